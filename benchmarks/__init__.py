@@ -0,0 +1 @@
+"""文字起こしツールのベンチマークスイート."""
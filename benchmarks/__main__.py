@@ -0,0 +1,89 @@
+"""ベンチマークのコマンドラインエントリーポイント.
+
+使用例:
+    python -m benchmarks run -m tiny base -o bench.json
+    python -m benchmarks run -m large-v3 --dtypes float32 int8 -o int8.json
+    python -m benchmarks compare before.json after.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+from .compare import compare_results, find_regressions, format_comparisons
+from .suite import DEFAULT_DURATIONS, run_suite
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """ベンチマークを実行または比較する."""
+    parser = argparse.ArgumentParser(prog="benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="ベンチマークを実行する")
+    run.add_argument("-m", "--models", nargs="+", default=["tiny", "base"])
+    run.add_argument(
+        "-d",
+        "--durations",
+        nargs="+",
+        type=float,
+        default=[seconds for _, seconds in DEFAULT_DURATIONS],
+        help="合成音声の長さ（秒）",
+    )
+    run.add_argument("-n", "--repeat", type=int, default=3)
+    run.add_argument(
+        "--dtypes",
+        nargs="+",
+        default=["float32"],
+        choices=["float32", "int8"],
+        help="計測する精度（int8を含めるとfloat32との速度・メモリ・誤り率を比較）",
+    )
+    run.add_argument("-o", "--output", type=Path, default=Path("benchmark.json"))
+    run.add_argument(
+        "--allow-download",
+        action="store_true",
+        help="未ダウンロードのモデルをダウンロードする（既定ではスキップ）",
+    )
+
+    compare = subparsers.add_parser("compare", help="2つの結果を比較する")
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("current", type=Path)
+    compare.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="劣化とみなす変化率（既定: 0.10 = 10%%）",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_suite(
+            args.models,
+            durations=[(f"{seconds:g}s", seconds) for seconds in args.durations],
+            repeat=args.repeat,
+            allow_download=args.allow_download,
+            dtypes=args.dtypes,
+        )
+        args.output.write_text(
+            json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(f"✅ 結果を保存しました: {args.output}")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    current = json.loads(args.current.read_text(encoding="utf-8"))
+    comparisons = compare_results(baseline, current)
+    print(format_comparisons(comparisons, args.threshold))
+
+    regressions = find_regressions(comparisons, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)}件の指標が劣化しています", file=sys.stderr)
+        return 1
+    print("\n✅ 劣化は検出されませんでした")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
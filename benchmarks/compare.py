@@ -0,0 +1,67 @@
+"""2つのベンチマーク結果を比較して性能の劣化を検出する."""
+
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class Comparison:
+    """1つの指標の比較結果."""
+
+    name: str
+    unit: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """基準値からの変化率（正の値は悪化）."""
+        if self.baseline == 0:
+            return 0.0
+        return (self.current - self.baseline) / self.baseline
+
+
+def compare_results(
+    baseline: dict[str, Any], current: dict[str, Any]
+) -> list[Comparison]:
+    """両方の結果に含まれる指標を比較する.
+
+    Args:
+    ----
+        baseline: 基準となるベンチマーク結果
+        current: 比較対象のベンチマーク結果
+
+    Returns:
+    -------
+        指標名順の比較結果
+    """
+    base_metrics = baseline["metrics"]
+    current_metrics = current["metrics"]
+    return [
+        Comparison(
+            name=name,
+            unit=current_metrics[name]["unit"],
+            baseline=base_metrics[name]["value"],
+            current=current_metrics[name]["value"],
+        )
+        for name in sorted(base_metrics.keys() & current_metrics.keys())
+    ]
+
+
+def find_regressions(
+    comparisons: list[Comparison], threshold: float
+) -> list[Comparison]:
+    """変化率がthresholdを超えて悪化した指標を返す."""
+    return [c for c in comparisons if c.change > threshold]
+
+
+def format_comparisons(comparisons: list[Comparison], threshold: float) -> str:
+    """比較結果を表形式の文字列にする."""
+    lines = [f"{'指標':<48} {'基準':>12} {'今回':>12} {'変化':>8}"]
+    for c in comparisons:
+        mark = " ⚠️" if c.change > threshold else ""
+        lines.append(
+            f"{c.name:<50} {c.baseline:>10.4f}{c.unit:<2} {c.current:>10.4f}"
+            f"{c.unit:<2} {c.change:>+7.1%}{mark}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,279 @@
+"""文字起こし処理の各段階の処理時間とメモリを計測する."""
+
+import multiprocessing
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .synthetic import generate_speech_like_audio, write_wav
+
+# 既定で計測する音声の長さ（ラベル, 秒）
+DEFAULT_DURATIONS = [("10s", 10.0), ("60s", 60.0), ("300s", 300.0)]
+
+# Metric: {"value": 計測値, "unit": 単位}（すべて値が小さいほど良い）
+Metric = dict[str, Any]
+
+
+def _median_time(func: Callable[[], Any], repeat: int) -> float:
+    """funcをrepeat回実行した処理時間の中央値（秒）."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """現在のプロセスの最大常駐メモリ（MB）. 取得できない環境ではNone."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # LinuxはKB単位、macOSはバイト単位
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def _first_stream_update(transcriber: Any, path: str) -> Any:
+    """ストリーミングで最初のウィンドウの結果が得られるまで実行する."""
+    return next(iter(transcriber.transcribe_stream(path)))
+
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    """文字単位の誤り率（編集距離 / 参照の文字数）.
+
+    日本語は単語の区切りがないため、WERの代わりに文字単位で比較する。
+    空白は比較の対象外とする。
+    """
+    ref = "".join(reference.split())
+    hyp = "".join(hypothesis.split())
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_char in enumerate(ref, start=1):
+        current = [i]
+        for j, hyp_char in enumerate(hyp, start=1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_char != hyp_char),
+                )
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def _metric_prefix(model_name: str, dtype: str) -> str:
+    """指標名の接頭辞（float32は従来どおりモデル名のみ）."""
+    return model_name if dtype == "float32" else f"{model_name}.{dtype}"
+
+
+def _measure_model(
+    model_name: str,
+    dtype: str,
+    audio_files: list[tuple[str, str, float]],
+    repeat: int,
+) -> tuple[dict[str, Metric], dict[str, str]]:
+    """1つのモデルについてロード時間・RTF・初回セグメント遅延を計測する.
+
+    最大常駐メモリを他のモデルと分けて計測するため、子プロセスで実行する。
+
+    Returns
+    -------
+        (指標, 音声のラベルごとの文字起こし結果)
+    """
+    import torch
+
+    from transcription_tool.model_registry import ModelRegistry
+    from transcription_tool.transcriber import Transcriber
+
+    torch.set_num_threads(os.cpu_count() or 1)
+    metrics: dict[str, Metric] = {}
+    texts: dict[str, str] = {}
+    prefix = _metric_prefix(model_name, dtype)
+    transcriber = Transcriber(
+        model_name, device="cpu", dtype=dtype, registry=ModelRegistry()
+    )
+
+    start = time.perf_counter()
+    transcriber._load_model()
+    metrics[f"{prefix}.load_time"] = {
+        "value": time.perf_counter() - start,
+        "unit": "s",
+    }
+
+    for label, path, duration in audio_files:
+        elapsed = _median_time(partial(transcriber.transcribe, path), repeat)
+        metrics[f"{prefix}.rtf.{label}"] = {
+            "value": elapsed / duration,
+            "unit": "x",
+        }
+        first_segment = _median_time(
+            partial(_first_stream_update, transcriber, path), repeat
+        )
+        metrics[f"{prefix}.first_segment_latency.{label}"] = {
+            "value": first_segment,
+            "unit": "s",
+        }
+        texts[label] = transcriber.transcribe(path)["text"]
+
+    peak = _peak_rss_mb()
+    if peak is not None:
+        metrics[f"{prefix}.peak_rss"] = {"value": peak, "unit": "MB"}
+    return metrics, texts
+
+
+def _measure_io(work_dir: Path, repeat: int) -> dict[str, Metric]:
+    """Markdown保存と結果ファイル一覧取得の処理時間を計測する."""
+    from transcription_tool import file_manager
+    from transcription_tool.utils import save_transcription_as_markdown
+
+    metrics: dict[str, Metric] = {}
+    for n_segments in (100, 10000):
+        segments = [
+            {"start": i * 2.0, "end": i * 2.0 + 1.5, "text": f"セグメント{i}です。"}
+            for i in range(n_segments)
+        ]
+        result = {"text": "".join(s["text"] for s in segments), "segments": segments}
+        output_dir = work_dir / f"markdown_{n_segments}"
+        metrics[f"markdown.write_time.{n_segments}segments"] = {
+            "value": _median_time(
+                partial(
+                    save_transcription_as_markdown,
+                    result,
+                    "bench.wav",
+                    output_dir=output_dir,
+                    include_timestamps=True,
+                    output_filename="bench.md",
+                ),
+                repeat,
+            ),
+            "unit": "s",
+        }
+
+    # file_managerはカレントディレクトリのtranscriptionsを参照する
+    cwd = Path.cwd()
+    os.chdir(work_dir)
+    try:
+        transcriptions_dir = file_manager.get_transcriptions_dir()
+        for i in range(1000):
+            (transcriptions_dir / f"{i:05d}_bench.md").write_text("# bench")
+        metrics["file_manager.list_time.1000files"] = {
+            "value": _median_time(file_manager.list_transcription_files, repeat),
+            "unit": "s",
+        }
+        metrics["file_manager.page_time.1000files"] = {
+            "value": _median_time(file_manager.list_transcription_page, repeat),
+            "unit": "s",
+        }
+    finally:
+        os.chdir(cwd)
+    return metrics
+
+
+def _compare_with_float32(
+    model_name: str, texts: dict[str, dict[str, str]]
+) -> dict[str, Metric]:
+    """float32以外の精度の文字起こし結果を、float32の結果と比較する."""
+    metrics: dict[str, Metric] = {}
+    reference = texts.get("float32")
+    if reference is None:
+        return metrics
+    for dtype, hypothesis in texts.items():
+        if dtype == "float32":
+            continue
+        prefix = _metric_prefix(model_name, dtype)
+        for label, text in hypothesis.items():
+            metrics[f"{prefix}.cer_vs_float32.{label}"] = {
+                "value": character_error_rate(reference[label], text),
+                "unit": "ratio",
+            }
+    return metrics
+
+
+def _environment() -> dict[str, Any]:
+    """計測環境の情報."""
+    info: dict[str, Any] = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        import torch
+
+        info["torch"] = torch.__version__
+        info["torch_threads"] = torch.get_num_threads()
+    except ImportError:
+        pass
+    return info
+
+
+def run_suite(
+    models: list[str],
+    durations: Optional[list[tuple[str, float]]] = None,
+    repeat: int = 3,
+    allow_download: bool = False,
+    log: Callable[[str], None] = print,
+    dtypes: Optional[list[str]] = None,
+) -> dict[str, Any]:
+    """ベンチマークを実行して結果を返す.
+
+    Args:
+    ----
+        models: 計測するモデル名
+        durations: 合成音声の(ラベル, 秒)のリスト
+        repeat: 各計測の繰り返し回数（中央値を採用）
+        allow_download: 未ダウンロードのモデルをダウンロードするかどうか
+            （Falseの場合はスキップしてオフラインで実行する）
+        log: 進捗メッセージの出力先
+        dtypes: 計測するモデルの精度（既定: float32のみ）。float32と
+            int8を指定すると、int8の文字誤り率をfloat32の結果に対して計測する
+
+    Returns:
+    -------
+        {"environment": ..., "metrics": {名前: {"value", "unit"}}, "skipped": [...]}
+    """
+    from transcription_tool.model_utils import is_model_downloaded
+
+    durations = durations or DEFAULT_DURATIONS
+    metrics: dict[str, Metric] = {}
+    skipped: list[str] = []
+
+    with tempfile.TemporaryDirectory(prefix="transcription_bench_") as temp:
+        work_dir = Path(temp)
+        audio_files = []
+        for i, (label, seconds) in enumerate(durations):
+            path = write_wav(
+                work_dir / f"{label}.wav", generate_speech_like_audio(seconds, i)
+            )
+            audio_files.append((label, str(path), seconds))
+
+        log("📝 Markdown保存とファイル一覧を計測中...")
+        metrics.update(_measure_io(work_dir, repeat))
+
+        context = multiprocessing.get_context("spawn")
+        for model_name in models:
+            if not allow_download and not is_model_downloaded(model_name):
+                log(f"⏭️  {model_name}: 未ダウンロードのためスキップ")
+                skipped.append(model_name)
+                continue
+            texts: dict[str, dict[str, str]] = {}
+            for dtype in dtypes or ["float32"]:
+                log(f"📦 {model_name}モデル（{dtype}）を計測中...")
+                with context.Pool(1) as pool:
+                    model_metrics, texts[dtype] = pool.apply(
+                        _measure_model, (model_name, dtype, audio_files, repeat)
+                    )
+                metrics.update(model_metrics)
+            metrics.update(_compare_with_float32(model_name, texts))
+
+    return {"environment": _environment(), "metrics": metrics, "skipped": skipped}
@@ -0,0 +1,53 @@
+"""ベンチマーク用の合成音声を生成する."""
+
+import wave
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def generate_speech_like_audio(duration: float, seed: int = 0) -> np.ndarray:
+    """発話と無音が交互に現れる音声に似た信号を生成する.
+
+    基本周波数が揺らぐ調波音を0.5〜3秒の長さで鳴らし、間に短い無音を挟む。
+
+    Args:
+    ----
+        duration: 音声の長さ（秒）
+        seed: 乱数シード（同じシードなら同じ音声になる）
+
+    Returns:
+    -------
+        -1.0〜1.0のfloat32配列（16kHzモノラル）
+    """
+    rng = np.random.default_rng(seed)
+    total = int(duration * SAMPLE_RATE)
+    audio = np.zeros(total, dtype=np.float32)
+
+    position = 0
+    while position < total:
+        burst = int(rng.uniform(0.5, 3.0) * SAMPLE_RATE)
+        t = np.arange(min(burst, total - position)) / SAMPLE_RATE
+        pitch = rng.uniform(100, 250) * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+        envelope = np.sin(np.pi * t / t[-1]) if len(t) > 1 else np.ones_like(t)
+        audio[position : position + len(t)] = 0.3 * voiced * envelope
+        position += len(t) + int(rng.uniform(0.2, 1.0) * SAMPLE_RATE)
+
+    audio += rng.normal(0, 0.005, total).astype(np.float32)
+    return np.clip(audio, -1.0, 1.0)
+
+
+def write_wav(path: Path, audio: np.ndarray) -> Path:
+    """16bit PCMのWAVファイルとして保存する."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pcm = (audio * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+    return path
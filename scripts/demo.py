@@ -1,17 +1,31 @@
 """デモンストレーション用スクリプト."""
 
+import argparse
 import time
 from pathlib import Path
+from typing import Optional
 
+from transcription_tool.model_registry import (
+    configure_model_registry,
+    get_model_registry,
+)
 from transcription_tool.transcriber import Transcriber
 from transcription_tool.utils import save_transcription_as_markdown
 
 
-def demo_transcription() -> None:
-    """文字起こし機能のデモンストレーション."""
+def demo_transcription(model_memory_mb: Optional[float] = None) -> None:
+    """文字起こし機能のデモンストレーション.
+
+    Args:
+    ----
+        model_memory_mb: ロード済みモデルを保持するメモリの上限（MB）
+    """
     print("🎙️  音声文字起こしツール - デモンストレーション")
     print("=" * 50)
 
+    if model_memory_mb is not None:
+        configure_model_registry(model_memory_mb)
+
     # テスト用音声ファイルの確認
     test_audio = Path("tests/test_data/test_audio.wav")
     if not test_audio.exists():
@@ -69,6 +83,18 @@ def demo_transcription() -> None:
                 text = segment["text"].strip()
                 print(f"  [{start:.1f}s - {end:.1f}s] {text}")
 
+        # 2回目の実行ではロード済みモデルが再利用される
+        print("\n🔁 同じモデルで再実行します...")
+        rerun_start = time.time()
+        Transcriber(model_name=model_name).transcribe(test_audio)
+        print(f"✅ 再実行完了（処理時間: {time.time() - rerun_start:.1f}秒）")
+
+        stats = get_model_registry().stats()
+        print(
+            f"\n📊 モデルレジストリ: ヒット {stats.hits}回 / ミス {stats.misses}回 / "
+            f"平均ロード時間 {stats.average_load_time:.1f}秒"
+        )
+
     except Exception as e:
         print(f"\n❌ エラーが発生しました: {e}")
         import traceback
@@ -77,4 +103,11 @@ def demo_transcription() -> None:
 
 
 if __name__ == "__main__":
-    demo_transcription()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--model-memory-mb",
+        type=float,
+        default=None,
+        help="ロード済みモデルを保持するメモリの上限（MB）",
+    )
+    demo_transcription(parser.parse_args().model_memory_mb)
@@ -1,6 +1,8 @@
 """メインエントリーポイント."""
 
-from transcription_tool.app import main
+import sys
+
+from transcription_tool.cli import main
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,357 @@
+"""保存済みの文字起こし結果に、必要になったときだけ単語のタイムスタンプを付ける.
+
+単語ごとの時刻（word_timestamps）を毎回のデコードで計算すると、すべての
+ジョブが遅くなる。結果にはデコード済みのトークンが残っているため、後から
+元の音声とトークンを同じモデルに通してクロスアテンションを求め直せば、
+デコードをやり直さずに単語の時刻を計算できる。
+"""
+
+import math
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from .audio_cache import get_audio_cache
+from .chunking import SAMPLE_RATE
+from .history_index import get_history_index
+from .result_cache import get_result_cache
+from .transcriber import Transcriber
+from .vad import SpeechMap
+from .writers import write_outputs
+
+# 1回のforwardでアライメントする音声の最大長（秒, Whisperの入力長）
+ALIGNMENT_WINDOW_LENGTH = 30.0
+
+# 単語のタイムスタンプを付けた結果の保存先（元のファイル名.words.json）
+WORDS_SUFFIX = ".words.json"
+
+
+def _group_windows(
+    segments: list[dict[str, Any]], window_length: float
+) -> list[list[dict[str, Any]]]:
+    """連続するセグメントを、window_length秒に収まるまとまりに分ける."""
+    windows: list[list[dict[str, Any]]] = []
+    for segment in segments:
+        if windows and segment["end"] - windows[-1][0]["start"] <= window_length:
+            windows[-1].append(segment)
+        else:
+            windows.append([segment])
+    return windows
+
+
+def align_words(
+    model: Any,
+    audio: np.ndarray,
+    segments: list[dict[str, Any]],
+    language: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    """デコード済みのセグメントに単語ごとのタイムスタンプを付ける.
+
+    セグメントを30秒以内のまとまりに分け、まとまりごとに1回だけモデルに
+    通す。トークンが保存されていないセグメントはテキストから作り直す。
+
+    VADで無音を取り除いてデコードしたセグメントは、元の音声では30秒を
+    超えることがある。その場合は発話区間だけをつなげた音声の時刻で
+    アライメントし、単語の時刻を元の音声の時刻に戻す。発話区間だけでも
+    30秒を超えるセグメントは_align_long_segmentsで分けてアライメントする。
+
+    Args:
+    ----
+        model: openai-whisperのモデル
+        audio: 16kHzモノラルの元の音声
+        segments: 元の音声の時刻で表したセグメント
+        language: 文字起こし結果の言語
+
+    Returns:
+    -------
+        wordsを追加したセグメントのコピー
+    """
+    if not any(
+        segment["end"] - segment["start"] > ALIGNMENT_WINDOW_LENGTH
+        for segment in segments
+    ):
+        return _align_windows(model, audio, segments, language)
+
+    speech_map = SpeechMap.from_audio(audio)
+    compacted = [
+        {
+            **segment,
+            "start": speech_map.to_compacted(segment["start"]),
+            "end": speech_map.to_compacted(segment["end"]),
+        }
+        for segment in segments
+    ]
+    aligned = speech_map.remap_segments(
+        _align_long_segments(model, speech_map.compact(audio), compacted, language)
+    )
+    # セグメントの時刻は保存されていた元の値のまま残す
+    return [
+        {**segment, "start": original["start"], "end": original["end"]}
+        for segment, original in zip(aligned, segments)
+    ]
+
+
+def _timestamp_pieces(
+    segment: dict[str, Any], tokenizer: Any
+) -> list[tuple[float, float, list[int]]]:
+    """セグメントのトークンをタイムスタンプトークンの位置で区切る.
+
+    タイムスタンプトークンはデコードしたウィンドウの先頭からの時刻のため、
+    先頭のタイムスタンプトークンからの差をセグメントの開始時刻に足す。
+
+    Returns
+    -------
+        (開始時刻, 終了時刻, テキストのトークン)のリスト。先頭が
+        タイムスタンプトークンでない場合は空のリスト
+    """
+    from whisper.audio import TOKENS_PER_SECOND
+
+    tokens = segment.get("tokens") or []
+    if not tokens or tokens[0] < tokenizer.timestamp_begin:
+        return []
+
+    def time_of(token: int) -> float:
+        return float(segment["start"] + (token - tokens[0]) / TOKENS_PER_SECOND)
+
+    pieces: list[tuple[float, float, list[int]]] = []
+    piece_start = float(segment["start"])
+    text_tokens: list[int] = []
+    for token in tokens[1:]:
+        if token >= tokenizer.timestamp_begin:
+            if text_tokens:
+                pieces.append((piece_start, time_of(token), text_tokens))
+            piece_start, text_tokens = time_of(token), []
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+    if text_tokens:
+        pieces.append((piece_start, float(segment["end"]), text_tokens))
+    return pieces
+
+
+def _split_by_timestamps(
+    segment: dict[str, Any], tokenizer: Any, window_length: float
+) -> Optional[list[dict[str, Any]]]:
+    """セグメントを途中のタイムスタンプトークンの位置でwindow_length秒以内に分ける.
+
+    Returns
+    -------
+        分けたセグメントのリスト。途中にタイムスタンプトークンがない場合や、
+        タイムスタンプトークンの間だけでwindow_length秒を超える場合はNone
+    """
+    parts: list[dict[str, Any]] = []
+    for start, end, piece_tokens in _timestamp_pieces(segment, tokenizer):
+        if end - start > window_length:
+            return None
+        if parts and end - parts[-1]["start"] <= window_length:
+            parts[-1]["end"] = end
+            parts[-1]["tokens"] = parts[-1]["tokens"] + piece_tokens
+        else:
+            parts.append({"start": start, "end": end, "tokens": piece_tokens})
+    if len(parts) < 2:
+        return None
+    return [
+        {**segment, **part, "text": tokenizer.decode(part["tokens"])} for part in parts
+    ]
+
+
+def _redecode_words(
+    model: Any,
+    audio: np.ndarray,
+    segment: dict[str, Any],
+    language: Optional[str],
+) -> list[dict[str, Any]]:
+    """セグメントの範囲をword_timestamps=Trueでデコードし直して単語を求める.
+
+    トークンから分けられない場合の代替のため、単語は保存されている
+    テキストではなくデコードし直した結果になる。
+    """
+    import torch
+
+    start = int(segment["start"] * SAMPLE_RATE)
+    end = math.ceil(segment["end"] * SAMPLE_RATE)
+    result = model.transcribe(
+        np.asarray(audio[start:end], dtype=np.float32),
+        language=language,
+        word_timestamps=True,
+        condition_on_previous_text=False,
+        fp16=next(model.parameters()).dtype == torch.float16,
+    )
+    offset = start / SAMPLE_RATE
+    return [
+        {**word, "start": word["start"] + offset, "end": word["end"] + offset}
+        for decoded in result["segments"]
+        for word in decoded.get("words") or []
+    ]
+
+
+def _align_long_segments(
+    model: Any,
+    audio: np.ndarray,
+    segments: list[dict[str, Any]],
+    language: Optional[str],
+) -> list[dict[str, Any]]:
+    """30秒を超えるセグメントを分けてから_align_windowsでアライメントする.
+
+    途中のタイムスタンプトークンで分けられる場合はトークンの時刻で分け、
+    分けた部分の単語をつなげる。分けられない場合はその範囲だけを
+    デコードし直す。
+    """
+    from whisper.tokenizer import get_tokenizer
+
+    tokenizer = get_tokenizer(
+        model.is_multilingual,
+        num_languages=model.num_languages,
+        language=language,
+        task="transcribe",
+    )
+    parts: list[dict[str, Any]] = []
+    owners: list[int] = []
+    redecoded: dict[int, list[dict[str, Any]]] = {}
+    for i, segment in enumerate(segments):
+        split: Optional[list[dict[str, Any]]] = [segment]
+        if segment["end"] - segment["start"] > ALIGNMENT_WINDOW_LENGTH:
+            split = _split_by_timestamps(segment, tokenizer, ALIGNMENT_WINDOW_LENGTH)
+        if split is None:
+            redecoded[i] = _redecode_words(model, audio, segment, language)
+            continue
+        parts.extend(split)
+        owners.extend([i] * len(split))
+
+    aligned: dict[int, list[dict[str, Any]]] = {}
+    for owner, part in zip(owners, _align_windows(model, audio, parts, language)):
+        aligned.setdefault(owner, []).append(part)
+    results = []
+    for i, segment in enumerate(segments):
+        if i in redecoded:
+            results.append({**segment, "words": redecoded[i]})
+        elif len(aligned[i]) == 1:
+            results.append(aligned[i][0])
+        else:
+            # 分けた部分の単語をつなげ、トークンなどは元のセグメントのまま残す
+            words = [word for part in aligned[i] for word in part["words"]]
+            results.append({**segment, "words": words})
+    return results
+
+
+def _align_windows(
+    model: Any,
+    audio: np.ndarray,
+    segments: list[dict[str, Any]],
+    language: Optional[str],
+) -> list[dict[str, Any]]:
+    """30秒以内のまとまりごとにモデルに通して単語の時刻を求める."""
+    import torch
+    import whisper
+    from whisper.audio import FRAMES_PER_SECOND, HOP_LENGTH, N_FRAMES, N_SAMPLES
+    from whisper.timing import add_word_timestamps
+    from whisper.tokenizer import get_tokenizer
+
+    tokenizer = get_tokenizer(
+        model.is_multilingual,
+        num_languages=model.num_languages,
+        language=language,
+        task="transcribe",
+    )
+    dtype = next(model.parameters()).dtype
+    aligned: list[dict[str, Any]] = []
+    last_speech_timestamp = 0.0
+    for window in _group_windows(segments, ALIGNMENT_WINDOW_LENGTH):
+        # add_word_timestampsはseek（フレーム）から時刻のオフセットを求める
+        seek = int(window[0]["start"] * SAMPLE_RATE) // HOP_LENGTH
+        offset = seek * HOP_LENGTH
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(
+                np.asarray(audio[offset : offset + N_SAMPLES], dtype=np.float32)
+            ),
+            model.dims.n_mels,
+        ).to(model.device, dtype=dtype)
+        span = max(segment["end"] for segment in window) - offset / SAMPLE_RATE
+        num_frames = min(N_FRAMES, max(1, math.ceil(span * FRAMES_PER_SECOND)))
+
+        window_segments = []
+        for segment in window:
+            tokens = [t for t in segment.get("tokens") or [] if t < tokenizer.eot]
+            window_segments.append(
+                {
+                    **segment,
+                    "seek": seek,
+                    "tokens": tokens or tokenizer.encode(segment["text"]),
+                }
+            )
+        with torch.no_grad():
+            add_word_timestamps(
+                segments=window_segments,
+                model=model,
+                tokenizer=tokenizer,
+                mel=mel,
+                num_frames=num_frames,
+                last_speech_timestamp=last_speech_timestamp,
+            )
+        for segment, original in zip(window_segments, window):
+            # 元のトークン（タイムスタンプトークンを含む）とseekは元のまま残す
+            segment["tokens"] = original.get("tokens", segment["tokens"])
+            if "seek" in original:
+                segment["seek"] = original["seek"]
+            else:
+                del segment["seek"]
+        aligned.extend(window_segments)
+        last_speech_timestamp = aligned[-1]["end"]
+    return aligned
+
+
+def has_word_timestamps(result: dict[str, Any]) -> bool:
+    """すべてのセグメントに単語のタイムスタンプが付いているかどうか."""
+    return all("words" in segment for segment in result.get("segments") or [])
+
+
+def align_transcript(
+    filename: str,
+    directory: Path,
+    audio: Optional[Path] = None,
+    model_name: Optional[str] = None,
+    progress_callback: Optional[Callable[[str], None]] = None,
+) -> Path:
+    """履歴に保存した文字起こし結果に単語のタイムスタンプを付けて保存する.
+
+    保存時に登録したトークンとセグメントを使い、音声は音声キャッシュから
+    取り出す（キャッシュから削除されている場合はaudioで指定する）。
+
+    Args:
+    ----
+        filename: 文字起こし結果（Markdown）のファイル名
+        directory: 文字起こし結果のディレクトリ
+        audio: 元の音声ファイル（Noneの場合は音声キャッシュから取得）
+        model_name: アライメントに使うモデル（Noneの場合は文字起こしと同じ）
+        progress_callback: モデル準備中の進捗を通知するコールバック関数
+
+    Returns:
+    -------
+        単語のタイムスタンプを含むJSONファイルのパス
+
+    Raises:
+    ------
+        ValueError: 単語のタイムスタンプを計算するための情報がない場合
+    """
+    source = get_history_index(directory).get_alignment_source(filename)
+    if source is None:
+        raise ValueError(
+            f"{filename}には単語のタイムスタンプを計算するための情報がありません"
+        )
+    audio_input: Any = audio
+    if audio_input is None:
+        audio_input = get_audio_cache().get(source.audio_hash)
+        if audio_input is None:
+            raise ValueError(
+                "元の音声が音声キャッシュにありません。音声ファイルを指定してください"
+            )
+
+    transcriber = Transcriber(
+        model_name=model_name or source.model_name, result_cache=get_result_cache()
+    )
+    result = transcriber.add_word_timestamps(
+        audio_input, source.to_result(), progress_callback
+    )
+    output_path = directory / f"{Path(filename).stem}{WORDS_SUFFIX}"
+    write_outputs(result, filename, {"json": output_path})
+    return output_path
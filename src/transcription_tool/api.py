@@ -0,0 +1,395 @@
+"""他のサービスから音声を投入して結果を取得するための非同期HTTP API.
+
+UIと同じプロセスで動き、同じモデルレジストリ・スケジューラ・キャッシュを
+共有する。ジョブはスケジューラのレーンで実行され、呼び出し側は
+ジョブIDで状態と途中までのセグメントをポーリングする。
+
+    POST /jobs?filename=...           音声ファイルの内容を本文で送る（202）
+    GET  /jobs/{id}?since=&wait=      状態と途中までのセグメント
+    GET  /jobs/{id}/result?format=    md, srt, vtt, json, tsvの結果
+    DELETE /jobs/{id}                 待機中のジョブのキャンセル
+
+接続ごとにスレッドを使わないよう、エンドポイントはすべてasyncで、
+ポーリングの待機（wait）もイベントループ上で行う。CLIの起動を遅くしない
+よう、fastapiとtranscriberはAPIを作成する時点で読み込む。
+"""
+
+import asyncio
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from .decoding import DECODING_PROFILES, DEFAULT_DECODING_PROFILE
+from .model_utils import MODEL_SIZES, WHISPER_BACKEND, split_model_choice
+from .scheduler import QUEUED, Job, get_scheduler, lane_name
+from .writers import render_output
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+    from .transcriber import Transcriber
+
+# APIサーバーの既定のポート（UIは7862、メトリクスは7863）
+DEFAULT_API_PORT = 7864
+# 認証がないため、既定では同じマシンからの接続だけを受け付ける
+DEFAULT_API_HOST = "127.0.0.1"
+
+# アップロードされた音声を文字起こしが終わるまで置く場所
+DEFAULT_UPLOAD_DIR = Path(tempfile.gettempdir()) / "transcription_tool_api"
+
+# アップロードできる音声の最大サイズ（MB）
+MAX_UPLOAD_MB = 1024
+
+# 結果を保持しておく終了済みのジョブの数（古いものから破棄する）
+MAX_FINISHED_JOBS = 100
+# GET /jobs/{id} で状態の変化を待つ最大時間（秒）と確認の間隔（秒）
+MAX_POLL_WAIT = 30.0
+POLL_INTERVAL = 0.2
+
+# 形式ごとのContent-Type
+_MEDIA_TYPES = {
+    "md": "text/markdown; charset=utf-8",
+    "srt": "application/x-subrip; charset=utf-8",
+    "vtt": "text/vtt; charset=utf-8",
+    "json": "application/json; charset=utf-8",
+    "tsv": "text/tab-separated-values; charset=utf-8",
+}
+
+
+@dataclass
+class ApiJob:
+    """APIから投入された1件のジョブと途中までの結果."""
+
+    filename: str
+    model: str
+    audio_path: Path
+    job: Optional[Job] = None
+    segments: list[dict[str, Any]] = field(default_factory=list)
+    position: float = 0.0
+    duration: Optional[float] = None
+    language: Optional[str] = None
+    result: Optional[dict[str, Any]] = None
+    # 途中の結果が更新されるたびに増える（ポーリングの待機に使用）
+    version: int = 0
+
+    async def wait_for_change(self, timeout: float) -> None:
+        """状態か途中の結果が変わるか、終了するまで最大timeout秒待つ."""
+        assert self.job is not None
+        deadline = time.monotonic() + timeout
+        seen = (self.job.status, self.version)
+        while (
+            not self.job.is_finished
+            and (self.job.status, self.version) == seen
+            and time.monotonic() < deadline
+        ):
+            await asyncio.sleep(POLL_INTERVAL)
+
+    def unfinished_message(self) -> str:
+        """結果がまだないジョブの状態の説明."""
+        assert self.job is not None
+        if self.job.error is not None:
+            return f"ジョブは失敗しました: {self.job.error}"
+        return f"ジョブは完了していません: {self.job.status}"
+
+    def snapshot(self, since: int = 0) -> dict[str, Any]:
+        """状態とsince番目以降のセグメント."""
+        assert self.job is not None
+        scheduler = get_scheduler()
+        queued = self.job.status == QUEUED
+        error = self.job.error
+        return {
+            "job_id": self.job.job_id,
+            "status": self.job.status,
+            "filename": self.filename,
+            "model": self.model,
+            "queue_position": (
+                scheduler.queue_position(self.job.job_id) if queued else None
+            ),
+            "estimated_wait": (
+                scheduler.estimate_wait(self.job.job_id) if queued else None
+            ),
+            "position": self.position,
+            "duration": self.duration,
+            "language": self.language,
+            "segments": self.segments[since:],
+            "next": len(self.segments),
+            "error": str(error) if error is not None else None,
+        }
+
+
+class ApiJobStore:
+    """APIから投入したジョブを保持し、終了済みのものは古い順に破棄する."""
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS) -> None:
+        """ApiJobStoreを初期化する.
+
+        Args:
+        ----
+            max_finished: 保持する終了済みのジョブの数
+        """
+        self.max_finished = max_finished
+        self._jobs: dict[str, ApiJob] = {}
+        self._lock = threading.Lock()
+
+    def add(self, api_job: ApiJob) -> None:
+        """ジョブを追加し、上限を超えた終了済みのジョブを破棄する."""
+        assert api_job.job is not None
+        with self._lock:
+            self._jobs[api_job.job.job_id] = api_job
+            finished = [
+                job_id
+                for job_id, stored in self._jobs.items()
+                if stored.job is not None and stored.job.is_finished
+            ]
+            for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+                del self._jobs[job_id]
+
+    def get(self, job_id: str) -> ApiJob:
+        """ジョブIDからジョブを取得する.
+
+        Raises
+        ------
+            HTTPException: ジョブが見つからない場合（404）
+        """
+        from fastapi import HTTPException
+
+        with self._lock:
+            api_job = self._jobs.get(job_id)
+        if api_job is None:
+            raise HTTPException(404, f"ジョブ {job_id} が見つかりません")
+        return api_job
+
+
+class UploadTooLargeError(ValueError):
+    """アップロードされた音声が上限を超えた場合のエラー."""
+
+
+async def _save_upload(
+    chunks: AsyncIterator[bytes], audio_path: Path, max_bytes: int
+) -> None:
+    """受け取った分からファイルに書き込む（音声全体をメモリに載せない）.
+
+    Args:
+    ----
+        chunks: リクエスト本文
+        audio_path: 保存先のパス
+        max_bytes: 受け付ける最大サイズ（バイト）
+
+    Raises:
+    ------
+        UploadTooLargeError: 最大サイズを超えた場合
+        ValueError: 内容が空の場合
+    """
+    from fastapi.concurrency import run_in_threadpool
+
+    audio_path.parent.mkdir(parents=True, exist_ok=True)
+    size = 0
+    try:
+        with audio_path.open("wb") as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"音声ファイルが大きすぎます（上限: {max_bytes // 2**20}MB）"
+                    )
+                await run_in_threadpool(f.write, chunk)
+        if size == 0:
+            raise ValueError("音声ファイルの内容が空です")
+    except BaseException:
+        audio_path.unlink(missing_ok=True)  # 途中で切断された場合など
+        raise
+
+
+def _create_transcriber(
+    model_choice: str,
+    backend: str,
+    vad: bool,
+    language: Optional[str],
+    decoding: str,
+) -> "Transcriber":
+    """UIと同じレジストリ・キャッシュを使うTranscriberを作成する."""
+    from .audio_cache import get_audio_cache
+    from .result_cache import get_result_cache
+    from .transcriber import Transcriber
+
+    model_name, dtype = split_model_choice(model_choice)
+    return Transcriber(
+        model_name=model_name,
+        device="cpu" if dtype == "int8" else None,
+        dtype=dtype,
+        result_cache=get_result_cache(),
+        audio_cache=get_audio_cache(),
+        max_instances=get_scheduler().lane_concurrency(
+            lane_name(model_choice, backend)
+        ),
+        backend=backend,
+        vad=vad,
+        language=language,
+        decoding=decoding,
+    )
+
+
+def _transcribe_job(api_job: ApiJob, transcriber: "Transcriber") -> dict[str, Any]:
+    """スケジューラのスレッドで文字起こしし、途中の結果をジョブに反映する."""
+    try:
+        for update in transcriber.transcribe_stream(api_job.audio_path):
+            api_job.segments.extend(update.segments)
+            api_job.position = update.position
+            api_job.duration = update.duration
+            api_job.language = update.language
+            api_job.version += 1
+        api_job.result = {
+            "text": "".join(segment["text"] for segment in api_job.segments),
+            "segments": api_job.segments,
+            "language": api_job.language,
+            "duration": api_job.duration,
+        }
+        return api_job.result
+    finally:
+        api_job.version += 1
+        api_job.audio_path.unlink(missing_ok=True)
+
+
+def _validate_options(filename: str, model: str, backend: str, decoding: str) -> None:
+    """ジョブのパラメータを確認する.
+
+    Raises
+    ------
+        ValueError: 対応していない値の場合
+    """
+    from .backends import available_backends
+    from .transcriber import SUPPORTED_FORMATS
+
+    suffix = Path(filename).suffix.lower()
+    if suffix not in SUPPORTED_FORMATS:
+        raise ValueError(f"対応していない音声フォーマット: {suffix or filename}")
+    if split_model_choice(model)[0] not in MODEL_SIZES:
+        raise ValueError(f"対応していないモデル: {model}")
+    if backend not in available_backends():
+        raise ValueError(f"利用できない推論バックエンド: {backend}")
+    if decoding not in DECODING_PROFILES:
+        raise ValueError(f"対応していないデコードのプロファイル: {decoding}")
+
+
+def create_api(
+    upload_dir: Path = DEFAULT_UPLOAD_DIR, max_upload_mb: float = MAX_UPLOAD_MB
+) -> "FastAPI":
+    """文字起こしジョブのHTTP APIを作成する.
+
+    Args:
+    ----
+        upload_dir: アップロードされた音声を文字起こしが終わるまで置く場所
+        max_upload_mb: アップロードできる音声の最大サイズ（MB, 超えると413）
+
+    Returns:
+    -------
+        FastAPIのアプリケーション
+    """
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.concurrency import run_in_threadpool
+    from fastapi.responses import JSONResponse, Response
+
+    from .utils import estimate_audio_duration
+
+    api = FastAPI(title="transcription_tool")
+    store = ApiJobStore()
+
+    @api.post("/jobs", status_code=202)
+    async def submit_job(
+        request: Request,
+        filename: str,
+        model: str = "large-v3",
+        language: Optional[str] = None,
+        backend: str = WHISPER_BACKEND,
+        vad: bool = False,
+        decoding: str = DEFAULT_DECODING_PROFILE,
+    ) -> JSONResponse:
+        """本文で送られた音声を保存し、文字起こしジョブを投入する."""
+        audio_path = upload_dir / f"{uuid.uuid4().hex}{Path(filename).suffix.lower()}"
+        try:
+            _validate_options(filename, model, backend, decoding)
+            await _save_upload(request.stream(), audio_path, int(max_upload_mb * 2**20))
+        except UploadTooLargeError as e:
+            raise HTTPException(413, str(e)) from e
+        except ValueError as e:
+            raise HTTPException(400, str(e)) from e
+
+        # ffprobeを起動して待つため、イベントループを止めないよう別スレッドで実行する
+        audio_seconds = await run_in_threadpool(estimate_audio_duration, audio_path)
+        transcriber = _create_transcriber(model, backend, vad, language, decoding)
+        api_job = ApiJob(filename=filename, model=model, audio_path=audio_path)
+        api_job.job = get_scheduler().submit(
+            lane_name(model, backend),
+            lambda: _transcribe_job(api_job, transcriber),
+            audio_seconds=audio_seconds,
+        )
+        store.add(api_job)
+        return JSONResponse(
+            api_job.snapshot(),
+            status_code=202,
+            headers={"Location": f"/jobs/{api_job.job.job_id}"},
+        )
+
+    @api.get("/jobs/{job_id}")
+    async def get_job(job_id: str, since: int = 0, wait: float = 0.0) -> dict:
+        """状態と途中までのセグメントを返す.
+
+        waitを指定した場合は、状態か途中の結果が変わるまで最大wait秒待つ。
+        """
+        api_job = store.get(job_id)
+        await api_job.wait_for_change(min(max(wait, 0.0), MAX_POLL_WAIT))
+        return api_job.snapshot(max(since, 0))
+
+    @api.get("/jobs/{job_id}/result")
+    async def get_result(
+        job_id: str, format: str = "json", timestamps: bool = False
+    ) -> Response:
+        """終了したジョブの結果を指定の形式で返す."""
+        api_job = store.get(job_id)
+        if format not in _MEDIA_TYPES:
+            raise HTTPException(400, f"対応していない出力形式: {format}")
+        if api_job.result is None:
+            raise HTTPException(409, api_job.unfinished_message())
+        content = render_output(
+            api_job.result, format, api_job.filename, include_timestamps=timestamps
+        )
+        return Response(content, media_type=_MEDIA_TYPES[format])
+
+    @api.delete("/jobs/{job_id}")
+    async def cancel_job(job_id: str) -> dict:
+        """待機中のジョブをキャンセルする."""
+        api_job = store.get(job_id)
+        if not get_scheduler().cancel(job_id):
+            raise HTTPException(
+                409, f"ジョブ {job_id} は実行中または終了済みのためキャンセルできません"
+            )
+        api_job.audio_path.unlink(missing_ok=True)
+        return api_job.snapshot()
+
+    return api
+
+
+def start_api_server(port: int = DEFAULT_API_PORT, host: str = DEFAULT_API_HOST) -> Any:
+    """HTTP APIをバックグラウンドのスレッドで起動する.
+
+    Args:
+    ----
+        port: 待ち受けるポート
+        host: 待ち受けるアドレス（既定は同じマシンからの接続のみ）
+
+    Returns:
+    -------
+        起動したuvicornのサーバー（should_exitをTrueにすると停止する）
+    """
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(create_api(), host=host, port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, name="api-server", daemon=True).start()
+    return server
@@ -1,26 +1,133 @@
 """Gradioを使用した文字起こしツールのWebインターフェース."""
 
+import contextvars
+import functools
+import json
+import queue
 import time
+from collections.abc import Iterator, Sequence
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional, Union
 
 import gradio as gr
 
+from transcription_tool.alignment import align_transcript
+from transcription_tool.api import DEFAULT_API_HOST, start_api_server
+from transcription_tool.audio_cache import get_audio_cache
+from transcription_tool.backends import available_backends
 from transcription_tool.file_manager import (
+    DEFAULT_PAGE_SIZE,
     get_file_full_path,
-    list_transcription_files,
+    get_transcriptions_dir,
+    list_transcription_page,
     read_transcription_file,
+    search_transcriptions,
 )
-from transcription_tool.model_utils import MODEL_SIZES, is_model_downloaded
-from transcription_tool.transcriber import Transcriber
-from transcription_tool.utils import save_transcription_as_markdown
+from transcription_tool.language_id import AUTO_LANGUAGE_LABEL, LANGUAGE_CHOICES
+from transcription_tool.metrics import (
+    DEFAULT_METRICS_PORT,
+    configure_json_logging,
+    start_metrics_server,
+)
+from transcription_tool.micro_batch import BATCH_WINDOW_LENGTH, DEFAULT_MAX_BATCH_SIZE
+from transcription_tool.model_registry import (
+    configure_model_registry,
+    get_model_registry,
+)
+from transcription_tool.model_utils import (
+    MODEL_SIZES,
+    QUANTIZED_SUFFIX,
+    WHISPER_BACKEND,
+    ensure_model_downloaded,
+    is_model_downloaded,
+    split_model_choice,
+)
+from transcription_tool.result_cache import get_result_cache
+from transcription_tool.scheduler import (
+    CANCELLED,
+    DEFAULT_MEMORY_RESERVE_MB,
+    QUEUED,
+    configure_scheduler,
+    get_scheduler,
+    lane_name,
+)
+from transcription_tool.transcriber import (
+    DRAFT_MODELS,
+    SpeculativeUpdate,
+    StreamUpdate,
+    Transcriber,
+)
+from transcription_tool.utils import (
+    estimate_audio_duration,
+    save_transcription,
+)
+from transcription_tool.warmup import get_model_warmer
+from transcription_tool.writers import DEFAULT_OUTPUT_FORMATS, format_timestamp
+
+# 下書きモデルの選択肢（なしの場合は選択したモデルだけで文字起こしする）
+NO_DRAFT_LABEL = "なし"
+DRAFT_MODEL_CHOICES = [NO_DRAFT_LABEL, *DRAFT_MODELS]
+
+# 画面に表示する出力形式の名前
+OUTPUT_FORMAT_LABELS = {
+    "md": "Markdown",
+    "srt": "SRT字幕",
+    "vtt": "WebVTT字幕",
+    "json": "JSON",
+    "tsv": "TSV",
+}
+
+
+def _create_transcriber(
+    model_choice: str,
+    backend: str,
+    vad: bool = False,
+    micro_batch: bool = False,
+    language: Optional[str] = None,
+) -> Transcriber:
+    """モデルの選択肢と推論バックエンドに対応するTranscriberを作成する.
+
+    int8の選択肢はCPUで量子化モデルを使用する。スケジューラのレーンは
+    選択肢ごとに分かれるため、同時実行数も選択肢単位で決める。
+    """
+    model_name, dtype = split_model_choice(model_choice)
+    return Transcriber(
+        model_name=model_name,
+        device="cpu" if dtype == "int8" else None,
+        dtype=dtype,
+        result_cache=get_result_cache(),
+        audio_cache=get_audio_cache(),
+        max_instances=get_scheduler().lane_concurrency(
+            lane_name(model_choice, backend)
+        ),
+        backend=backend,
+        vad=vad,
+        micro_batch=micro_batch,
+        language=language,
+    )
+
+
+def _use_micro_batch(audio_file: str, long_form: bool, backend: str) -> bool:
+    """他のジョブとまとめてデコードする短い音声かどうか."""
+    if long_form or backend != WHISPER_BACKEND:
+        return False
+    try:
+        return estimate_audio_duration(Path(audio_file)) <= BATCH_WINDOW_LENGTH
+    except OSError:
+        return False
 
 
 def transcribe_audio(
     audio_file: Optional[str],
     model_name: str,
     include_timestamps: bool,
+    long_form: bool = False,
     progress: Optional[gr.Progress] = None,
+    backend: str = WHISPER_BACKEND,
+    vad: bool = False,
+    micro_batch: bool = False,
+    output_formats: Sequence[str] = DEFAULT_OUTPUT_FORMATS,
+    language: Optional[str] = None,
 ) -> str:
     """音声ファイルを文字起こしして結果を返す.
 
@@ -29,7 +136,13 @@ def transcribe_audio(
         audio_file: アップロードされた音声ファイルのパス
         model_name: 使用するWhisperモデル名
         include_timestamps: タイムスタンプを含めるかどうか
+        long_form: 長時間音声をチャンク分割して並列処理するかどうか
         progress: Gradioのプログレストラッカー
+        backend: 推論バックエンドの名前
+        vad: 無音区間をスキップしてから文字起こしするかどうか
+        micro_batch: 短い音声を他のジョブとまとめてデコードするかどうか
+        output_formats: 保存する形式（md, srt, vtt, json, tsv）
+        language: 音声の言語（Noneの場合は自動判定）
 
     Returns:
     -------
@@ -47,19 +160,22 @@ def transcribe_audio(
             progress(0.05, desc=f"音声ファイルを確認中... ({file_size_mb:.1f} MB)")
 
         # モデルのダウンロード状況をチェック
-        if not is_model_downloaded(model_name):
-            model_size_mb = MODEL_SIZES.get(model_name, 0)
+        base_model, _ = split_model_choice(model_name)
+        if not is_model_downloaded(base_model, backend):
+            model_size_mb = MODEL_SIZES.get(base_model, 0)
             if progress:
                 progress(
                     0.1,
                     desc=(
-                        f"{model_name}モデル ({model_size_mb}MB) "
+                        f"{base_model}モデル ({model_size_mb}MB) "
                         "のダウンロードが必要です..."
                     ),
                 )
 
         # Transcriberインスタンスを作成
-        transcriber = Transcriber(model_name=model_name)
+        transcriber = _create_transcriber(
+            model_name, backend, vad, micro_batch, language
+        )
 
         # 進捗表示を更新する変数
         current_progress = 0.1
@@ -104,48 +220,76 @@ def transcribe_audio(
         # model_progressコールバックでモデルのダウンロード/ロード進捗を表示
         result = transcriber.transcribe(
             audio_file,
-            progress_callback=lambda msg: model_progress(msg)
-            if current_progress < 0.5
-            else transcription_progress(msg),
+            progress_callback=lambda msg: (
+                model_progress(msg)
+                if current_progress < 0.5
+                else transcription_progress(msg)
+            ),
+            long_form=long_form,
         )
         elapsed_time = time.time() - start_time
 
         # 結果を保存
         if progress:
             progress(0.8, desc="文字起こし完了！結果を保存中...")
-        audio_filename = Path(audio_file).name
-        output_path = save_transcription_as_markdown(
-            result, audio_filename, include_timestamps=include_timestamps
+        output_paths = save_transcription(
+            result,
+            Path(audio_file).name,
+            include_timestamps=include_timestamps,
+            formats=output_formats or DEFAULT_OUTPUT_FORMATS,
         )
 
         # 結果の整形
         if progress:
             progress(1.0, desc="すべての処理が完了しました！")
-        return f"""✅ 文字起こしが完了しました！
+        return _format_success_message(result, elapsed_time, output_paths)
+
+    except Exception as e:
+        return _format_error_message(e)
+
+
+def _format_success_message(
+    result: dict[str, Any], elapsed_time: float, output_paths: dict[str, Path]
+) -> str:
+    """文字起こし完了時に表示するメッセージを生成する."""
+    speech = ""
+    if result.get("speech_ratio") is not None:
+        speech = f"\n**発話区間**: 音声全体の{result['speech_ratio']:.0%}"
+    output_dir = next(iter(output_paths.values())).parent
+    saved = "\n".join(
+        f"📝 {OUTPUT_FORMAT_LABELS[fmt]}ファイルを`{path}`に保存しました。"
+        for fmt, path in output_paths.items()
+    )
+    return f"""✅ 文字起こしが完了しました！
 
 **処理時間**: {elapsed_time:.1f}秒
-**検出言語**: {result.get('language', '不明')}
-**保存場所**: {output_path}
+**検出言語**: {result.get("language", "不明")}{speech}
+**保存場所**: {output_dir}
 
 ---
 
 **文字起こし結果**:
-{result['text']}
+{result["text"]}
 
 ---
 
-📝 Markdownファイルを`{output_path}`に保存しました。
+{saved}
 """
 
-    except FileNotFoundError as e:
-        return f"❌ ファイルエラー: {str(e)}"
-    except ValueError as e:
-        return f"❌ フォーマットエラー: {str(e)}"
-    except Exception as e:
-        import traceback
 
-        error_details = traceback.format_exc()
-        return f"""❌ エラーが発生しました: {str(e)}
+def _format_error_message(error: Exception) -> str:
+    """エラー発生時に表示するメッセージを生成する."""
+    if isinstance(error, FileNotFoundError):
+        return f"❌ ファイルエラー: {str(error)}"
+    if isinstance(error, ValueError):
+        return f"❌ フォーマットエラー: {str(error)}"
+
+    import traceback
+
+    error_details = "".join(
+        traceback.format_exception(type(error), error, error.__traceback__)
+    )
+    return f"""❌ エラーが発生しました: {str(error)}
 
 詳細情報:
 ```
@@ -159,10 +303,394 @@ def transcribe_audio(
 """
 
 
+def _format_timestamp_position(seconds: float) -> str:
+    """秒数を進捗表示用の M:SS 形式に変換する."""
+    return f"{int(seconds // 60)}:{int(seconds % 60):02d}"
+
+
+def _report(progress: Optional[gr.Progress], ratio: float, message: str) -> None:
+    """プログレストラッカーがある場合のみ進捗を通知する."""
+    if progress:
+        progress(ratio, desc=message)
+
+
+def _window_updates(
+    transcriber: Transcriber,
+    audio_file: str,
+    draft_model: Optional[str],
+    progress_callback: Callable[[str], None],
+) -> Iterator[tuple[int, Union[StreamUpdate, SpeculativeUpdate]]]:
+    """ウィンドウの番号と結果を返す（下書きは同じ番号の確定した結果で置き換える）."""
+    if draft_model is None:
+        updates = transcriber.transcribe_stream(
+            audio_file, progress_callback=progress_callback
+        )
+        yield from enumerate(updates)
+        return
+    for update in transcriber.transcribe_speculative(
+        audio_file, draft_model=draft_model, progress_callback=progress_callback
+    ):
+        yield update.window, update
+
+
+def transcribe_audio_stream(
+    audio_file: Optional[str],
+    model_name: str,
+    include_timestamps: bool,
+    progress: Optional[gr.Progress] = None,
+    backend: str = WHISPER_BACKEND,
+    vad: bool = False,
+    output_formats: Sequence[str] = DEFAULT_OUTPUT_FORMATS,
+    language: Optional[str] = None,
+    draft_model: Optional[str] = None,
+) -> Iterator[str]:
+    """音声ファイルを文字起こしし、途中経過を逐次返す.
+
+    Args:
+    ----
+        audio_file: アップロードされた音声ファイルのパス
+        model_name: 使用するWhisperモデル名
+        include_timestamps: タイムスタンプを含めるかどうか
+        progress: Gradioのプログレストラッカー
+        backend: 推論バックエンドの名前
+        vad: 無音区間をスキップしてから文字起こしするかどうか
+        output_formats: 保存する形式（md, srt, vtt, json, tsv）
+        language: 音声の言語（Noneの場合は自動判定）
+        draft_model: 先に下書きを表示する小さいモデル（Noneの場合は使わない）
+
+    Yields:
+    ------
+        その時点までの文字起こし結果を含むメッセージ
+    """
+    if audio_file is None:
+        yield "❌ 音声ファイルを選択してください。"
+        return
+
+    try:
+        start_time = time.time()
+
+        # モデルのダウンロード（実際のダウンロード量で進捗を表示）
+        ensure_model_downloaded(
+            split_model_choice(model_name)[0],
+            lambda ratio, message: _report(progress, 0.05 + ratio * 0.25, message),
+            backend=backend,
+        )
+
+        transcriber = _create_transcriber(model_name, backend, vad, language=language)
+        # ウィンドウごとのセグメント（下書きは確定した結果が届いたら置き換える）
+        windows: dict[int, list[dict[str, Any]]] = {}
+        drafts: set[int] = set()
+        speech_ratio: Optional[float] = None
+        segments: list[dict[str, Any]] = []
+        text = ""
+
+        for index, update in _window_updates(
+            transcriber,
+            audio_file,
+            draft_model,
+            lambda message: _report(progress, 0.3, message),
+        ):
+            windows[index] = update.segments
+            if isinstance(update, SpeculativeUpdate) and not update.final:
+                drafts.add(index)
+            else:
+                drafts.discard(index)
+            language = update.language
+            speech_ratio = update.speech_ratio
+            ordered = (segment for i in sorted(windows) for segment in windows[i])
+            segments = [{**segment, "id": i} for i, segment in enumerate(ordered)]
+            text = "".join(segment["text"] for segment in segments)
+
+            position = _format_timestamp_position(update.position)
+            duration = _format_timestamp_position(update.duration)
+            status = f"文字起こし中... ({position} / {duration})"
+            if drafts:
+                status += f" 下書き{len(drafts)}件を確定中"
+            _report(progress, 0.3 + update.progress * 0.65, status)
+            yield f"""⏳ {status}
+
+---
+
+**文字起こし結果**:
+{text}
+"""
+
+        elapsed_time = time.time() - start_time
+
+        # 結果を保存
+        _report(progress, 0.95, "文字起こし完了！結果を保存中...")
+        result = {
+            "text": text,
+            "segments": segments,
+            "language": language,
+            "speech_ratio": speech_ratio,
+            **transcriber.source_metadata(audio_file),
+        }
+        output_paths = save_transcription(
+            result,
+            Path(audio_file).name,
+            include_timestamps=include_timestamps,
+            formats=output_formats or DEFAULT_OUTPUT_FORMATS,
+        )
+
+        _report(progress, 1.0, "すべての処理が完了しました！")
+        yield _format_success_message(result, elapsed_time, output_paths)
+
+    except Exception as e:
+        yield _format_error_message(e)
+
+
+def _format_queue_status(job_id: str) -> str:
+    """待機中のジョブの待ち順と推定待ち時間を表示するメッセージ."""
+    scheduler = get_scheduler()
+    position = scheduler.queue_position(job_id)
+    wait = scheduler.estimate_wait(job_id) or 0.0
+    return f"""🕒 順番待ち中です（ジョブID: {job_id}）
+
+**待ち順**: {position}番目
+**推定待ち時間**: 約{_format_timestamp_position(wait)}
+"""
+
+
+def run_scheduled(
+    audio_file: Optional[str],
+    model_name: str,
+    produce: Callable[[], Iterator[str]],
+    poll_interval: float = 0.5,
+    concurrency: Optional[int] = None,
+) -> Iterator[tuple[str, str]]:
+    """文字起こし処理をスケジューラのジョブとして実行し、途中経過を返す.
+
+    produceはレーンに空きができてからジョブのスレッドで実行され、
+    それまでの間は待ち順と推定待ち時間を返す。
+
+    Args:
+    ----
+        audio_file: 音声ファイルのパス（待ち時間の推定に使用）
+        model_name: 使用するWhisperモデル名（レーンの選択に使用）
+        produce: 表示するメッセージを逐次返す処理
+        poll_interval: 状態を確認する間隔（秒）
+        concurrency: レーンの同時実行数（Noneの場合はスケジューラの設定）
+
+    Yields:
+    ------
+        (表示するメッセージ, ジョブID)
+    """
+    scheduler = get_scheduler()
+    messages: queue.Queue[str] = queue.Queue()
+
+    def work() -> None:
+        for message in produce():
+            messages.put(message)
+
+    audio_seconds = None
+    if audio_file is not None and Path(audio_file).exists():
+        audio_seconds = estimate_audio_duration(Path(audio_file))
+
+    # Gradioのプログレス通知はコンテキスト変数に依存するため引き継ぐ
+    context = contextvars.copy_context()
+    job = scheduler.submit(
+        model_name,
+        lambda: context.run(work),
+        audio_seconds=audio_seconds,
+        concurrency=concurrency,
+    )
+
+    while not job.wait(timeout=poll_interval):
+        if job.status == QUEUED:
+            yield _format_queue_status(job.job_id), job.job_id
+        while not messages.empty():
+            yield messages.get(), job.job_id
+
+    while not messages.empty():
+        yield messages.get(), job.job_id
+    if job.status == CANCELLED:
+        yield f"⏹️ ジョブ {job.job_id} はキャンセルされました。", job.job_id
+    elif isinstance(job.error, Exception):
+        yield _format_error_message(job.error), job.job_id
+
+
+def cancel_job(job_id: str) -> str:
+    """待機中のジョブをキャンセルする.
+
+    Args:
+    ----
+        job_id: キャンセルするジョブのID
+
+    Returns:
+    -------
+        処理結果のメッセージ
+    """
+    job_id = job_id.strip()
+    if not job_id:
+        return "❌ キャンセルするジョブがありません。"
+    scheduler = get_scheduler()
+    if scheduler.cancel(job_id):
+        return f"⏹️ ジョブ {job_id} をキャンセルしました。"
+    if scheduler.get_job(job_id) is None:
+        return f"❌ ジョブ {job_id} が見つかりません。"
+    return f"❌ ジョブ {job_id} は実行中または終了済みのためキャンセルできません。"
+
+
+def update_readiness(
+    model_name: str, seen_version: int
+) -> tuple[str, dict, int, gr.Timer]:
+    """起動時のウォームアップの進み具合を表示に反映する.
+
+    Args:
+    ----
+        model_name: 選択中のモデル名
+        seen_version: 前回反映したウォームアップの状態番号
+
+    Returns:
+    -------
+        (準備状況, モデル一覧の更新, 状態番号, タイマーの更新)
+    """
+    warmer = get_model_warmer()
+    version = warmer.version
+    # 状態が変わった場合のみモデル一覧を更新する（選択操作を妨げないため）
+    choices = (
+        gr.update(choices=get_model_choices(), value=model_name)
+        if version != seen_version
+        else gr.update()
+    )
+    return (
+        warmer.format_status(),
+        choices,
+        version,
+        gr.Timer(active=not warmer.is_ready()),
+    )
+
+
+# 過去の結果タブの並べ替え（表示名: (列, 降順)）
+HISTORY_SORT_OPTIONS = {
+    "新しい順": ("mtime", True),
+    "古い順": ("mtime", False),
+    "ファイル名順": ("filename", False),
+    "サイズが大きい順": ("size", True),
+}
+
+# 単語のタイムスタンプを計算した後に表示する単語の数
+WORD_PREVIEW_COUNT = 20
+
+
+def load_history_page(
+    page: int, sort_label: str, offset: int = 0, refresh: bool = False
+) -> tuple[list[list[str]], dict, str, str, int, str]:
+    """過去の結果タブに表示する1ページ分の一覧を取得する.
+
+    Args:
+    ----
+        page: 現在のページ番号
+        sort_label: HISTORY_SORT_OPTIONSの表示名
+        offset: 現在のページからの移動量（範囲外は最初または最後のページ）
+        refresh: ディレクトリを走査し直して索引を更新するかどうか
+
+    Returns:
+    -------
+        (一覧, ファイル選択の更新, ファイルパス, 内容, ページ番号, ページ表示)
+    """
+    sort_by, descending = HISTORY_SORT_OPTIONS.get(sort_label, ("mtime", True))
+    page = max(1, page + offset)
+    files, total = list_transcription_page(
+        page,
+        DEFAULT_PAGE_SIZE,
+        sort_by=sort_by,
+        descending=descending,
+        refresh=refresh,
+    )
+    last_page = max(1, -(-total // DEFAULT_PAGE_SIZE))
+    if page > last_page:
+        # ファイルが削除されてページが減った場合は最後のページを表示する
+        page = last_page
+        files, total = list_transcription_page(
+            page, DEFAULT_PAGE_SIZE, sort_by=sort_by, descending=descending
+        )
+    # DataFrameに表示するデータ（タイムスタンプを除く）
+    display_data = [[f[0], f[1], f[2]] for f in files]
+    return (
+        display_data,
+        gr.update(choices=[f[0] for f in files], value=None),
+        "",
+        "",
+        page,
+        f"{page} / {last_page} ページ（全{total}件）",
+    )
+
+
+def load_first_history_page(
+    sort_label: str,
+) -> tuple[list[list[str]], dict, str, str, int, str]:
+    """並べ替えを変えた場合などに、最初のページを表示する."""
+    return load_history_page(1, sort_label)
+
+
+def search_history(query: str) -> tuple[list[list[str]], str, dict]:
+    """過去の文字起こし結果を全文検索する.
+
+    Args:
+    ----
+        query: 検索語（空白区切りでAND検索）
+
+    Returns:
+    -------
+        (検索結果, 件数の表示, ファイル選択の更新)
+    """
+    if not query.strip():
+        return [], "", gr.update()
+    start_time = time.perf_counter()
+    hits = search_transcriptions(query)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    # ヒットしたファイルをファイル選択の候補にする（関連度の高い順）
+    filenames = list(dict.fromkeys(hit[0] for hit in hits))
+    return (
+        [list(hit) for hit in hits],
+        f"🔍 {len(hits)}件（{len(filenames)}ファイル, {elapsed_ms:.0f}ms）",
+        gr.update(choices=filenames, value=None),
+    )
+
+
+def compute_word_timestamps(filename: Optional[str]) -> str:
+    """選択した過去の結果に単語のタイムスタンプを付けて保存する.
+
+    Args:
+    ----
+        filename: 文字起こし結果のファイル名
+
+    Returns:
+    -------
+        保存先と先頭の単語の時刻を含むメッセージ
+    """
+    if not filename:
+        return "❌ ファイルを選択してください。"
+    try:
+        start_time = time.time()
+        output_path = align_transcript(filename, get_transcriptions_dir())
+        saved = json.loads(output_path.read_text(encoding="utf-8"))
+    except Exception as e:
+        return _format_error_message(e)
+
+    elapsed_time = time.time() - start_time
+    words = [word for segment in saved["segments"] for word in segment["words"]]
+    preview = "\n".join(
+        f"- [{format_timestamp(word['start'])} - {format_timestamp(word['end'])}] "
+        f"{word['word'].strip()}"
+        for word in words[:WORD_PREVIEW_COUNT]
+    )
+    summary = f"{len(words)}語, {elapsed_time:.1f}秒"
+    return f"""✅ 単語のタイムスタンプを計算しました（{summary}）
+
+📝 `{output_path}`に保存しました。
+
+{preview}
+"""
+
+
 def get_model_choices() -> list[tuple[str, str]]:
-    """モデル選択肢を生成（ダウンロード状況付き）."""
+    """モデル選択肢を生成（ロード・ダウンロード状況付き）."""
+    registry = get_model_registry()
     choices = []
-    for name, label in [
+    for choice, label in [
         ("tiny", "最速・低精度"),
         ("base", "高速・やや低精度"),
         ("small", "バランス型"),
@@ -170,10 +698,18 @@ def get_model_choices() -> list[tuple[str, str]]:
         ("large", "最高精度"),
         ("large-v2", "最高精度v2"),
         ("large-v3", "最高精度v3・日本語推奨"),
+        (f"medium{QUANTIZED_SUFFIX}", "高精度・int8量子化（CPU向け）"),
+        (f"large-v3{QUANTIZED_SUFFIX}", "最高精度v3・int8量子化（CPU向け）"),
     ]:
+        name, dtype = split_model_choice(choice)
         size = MODEL_SIZES.get(name, 0)
-        status = "✓" if is_model_downloaded(name) else "↓"
-        choices.append((f"{name} ({size}MB) - {label} {status}", name))
+        if registry.is_loaded(name, dtype):
+            status = "●"
+        elif is_model_downloaded(name):
+            status = "✓"
+        else:
+            status = "↓"
+        choices.append((f"{choice} ({size}MB) - {label} {status}", choice))
     return choices
 
 
@@ -231,6 +767,11 @@ def create_app() -> gr.Blocks:
             """
         )
 
+        # 起動時のモデルの準備状況
+        warmer = get_model_warmer()
+        readiness = gr.Markdown(warmer.format_status())
+        readiness_timer = gr.Timer(2.0, active=not warmer.is_ready())
+
         # タブで機能を分ける
         with gr.Tabs():
             # 文字起こしタブ
@@ -251,7 +792,9 @@ def create_app() -> gr.Blocks:
                                 choices=get_model_choices(),
                                 value="large-v3",
                                 label="Whisperモデル",
-                                info="✓=ダウンロード済み ↓=ダウンロード必要",
+                                info=(
+                                    "●=ロード済み ✓=ダウンロード済み ↓=ダウンロード必要"
+                                ),
                             )
 
                             timestamp_checkbox = gr.Checkbox(
@@ -260,6 +803,55 @@ def create_app() -> gr.Blocks:
                                 info="文字起こし結果に時間情報を追加します",
                             )
 
+                            long_form_checkbox = gr.Checkbox(
+                                label="長時間音声を並列処理する",
+                                value=False,
+                                info="無音区間で分割し、複数のCPUコアで同時に処理します",
+                            )
+
+                            # faster-whisperがインストールされている場合のみ選択できる
+                            backends = available_backends()
+                            backend_dropdown = gr.Dropdown(
+                                choices=backends,
+                                value=WHISPER_BACKEND,
+                                label="推論エンジン",
+                                info="faster-whisperはCPUでも高速に処理できます",
+                                visible=len(backends) > 1,
+                            )
+
+                            language_dropdown = gr.Dropdown(
+                                choices=list(LANGUAGE_CHOICES),
+                                value=AUTO_LANGUAGE_LABEL,
+                                label="言語",
+                                info="自動判定では音声の数か所から言語を判定します",
+                            )
+
+                            vad_checkbox = gr.Checkbox(
+                                label="無音区間をスキップする",
+                                value=False,
+                                info="発話のない区間を取り除いてから文字起こしします",
+                            )
+
+                            draft_dropdown = gr.Dropdown(
+                                choices=DRAFT_MODEL_CHOICES,
+                                value=NO_DRAFT_LABEL,
+                                label="下書きモデル",
+                                info=(
+                                    "小さいモデルの結果を先に表示し、"
+                                    "選択したモデルの結果で順に置き換えます"
+                                ),
+                            )
+
+                            format_checkboxes = gr.CheckboxGroup(
+                                choices=[
+                                    (label, fmt)
+                                    for fmt, label in OUTPUT_FORMAT_LABELS.items()
+                                ],
+                                value=list(DEFAULT_OUTPUT_FORMATS),
+                                label="出力形式",
+                                info="字幕（SRT/WebVTT）やJSON・TSVも同時に保存できます",
+                            )
+
                         # プライマリボタン（単一で目立つ）
                         transcribe_button = gr.Button(
                             "🚀 文字起こしを開始",
@@ -267,6 +859,15 @@ def create_app() -> gr.Blocks:
                             elem_classes=["gr-button-primary"],
                         )
 
+                        # 順番待ち中のジョブのキャンセル
+                        with gr.Row():
+                            job_id_box = gr.Textbox(
+                                label="ジョブID",
+                                interactive=False,
+                                scale=2,
+                            )
+                            cancel_button = gr.Button("⏹️ キャンセル", scale=1)
+
                     with gr.Column(scale=2):
                         # 結果表示エリア
                         result_output = gr.Textbox(
@@ -289,8 +890,8 @@ def create_app() -> gr.Blocks:
 
                     💡 **ヒント**:
                     - 日本語音声には`large-v3`モデルがおすすめです
-                    - モデル選択欄の ✓ はダウンロード済み、
-                      ↓ はダウンロードが必要なモデルです
+                    - モデル選択欄の ● はメモリにロード済み（すぐに開始できます）、
+                      ✓ はダウンロード済み、↓ はダウンロードが必要なモデルです
                     - 初回実行時は選択したモデルのダウンロードが必要です
                       （サイズ: tiny=39MB〜large-v3=1.5GB）
                     - ダウンロード進捗は画面上部のプログレスバーに表示されます
@@ -306,25 +907,93 @@ def create_app() -> gr.Blocks:
                     audio_file: Optional[str],
                     model_name: str,
                     include_timestamps: bool,
-                ) -> tuple[str, dict]:
-                    result = transcribe_audio(
-                        audio_file, model_name, include_timestamps
-                    )
+                    long_form: bool,
+                    backend: str,
+                    vad: bool,
+                    output_formats: list[str],
+                    language_label: str,
+                    draft_label: str,
+                    progress: gr.Progress = gr.Progress(),  # noqa: B008
+                ) -> Iterator[tuple[str, dict, str]]:
+                    if audio_file is None:
+                        yield "❌ 音声ファイルを選択してください。", gr.update(), ""
+                        return
+
+                    micro_batch = _use_micro_batch(audio_file, long_form, backend)
+                    language = LANGUAGE_CHOICES.get(language_label)
+                    draft_model = None if draft_label == NO_DRAFT_LABEL else draft_label
+
+                    def produce() -> Iterator[str]:
+                        if long_form or micro_batch:
+                            # 並列処理ではチャンクの完了順が前後し、短い音声は
+                            # 他のジョブとまとめてデコードするため一括で表示
+                            yield transcribe_audio(
+                                audio_file,
+                                model_name,
+                                include_timestamps,
+                                long_form,
+                                progress=progress,
+                                backend=backend,
+                                vad=vad,
+                                micro_batch=micro_batch,
+                                output_formats=output_formats,
+                                language=language,
+                            )
+                        else:
+                            # ウィンドウごとに結果を追記していく
+                            yield from transcribe_audio_stream(
+                                audio_file,
+                                model_name,
+                                include_timestamps,
+                                progress,
+                                backend=backend,
+                                vad=vad,
+                                output_formats=output_formats,
+                                language=language,
+                                draft_model=draft_model,
+                            )
+
+                    # 同じモデルのジョブはレーンの同時実行数まで並行して実行される
+                    result, job_id = "", ""
+                    for result, job_id in run_scheduled(
+                        audio_file,
+                        lane_name(model_name, backend, micro_batch),
+                        produce,
+                        concurrency=DEFAULT_MAX_BATCH_SIZE if micro_batch else None,
+                    ):
+                        yield result, gr.update(), job_id
+
                     # モデルリストを更新
                     # （ダウンロード済みステータスが変わる可能性があるため）
                     updated_choices = gr.update(
                         choices=get_model_choices(), value=model_name
                     )
-                    return result, updated_choices
+                    yield result, updated_choices, job_id
 
                 # イベントハンドラの設定
                 transcribe_button.click(
                     fn=transcribe_and_update,
-                    inputs=[audio_input, model_dropdown, timestamp_checkbox],
-                    outputs=[result_output, model_dropdown],
+                    inputs=[
+                        audio_input,
+                        model_dropdown,
+                        timestamp_checkbox,
+                        long_form_checkbox,
+                        backend_dropdown,
+                        vad_checkbox,
+                        format_checkboxes,
+                        language_dropdown,
+                        draft_dropdown,
+                    ],
+                    outputs=[result_output, model_dropdown, job_id_box],
                     show_progress="full",
                 )
 
+                cancel_button.click(
+                    fn=cancel_job,
+                    inputs=[job_id_box],
+                    outputs=[result_output],
+                )
+
             # 過去の結果タブ
             with gr.Tab("過去の結果"):
                 gr.Markdown(
@@ -335,9 +1004,37 @@ def create_app() -> gr.Blocks:
                     """
                 )
 
+                # 全文検索
+                with gr.Row():
+                    search_box = gr.Textbox(
+                        label="全文検索",
+                        placeholder="検索する語句（空白区切りですべてを含む箇所を検索）",
+                        scale=4,
+                    )
+                    search_button = gr.Button("🔍 検索", scale=1)
+                search_status = gr.Markdown()
+                search_results = gr.DataFrame(
+                    headers=["ファイル名", "位置", "該当箇所"],
+                    interactive=False,
+                    wrap=True,
+                )
+
                 with gr.Row():
                     # 更新ボタン
                     refresh_button = gr.Button("🔄 一覧を更新", scale=1)
+                    sort_dropdown = gr.Dropdown(
+                        choices=list(HISTORY_SORT_OPTIONS),
+                        value="新しい順",
+                        label="並べ替え",
+                        scale=1,
+                    )
+
+                # ページ送り
+                with gr.Row():
+                    prev_button = gr.Button("◀ 前へ", scale=1)
+                    page_label = gr.Markdown()
+                    next_button = gr.Button("次へ ▶", scale=1)
+                page_state = gr.State(1)
 
                 # ファイル一覧表示
                 file_list = gr.DataFrame(
@@ -362,6 +1059,10 @@ def create_app() -> gr.Blocks:
                             show_copy_button=True,
                         )
 
+                        # 単語ごとのタイムスタンプ（必要な場合だけ後から計算する）
+                        words_button = gr.Button("🔤 単語のタイムスタンプを計算")
+                        words_status = gr.Markdown()
+
                     with gr.Column(scale=2):
                         # ファイル内容プレビュー
                         file_preview = gr.Textbox(
@@ -373,19 +1074,14 @@ def create_app() -> gr.Blocks:
                         )
 
                 # 初期表示とイベントハンドラ
-                def update_file_list() -> tuple[list[list[str]], dict, str, str]:
-                    """ファイル一覧を更新."""
-                    files = list_transcription_files()
-                    # DataFrameに表示するデータ（タイムスタンプを除く）
-                    display_data = [[f[0], f[1], f[2]] for f in files]
-                    # ドロップダウンの選択肢
-                    file_choices = [f[0] for f in files]
-                    return (
-                        display_data,
-                        gr.update(choices=file_choices, value=None),
-                        "",
-                        "",
-                    )
+                page_outputs = [
+                    file_list,
+                    selected_file,
+                    file_path_display,
+                    file_preview,
+                    page_state,
+                    page_label,
+                ]
 
                 def on_file_selected(filename: Optional[str]) -> tuple[str, str]:
                     """ファイル選択時の処理"""
@@ -404,14 +1100,39 @@ def create_app() -> gr.Blocks:
 
                 # 初期表示
                 app.load(
-                    fn=update_file_list,
-                    outputs=[file_list, selected_file, file_path_display, file_preview],
+                    fn=load_first_history_page,
+                    inputs=[sort_dropdown],
+                    outputs=page_outputs,
                 )
 
                 # イベントハンドラの設定
                 refresh_button.click(
-                    fn=update_file_list,
-                    outputs=[file_list, selected_file, file_path_display, file_preview],
+                    fn=functools.partial(load_history_page, refresh=True),
+                    inputs=[page_state, sort_dropdown],
+                    outputs=page_outputs,
+                )
+                sort_dropdown.change(
+                    fn=load_first_history_page,
+                    inputs=[sort_dropdown],
+                    outputs=page_outputs,
+                )
+                prev_button.click(
+                    fn=functools.partial(load_history_page, offset=-1),
+                    inputs=[page_state, sort_dropdown],
+                    outputs=page_outputs,
+                )
+                next_button.click(
+                    fn=functools.partial(load_history_page, offset=1),
+                    inputs=[page_state, sort_dropdown],
+                    outputs=page_outputs,
+                )
+
+                search_outputs = [search_results, search_status, selected_file]
+                search_button.click(
+                    fn=search_history, inputs=[search_box], outputs=search_outputs
+                )
+                search_box.submit(
+                    fn=search_history, inputs=[search_box], outputs=search_outputs
                 )
 
                 selected_file.change(
@@ -419,15 +1140,87 @@ def create_app() -> gr.Blocks:
                     inputs=[selected_file],
                     outputs=[file_path_display, file_preview],
                 )
+                words_button.click(
+                    fn=compute_word_timestamps,
+                    inputs=[selected_file],
+                    outputs=[words_status],
+                )
+
+        # 準備状況の表示を更新し、状態が変わった場合はモデル一覧も更新する
+        warmup_version = gr.State(-1)
+        readiness_timer.tick(
+            fn=update_readiness,
+            inputs=[model_dropdown, warmup_version],
+            outputs=[readiness, model_dropdown, warmup_version, readiness_timer],
+            show_progress="hidden",
+        )
 
     return app
 
 
-def main() -> None:
-    """メインエントリーポイント."""
+def main(
+    concurrency: int = 1,
+    lane_concurrency: Optional[dict[str, int]] = None,
+    memory_reserve_mb: float = DEFAULT_MEMORY_RESERVE_MB,
+    preload: Optional[list[str]] = None,
+    wait_for_preload: bool = False,
+    metrics_port: Optional[int] = DEFAULT_METRICS_PORT,
+    json_logs: bool = False,
+    api_port: Optional[int] = None,
+    api_host: str = DEFAULT_API_HOST,
+    model_memory_mb: Optional[float] = None,
+) -> None:
+    """メインエントリーポイント.
+
+    Args:
+    ----
+        concurrency: モデルごとに同時に実行する文字起こしの数
+        lane_concurrency: モデル名ごとの同時実行数（concurrencyより優先）
+        memory_reserve_mb: ジョブ開始時に残しておく空きメモリ（MB）
+        preload: 起動時にロードしてウォームアップするモデル名
+        wait_for_preload: ウォームアップが終わるまでサーバーの起動を待つかどうか
+        metrics_port: /metricsを返すポート（Noneまたは0の場合は起動しない）
+        json_logs: 段階ごとの処理時間などを1行1件のJSONで標準エラーに出力するかどうか
+        api_port: 文字起こしジョブのHTTP APIのポート（Noneまたは0の場合は起動しない）
+        api_host: HTTP APIが待ち受けるアドレス（既定は同じマシンからの接続のみ）
+        model_memory_mb: ロード済みモデルを保持するメモリの上限（MB, Noneは既定値）
+    """
+    if model_memory_mb is not None:
+        configure_model_registry(model_memory_mb)
+    configure_scheduler(
+        default_concurrency=concurrency,
+        lane_concurrency=lane_concurrency,
+        memory_reserve_mb=memory_reserve_mb,
+    )
+    max_lane = max([concurrency, *(lane_concurrency or {}).values()])
+
+    if json_logs:
+        configure_json_logging()
+    if metrics_port:
+        start_metrics_server(metrics_port)
+        print(f"📈 メトリクス: http://127.0.0.1:{metrics_port}/metrics")
+    if api_port:
+        # UIと同じスケジューラ・モデルレジストリでジョブを実行する
+        start_api_server(api_port, api_host)
+        print(f"🔌 HTTP API: http://{api_host}:{api_port}/jobs")
+
+    # 最初の利用者がモデルのロードを待たないよう、起動時に準備しておく
+    warmer = get_model_warmer()
+    warmer.start(preload or [])
+    if wait_for_preload:
+        print(f"🔄 モデルを準備中: {', '.join(preload or [])}")
+        warmer.wait()
+        print(warmer.format_status())
+
     app = create_app()
     # queueを有効にして非同期処理を可能にする
-    app.queue(max_size=10, api_open=False).launch(
+    # 実際の同時実行数はスケジューラのレーンで制御するため、
+    # イベントは全モデルのレーンが埋まる数まで受け付ける
+    app.queue(
+        max_size=10,
+        api_open=False,
+        default_concurrency_limit=max(1, max_lane) * len(MODEL_SIZES),
+    ).launch(
         server_name="0.0.0.0",
         server_port=7862,  # ポート変更
         share=False,
@@ -0,0 +1,165 @@
+"""デコード済み音声（16kHzのPCM）を音声内容のハッシュで保存するキャッシュ."""
+
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+from .audio_input import load_audio_file
+from .result_cache import CacheStats
+from .utils import compute_file_hash
+
+# キャッシュの保存先と容量上限（16kHz float32で1時間あたり約230MB）
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "transcription_tool" / "audio"
+DEFAULT_MAX_SIZE_MB = 2048.0
+
+
+def _decode_audio_file(audio_path: str) -> np.ndarray:
+    """音声を16kHzモノラルにデコードする（16kHzのWAV以外はffmpeg）."""
+    return load_audio_file(Path(audio_path))
+
+
+class AudioCache:
+    """デコード済みの音声を.npyファイルとして保存する永続キャッシュ.
+
+    読み込みはメモリマップで行うため、同じ音声を別のモデルで再実行する場合も
+    ffmpegによるデコードを省略でき、複数のジョブでページキャッシュを共有できる。
+    合計サイズが上限を超えた場合は、最終アクセス（mtime）が古いものから削除する。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_size_mb: float = DEFAULT_MAX_SIZE_MB,
+        decoder: Optional[Callable[[str], np.ndarray]] = None,
+    ) -> None:
+        """AudioCacheを初期化する.
+
+        Args:
+        ----
+            cache_dir: キャッシュの保存先（Noneの場合は~/.cache/transcription_tool）
+            max_size_mb: キャッシュの合計サイズ上限（MB）
+            decoder: 音声ファイルをデコードする関数（Noneの場合はffmpeg）
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_mb = max_size_mb
+        self._decoder = decoder or _decode_audio_file
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def _path(self, audio_hash: str) -> Path:
+        return self.cache_dir / f"{audio_hash}.npy"
+
+    def load(self, audio_path: Path, audio_hash: Optional[str] = None) -> np.ndarray:
+        """音声を読み込む。キャッシュになければデコードして保存する.
+
+        Args:
+        ----
+            audio_path: 音声ファイルのパス
+            audio_hash: 音声ファイル内容のハッシュ（Noneの場合は計算する）
+
+        Returns:
+        -------
+            16kHzモノラルのfloat32配列（キャッシュ済みの場合はメモリマップ）
+        """
+        audio_hash = audio_hash or compute_file_hash(audio_path)
+        cached = self.get(audio_hash)
+        if cached is not None:
+            return cached
+
+        audio = self._decoder(str(audio_path))
+        self._store(self._path(audio_hash), audio)
+        return audio
+
+    def get(self, audio_hash: str) -> Optional[np.ndarray]:
+        """キャッシュ済みの音声をハッシュだけで取得する.
+
+        Args:
+        ----
+            audio_hash: 音声ファイル内容のハッシュ
+
+        Returns:
+        -------
+            16kHzモノラルのfloat32配列（メモリマップ）、またはNone
+        """
+        path = self._path(audio_hash)
+        try:
+            # copy-on-writeでマップし、書き込み可能な配列として扱えるようにする
+            audio: np.ndarray = np.load(path, mmap_mode="c")
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self._stats.misses += 1
+            return None
+        with self._lock:
+            self._stats.hits += 1
+        return audio
+
+    def _store(self, path: Path, audio: np.ndarray) -> None:
+        """配列を一時ファイル経由で保存する（並行して読み込まれても壊れない）."""
+        temp_path = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.tmp")
+        with open(temp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(audio, dtype=np.float32))
+        with self._lock:
+            temp_path.replace(path)
+            self._evict()
+
+    def _evict(self) -> None:
+        """容量上限を超えた分を古い順に削除する（ロック取得済み前提）."""
+        entries = []
+        for path in self.cache_dir.glob("*.npy"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        max_bytes = self.max_size_mb * 1024 * 1024
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total_size <= max_bytes:
+                break
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                # 他のプロセスがマップ中で削除できない環境では残しておく
+                continue
+            total_size -= size
+            self._stats.evictions += 1
+
+    def contains(self, audio_hash: str) -> bool:
+        """指定ハッシュの音声がキャッシュ済みかどうか."""
+        return self._path(audio_hash).exists()
+
+    def size_mb(self) -> float:
+        """キャッシュの合計サイズ（MB）."""
+        total = sum(path.stat().st_size for path in self.cache_dir.glob("*.npy"))
+        return total / (1024 * 1024)
+
+    def stats(self) -> CacheStats:
+        """統計情報のスナップショットを返す."""
+        with self._lock:
+            return CacheStats(**vars(self._stats))
+
+    def clear(self) -> None:
+        """すべてのキャッシュを削除する."""
+        with self._lock:
+            for path in self.cache_dir.glob("*.npy"):
+                path.unlink(missing_ok=True)
+
+
+_cache: Optional[AudioCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_audio_cache() -> AudioCache:
+    """プロセス共有の音声キャッシュを取得する."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AudioCache()
+        return _cache
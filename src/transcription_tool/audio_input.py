@@ -0,0 +1,231 @@
+"""パス以外の音声入力（配列・バイト列）を文字起こし用のPCMに変換する.
+
+Gradioの ``gr.Audio(type="numpy")`` が返す (サンプリングレート, 配列) や、
+APIで受け取った音声ファイルのバイト列を、一時ファイルを作らずに文字起こしに
+渡せるようにする。16kHzモノラルのfloat32配列はコピーせずにそのまま使い、
+リサンプリングや圧縮音声のデコードが必要な場合はffmpegの標準入出力で変換する。
+"""
+
+import hashlib
+import subprocess
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from .chunking import SAMPLE_RATE
+
+# Transcriberが受け付ける音声入力
+#   パス: ファイルをデコードする（CLIやGradioのfilepath）
+#   np.ndarray: 16kHzのPCM（float32なら-1.0〜1.0, 整数型はフルスケール）
+#   (サンプリングレート, np.ndarray): gr.Audio(type="numpy")の値
+#   bytes: 音声ファイルの内容（WAVはffmpegを使わずに読み込む）
+AudioInput = Union[
+    str, Path, np.ndarray, bytes, bytearray, memoryview, tuple[int, np.ndarray]
+]
+
+# WAVのフォーマットタグ
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_IEEE_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def _run_ffmpeg(input_args: list[str], data: Union[bytes, memoryview]) -> np.ndarray:
+    """標準入力のデータをffmpegで16kHzモノラルのPCMに変換する.
+
+    出力はwhisper.load_audioと同じく16bitに量子化してからfloat32に戻す。
+    """
+    cmd = [
+        "ffmpeg",
+        "-threads",
+        "0",
+        *input_args,
+        "-i",
+        "pipe:0",
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(SAMPLE_RATE),
+        "pipe:1",
+    ]
+    try:
+        output = subprocess.run(cmd, input=data, capture_output=True, check=True)
+    except FileNotFoundError as e:
+        raise RuntimeError("ffmpegが見つかりません（インストールしてください）") from e
+    except subprocess.CalledProcessError as e:
+        message = e.stderr.decode(errors="ignore").strip().splitlines()
+        raise ValueError(
+            f"音声をデコードできません: {message[-1] if message else e}"
+        ) from e
+    pcm = np.frombuffer(output.stdout, np.int16)
+    audio: np.ndarray = pcm.astype(np.float32) / 32768.0
+    return audio
+
+
+def _to_float(data: np.ndarray) -> np.ndarray:
+    """整数型のPCMを-1.0〜1.0のfloat32にする（float32はコピーしない）."""
+    if not np.issubdtype(data.dtype, np.integer):
+        return data.astype(np.float32, copy=False)
+    info = np.iinfo(data.dtype)
+    audio = data.astype(np.float32)
+    if info.min == 0:
+        # 8bitのWAVなど符号なしの形式は中央が無音
+        audio -= (info.max + 1) / 2
+        audio /= (info.max + 1) / 2
+    else:
+        audio /= -float(info.min)
+    return audio
+
+
+def from_pcm(data: np.ndarray, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """PCMの配列を16kHzモノラルのfloat32配列に変換する.
+
+    16kHzモノラルのfloat32配列（C連続）はコピーせずにそのまま返す。
+
+    Args:
+    ----
+        data: (サンプル数,) または (サンプル数, チャンネル数) の配列
+        sample_rate: dataのサンプリングレート
+
+    Returns:
+    -------
+        16kHzモノラルのfloat32配列
+
+    Raises:
+    ------
+        ValueError: 配列の形状やサンプリングレートが不正な場合
+    """
+    data = np.asarray(data)
+    if data.ndim not in (1, 2) or sample_rate <= 0:
+        raise ValueError(f"対応していない音声データ: 形状{data.shape}, {sample_rate}Hz")
+    audio = _to_float(data)
+    if sample_rate != SAMPLE_RATE:
+        # リサンプリングはファイル入力と同じくffmpegで行う（メモリ上で完結する）
+        channels = 1 if audio.ndim == 1 else audio.shape[1]
+        return _run_ffmpeg(
+            ["-f", "f32le", "-ar", str(sample_rate), "-ac", str(channels)],
+            np.ascontiguousarray(audio).data.cast("B"),
+        )
+    if audio.ndim == 2:
+        audio = (
+            audio[:, 0] if audio.shape[1] == 1 else audio.mean(axis=1, dtype=np.float32)
+        )
+    return np.ascontiguousarray(audio)
+
+
+def _parse_wav(data: memoryview) -> Optional[tuple[int, np.ndarray]]:
+    """WAVのバイト列から (サンプリングレート, PCM配列) を取り出す.
+
+    PCM配列はdataを参照するビューで、コピーしない。対応していない形式の
+    場合はNoneを返す。
+    """
+    if bytes(data[:4]) != b"RIFF" or bytes(data[8:12]) != b"WAVE":
+        return None
+
+    fmt: Optional[tuple[int, int, int, int]] = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = bytes(data[offset : offset + 4])
+        size = int.from_bytes(data[offset + 4 : offset + 8], "little")
+        body = data[offset + 8 : offset + 8 + size]
+        if chunk_id == b"fmt " and len(body) >= 16:
+            tag = int.from_bytes(body[0:2], "little")
+            if tag == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                tag = int.from_bytes(body[24:26], "little")
+            channels = int.from_bytes(body[2:4], "little")
+            rate = int.from_bytes(body[4:8], "little")
+            bits = int.from_bytes(body[14:16], "little")
+            fmt = (tag, channels, rate, bits)
+        elif chunk_id == b"data" and fmt is not None:
+            tag, channels, rate, bits = fmt
+            dtypes: dict[tuple[int, int], np.dtype] = {
+                (_WAVE_FORMAT_PCM, 8): np.dtype("u1"),
+                (_WAVE_FORMAT_PCM, 16): np.dtype("<i2"),
+                (_WAVE_FORMAT_PCM, 32): np.dtype("<i4"),
+                (_WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype("<f4"),
+            }
+            dtype = dtypes.get((tag, bits))
+            if dtype is None or channels < 1:
+                return None
+            frame = dtype.itemsize * channels
+            body = body[: len(body) - len(body) % frame]
+            pcm = np.frombuffer(body, dtype=dtype).reshape(-1, channels)
+            return rate, pcm[:, 0] if channels == 1 else pcm
+        # チャンクは2バイト境界に揃えられる
+        offset += 8 + size + size % 2
+    return None
+
+
+def decode_audio_bytes(data: Union[bytes, bytearray, memoryview]) -> np.ndarray:
+    """音声ファイルの内容を16kHzモノラルのfloat32配列にデコードする.
+
+    16kHzのWAVはffmpegを使わずに読み込み、それ以外はffmpegに標準入力で渡す。
+
+    Args:
+    ----
+        data: 音声ファイルの内容
+
+    Returns:
+    -------
+        16kHzモノラルのfloat32配列
+
+    Raises:
+    ------
+        ValueError: デコードできない場合
+    """
+    view = memoryview(data).cast("B")
+    parsed = _parse_wav(view)
+    if parsed is not None:
+        return from_pcm(parsed[1], parsed[0])
+    return _run_ffmpeg([], view)
+
+
+def load_audio_file(audio_path: Path) -> np.ndarray:
+    """音声ファイルを16kHzモノラルのfloat32配列で読み込む.
+
+    16kHzのWAVはffmpegのサブプロセスを起動せずに読み込み、それ以外は
+    Whisperと同じ方法（ffmpeg）でデコードする。
+    """
+    if audio_path.suffix.lower() == ".wav":
+        parsed = _parse_wav(memoryview(audio_path.read_bytes()))
+        if parsed is not None and parsed[0] == SAMPLE_RATE:
+            return from_pcm(parsed[1])
+
+    import whisper
+
+    audio: np.ndarray = whisper.load_audio(str(audio_path))
+    return audio
+
+
+def load_audio_input(audio: AudioInput) -> np.ndarray:
+    """パス以外の音声入力を16kHzモノラルのfloat32配列にする.
+
+    Args:
+    ----
+        audio: 配列、(サンプリングレート, 配列)、または音声ファイルの内容
+
+    Returns:
+    -------
+        16kHzモノラルのfloat32配列
+
+    Raises:
+    ------
+        TypeError: 対応していない型の場合
+    """
+    if isinstance(audio, tuple):
+        sample_rate, data = audio
+        return from_pcm(data, int(sample_rate))
+    if isinstance(audio, np.ndarray):
+        return from_pcm(audio)
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return decode_audio_bytes(audio)
+    raise TypeError(f"対応していない音声の入力: {type(audio).__name__}")
+
+
+def compute_audio_hash(audio: np.ndarray) -> str:
+    """PCM配列の内容のSHA-256ハッシュ（結果キャッシュのキーに使う）."""
+    return hashlib.sha256(np.ascontiguousarray(audio).data).hexdigest()
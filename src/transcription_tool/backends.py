@@ -0,0 +1,318 @@
+"""文字起こしの推論バックエンド.
+
+各バックエンドはロードしたモデルを、openai-whisperと同じ
+``transcribe(audio, **options)`` で呼び出せる形で返す。結果は
+``text``・``segments``・``language`` を含む辞書で、Transcriberや
+チャンクの結合処理はバックエンドを意識せずに扱える。
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from .chunking import SAMPLE_RATE
+from .model_utils import (
+    FASTER_WHISPER_BACKEND,
+    WHISPER_BACKEND,
+    get_ctranslate2_model_dir,
+)
+from .quantization import load_quantized_model
+
+# faster-whisperのBatchedInferencePipelineを使う音声の長さの下限（秒）
+BATCHED_MIN_DURATION = 60.0
+# バッチ推論で同時にデコードする区間の数
+DEFAULT_BATCH_SIZE = 8
+
+# faster-whisperのtranscribeにそのまま渡せるデコードオプション
+_FASTER_WHISPER_OPTIONS = {
+    "language",
+    "initial_prompt",
+    "temperature",
+    "beam_size",
+    "best_of",
+    "word_timestamps",
+    "condition_on_previous_text",
+    "compression_ratio_threshold",
+    "no_speech_threshold",
+}
+
+# dtypeごとのCTranslate2の計算精度（デバイス別）
+_COMPUTE_TYPES = {
+    ("cpu", "float32"): "float32",
+    ("cpu", "int8"): "int8",
+    ("cuda", "float32"): "float32",
+    ("cuda", "float16"): "float16",
+    ("cuda", "int8"): "int8_float16",
+}
+
+
+class InferenceBackend(ABC):
+    """推論バックエンドの基底クラス."""
+
+    name = ""
+
+    @abstractmethod
+    def check(self, device: str, dtype: str) -> None:
+        """デバイスとdtypeの組み合わせを使用できるか確認する.
+
+        Raises
+        ------
+            ValueError: 使用できない組み合わせの場合
+        """
+
+    @abstractmethod
+    def load_model(
+        self,
+        model_name: str,
+        device: str,
+        dtype: str,
+        progress_callback: Optional[Callable[[str], None]] = None,
+    ) -> Any:
+        """ダウンロード済みのモデルをロードする.
+
+        Args:
+        ----
+            model_name: モデル名
+            device: 推論デバイス
+            dtype: モデルの重みの精度
+            progress_callback: 進捗を通知するコールバック関数
+
+        Returns:
+        -------
+            transcribe(audio, **options)で文字起こしできるモデル
+        """
+
+    def detect_language(
+        self, model: Any, windows: list[np.ndarray]
+    ) -> list[dict[str, float]]:
+        """音声の区間ごとに言語の確率を求める.
+
+        Args:
+        ----
+            model: load_modelでロードしたモデル
+            windows: 30秒以下の16kHzモノラルの音声の区間
+
+        Returns:
+        -------
+            区間ごとの {言語コード: 確率}（判定できないモデルの場合は空のリスト）
+        """
+        return []
+
+
+class WhisperBackend(InferenceBackend):
+    """openai-whisper（PyTorch）による基準となるバックエンド."""
+
+    name = WHISPER_BACKEND
+
+    def check(self, device: str, dtype: str) -> None:
+        """デバイスとdtypeの組み合わせを使用できるか確認する."""
+        if dtype == "float16" and device == "cpu":
+            raise ValueError("float16はCPUでは使用できません")
+        if dtype == "int8" and device != "cpu":
+            raise ValueError("int8はCPUでのみ使用できます")
+
+    def load_model(
+        self,
+        model_name: str,
+        device: str,
+        dtype: str,
+        progress_callback: Optional[Callable[[str], None]] = None,
+    ) -> Any:
+        """whisper.load_modelでロードする（int8は量子化モデル）."""
+        import whisper
+
+        if dtype == "int8":
+            return load_quantized_model(model_name, progress_callback)
+        model = whisper.load_model(model_name, device=device)
+        if dtype == "float16":
+            model = model.half()
+        return model
+
+    def detect_language(
+        self, model: Any, windows: list[np.ndarray]
+    ) -> list[dict[str, float]]:
+        """区間のメルスペクトログラムをまとめて1回のforwardで判定する."""
+        import torch
+        import whisper
+
+        if not model.is_multilingual or not windows:
+            return []
+        mel = torch.stack(
+            [
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(np.asarray(window, dtype=np.float32)),
+                    model.dims.n_mels,
+                )
+                for window in windows
+            ]
+        ).to(model.device, dtype=next(model.parameters()).dtype)
+        with torch.no_grad():
+            _, probs = model.detect_language(mel)
+        return list(probs)
+
+
+class FasterWhisperModel:
+    """faster-whisperのモデルをopenai-whisperと同じ呼び出し方で使うラッパー.
+
+    長い音声はBatchedInferencePipelineで区間をまとめてデコードする。
+    """
+
+    def __init__(self, model: Any, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        """FasterWhisperModelを初期化する.
+
+        Args:
+        ----
+            model: faster_whisper.WhisperModel
+            batch_size: バッチ推論で同時にデコードする区間の数
+        """
+        self.model = model
+        self.batch_size = batch_size
+        self._pipeline: Optional[Any] = None
+
+    def _batched_pipeline(self) -> Optional[Any]:
+        """バッチ推論のパイプライン（faster-whisperが対応していない場合はNone）."""
+        if self._pipeline is None:
+            try:
+                from faster_whisper import BatchedInferencePipeline
+            except ImportError:
+                return None
+            self._pipeline = BatchedInferencePipeline(model=self.model)
+        return self._pipeline
+
+    def transcribe(self, audio: np.ndarray, **options: Any) -> dict[str, Any]:
+        """音声を文字起こしする.
+
+        Args:
+        ----
+            audio: 16kHzモノラルのfloat32配列
+            **options: openai-whisperのtranscribeと同じデコードオプション
+                （faster-whisperが対応していないものは無視する）
+
+        Returns:
+        -------
+            text, segments, languageを含む結果
+        """
+        kwargs = {
+            key: value
+            for key, value in options.items()
+            if key in _FASTER_WHISPER_OPTIONS and value is not None
+        }
+        # openai-whisperはbeam_sizeがNoneなら貪欲法だが、faster-whisperは
+        # 省略するとビーム幅5になるため、貪欲法を明示する
+        kwargs.setdefault("beam_size", 1)
+        pipeline = None
+        if len(audio) / SAMPLE_RATE >= BATCHED_MIN_DURATION:
+            pipeline = self._batched_pipeline()
+        if pipeline is not None:
+            # バッチ推論は直前のテキストを引き継がない
+            kwargs.pop("condition_on_previous_text", None)
+            segments, info = pipeline.transcribe(
+                audio, batch_size=self.batch_size, **kwargs
+            )
+        else:
+            segments, info = self.model.transcribe(audio, **kwargs)
+
+        result_segments = [
+            {
+                "id": i,
+                "seek": 0,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "tokens": list(segment.tokens),
+                "temperature": segment.temperature,
+                "avg_logprob": segment.avg_logprob,
+                "compression_ratio": segment.compression_ratio,
+                "no_speech_prob": segment.no_speech_prob,
+            }
+            for i, segment in enumerate(segments)
+        ]
+        return {
+            "text": "".join(segment["text"] for segment in result_segments),
+            "segments": result_segments,
+            "language": info.language,
+        }
+
+    def detect_language(self, windows: list[np.ndarray]) -> list[dict[str, float]]:
+        """区間ごとに言語の確率を求める（古いfaster-whisperでは空のリスト）."""
+        detect = getattr(self.model, "detect_language", None)
+        if detect is None:
+            return []
+        probabilities = []
+        for window in windows:
+            _, _, all_probs = detect(window)
+            probabilities.append(dict(all_probs))
+        return probabilities
+
+
+class FasterWhisperBackend(InferenceBackend):
+    """faster-whisper（CTranslate2）による高速なバックエンド.
+
+    int8の重みとバッチ推論により、一般的なCPUでもopenai-whisperより
+    高いスループットが得られる。
+    """
+
+    name = FASTER_WHISPER_BACKEND
+
+    def check(self, device: str, dtype: str) -> None:
+        """デバイスとdtypeの組み合わせを使用できるか確認する."""
+        if (device, dtype) not in _COMPUTE_TYPES:
+            raise ValueError(f"faster-whisperでは{device}で{dtype}を使用できません")
+
+    def load_model(
+        self,
+        model_name: str,
+        device: str,
+        dtype: str,
+        progress_callback: Optional[Callable[[str], None]] = None,
+    ) -> Any:
+        """CTranslate2形式のモデルをロードする."""
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImportError(
+                "faster-whisperがインストールされていません"
+                "（pip install faster-whisper）"
+            ) from e
+
+        model = WhisperModel(
+            str(get_ctranslate2_model_dir(model_name)),
+            device=device,
+            compute_type=_COMPUTE_TYPES[(device, dtype)],
+        )
+        return FasterWhisperModel(model)
+
+    def detect_language(
+        self, model: Any, windows: list[np.ndarray]
+    ) -> list[dict[str, float]]:
+        """FasterWhisperModelで区間ごとに判定する."""
+        probabilities: list[dict[str, float]] = model.detect_language(windows)
+        return probabilities
+
+
+BACKENDS: dict[str, InferenceBackend] = {
+    backend.name: backend for backend in (WhisperBackend(), FasterWhisperBackend())
+}
+
+
+def get_backend(name: str) -> InferenceBackend:
+    """名前から推論バックエンドを取得する.
+
+    Raises
+    ------
+        ValueError: 存在しないバックエンドの場合
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"対応していない推論バックエンド: {name}")
+    return BACKENDS[name]
+
+
+def available_backends() -> list[str]:
+    """この環境で使用できる推論バックエンドの名前（既定のものが先頭）."""
+    import importlib.util
+
+    names = [WHISPER_BACKEND]
+    if importlib.util.find_spec("faster_whisper") is not None:
+        names.append(FASTER_WHISPER_BACKEND)
+    return names
@@ -0,0 +1,482 @@
+"""ディレクトリ単位で音声ファイルを一括文字起こしするバッチ処理."""
+
+import glob
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .decoding import DEFAULT_DECODING_PROFILE
+from .model_utils import WHISPER_BACKEND
+from .profiling import JobProfiler
+from .transcriber import SUPPORTED_FORMATS, Transcriber
+from .utils import save_transcription
+from .writers import DEFAULT_OUTPUT_FORMATS
+
+# 出力ディレクトリに作成するジョブジャーナルのファイル名
+JOURNAL_FILENAME = ".batch_journal.jsonl"
+
+
+def _input_root(item: str) -> Path:
+    """入力（ディレクトリ・globパターン・ファイル）の基準となるディレクトリ."""
+    path = Path(item)
+    if path.is_dir():
+        return path
+    if glob.has_magic(item):
+        # パターンを含まない先頭の部分を基準にする
+        parts = []
+        for part in path.parts:
+            if glob.has_magic(part):
+                break
+            parts.append(part)
+        return Path(*parts) if parts else Path(".")
+    return path.parent
+
+
+def collect_audio_inputs(
+    inputs: list[str], recursive: bool = False
+) -> dict[Path, Path]:
+    """音声ファイルと、それを見つけた入力の基準ディレクトリを集める.
+
+    基準ディレクトリはディレクトリの入力ではそのディレクトリ、globパターン
+    ではパターンを含まない先頭の部分、ファイルでは親ディレクトリになる。
+
+    Args:
+    ----
+        inputs: ディレクトリ、globパターン、またはファイルパスのリスト
+        recursive: ディレクトリをサブディレクトリまで探索するかどうか
+
+    Returns:
+    -------
+        音声ファイルのパスから基準ディレクトリへの対応（パス順）
+    """
+    roots: dict[Path, Path] = {}
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            pattern = "**/*" if recursive else "*"
+            candidates = list(path.glob(pattern))
+        elif glob.has_magic(item):
+            candidates = [Path(p) for p in glob.glob(item, recursive=recursive)]
+        else:
+            candidates = [path]
+        root = _input_root(item).resolve()
+        for candidate in candidates:
+            if candidate.is_file() and candidate.suffix.lower() in SUPPORTED_FORMATS:
+                # 複数の入力で見つかった場合は最初の入力を基準にする
+                roots.setdefault(candidate.resolve(), root)
+    return dict(sorted(roots.items()))
+
+
+def collect_audio_files(inputs: list[str], recursive: bool = False) -> list[Path]:
+    """ディレクトリ・globパターン・ファイルから対応フォーマットの音声を集める.
+
+    Args:
+    ----
+        inputs: ディレクトリ、globパターン、またはファイルパスのリスト
+        recursive: ディレクトリをサブディレクトリまで探索するかどうか
+
+    Returns:
+    -------
+        重複を除いた音声ファイルのパス（ソート済み）
+    """
+    return list(collect_audio_inputs(inputs, recursive))
+
+
+def output_stems(
+    audio_files: Sequence[Path], input_roots: Optional[Mapping[Path, Path]] = None
+) -> dict[Path, Path]:
+    """音声ファイルごとの拡張子を除いた出力ファイル名（出力先からの相対パス）.
+
+    各音声を見つけた入力の基準ディレクトリからの相対パスで出力するため、
+    入力を追加して再実行しても既存の出力ファイル名は変わらない。名前が
+    実際に衝突する場合だけ、別の入力の音声はそれらに共通するディレクトリ
+    からの相対パスで、同じディレクトリの音声は拡張子を含めて区別する。
+
+    Args:
+    ----
+        audio_files: 音声ファイルのリスト
+        input_roots: 音声ファイルから基準ディレクトリへの対応
+            （含まれない音声は親ディレクトリを基準にする）
+
+    Returns:
+    -------
+        音声ファイルのパスから出力ファイル名への対応
+    """
+    roots = {path: (input_roots or {}).get(path, path.parent) for path in audio_files}
+    groups: dict[Path, list[Path]] = defaultdict(list)
+    for path, root in roots.items():
+        groups[path.relative_to(root).with_suffix("")].append(path)
+
+    stems: dict[Path, Path] = {}
+    for stem, paths in groups.items():
+        names = dict.fromkeys(paths, stem)
+        if len({roots[path] for path in paths}) > 1:
+            common = Path(os.path.commonpath([path.parent for path in paths]))
+            names = {path: path.relative_to(common).with_suffix("") for path in paths}
+        counts = Counter(names.values())
+        for path, name in names.items():
+            if counts[name] > 1:
+                ext = path.suffix.lstrip(".").lower()
+                name = name.with_name(f"{name.name}_{ext}")
+            stems[path] = name
+    return stems
+
+
+def output_path_for(
+    audio_path: Path,
+    output_dir: Path,
+    fmt: str = "md",
+    output_stem: Optional[Path] = None,
+) -> Path:
+    """音声ファイルに対応する出力ファイルのパスを返す.
+
+    Args:
+    ----
+        audio_path: 音声ファイルのパス
+        output_dir: 出力ディレクトリ
+        fmt: 出力形式
+        output_stem: output_stemsで求めた出力ファイル名（Noneの場合は音声のファイル名）
+    """
+    return output_dir / f"{output_stem or audio_path.stem}.{fmt}"
+
+
+class BatchJournal:
+    """処理済みファイルを記録するJSON Linesのジョブジャーナル.
+
+    クラッシュ後に再実行した場合は、記録済みのファイルをスキップする。
+    ファイルのサイズか更新時刻が変わっていれば未処理として扱う。
+    """
+
+    def __init__(self, path: Path) -> None:
+        """ジャーナルを読み込む.
+
+        Args:
+        ----
+            path: ジャーナルファイルのパス
+        """
+        self.path = path
+        self._done: dict[str, dict[str, Any]] = {}
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 書き込み途中で中断された行
+                if entry.get("status") == "done":
+                    self._done[entry["file"]] = entry
+
+    @staticmethod
+    def _signature(audio_path: Path) -> dict[str, Any]:
+        stat = audio_path.stat()
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def is_done(self, audio_path: Path) -> bool:
+        """ファイルが処理済みとして記録されているかどうか."""
+        entry = self._done.get(str(audio_path))
+        if entry is None:
+            return False
+        signature = self._signature(audio_path)
+        return all(entry.get(k) == v for k, v in signature.items())
+
+    def record(self, audio_path: Path, status: str, **details: Any) -> None:
+        """処理結果を1行追記する.
+
+        Args:
+        ----
+            audio_path: 音声ファイルのパス
+            status: "done"または"failed"
+            **details: 出力パスや音声の長さなどの追加情報
+        """
+        entry = {"file": str(audio_path), "status": status}
+        entry.update(self._signature(audio_path))
+        entry.update(details)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if status == "done":
+            self._done[entry["file"]] = entry
+
+
+@dataclass
+class BatchSummary:
+    """バッチ処理の集計結果."""
+
+    processed: list[Path] = field(default_factory=list)
+    skipped: list[Path] = field(default_factory=list)
+    failed: dict[Path, str] = field(default_factory=dict)
+    audio_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """1時間あたりに処理できた音声の時間（音声時間 / 実時間）."""
+        return self.audio_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+
+# ワーカープロセスごとに1つだけ保持するTranscriber
+_worker_transcriber: Optional[Transcriber] = None
+
+
+def _init_batch_worker(
+    model_name: str,
+    backend: str,
+    vad: bool,
+    language: Optional[str],
+    decoding: str,
+    num_threads: int,
+) -> None:
+    """ワーカープロセスの初期化（モデルを1回だけロードする）."""
+    global _worker_transcriber
+    import torch
+
+    torch.set_num_threads(num_threads)
+    _worker_transcriber = Transcriber(
+        model_name=model_name,
+        backend=backend,
+        vad=vad,
+        language=language,
+        decoding=decoding,
+    )
+    _worker_transcriber._load_model()
+
+
+def _transcribe_file(
+    audio_path: Path,
+    output_stem: Path,
+    output_dir: Path,
+    include_timestamps: bool,
+    formats: Sequence[str],
+    transcriber: Optional[Transcriber] = None,
+    profile: bool = False,
+    torch_trace: bool = False,
+) -> float:
+    """1ファイルを文字起こしして各形式で保存し、音声の長さ（秒）を返す."""
+    transcriber = transcriber or _worker_transcriber
+    assert transcriber is not None
+    # サブディレクトリの音声は出力先にも同じディレクトリを作って保存する
+    output_dir = output_dir / output_stem.parent
+    profiler = None
+    if profile or torch_trace:
+        profiler = JobProfiler(output_dir, output_stem.name, torch_trace=torch_trace)
+    result = transcriber.transcribe(audio_path, profiler=profiler)
+    save_transcription(
+        result,
+        audio_path.name,
+        output_dir=output_dir,
+        include_timestamps=include_timestamps,
+        formats=formats,
+        output_stem=output_stem.name,
+    )
+    return float(result.get("duration", 0.0))
+
+
+# (音声ファイル, 音声の長さ（失敗時はNone）, エラーメッセージ)
+_FileOutcome = tuple[Path, Optional[float], str]
+
+
+def _run_sequential(
+    pending: dict[Path, Path],
+    output_dir: Path,
+    model_name: str,
+    include_timestamps: bool,
+    formats: Sequence[str],
+    backend: str,
+    vad: bool,
+    language: Optional[str],
+    decoding: str,
+    profile: bool,
+    torch_trace: bool,
+) -> Iterator[_FileOutcome]:
+    """現在のプロセスで1ファイルずつ文字起こしする."""
+    transcriber = Transcriber(
+        model_name=model_name,
+        backend=backend,
+        vad=vad,
+        language=language,
+        decoding=decoding,
+    )
+    for audio_path, output_stem in pending.items():
+        try:
+            duration = _transcribe_file(
+                audio_path,
+                output_stem,
+                output_dir,
+                include_timestamps,
+                formats,
+                transcriber,
+                profile,
+                torch_trace,
+            )
+        except Exception as e:
+            yield audio_path, None, str(e)
+        else:
+            yield audio_path, duration, ""
+
+
+def _run_parallel(
+    pending: dict[Path, Path],
+    output_dir: Path,
+    model_name: str,
+    include_timestamps: bool,
+    formats: Sequence[str],
+    workers: int,
+    backend: str,
+    vad: bool,
+    language: Optional[str],
+    decoding: str,
+    profile: bool,
+    torch_trace: bool,
+) -> Iterator[_FileOutcome]:
+    """ワーカープロセスに分散して文字起こしする（完了順に返す）."""
+    threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_batch_worker,
+        initargs=(model_name, backend, vad, language, decoding, threads_per_worker),
+    ) as executor:
+        futures = {
+            executor.submit(
+                _transcribe_file,
+                audio_path,
+                output_stem,
+                output_dir,
+                include_timestamps,
+                formats,
+                None,
+                profile,
+                torch_trace,
+            ): audio_path
+            for audio_path, output_stem in pending.items()
+        }
+        for future in as_completed(futures):
+            try:
+                duration = future.result()
+            except Exception as e:
+                yield futures[future], None, str(e)
+            else:
+                yield futures[future], duration, ""
+
+
+def run_batch(
+    audio_files: list[Path],
+    output_dir: Path,
+    model_name: str = "large-v3",
+    workers: int = 1,
+    include_timestamps: bool = False,
+    journal_path: Optional[Path] = None,
+    on_progress: Optional[Callable[[Path, str], None]] = None,
+    backend: str = WHISPER_BACKEND,
+    vad: bool = False,
+    formats: Sequence[str] = DEFAULT_OUTPUT_FORMATS,
+    language: Optional[str] = None,
+    decoding: str = DEFAULT_DECODING_PROFILE,
+    profile: bool = False,
+    torch_trace: bool = False,
+    input_roots: Optional[Mapping[Path, Path]] = None,
+) -> BatchSummary:
+    """音声ファイルを一括で文字起こしする.
+
+    出力ファイルが既に存在するか、ジャーナルに処理済みとして記録されている
+    ファイルはスキップする。出力ファイル名はoutput_stemsで決める。
+
+    Args:
+    ----
+        audio_files: 音声ファイルのリスト
+        output_dir: Markdownの出力ディレクトリ
+        model_name: 使用するWhisperモデル名
+        workers: ワーカープロセス数（各プロセスがモデルを1つ保持する）
+        include_timestamps: タイムスタンプを含めるかどうか
+        journal_path: ジャーナルのパス（Noneの場合は出力ディレクトリ内）
+        on_progress: ファイルごとの状態（"done", "skipped", "failed"）の通知先
+        backend: 推論バックエンドの名前
+        vad: 無音区間を取り除いてから文字起こしするかどうか
+        formats: 保存する形式（先頭の形式のファイルで出力済みかを判定する）
+        language: 音声の言語（Noneの場合はファイルごとに自動判定）
+        decoding: デコードのプロファイル（fast, balanced, accurate, adaptive）
+        profile: ファイルごとにプロファイルとデコードログを出力先に保存するかどうか
+        torch_trace: torch.profilerのトレースも保存するかどうか（profileを含む）
+        input_roots: 出力ファイル名の基準ディレクトリ（collect_audio_inputsの結果）
+
+    Returns:
+    -------
+        処理結果の集計
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    journal = BatchJournal(journal_path or output_dir / JOURNAL_FILENAME)
+    summary = BatchSummary()
+    start_time = time.perf_counter()
+
+    def notify(audio_path: Path, status: str) -> None:
+        if on_progress:
+            on_progress(audio_path, status)
+
+    stems = output_stems(audio_files, input_roots)
+    pending = {}
+    for audio_path in audio_files:
+        output_path = output_path_for(
+            audio_path, output_dir, formats[0], stems[audio_path]
+        )
+        if journal.is_done(audio_path) or output_path.exists():
+            summary.skipped.append(audio_path)
+            notify(audio_path, "skipped")
+        else:
+            pending[audio_path] = stems[audio_path]
+
+    if workers <= 1 or len(pending) <= 1:
+        outcomes = _run_sequential(
+            pending,
+            output_dir,
+            model_name,
+            include_timestamps,
+            formats,
+            backend,
+            vad,
+            language,
+            decoding,
+            profile,
+            torch_trace,
+        )
+    else:
+        outcomes = _run_parallel(
+            pending,
+            output_dir,
+            model_name,
+            include_timestamps,
+            formats,
+            workers,
+            backend,
+            vad,
+            language,
+            decoding,
+            profile,
+            torch_trace,
+        )
+
+    for audio_path, duration, error in outcomes:
+        if duration is None:
+            journal.record(audio_path, "failed", error=error)
+            summary.failed[audio_path] = error
+            notify(audio_path, "failed")
+        else:
+            output_path = output_path_for(
+                audio_path, output_dir, formats[0], stems[audio_path]
+            )
+            journal.record(
+                audio_path, "done", output=str(output_path), duration=duration
+            )
+            summary.processed.append(audio_path)
+            summary.audio_seconds += duration
+            notify(audio_path, "done")
+
+    summary.wall_seconds = time.perf_counter() - start_time
+    return summary
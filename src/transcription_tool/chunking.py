@@ -0,0 +1,181 @@
+"""長時間音声を無音区間で分割・結合する機能."""
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+# Whisperが扱う音声のサンプリングレート
+SAMPLE_RATE = 16000
+
+# チャンク分割のデフォルト設定（秒）
+DEFAULT_CHUNK_LENGTH = 120.0
+DEFAULT_OVERLAP = 2.0
+
+
+@dataclass
+class AudioChunk:
+    """元音声の一部分を表すチャンク.
+
+    start〜endが実際に文字起こしする範囲で、keep_start〜keep_endが
+    このチャンクの結果を採用する範囲（前後のチャンクとの重複を除いた範囲）。
+    """
+
+    start: float
+    end: float
+    keep_start: float
+    keep_end: float
+
+    def slice(self, audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+        """音声配列からこのチャンクの範囲を切り出す（コピーしないビュー）."""
+        return audio[int(self.start * sample_rate) : int(self.end * sample_rate)]
+
+
+def find_silence_points(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_duration: float = 0.03,
+    threshold_db: float = -40.0,
+    min_silence: float = 0.3,
+) -> list[float]:
+    """無音区間の中央の時刻（秒）を列挙する.
+
+    Args:
+    ----
+        audio: モノラル音声（-1.0〜1.0のfloat配列）
+        sample_rate: サンプリングレート
+        frame_duration: エネルギーを計算するフレーム長（秒）
+        threshold_db: これより小さいRMS（dBFS）のフレームを無音とみなす
+        min_silence: 分割点として扱う無音の最小長（秒）
+
+    Returns:
+    -------
+        無音区間の中央の時刻のリスト（昇順）
+    """
+    frame_size = max(1, int(frame_duration * sample_rate))
+    n_frames = len(audio) // frame_size
+    if n_frames == 0:
+        return []
+
+    frames = audio[: n_frames * frame_size].reshape(n_frames, frame_size)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    silent = 20 * np.log10(rms + 1e-10) < threshold_db
+
+    # 無音フレームが連続する区間を検出
+    padded = np.concatenate(([False], silent, [False]))
+    changes = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    starts, ends = changes[0::2], changes[1::2]
+
+    min_frames = max(1, int(min_silence / frame_duration))
+    return [
+        (start + end) / 2 * frame_size / sample_rate
+        for start, end in zip(starts, ends)
+        if end - start >= min_frames
+    ]
+
+
+def plan_chunks(
+    duration: float,
+    silence_points: list[float],
+    chunk_length: float = DEFAULT_CHUNK_LENGTH,
+    overlap: float = DEFAULT_OVERLAP,
+) -> list[AudioChunk]:
+    """無音区間を優先して、音声をオーバーラップ付きのチャンクに分割する.
+
+    各境界はchunk_lengthの後半にある無音点のうち最も遠いものを選び、
+    見つからない場合はchunk_lengthで区切る。
+
+    Args:
+    ----
+        duration: 音声全体の長さ（秒）
+        silence_points: 無音区間の中央の時刻（秒, 昇順）
+        chunk_length: チャンクの目標長（秒）
+        overlap: 隣接チャンクと重ねる長さ（秒）
+
+    Returns:
+    -------
+        チャンクのリスト
+    """
+    if chunk_length <= 0:
+        raise ValueError("chunk_lengthは正の値である必要があります")
+
+    boundaries = [0.0]
+    cursor = 0.0
+    while duration - cursor > chunk_length:
+        ideal_end = cursor + chunk_length
+        candidates = [
+            point
+            for point in silence_points
+            if cursor + chunk_length / 2 <= point <= ideal_end
+        ]
+        cursor = candidates[-1] if candidates else ideal_end
+        boundaries.append(cursor)
+    boundaries.append(duration)
+
+    chunks = []
+    last_index = len(boundaries) - 2
+    for i in range(len(boundaries) - 1):
+        keep_start, keep_end = boundaries[i], boundaries[i + 1]
+        chunks.append(
+            AudioChunk(
+                start=max(0.0, keep_start - overlap) if i > 0 else 0.0,
+                end=min(duration, keep_end + overlap) if i < last_index else duration,
+                keep_start=keep_start,
+                keep_end=keep_end,
+            )
+        )
+    return chunks
+
+
+def merge_chunk_results(
+    chunks: list[AudioChunk], results: list[dict[str, Any]]
+) -> dict[str, Any]:
+    """チャンクごとの文字起こし結果を1つの結果に結合する.
+
+    タイムスタンプを元音声の時刻に補正し、重複区間のセグメントは
+    中央の時刻が採用範囲に入るチャンクのものだけを残す。
+
+    Args:
+    ----
+        chunks: plan_chunksで作成したチャンク
+        results: 各チャンクの文字起こし結果（chunksと同じ順序）
+
+    Returns:
+    -------
+        Whisperと同じ形式（text, segments, language）の結果
+    """
+    segments: list[dict[str, Any]] = []
+    last_index = len(chunks) - 1
+
+    for i, (chunk, result) in enumerate(zip(chunks, results)):
+        for segment in result.get("segments", []):
+            start = segment["start"] + chunk.start
+            end = segment["end"] + chunk.start
+            middle = (start + end) / 2
+            in_range = chunk.keep_start <= middle and (
+                middle < chunk.keep_end or i == last_index
+            )
+            if not in_range:
+                continue
+
+            # 境界付近で同じ発話が重複して認識された場合は後ろを捨てる
+            text = segment["text"].strip()
+            if segments and segments[-1]["text"].strip() == text:
+                if start < segments[-1]["end"]:
+                    continue
+
+            merged = dict(segment)
+            merged["id"] = len(segments)
+            merged["start"] = start
+            merged["end"] = end
+            if "seek" in merged:
+                merged["seek"] += int(chunk.start * 100)  # 10ms単位のフレーム
+            segments.append(merged)
+
+    languages = Counter(r["language"] for r in results if r.get("language"))
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": languages.most_common(1)[0][0] if languages else None,
+    }
@@ -0,0 +1,393 @@
+"""コマンドラインインターフェース."""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Optional
+
+from .api import DEFAULT_API_HOST, DEFAULT_API_PORT
+from .decoding import DECODING_PROFILES, DEFAULT_DECODING_PROFILE
+from .metrics import DEFAULT_METRICS_PORT
+from .model_registry import DEFAULT_MEMORY_BUDGET_MB
+from .model_utils import (
+    FASTER_WHISPER_BACKEND,
+    MODEL_URLS,
+    QUANTIZED_SUFFIX,
+    WHISPER_BACKEND,
+)
+from .scheduler import DEFAULT_MEMORY_RESERVE_MB
+from .writers import DEFAULT_OUTPUT_FORMATS, OUTPUT_FORMATS
+
+
+def _format_duration(seconds: float) -> str:
+    """秒数を H:MM:SS 形式に変換する."""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="transcription_tool",
+        description="OpenAI Whisperを使用した音声文字起こしツール",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    ui = subparsers.add_parser(
+        "ui", help="GradioのWebインターフェースを起動する（既定）"
+    )
+    ui.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=1,
+        help="モデルごとに同時に実行する文字起こしの数（既定: 1）",
+    )
+    ui.add_argument(
+        "--memory-reserve-mb",
+        type=float,
+        default=DEFAULT_MEMORY_RESERVE_MB,
+        help=(
+            "ジョブ開始時に残しておく空きメモリ（MB）。"
+            f"不足する場合は順番待ちになる（既定: {DEFAULT_MEMORY_RESERVE_MB:.0f}）"
+        ),
+    )
+    ui.add_argument(
+        "--model-memory-mb",
+        type=float,
+        default=None,
+        help=(
+            "ロード済みモデルを保持するメモリの上限（MB）。超える場合は最も長く"
+            f"使われていないモデルから解放する（既定: {DEFAULT_MEMORY_BUDGET_MB:.0f}）"
+        ),
+    )
+    ui.add_argument(
+        "--preload",
+        nargs="+",
+        default=[],
+        choices=sorted(MODEL_URLS) + [f"{m}{QUANTIZED_SUFFIX}" for m in MODEL_URLS],
+        metavar="MODEL",
+        help=(
+            "起動時にロードしてウォームアップするモデル"
+            f"（int8量子化モデルは large-v3{QUANTIZED_SUFFIX} のように指定）"
+        ),
+    )
+    ui.add_argument(
+        "--wait-for-preload",
+        action="store_true",
+        help="ウォームアップが終わってからサーバーを起動する",
+    )
+    ui.add_argument(
+        "--metrics-port",
+        type=int,
+        default=DEFAULT_METRICS_PORT,
+        help=(
+            "段階ごとの処理時間などをPrometheus形式で返す /metrics のポート"
+            f"（0で無効, 既定: {DEFAULT_METRICS_PORT}）"
+        ),
+    )
+    ui.add_argument(
+        "--api-port",
+        type=int,
+        default=None,
+        help=(
+            "他のサービスから音声を投入できるHTTP API（POST /jobs）のポート"
+            f"（指定した場合のみ起動, 例: {DEFAULT_API_PORT}）"
+        ),
+    )
+    ui.add_argument(
+        "--api-host",
+        default=DEFAULT_API_HOST,
+        help=(
+            "HTTP APIが待ち受けるアドレス。APIに認証はないため、他のマシンに公開する"
+            f"場合のみ0.0.0.0などを指定する（既定: {DEFAULT_API_HOST}）"
+        ),
+    )
+    ui.add_argument(
+        "--json-logs",
+        action="store_true",
+        help="段階ごとの処理時間や待ち時間を1行1件のJSONで標準エラーに出力する",
+    )
+
+    download = subparsers.add_parser(
+        "download", help="モデルを事前にダウンロードする（中断しても続きから再開）"
+    )
+    download.add_argument("models", nargs="+", choices=sorted(MODEL_URLS))
+    download.add_argument(
+        "-n",
+        "--connections",
+        type=int,
+        default=4,
+        help="範囲を分割して並列に取得する接続数（既定: 4）",
+    )
+
+    batch = subparsers.add_parser(
+        "batch", help="ディレクトリやglobで指定した音声ファイルを一括で文字起こしする"
+    )
+    batch.add_argument(
+        "inputs", nargs="+", help="音声ファイル、ディレクトリ、またはglobパターン"
+    )
+    batch.add_argument(
+        "-o",
+        "--output-dir",
+        type=Path,
+        default=Path("transcriptions"),
+        help="Markdownの出力先（既定: transcriptions）",
+    )
+    batch.add_argument(
+        "-m",
+        "--model",
+        default="large-v3",
+        choices=sorted(MODEL_URLS),
+        help="使用するWhisperモデル（既定: large-v3）",
+    )
+    batch.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="ワーカープロセス数。各プロセスがモデルを1つロードする（既定: 1）",
+    )
+    batch.add_argument(
+        "-b",
+        "--backend",
+        default=WHISPER_BACKEND,
+        choices=[WHISPER_BACKEND, FASTER_WHISPER_BACKEND],
+        help="推論バックエンド（faster-whisperは別途インストール, 既定: whisper）",
+    )
+    batch.add_argument(
+        "-r", "--recursive", action="store_true", help="サブディレクトリも探索する"
+    )
+    batch.add_argument(
+        "--timestamps", action="store_true", help="タイムスタンプを含めて保存する"
+    )
+    batch.add_argument(
+        "-f",
+        "--formats",
+        nargs="+",
+        default=list(DEFAULT_OUTPUT_FORMATS),
+        choices=OUTPUT_FORMATS,
+        help="保存する形式（複数指定可, 既定: md）",
+    )
+    batch.add_argument(
+        "-l",
+        "--language",
+        default=None,
+        help="音声の言語コード（ja, enなど, 既定: ファイルごとに自動判定）",
+    )
+    batch.add_argument(
+        "-d",
+        "--decoding",
+        default=DEFAULT_DECODING_PROFILE,
+        choices=list(DECODING_PROFILES),
+        help=(
+            "デコードのプロファイル（fast: 再デコード1回まで, accurate: ビームサーチ,"
+            " adaptive: 再デコードの回数と時間に上限, 既定: balanced）"
+        ),
+    )
+    batch.add_argument(
+        "--vad",
+        action="store_true",
+        help="発話のない区間を取り除いてから文字起こしする",
+    )
+    batch.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "ファイルごとにcProfileの結果とウィンドウごとのデコードログ"
+            "（温度・圧縮率・トークン数）を出力先に保存する"
+        ),
+    )
+    batch.add_argument(
+        "--torch-trace",
+        action="store_true",
+        help="--profileに加えてtorch.profilerのトレース（.trace.json）も保存する",
+    )
+    batch.add_argument(
+        "--journal",
+        type=Path,
+        default=None,
+        help="ジョブジャーナルのパス（既定: 出力先の.batch_journal.jsonl）",
+    )
+
+    search = subparsers.add_parser("search", help="過去の文字起こし結果を全文検索する")
+    search.add_argument(
+        "query", nargs="+", help="検索語（複数指定時はすべてを含む箇所）"
+    )
+    search.add_argument(
+        "-d",
+        "--dir",
+        type=Path,
+        default=Path("transcriptions"),
+        help="文字起こし結果のディレクトリ（既定: transcriptions）",
+    )
+    search.add_argument(
+        "-n", "--limit", type=int, default=20, help="表示する最大件数（既定: 20）"
+    )
+
+    words = subparsers.add_parser(
+        "words",
+        help="保存済みの文字起こし結果に単語ごとのタイムスタンプを付ける",
+    )
+    words.add_argument("filename", help="文字起こし結果（Markdown）のファイル名")
+    words.add_argument(
+        "-d",
+        "--dir",
+        type=Path,
+        default=Path("transcriptions"),
+        help="文字起こし結果のディレクトリ（既定: transcriptions）",
+    )
+    words.add_argument(
+        "-a",
+        "--audio",
+        type=Path,
+        default=None,
+        help="元の音声ファイル（既定: 音声キャッシュから取得）",
+    )
+    words.add_argument(
+        "-m",
+        "--model",
+        default=None,
+        choices=sorted(MODEL_URLS),
+        help="アライメントに使うモデル（既定: 文字起こしと同じモデル）",
+    )
+    return parser
+
+
+def _run_batch_command(args: argparse.Namespace) -> int:
+    """batchサブコマンドを実行する."""
+    from .batch import collect_audio_inputs, run_batch
+
+    input_roots = collect_audio_inputs(args.inputs, recursive=args.recursive)
+    audio_files = list(input_roots)
+    if not audio_files:
+        print("❌ 対象の音声ファイルが見つかりません", file=sys.stderr)
+        return 1
+
+    print(f"🎙️  {len(audio_files)}ファイルを{args.workers}プロセスで処理します")
+    icons = {"done": "✅", "skipped": "⏭️ ", "failed": "❌"}
+
+    def on_progress(audio_path: Path, status: str) -> None:
+        print(f"{icons[status]} {audio_path}")
+
+    summary = run_batch(
+        audio_files,
+        args.output_dir,
+        model_name=args.model,
+        workers=args.workers,
+        include_timestamps=args.timestamps,
+        journal_path=args.journal,
+        on_progress=on_progress,
+        backend=args.backend,
+        vad=args.vad,
+        formats=args.formats,
+        language=args.language,
+        decoding=args.decoding,
+        profile=args.profile,
+        torch_trace=args.torch_trace,
+        input_roots=input_roots,
+    )
+
+    print("-" * 50)
+    print(
+        f"処理: {len(summary.processed)}件 / スキップ: {len(summary.skipped)}件 / "
+        f"失敗: {len(summary.failed)}件"
+    )
+    print(
+        f"音声時間: {_format_duration(summary.audio_seconds)} / "
+        f"処理時間: {_format_duration(summary.wall_seconds)}"
+    )
+    print(f"スループット: {summary.throughput:.2f} 音声時間/実時間")
+    for audio_path, error in summary.failed.items():
+        print(f"  ❌ {audio_path}: {error}", file=sys.stderr)
+    return 1 if summary.failed else 0
+
+
+def _run_download_command(args: argparse.Namespace) -> int:
+    """downloadサブコマンドを実行する."""
+    from .model_utils import ensure_model_downloaded
+
+    def on_progress(ratio: float, message: str) -> None:
+        print(f"\r{message}", end="", flush=True)
+
+    for model_name in args.models:
+        try:
+            ensure_model_downloaded(model_name, on_progress, args.connections)
+        except Exception as e:
+            print(f"\n❌ {model_name}: {e}", file=sys.stderr)
+            return 1
+        print()
+    return 0
+
+
+def _run_search_command(args: argparse.Namespace) -> int:
+    """searchサブコマンドを実行する."""
+    from .history_index import get_history_index
+
+    if not args.dir.is_dir():
+        print(f"❌ ディレクトリが見つかりません: {args.dir}", file=sys.stderr)
+        return 1
+
+    index = get_history_index(args.dir)
+    index.reconcile()
+    hits = index.search(" ".join(args.query), args.limit)
+    for hit in hits:
+        position = "" if hit.start is None else f" [{_format_duration(hit.start)}]"
+        print(f"{hit.filename}{position} {hit.text}")
+    return 0 if hits else 1
+
+
+def _run_words_command(args: argparse.Namespace) -> int:
+    """wordsサブコマンドを実行する."""
+    from .alignment import align_transcript
+
+    try:
+        output_path = align_transcript(
+            Path(args.filename).name,
+            args.dir,
+            audio=args.audio,
+            model_name=args.model,
+            progress_callback=print,
+        )
+    except (ValueError, FileNotFoundError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(f"📝 {output_path}")
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """コマンドラインのエントリーポイント.
+
+    Args:
+    ----
+        argv: コマンドライン引数（Noneの場合はsys.argv）
+
+    Returns:
+    -------
+        終了コード
+    """
+    args = _build_parser().parse_args(argv)
+
+    if args.command == "batch":
+        return _run_batch_command(args)
+    if args.command == "download":
+        return _run_download_command(args)
+    if args.command == "search":
+        return _run_search_command(args)
+    if args.command == "words":
+        return _run_words_command(args)
+
+    from .app import main as run_app
+
+    run_app(
+        concurrency=getattr(args, "concurrency", 1),
+        memory_reserve_mb=getattr(args, "memory_reserve_mb", DEFAULT_MEMORY_RESERVE_MB),
+        preload=getattr(args, "preload", []),
+        wait_for_preload=getattr(args, "wait_for_preload", False),
+        metrics_port=getattr(args, "metrics_port", DEFAULT_METRICS_PORT),
+        json_logs=getattr(args, "json_logs", False),
+        api_port=getattr(args, "api_port", None),
+        api_host=getattr(args, "api_host", DEFAULT_API_HOST),
+        model_memory_mb=getattr(args, "model_memory_mb", None),
+    )
+    return 0
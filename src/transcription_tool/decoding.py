@@ -0,0 +1,215 @@
+"""デコードのプロファイル（ビームサーチ・温度フォールバックの設定）と再試行の予算.
+
+openai-whisperのtranscribeは、繰り返しが多い・確信度が低いと判断した
+ウィンドウを温度を上げて最大6回デコードし直す。雑音の多い音声では処理時間が
+予測できないほど伸びるため、ビーム幅・best_of・温度の段階をプロファイルとして
+選べるようにし、adaptiveではウィンドウごと・ジョブごとの再デコードの回数と
+時間に上限を設ける。
+"""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+# model.transcribeの既定値と同じ基準で、温度を上げて再デコードするかを判定する
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+# model.transcribeの既定の温度の段階
+DEFAULT_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+@dataclass(frozen=True)
+class DecodingProfile:
+    """デコードの設定."""
+
+    name: str
+    # 温度0でのビーム幅（Noneの場合は貪欲法）
+    beam_size: Optional[int] = None
+    # 温度を上げたときにサンプリングする候補の数
+    best_of: Optional[int] = None
+    temperatures: tuple[float, ...] = DEFAULT_TEMPERATURES
+    # ウィンドウごとの再デコードの上限（温度の段階を切り詰める）
+    max_window_retries: Optional[int] = None
+    # ジョブ全体での再デコードの上限
+    max_job_retries: Optional[int] = None
+    # 再デコードに使える時間（最初のデコードにかかった時間に対する割合）
+    retry_time_ratio: Optional[float] = None
+
+    @property
+    def budgeted(self) -> bool:
+        """ジョブ全体の再デコードに上限があるかどうか."""
+        return self.max_job_retries is not None or self.retry_time_ratio is not None
+
+    def options(self) -> dict[str, Any]:
+        """model.transcribeに渡すデコードオプション."""
+        temperatures = self.temperatures
+        if self.max_window_retries is not None:
+            temperatures = temperatures[: self.max_window_retries + 1]
+        return {
+            "temperature": temperatures,
+            "beam_size": self.beam_size,
+            "best_of": self.best_of,
+        }
+
+
+DECODING_PROFILES = {
+    # 再デコードは1回まで
+    "fast": DecodingProfile("fast", temperatures=(0.0, 0.5)),
+    # model.transcribeの既定値と同じ
+    "balanced": DecodingProfile("balanced"),
+    # ビームサーチと複数候補のサンプリングで精度を優先する
+    "accurate": DecodingProfile("accurate", beam_size=5, best_of=5),
+    # 再デコードの回数と時間に上限を設け、処理時間の上振れを抑える
+    "adaptive": DecodingProfile(
+        "adaptive",
+        temperatures=(0.0, 0.4, 0.8),
+        max_window_retries=2,
+        max_job_retries=8,
+        retry_time_ratio=0.5,
+    ),
+}
+
+DEFAULT_DECODING_PROFILE = "balanced"
+
+
+def get_decoding_profile(name: str) -> DecodingProfile:
+    """名前からデコードのプロファイルを取得する.
+
+    Raises
+    ------
+        ValueError: 存在しないプロファイルの場合
+    """
+    if name not in DECODING_PROFILES:
+        raise ValueError(f"対応していないデコードのプロファイル: {name}")
+    return DECODING_PROFILES[name]
+
+
+def fallback_reasons(
+    compression_ratio: float, avg_logprob: float, no_speech_prob: float
+) -> list[str]:
+    """model.transcribeが次の温度で再デコードする理由を返す（しない場合は空）."""
+    reasons = []
+    if compression_ratio > COMPRESSION_RATIO_THRESHOLD:
+        reasons.append("compression_ratio")  # 繰り返しが多すぎる
+    if avg_logprob < LOGPROB_THRESHOLD:
+        if no_speech_prob > NO_SPEECH_THRESHOLD:
+            return []  # 無音として扱われる
+        reasons.append("avg_logprob")
+    return reasons
+
+
+@contextmanager
+def patch_decode(model: Any, decode: Callable[..., Any]) -> Iterator[None]:
+    """ブロック内だけモデルのdecodeを差し替える.
+
+    Args:
+    ----
+        model: 借りているモデル（ブロック内は他のスレッドと共有しない）
+        decode: model.decodeの代わりに呼ぶ関数
+    """
+    # 既に差し替えられている場合やクラスにdecodeがない場合は元の属性に戻す
+    restore = "decode" in vars(model) or not hasattr(type(model), "decode")
+    original = model.decode
+    model.decode = decode
+    try:
+        yield
+    finally:
+        if restore:
+            model.decode = original
+        else:
+            del model.decode  # クラスのdecodeに戻す
+
+
+class DecodeBudget:
+    """1件のジョブの再デコードを数え、プロファイルの上限を超えたら打ち切る.
+
+    openai-whisperのtranscribeは温度を上げながらmodel.decodeを呼び直すため、
+    温度が前回より高い呼び出しを再デコードとみなす。上限に達した後の
+    再デコードは実行せず、そのウィンドウの前回の結果をそのまま返す
+    （transcribeは残りの温度でも同じ結果を受け取り、それを採用する）。
+    """
+
+    def __init__(self, profile: DecodingProfile) -> None:
+        """DecodeBudgetを初期化する.
+
+        Args:
+        ----
+            profile: 上限を決めるデコードのプロファイル
+        """
+        self.profile = profile
+        self.windows = 0
+        self.retries = 0
+        self.skipped_retries = 0
+        self._first_pass_seconds = 0.0
+        self._retry_seconds = 0.0
+        self._last_temperature: Optional[float] = None
+        self._last_result: Any = None
+        self._lock = threading.Lock()
+
+    def exhausted(self) -> bool:
+        """ジョブ全体の再デコードの上限に達したかどうか."""
+        profile = self.profile
+        if profile.max_job_retries is not None:
+            if self.retries >= profile.max_job_retries:
+                return True
+        if profile.retry_time_ratio is not None:
+            limit = self._first_pass_seconds * profile.retry_time_ratio
+            if self._retry_seconds >= limit:
+                return True
+        return False
+
+    def summary(self) -> dict[str, Any]:
+        """結果に含める再デコードの回数."""
+        return {
+            "profile": self.profile.name,
+            "windows": self.windows,
+            "retries": self.retries,
+            "skipped_retries": self.skipped_retries,
+        }
+
+    @contextmanager
+    def watch(self, model: Any) -> Iterator[None]:
+        """ブロック内でのモデルのdecodeの呼び出しを数え、上限を適用する.
+
+        decodeを持たないモデル（faster-whisperなど）では何もしない。
+
+        Args:
+        ----
+            model: 借りているモデル（ブロック内は他のスレッドと共有しない）
+        """
+        original = getattr(model, "decode", None)
+        if original is None:
+            yield
+            return
+
+        def decode(segment: Any, options: Any = None, **kwargs: Any) -> Any:
+            temperature = float(getattr(options, "temperature", 0.0))
+            with self._lock:
+                retry = (
+                    self._last_temperature is not None
+                    and temperature > self._last_temperature
+                )
+                self._last_temperature = temperature
+                if retry and self.exhausted():
+                    self.skipped_retries += 1
+                    return self._last_result
+            start_time = time.perf_counter()
+            result = original(segment, options, **kwargs)
+            seconds = time.perf_counter() - start_time
+            with self._lock:
+                if retry:
+                    self.retries += 1
+                    self._retry_seconds += seconds
+                else:
+                    self.windows += 1
+                    self._first_pass_seconds += seconds
+                self._last_result = result
+            return result
+
+        with patch_decode(model, decode):
+            yield
@@ -4,6 +4,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from .history_index import HistoryEntry, get_history_index
+
+# 過去の結果タブで1ページに表示する件数
+DEFAULT_PAGE_SIZE = 50
+
 
 def get_transcriptions_dir() -> Path:
     """文字起こし結果の保存ディレクトリを取得.
@@ -18,44 +23,88 @@ def get_transcriptions_dir() -> Path:
     return transcriptions_dir
 
 
+def _format_size(size_bytes: int) -> str:
+    """ファイルサイズを読みやすい形式に変換する."""
+    if size_bytes < 1024:
+        return f"{size_bytes} B"
+    if size_bytes < 1024 * 1024:
+        return f"{size_bytes / 1024:.1f} KB"
+    return f"{size_bytes / (1024 * 1024):.1f} MB"
+
+
+def _to_row(entry: HistoryEntry) -> tuple[str, str, str, float]:
+    """索引のエントリを一覧表示用の行に変換する."""
+    created_str = datetime.fromtimestamp(entry.mtime).strftime("%Y年%m月%d日 %H:%M:%S")
+    return (entry.filename, created_str, _format_size(entry.size), entry.mtime)
+
+
+def list_transcription_page(
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    sort_by: str = "mtime",
+    descending: bool = True,
+    refresh: bool = False,
+) -> tuple[list[tuple[str, str, str, float]], int]:
+    """文字起こし結果ファイルの一覧を1ページ分取得.
+
+    ディレクトリ全体を走査せず、履歴の索引から取得する。
+
+    Args:
+    ----
+        page: ページ番号（1始まり）
+        page_size: 1ページあたりの件数
+        sort_by: 並べ替える列（mtime, filename, size）
+        descending: 降順にするかどうか
+        refresh: ディレクトリを走査し直して索引を更新するかどうか
+
+    Returns:
+    -------
+        ((ファイル名, 作成日時, サイズ, タイムスタンプ)のリスト, 全件数)
+    """
+    index = get_history_index(get_transcriptions_dir())
+    index.reconcile(full=refresh)
+    entries = index.query(page, page_size, sort_by=sort_by, descending=descending)
+    return [_to_row(entry) for entry in entries], index.count()
+
+
 def list_transcription_files() -> list[tuple[str, str, str, float]]:
     """文字起こし結果ファイルの一覧を取得.
 
     Returns
     -------
-        (ファイル名, 作成日時, サイズ, タイムスタンプ)のリスト
+        (ファイル名, 作成日時, サイズ, タイムスタンプ)のリスト（新しい順）
     """
-    transcriptions_dir = get_transcriptions_dir()
-    files = []
-
-    for file_path in transcriptions_dir.glob("*.md"):
-        stat = file_path.stat()
+    index = get_history_index(get_transcriptions_dir())
+    index.reconcile()
+    return [_to_row(entry) for entry in index.query(1, max(1, index.count()))]
 
-        # ファイル名
-        filename = file_path.name
 
-        # 作成日時を読みやすい形式に
-        created_time = datetime.fromtimestamp(stat.st_mtime)
-        created_str = created_time.strftime("%Y年%m月%d日 %H:%M:%S")
+def _format_position(seconds: Optional[float]) -> str:
+    """セグメントの開始位置をMM:SS形式に変換する（不明な場合は空文字）."""
+    if seconds is None:
+        return ""
+    seconds = int(seconds)
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
 
-        # ファイルサイズを読みやすい形式に
-        size_bytes = stat.st_size
-        if size_bytes < 1024:
-            size_str = f"{size_bytes} B"
-        elif size_bytes < 1024 * 1024:
-            size_str = f"{size_bytes / 1024:.1f} KB"
-        else:
-            size_str = f"{size_bytes / (1024 * 1024):.1f} MB"
 
-        # タイムスタンプ（ソート用）
-        timestamp = stat.st_mtime
+def search_transcriptions(query: str, limit: int = 50) -> list[tuple[str, str, str]]:
+    """文字起こし結果を全文検索.
 
-        files.append((filename, created_str, size_str, timestamp))
-
-    # 作成日時の新しい順にソート
-    files.sort(key=lambda x: x[3], reverse=True)
+    Args:
+    ----
+        query: 検索語（空白区切りでAND検索）
+        limit: 最大件数
 
-    return files
+    Returns:
+    -------
+        (ファイル名, 開始位置, 該当箇所)のリスト（関連度の高い順）
+    """
+    index = get_history_index(get_transcriptions_dir())
+    index.reconcile()
+    return [
+        (hit.filename, _format_position(hit.start), hit.text)
+        for hit in index.search(query, limit)
+    ]
 
 
 def read_transcription_file(filename: str) -> Optional[str]:
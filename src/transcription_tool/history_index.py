@@ -0,0 +1,387 @@
+"""文字起こし結果ファイルのメタデータをSQLiteで管理する索引."""
+
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from . import search_index
+from .search_index import SearchHit
+
+# 索引ファイル名（文字起こし結果と同じディレクトリに置く）
+INDEX_FILENAME = ".history.sqlite3"
+
+# 索引の形式のバージョン（変わった場合は既存の索引を作り直す）
+SCHEMA_VERSION = 3
+
+# 並べ替えに使える列
+SORT_COLUMNS = {"mtime", "filename", "size"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcriptions (
+    filename TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    audio_filename TEXT,
+    language TEXT,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS transcriptions_mtime ON transcriptions (mtime);
+CREATE INDEX IF NOT EXISTS transcriptions_size ON transcriptions (size);
+CREATE TABLE IF NOT EXISTS alignment_sources (
+    filename TEXT PRIMARY KEY,
+    audio_hash TEXT NOT NULL,
+    model_name TEXT NOT NULL,
+    language TEXT,
+    segments TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class HistoryEntry:
+    """索引に登録された1件の文字起こし結果."""
+
+    filename: str
+    mtime: float
+    size: int
+    audio_filename: Optional[str] = None
+    language: Optional[str] = None
+    duration: Optional[float] = None
+
+
+@dataclass
+class AlignmentSource:
+    """単語のタイムスタンプを後から計算するために保存しておく情報.
+
+    デコード済みのトークンとセグメントの時刻があれば、元の音声（音声キャッシュに
+    ハッシュで保存されている）と同じモデルで強制アライメントするだけで済み、
+    もう一度デコードする必要はない。
+    """
+
+    audio_hash: str
+    model_name: str
+    language: Optional[str]
+    # start, end, text, tokens だけを持つセグメント
+    segments: list[dict[str, Any]]
+
+    @classmethod
+    def from_result(cls, result: dict[str, Any]) -> Optional["AlignmentSource"]:
+        """文字起こし結果から作成する（音声のハッシュかモデルがなければNone）.
+
+        Args:
+        ----
+            result: audio_hashとmodelを含む文字起こし結果
+
+        Returns:
+        -------
+            作成したAlignmentSource、またはNone
+        """
+        if not result.get("audio_hash") or not result.get("model"):
+            return None
+        segments = [
+            {
+                "start": segment["start"],
+                "end": segment["end"],
+                "text": segment["text"],
+                "tokens": [int(token) for token in segment.get("tokens") or []],
+            }
+            for segment in result.get("segments") or []
+        ]
+        return cls(
+            result["audio_hash"], result["model"], result.get("language"), segments
+        )
+
+    def to_result(self) -> dict[str, Any]:
+        """単語のタイムスタンプを計算する対象の結果として返す."""
+        return {
+            "text": "".join(segment["text"] for segment in self.segments),
+            "segments": [dict(segment) for segment in self.segments],
+            "language": self.language,
+            "audio_hash": self.audio_hash,
+            "model": self.model_name,
+        }
+
+
+class HistoryIndex:
+    """文字起こし結果ディレクトリのファイル一覧を保持するSQLiteの索引.
+
+    保存時にrecordで登録し、それ以外の変更（手動での追加・削除など）は
+    reconcileで差分を取り込む。ディレクトリのmtimeが変わった場合のみ走査する。
+    一覧はページ単位で取得するため、件数が増えても表示の負荷は変わらない。
+    本文はsearch_indexの全文検索用の転置索引にも同時に登録する。
+    """
+
+    def __init__(self, directory: Path, db_path: Optional[Path] = None) -> None:
+        """HistoryIndexを初期化する.
+
+        Args:
+        ----
+            directory: 文字起こし結果（*.md）を保存するディレクトリ
+            db_path: 索引ファイルのパス（Noneの場合はdirectory内）
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path or self.directory / INDEX_FILENAME
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA + search_index.SCHEMA)
+            row = conn.execute(
+                "SELECT value FROM meta WHERE key = 'schema_version'"
+            ).fetchone()
+            if row is None or row[0] != SCHEMA_VERSION:
+                # 古い形式の索引は、次回のreconcileですべて登録し直す
+                for table in (
+                    "transcriptions",
+                    "alignment_sources",
+                    "segments",
+                    "segment_terms",
+                ):
+                    conn.execute(f"DELETE FROM {table}")
+                conn.execute("DELETE FROM meta WHERE key = 'dir_mtime'")
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)",
+                    (SCHEMA_VERSION,),
+                )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """スレッドごとに独立した接続を開き、終了時にコミットして閉じる."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        # ジャーナルを毎回作成・削除するとディレクトリのmtimeが変わり、
+        # reconcileで毎回走査することになるため、ジャーナルファイルを残す
+        conn.execute("PRAGMA journal_mode = PERSIST")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(
+        self,
+        path: Path,
+        audio_filename: Optional[str] = None,
+        language: Optional[str] = None,
+        duration: Optional[float] = None,
+        previous_dir_mtime: Optional[float] = None,
+        alignment_source: Optional[AlignmentSource] = None,
+    ) -> None:
+        """保存した文字起こし結果を索引に登録する.
+
+        Args:
+        ----
+            path: 保存したMarkdownファイルのパス
+            audio_filename: 元の音声ファイル名
+            language: 検出言語
+            duration: 音声の長さ（秒）
+            previous_dir_mtime: 保存前のディレクトリのmtime。索引がその時点の
+                ディレクトリと一致していた場合は、保存後も一致しているとみなし
+                次回のreconcileで走査しない
+            alignment_source: 単語のタイムスタンプを後から計算するための情報
+        """
+        stat = path.stat()
+        with self._lock, self._connect() as conn:
+            if previous_dir_mtime is not None:
+                conn.execute(
+                    "UPDATE meta SET value = ? WHERE key = 'dir_mtime' AND value = ?",
+                    (self.directory.stat().st_mtime, previous_dir_mtime),
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO transcriptions VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    path.name,
+                    stat.st_mtime,
+                    stat.st_size,
+                    audio_filename,
+                    language,
+                    duration,
+                ),
+            )
+            conn.execute(
+                "DELETE FROM alignment_sources WHERE filename = ?", (path.name,)
+            )
+            if alignment_source is not None:
+                conn.execute(
+                    "INSERT INTO alignment_sources VALUES (?, ?, ?, ?, ?)",
+                    (
+                        path.name,
+                        alignment_source.audio_hash,
+                        alignment_source.model_name,
+                        alignment_source.language,
+                        json.dumps(alignment_source.segments, ensure_ascii=False),
+                    ),
+                )
+            search_index.index_document(conn, path)
+
+    def get_alignment_source(self, filename: str) -> Optional[AlignmentSource]:
+        """保存時に登録した単語のタイムスタンプの計算用の情報を取得する.
+
+        Args:
+        ----
+            filename: 文字起こし結果のファイル名
+
+        Returns:
+        -------
+            登録されている情報、またはNone
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT audio_hash, model_name, language, segments "
+                "FROM alignment_sources WHERE filename = ?",
+                (filename,),
+            ).fetchone()
+        if row is None:
+            return None
+        audio_hash, model_name, language, segments = row
+        return AlignmentSource(audio_hash, model_name, language, json.loads(segments))
+
+    def reconcile(self, full: bool = False) -> int:
+        """ディレクトリの変更を索引に取り込む.
+
+        ディレクトリのmtimeが前回から変わっていない場合は走査せず、登録済みの
+        ファイルのmtimeとサイズだけを確認する（上書き保存ではディレクトリの
+        mtimeが変わらないため）。変わっている場合やfullを指定した場合は
+        ディレクトリを走査し、mtimeとサイズが変わったファイルだけを更新する。
+
+        Args:
+        ----
+            full: ディレクトリのmtimeに関わらず走査するかどうか
+
+        Returns:
+        -------
+            追加・更新・削除したファイル数
+        """
+        dir_mtime = self.directory.stat().st_mtime
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM meta WHERE key = 'dir_mtime'"
+            ).fetchone()
+            known = {
+                filename: (mtime, size)
+                for filename, mtime, size in conn.execute(
+                    "SELECT filename, mtime, size FROM transcriptions"
+                )
+            }
+            if not full and row is not None and row[0] == dir_mtime:
+                names = list(known)
+            else:
+                with os.scandir(self.directory) as entries:
+                    names = [
+                        entry.name
+                        for entry in entries
+                        if entry.name.endswith(".md") and entry.is_file()
+                    ]
+
+            changed = []
+            for name in names:
+                try:
+                    stat = (self.directory / name).stat()
+                except FileNotFoundError:
+                    continue
+                current = (stat.st_mtime, stat.st_size)
+                if known.pop(name, None) != current:
+                    changed.append((name, *current))
+            if not changed and not known and row is not None and row[0] == dir_mtime:
+                return 0
+
+            conn.executemany(
+                "INSERT INTO transcriptions (filename, mtime, size) VALUES (?, ?, ?) "
+                "ON CONFLICT (filename) DO UPDATE "
+                "SET mtime = excluded.mtime, size = excluded.size",
+                changed,
+            )
+            for table in ("transcriptions", "alignment_sources"):
+                conn.executemany(
+                    f"DELETE FROM {table} WHERE filename = ?",
+                    [(filename,) for filename in known],
+                )
+            for filename, _, _ in changed:
+                search_index.index_document(conn, self.directory / filename)
+            search_index.remove_documents(conn, list(known))
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('dir_mtime', ?)", (dir_mtime,)
+            )
+            return len(changed) + len(known)
+
+    def remove(self, filename: str) -> None:
+        """索引からファイルを削除する."""
+        with self._lock, self._connect() as conn:
+            for table in ("transcriptions", "alignment_sources"):
+                conn.execute(f"DELETE FROM {table} WHERE filename = ?", (filename,))
+            search_index.remove_documents(conn, [filename])
+
+    def count(self) -> int:
+        """登録されているファイル数."""
+        with self._connect() as conn:
+            (total,) = conn.execute("SELECT COUNT(*) FROM transcriptions").fetchone()
+        return int(total)
+
+    def query(
+        self,
+        page: int = 1,
+        page_size: int = 50,
+        sort_by: str = "mtime",
+        descending: bool = True,
+    ) -> list[HistoryEntry]:
+        """指定したページのファイルを並べ替えて取得する.
+
+        Args:
+        ----
+            page: ページ番号（1始まり）
+            page_size: 1ページあたりの件数
+            sort_by: 並べ替える列（mtime, filename, size）
+            descending: 降順にするかどうか
+
+        Returns:
+        -------
+            そのページのファイル一覧
+        """
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"並べ替えできない列です: {sort_by}")
+        order = "DESC" if descending else "ASC"
+        offset = (max(1, page) - 1) * page_size
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT filename, mtime, size, audio_filename, language, duration "
+                f"FROM transcriptions ORDER BY {sort_by} {order}, filename {order} "
+                "LIMIT ? OFFSET ?",
+                (page_size, offset),
+            ).fetchall()
+        return [HistoryEntry(*row) for row in rows]
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit]:
+        """本文を全文検索する.
+
+        Args:
+        ----
+            query: 検索語（空白区切りでAND検索）
+            limit: 最大件数
+
+        Returns:
+        -------
+            関連度の高い順のセグメント
+        """
+        with self._connect() as conn:
+            return search_index.search(conn, query, limit)
+
+
+_indexes: dict[Path, HistoryIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_history_index(directory: Path) -> HistoryIndex:
+    """ディレクトリごとに共有する索引を取得する."""
+    key = Path(directory).resolve()
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = HistoryIndex(key)
+        return _indexes[key]
@@ -0,0 +1,174 @@
+"""音声全体から選んだ数か所の区間で言語を判定し、音声ごとに結果を再利用する.
+
+Whisperのtranscribeは言語を指定しないと最初の30秒だけで言語を判定するため、
+冒頭が無音や音楽の録音では判定を誤りやすい。ここでは発話の多い区間を
+数か所選んでまとめて判定し、確率を平均して言語を決める。判定結果は
+音声内容のハッシュごとに保持し、同じ音声の再実行では判定を省略する。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+from .chunking import SAMPLE_RATE
+from .result_cache import ResultCache, make_cache_key
+
+# 言語判定に使う区間の数と長さ（秒, Whisperの入力長）
+LANGUAGE_ID_WINDOWS = 3
+LANGUAGE_ID_WINDOW_LENGTH = 30.0
+# 区間の候補の数（判定に使う区間の何倍から発話の多いものを選ぶか）
+_CANDIDATES_PER_WINDOW = 3
+
+# プロセス内で保持する判定結果の数
+_MEMO_SIZE = 1024
+
+# UIやCLIで選べる言語（Noneは自動判定）
+AUTO_LANGUAGE_LABEL = "自動判定"
+LANGUAGE_CHOICES = {
+    AUTO_LANGUAGE_LABEL: None,
+    "日本語": "ja",
+    "英語": "en",
+    "中国語": "zh",
+    "韓国語": "ko",
+    "ドイツ語": "de",
+    "フランス語": "fr",
+    "スペイン語": "es",
+}
+
+# (区間ごとの言語の確率) を返す判定関数
+DetectFn = Callable[[list[np.ndarray]], list[dict[str, float]]]
+
+
+def sample_windows(
+    audio: np.ndarray,
+    n_windows: int = LANGUAGE_ID_WINDOWS,
+    window_length: float = LANGUAGE_ID_WINDOW_LENGTH,
+) -> list[np.ndarray]:
+    """言語判定に使う、発話の多い区間を音声全体から選ぶ.
+
+    音声全体に等間隔に並べた候補のうち、RMSの大きいn_windows個を時刻順に返す。
+
+    Args:
+    ----
+        audio: 16kHzモノラルの音声
+        n_windows: 選ぶ区間の数
+        window_length: 区間の長さ（秒）
+
+    Returns:
+    -------
+        選んだ区間（音声がwindow_length以下の場合は音声全体のみ）
+    """
+    size = int(window_length * SAMPLE_RATE)
+    if len(audio) <= size:
+        return [audio]
+    n_candidates = min(n_windows * _CANDIDATES_PER_WINDOW, -(-len(audio) // size))
+    starts = np.linspace(0, len(audio) - size, n_candidates).astype(int)
+    energies = [
+        float(np.mean(np.square(audio[start : start + size], dtype=np.float64)))
+        for start in starts
+    ]
+    chosen = sorted(np.argsort(energies)[::-1][:n_windows])
+    return [audio[starts[i] : starts[i] + size] for i in chosen]
+
+
+def pick_language(probabilities: list[dict[str, float]]) -> Optional[str]:
+    """区間ごとの言語の確率を平均し、最も確率の高い言語を返す.
+
+    Args:
+    ----
+        probabilities: 区間ごとの {言語コード: 確率}
+
+    Returns:
+    -------
+        言語コード（判定できなかった場合はNone）
+    """
+    totals: dict[str, float] = {}
+    for probs in probabilities:
+        for language, probability in probs.items():
+            totals[language] = totals.get(language, 0.0) + float(probability)
+    if not totals:
+        return None
+    return max(totals, key=lambda language: totals[language])
+
+
+def detect_language(audio: np.ndarray, detect: DetectFn) -> Optional[str]:
+    """発話の多い数か所の区間をまとめて判定し、音声の言語を決める.
+
+    Args:
+    ----
+        audio: 16kHzモノラルの音声
+        detect: 区間のリストから区間ごとの言語の確率を返す関数
+            （推論バックエンドのdetect_language）
+
+    Returns:
+    -------
+        言語コード（判定できなかった場合はNone）
+    """
+    return pick_language(detect(sample_windows(audio)))
+
+
+class LanguageCache:
+    """音声内容のハッシュごとの言語判定の結果.
+
+    プロセス内のLRUで保持し、結果キャッシュを渡した場合はそこにも保存して
+    プロセスをまたいで再利用する。
+    """
+
+    def __init__(self, max_entries: int = _MEMO_SIZE) -> None:
+        """LanguageCacheを初期化する.
+
+        Args:
+        ----
+            max_entries: プロセス内で保持する結果の数
+        """
+        self.max_entries = max_entries
+        self._memo: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(audio_hash: str) -> str:
+        return make_cache_key(audio_hash, "", None, {"mode": "language_id"})
+
+    def get(
+        self, audio_hash: str, result_cache: Optional[ResultCache] = None
+    ) -> Optional[str]:
+        """判定済みの言語を返す（未判定の場合はNone）."""
+        with self._lock:
+            if audio_hash in self._memo:
+                self._memo.move_to_end(audio_hash)
+                return self._memo[audio_hash]
+        if result_cache is None:
+            return None
+        cached = result_cache.get(self._key(audio_hash))
+        if cached is None or not cached.get("language"):
+            return None
+        self._remember(audio_hash, cached["language"])
+        return str(cached["language"])
+
+    def put(
+        self,
+        audio_hash: str,
+        language: str,
+        result_cache: Optional[ResultCache] = None,
+    ) -> None:
+        """判定した言語を保存する."""
+        self._remember(audio_hash, language)
+        if result_cache is not None:
+            result_cache.put(self._key(audio_hash), {"language": language})
+
+    def _remember(self, audio_hash: str, language: str) -> None:
+        with self._lock:
+            self._memo[audio_hash] = language
+            self._memo.move_to_end(audio_hash)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+
+
+_cache = LanguageCache()
+
+
+def get_language_cache() -> LanguageCache:
+    """プロセス共有の言語判定の結果を取得する."""
+    return _cache
@@ -0,0 +1,433 @@
+"""文字起こしの段階ごとの処理時間や待ち時間を集計するメトリクス.
+
+ダウンロード・モデルのロード・音声のデコード・VAD・言語判定・
+エンコード・デコード・保存の各段階の時間、実時間比、スケジューラの待ち時間を
+ヒストグラムで集計し、キャッシュのヒット率やモデルのメモリは取得時に
+各コンポーネントの統計から求める。Prometheusのテキスト形式で
+/metrics から取得でき、構造化ログ（1行1件のJSON）としても出力できる。
+"""
+
+import json
+import logging
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# 記録する段階
+STAGES = (
+    "download",
+    "model_load",
+    "audio_decode",
+    "vad",
+    "language_id",
+    "encode",
+    "decode",
+    "save",
+)
+
+# ヒストグラムのバケット（秒, 実時間比）
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+REAL_TIME_FACTOR_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+
+# /metricsのポート（Gradioのポートの隣）
+DEFAULT_METRICS_PORT = 7863
+
+# 構造化ログの出力先
+LOGGER_NAME = "transcription_tool.metrics"
+logger = logging.getLogger(LOGGER_NAME)
+
+# (メトリクス名, ラベル, 値)
+Sample = tuple[str, dict[str, str], float]
+
+_STAGE_METRIC = "transcription_stage_seconds"
+_RTF_METRIC = "transcription_real_time_factor"
+_QUEUE_WAIT_METRIC = "transcription_queue_wait_seconds"
+
+# メトリクスの種類と説明
+_METRIC_INFO = {
+    _STAGE_METRIC: ("histogram", "段階ごとの処理時間（秒）"),
+    _RTF_METRIC: ("histogram", "処理時間 / 音声の長さ"),
+    _QUEUE_WAIT_METRIC: ("histogram", "ジョブの投入から開始までの待ち時間（秒）"),
+    "transcription_audio_seconds_total": ("counter", "文字起こしした音声の合計（秒）"),
+    "transcription_decode_retries_total": ("counter", "温度を上げた再デコードの回数"),
+    "transcription_decode_retries_skipped_total": (
+        "counter",
+        "予算の上限で打ち切った再デコードの回数",
+    ),
+    "transcription_cache_hits_total": ("counter", "キャッシュのヒット数"),
+    "transcription_cache_misses_total": ("counter", "キャッシュのミス数"),
+    "transcription_cache_hit_ratio": ("gauge", "キャッシュのヒット率"),
+    "transcription_model_memory_mb": ("gauge", "ロード済みモデルの推定メモリ（MB）"),
+    "transcription_models_loaded": ("gauge", "ロード済みモデルの数"),
+}
+
+
+class _Histogram:
+    """1つのラベルの組み合わせのヒストグラム."""
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+
+def _labels_key(labels: dict[str, str]) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+    """Prometheusのラベル表記（{a="1",b="2"}）にする."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsRegistry:
+    """ヒストグラムとカウンターを保持し、Prometheus形式で出力する.
+
+    キャッシュのヒット率のように各コンポーネントが統計を持っている値は、
+    add_collectorで登録した関数から出力時に取得する。
+    """
+
+    def __init__(self) -> None:
+        """MetricsRegistryを初期化する."""
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[tuple[tuple[str, str], ...], _Histogram]] = {}
+        self._counters: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+        self._collectors: list[Callable[[], Iterable[Sample]]] = []
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        buckets: tuple[float, ...] = DURATION_BUCKETS,
+        **labels: str,
+    ) -> None:
+        """ヒストグラムに値を記録する."""
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = _Histogram(buckets)
+            series[key].observe(value)
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        """カウンターを増やす."""
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """出力時に値を取得する関数を登録する."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def histogram(self, name: str, **labels: str) -> tuple[int, float]:
+        """ヒストグラムの (記録数, 合計) を返す（未記録の場合は (0, 0.0)）."""
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(_labels_key(labels))
+            return (histogram.count, histogram.sum) if histogram else (0, 0.0)
+
+    def _collect(self) -> list[Sample]:
+        with self._lock:
+            collectors = list(self._collectors)
+        samples: list[Sample] = []
+        for collector in collectors:
+            samples.extend(collector())
+        return samples
+
+    def render(self) -> str:
+        """Prometheusのテキスト形式で出力する."""
+        lines: list[str] = []
+        written: set[str] = set()
+
+        def header(name: str) -> None:
+            if name not in written and name in _METRIC_INFO:
+                kind, help_text = _METRIC_INFO[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+            written.add(name)
+
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                header(name)
+                for key, histogram in sorted(series.items()):
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        labels = _format_labels([*key, ("le", _format_value(bound))])
+                        lines.append(f"{name}_bucket{labels} {count}")
+                    labels = _format_labels([*key, ("le", "+Inf")])
+                    lines.append(f"{name}_bucket{labels} {histogram.count}")
+                    labels = _format_labels(key)
+                    lines.append(f"{name}_sum{labels} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{labels} {histogram.count}")
+            for name, counters in sorted(self._counters.items()):
+                header(name)
+                for key, value in sorted(counters.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        for name, sample_labels, value in self._collect():
+            header(name)
+            labels_text = _format_labels(sorted(sample_labels.items()))
+            lines.append(f"{name}{labels_text} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _log(event: str, **fields: Any) -> None:
+    """構造化ログを1行のJSONで出力する（ログが無効な場合は何もしない）."""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({"event": event, **fields}, ensure_ascii=False))
+
+
+def configure_json_logging(stream: Any = None) -> logging.Handler:
+    """メトリクスの構造化ログを標準エラー（またはstream）に出力する.
+
+    Args:
+    ----
+        stream: 出力先（Noneの場合は標準エラー）
+
+    Returns:
+    -------
+        追加したハンドラ
+    """
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return handler
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """プロセス共有のメトリクスを取得する."""
+    return _registry
+
+
+@contextmanager
+def stage_timer(stage: str, **labels: str) -> Iterator[None]:
+    """withブロックの処理時間を段階の時間として記録する.
+
+    Args:
+    ----
+        stage: 段階の名前（STAGESのいずれか）
+        **labels: 追加のラベル（modelなど）
+
+    Yields:
+    ------
+        なし（ブロックを抜けると記録する。例外の場合も記録する）
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start_time, **labels)
+
+
+def record_stage(stage: str, seconds: float, **labels: str) -> None:
+    """段階の処理時間を記録する."""
+    _registry.observe(_STAGE_METRIC, seconds, DURATION_BUCKETS, stage=stage, **labels)
+    _log("stage", stage=stage, seconds=round(seconds, 6), **labels)
+
+
+def record_transcription(
+    model: str, audio_seconds: float, wall_seconds: float, mode: str
+) -> None:
+    """1件の文字起こしの実時間比と音声の長さを記録する.
+
+    Args:
+    ----
+        model: モデル名
+        audio_seconds: 音声の長さ（秒）
+        wall_seconds: 処理にかかった時間（秒）
+        mode: 文字起こしの方法（standard, long_form, stream, speculative）
+    """
+    _registry.inc("transcription_audio_seconds_total", audio_seconds, model=model)
+    rtf = wall_seconds / audio_seconds if audio_seconds > 0 else 0.0
+    if audio_seconds > 0:
+        _registry.observe(
+            _RTF_METRIC, rtf, REAL_TIME_FACTOR_BUCKETS, model=model, mode=mode
+        )
+    _log(
+        "transcription",
+        model=model,
+        mode=mode,
+        audio_seconds=round(audio_seconds, 3),
+        wall_seconds=round(wall_seconds, 3),
+        real_time_factor=round(rtf, 4),
+    )
+
+
+def record_decode_retries(
+    model: str, profile: str, retries: int, skipped_retries: int
+) -> None:
+    """1件の文字起こしで温度を上げて再デコードした回数を記録する."""
+    _registry.inc(
+        "transcription_decode_retries_total", retries, model=model, profile=profile
+    )
+    _registry.inc(
+        "transcription_decode_retries_skipped_total",
+        skipped_retries,
+        model=model,
+        profile=profile,
+    )
+    _log(
+        "decode_retries",
+        model=model,
+        profile=profile,
+        retries=retries,
+        skipped_retries=skipped_retries,
+    )
+
+
+def record_queue_wait(lane: str, seconds: float) -> None:
+    """スケジューラでジョブが開始を待った時間を記録する."""
+    _registry.observe(_QUEUE_WAIT_METRIC, seconds, lane=lane)
+    _log("queue_wait", lane=lane, seconds=round(seconds, 6))
+
+
+# スレッドごとのエンコーダの累計時間（推論1回分のエンコード時間を求める）
+_encoder_time = threading.local()
+
+
+def _encoder_seconds() -> float:
+    return float(getattr(_encoder_time, "total", 0.0))
+
+
+def instrument_encoder(model: Any) -> None:
+    """openai-whisperのモデルのエンコーダにforwardの時間を測るフックを付ける.
+
+    エンコーダとデコーダはmodel.transcribeの中で交互に呼ばれるため、
+    エンコーダの時間だけをスレッドごとに積算し、inference_timerで推論全体の
+    時間から差し引いてデコードの時間とする。エンコーダを持たないモデル
+    （faster-whisperなど）には何もしない。
+    """
+    encoder = getattr(model, "encoder", None)
+    if encoder is None or not hasattr(encoder, "register_forward_pre_hook"):
+        return
+
+    def before(module: Any, args: Any) -> None:
+        _encoder_time.start = time.perf_counter()
+
+    def after(module: Any, args: Any, output: Any) -> None:
+        start = getattr(_encoder_time, "start", None)
+        if start is not None:
+            _encoder_time.total = _encoder_seconds() + time.perf_counter() - start
+            _encoder_time.start = None
+
+    encoder.register_forward_pre_hook(before)
+    encoder.register_forward_hook(after)
+
+
+@contextmanager
+def inference_timer(**labels: str) -> Iterator[None]:
+    """推論の時間をエンコードとデコードに分けて記録する.
+
+    エンコーダの時間を測れないモデルでは、推論全体をデコードとして記録する。
+
+    Args:
+    ----
+        **labels: 追加のラベル（modelなど）
+
+    Yields:
+    ------
+        なし（ブロックを抜けると記録する）
+    """
+    encoder_start = _encoder_seconds()
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start_time
+        encode = _encoder_seconds() - encoder_start
+        if encode > 0:
+            record_stage("encode", encode, **labels)
+        record_stage("decode", max(0.0, elapsed - encode), **labels)
+
+
+def _collect_component_stats() -> list[Sample]:
+    """キャッシュやモデルレジストリの統計をメトリクスにする."""
+    from .audio_cache import get_audio_cache
+    from .model_registry import get_model_registry
+    from .result_cache import get_result_cache
+
+    samples: list[Sample] = []
+    registry = get_model_registry()
+    for cache_name, stats in (
+        ("result", get_result_cache().stats()),
+        ("audio", get_audio_cache().stats()),
+        ("model", registry.stats()),
+    ):
+        labels = {"cache": cache_name}
+        samples.append(("transcription_cache_hits_total", labels, stats.hits))
+        samples.append(("transcription_cache_misses_total", labels, stats.misses))
+        samples.append(("transcription_cache_hit_ratio", labels, stats.hit_rate))
+    samples.append(("transcription_model_memory_mb", {}, registry.memory_usage_mb()))
+    samples.append(("transcription_models_loaded", {}, len(registry.loaded_keys())))
+    return samples
+
+
+_registry.add_collector(_collect_component_stats)
+
+
+def start_metrics_server(
+    port: int = DEFAULT_METRICS_PORT, host: str = "127.0.0.1"
+) -> "ThreadingHTTPServer":
+    """/metrics を返すHTTPサーバーをバックグラウンドで起動する.
+
+    Args:
+    ----
+        port: 待ち受けるポート（0の場合は空いているポート）
+        host: 待ち受けるアドレス（既定ではローカルからのみ取得できる）
+
+    Returns:
+    -------
+        起動したサーバー（shutdownで停止する）
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """GET /metrics にPrometheus形式で応答する."""
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = get_metrics().render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            """アクセスログは出力しない."""
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    ).start()
+    return server
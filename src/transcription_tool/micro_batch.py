@@ -0,0 +1,330 @@
+"""複数のジョブの短い音声をまとめて1回のforwardでデコードするマイクロバッチ.
+
+短い音声（30秒以下）を1件ずつmodel.transcribeで処理するとバッチサイズが1に
+なり、CPUのSIMD幅を活かしきれない。BatchDecoderは同じモデルを使うジョブの
+音声を短時間だけ待って集め、メルスペクトログラムを積み重ねてエンコーダと
+デコーダを一度に実行し、結果をジョブごとに分けて返す。
+"""
+
+import threading
+import time
+import zlib
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from .chunking import SAMPLE_RATE
+from .decoding import (
+    COMPRESSION_RATIO_THRESHOLD,
+    LOGPROB_THRESHOLD,
+    NO_SPEECH_THRESHOLD,
+)
+from .model_registry import ModelKey
+
+# 1回のforwardでデコードする音声の最大長（秒, Whisperの入力長）
+BATCH_WINDOW_LENGTH = 30.0
+# 1回のforwardでまとめる音声の最大数
+DEFAULT_MAX_BATCH_SIZE = 8
+# 他のジョブの音声が揃うのを待つ最大時間（秒）
+DEFAULT_MAX_WAIT = 0.05
+
+# Whisperのタイムスタンプトークンの刻み（秒）
+_TIMESTAMP_STEP = 0.02
+
+# (言語, fp16, その他のデコードオプション) が同じ音声だけを同じバッチにまとめる
+_OptionsKey = tuple[Optional[str], bool, tuple[tuple[str, Any], ...]]
+
+
+def _options_key(options: dict[str, Any]) -> _OptionsKey:
+    """同じバッチにまとめられるかを判定するキー.
+
+    個別にデコードし直す音声はリーダーのオプションでmodel.transcribeに
+    渡すため、温度の段階やビーム幅が異なる音声は別のバッチにする。
+    """
+    others = tuple(
+        sorted(
+            (key, value)
+            for key, value in options.items()
+            if key not in ("language", "fp16", "verbose")
+        )
+    )
+    return options.get("language"), bool(options["fp16"]), others
+
+
+def _compression_ratio(text: str) -> float:
+    """テキストの圧縮率（繰り返しが多いほど大きい）."""
+    data = text.encode("utf-8")
+    return len(data) / len(zlib.compress(data)) if data else 0.0
+
+
+def _split_segments(
+    tokens: list[int], tokenizer: Any, duration: float
+) -> list[tuple[float, float, list[int]]]:
+    """タイムスタンプトークンでトークン列をセグメントに分ける.
+
+    Returns
+    -------
+        (開始, 終了, テキストのトークン) のリスト
+    """
+    segments: list[tuple[float, float, list[int]]] = []
+    start: Optional[float] = None
+    text_tokens: list[int] = []
+    for token in tokens:
+        if token < tokenizer.timestamp_begin:
+            text_tokens.append(token)
+            continue
+        seconds = (token - tokenizer.timestamp_begin) * _TIMESTAMP_STEP
+        if start is not None and text_tokens:
+            segments.append((start, seconds, text_tokens))
+            start, text_tokens = None, []
+        else:
+            start = seconds
+    if text_tokens:
+        # 終了のタイムスタンプがない場合は音声の末尾までとする
+        segments.append((start or 0.0, max(start or 0.0, duration), text_tokens))
+    return segments
+
+
+def decode_batch(
+    model: Any, audios: list[np.ndarray], language: Optional[str], fp16: bool
+) -> list[Optional[dict[str, Any]]]:
+    """30秒以下の複数の音声をopenai-whisperのモデルで一度にデコードする.
+
+    Args:
+    ----
+        model: openai-whisperのモデル
+        audios: 16kHzモノラルの音声（それぞれBATCH_WINDOW_LENGTH秒以下）
+        language: 言語（Noneの場合は音声ごとに検出する）
+        fp16: fp16で推論するかどうか
+
+    Returns:
+    -------
+        音声ごとのtext, segments, languageを含む結果。繰り返しや低い確信度で
+        デコードに失敗したとみなした音声はNone（呼び出し側で個別に処理する）
+    """
+    import torch
+    import whisper
+    from whisper.tokenizer import get_tokenizer
+
+    mel = torch.stack(
+        [
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(audio.astype(np.float32)), model.dims.n_mels
+            )
+            for audio in audios
+        ]
+    ).to(model.device)
+    options = whisper.DecodingOptions(language=language, fp16=fp16)
+    decoded = whisper.decode(model, mel, options)
+
+    results: list[Optional[dict[str, Any]]] = []
+    for audio, item in zip(audios, decoded):
+        if item.no_speech_prob > NO_SPEECH_THRESHOLD and (
+            item.avg_logprob < LOGPROB_THRESHOLD
+        ):
+            # 発話がないと判断した場合はmodel.transcribeと同様に結果を空にする
+            results.append({"text": "", "segments": [], "language": item.language})
+            continue
+        if (
+            # 失敗とみなした結果は個別にデコードし直す
+            _compression_ratio(item.text) > COMPRESSION_RATIO_THRESHOLD
+            or item.avg_logprob < LOGPROB_THRESHOLD
+        ):
+            results.append(None)
+            continue
+
+        tokenizer = get_tokenizer(
+            model.is_multilingual,
+            num_languages=model.num_languages,
+            language=item.language,
+            task="transcribe",
+        )
+        pieces = _split_segments(item.tokens, tokenizer, len(audio) / SAMPLE_RATE)
+        segments = []
+        for i, (start, end, tokens) in enumerate(pieces):
+            segments.append(
+                {
+                    "id": i,
+                    "seek": 0,
+                    "start": start,
+                    "end": end,
+                    "text": tokenizer.decode(tokens),
+                    "tokens": tokens,
+                    "temperature": 0.0,
+                    "avg_logprob": item.avg_logprob,
+                    "compression_ratio": item.compression_ratio,
+                    "no_speech_prob": item.no_speech_prob,
+                }
+            )
+        results.append(
+            {
+                "text": "".join(segment["text"] for segment in segments),
+                "segments": segments,
+                "language": item.language,
+            }
+        )
+    return results
+
+
+@dataclass
+class _Request:
+    """バッチへの追加を待っている1件の音声."""
+
+    audio: np.ndarray
+    options_key: _OptionsKey
+    result: Optional[dict[str, Any]] = None
+    error: Optional[BaseException] = None
+    done: bool = False
+
+
+@dataclass
+class BatchStats:
+    """BatchDecoderの統計."""
+
+    batches: int = 0
+    items: int = 0
+    fallbacks: int = 0
+
+    @property
+    def average_batch_size(self) -> float:
+        """1回のforwardでまとめた音声の平均数."""
+        return self.items / self.batches if self.batches else 0.0
+
+
+class BatchDecoder:
+    """同じモデルを使うジョブの短い音声を集めてまとめてデコードする.
+
+    最初に音声を投入したスレッドがリーダーとなり、max_wait秒だけ他の
+    ジョブの音声を待ってからバッチを実行する。実行中に届いた音声は次の
+    バッチにまとめられるため、リクエストが集中するほどバッチが大きくなる。
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        decode: Callable[..., list[Optional[dict[str, Any]]]] = decode_batch,
+    ) -> None:
+        """BatchDecoderを初期化する.
+
+        Args:
+        ----
+            max_batch_size: 1回のforwardでまとめる音声の最大数
+            max_wait: 他のジョブの音声が揃うのを待つ最大時間（秒）
+            decode: (model, audios, language, fp16) から結果のリストを返す関数
+        """
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._decode = decode
+        self._changed = threading.Condition()
+        self._pending: list[_Request] = []
+        self._running = False
+        self._stats = BatchStats()
+
+    def stats(self) -> BatchStats:
+        """統計のスナップショットを返す."""
+        with self._changed:
+            return BatchStats(**vars(self._stats))
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        lease: Callable[[], AbstractContextManager[Any]],
+        options: dict[str, Any],
+    ) -> dict[str, Any]:
+        """音声をバッチに加えてデコードし、その音声の結果を返す.
+
+        Args:
+        ----
+            audio: BATCH_WINDOW_LENGTH秒以下の16kHzモノラルの音声
+            lease: 推論に使うモデルを借りるコンテキストマネージャを返す関数
+            options: model.transcribeに渡すデコードオプション
+
+        Returns:
+        -------
+            text, segments, languageを含む結果
+        """
+        request = _Request(audio, _options_key(options))
+        batch: list[_Request] = []
+        with self._changed:
+            self._pending.append(request)
+            self._changed.notify_all()
+            while self._running and not request.done:
+                self._changed.wait()
+            if not request.done:
+                # 実行中のバッチがなければこのスレッドがリーダーになる
+                self._running = True
+                batch = self._collect(request)
+
+        if batch:
+            self._run(batch, lease, options)
+
+        if request.error is not None:
+            raise request.error
+        assert request.result is not None
+        return request.result
+
+    def _collect(self, leader: _Request) -> list[_Request]:
+        """リーダーと同じオプションの音声を待って集める（ロック取得済み前提）."""
+        deadline = time.perf_counter() + self.max_wait
+        while True:
+            batch = [leader] + [
+                r
+                for r in self._pending
+                if r is not leader and r.options_key == leader.options_key
+            ][: self.max_batch_size - 1]
+            remaining = deadline - time.perf_counter()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            self._changed.wait(remaining)
+        for r in batch:
+            self._pending.remove(r)
+        return batch
+
+    def _run(
+        self,
+        batch: list[_Request],
+        lease: Callable[[], AbstractContextManager[Any]],
+        options: dict[str, Any],
+    ) -> None:
+        """バッチをデコードして各リクエストに結果を設定する."""
+        language, fp16, _ = batch[0].options_key
+        fallbacks = 0
+        try:
+            with lease() as model:
+                results = self._decode(model, [r.audio for r in batch], language, fp16)
+                for r, result in zip(batch, results):
+                    if result is None:
+                        # 温度を上げての再試行が必要なものはmodel.transcribeに任せる
+                        fallbacks += 1
+                        result = model.transcribe(r.audio, **options)
+                    r.result = result
+        except BaseException as e:
+            for r in batch:
+                if r.result is None:
+                    r.error = e
+        finally:
+            with self._changed:
+                for r in batch:
+                    r.done = True
+                self._stats.batches += 1
+                self._stats.items += len(batch)
+                self._stats.fallbacks += fallbacks
+                self._running = False
+                self._changed.notify_all()
+
+
+_decoders: dict[ModelKey, BatchDecoder] = {}
+_decoders_lock = threading.Lock()
+
+
+def get_batch_decoder(key: ModelKey) -> BatchDecoder:
+    """モデルごとにプロセスで共有するBatchDecoderを取得する."""
+    with _decoders_lock:
+        decoder = _decoders.get(key)
+        if decoder is None:
+            decoder = BatchDecoder()
+            _decoders[key] = decoder
+        return decoder
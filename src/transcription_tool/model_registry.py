@@ -0,0 +1,368 @@
+"""ロード済みWhisperモデルを保持するプロセス内レジストリ."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from .model_utils import MODEL_SIZES
+
+# (モデル名, デバイス, dtype, 推論バックエンド)
+ModelKey = tuple[str, str, str, str]
+
+# レジストリ全体で保持するモデルのメモリ上限（MB）
+DEFAULT_MEMORY_BUDGET_MB = 8192.0
+
+
+@dataclass
+class RegistryStats:
+    """モデルレジストリの利用統計."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    loads: int = 0
+    total_load_time: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """キャッシュヒット率（0.0〜1.0）."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def average_load_time(self) -> float:
+        """1回あたりの平均ロード時間（秒）."""
+        return self.total_load_time / self.loads if self.loads else 0.0
+
+
+@dataclass
+class _Entry:
+    model: Any
+    size_mb: float
+    leased: bool = False
+
+
+# (モデルのキー, インスタンス番号)
+_InstanceKey = tuple[ModelKey, int]
+
+
+def _quantized_weight_bytes(model: Any) -> int:
+    """動的量子化した線形層の重み（parametersに含まれない）のバイト数."""
+    try:
+        total = 0
+        for module in model.modules():
+            packed = getattr(module, "_packed_params", None)
+            if packed is None or not hasattr(packed, "_weight_bias"):
+                continue
+            for tensor in packed._weight_bias():
+                if tensor is not None:
+                    total += tensor.numel() * tensor.element_size()
+        return total
+    except Exception:
+        return 0
+
+
+def estimate_model_size_mb(model: Any, model_name: str) -> float:
+    """ロード済みモデルのメモリ使用量（MB）を見積もる.
+
+    Args:
+    ----
+        model: ロード済みモデル
+        model_name: モデル名（パラメータを数えられない場合の推定に使用）
+
+    Returns:
+    -------
+        推定メモリ使用量（MB）
+    """
+    try:
+        total_bytes = sum(
+            t.numel() * t.element_size()
+            for t in list(model.parameters()) + list(model.buffers())
+        )
+        total_bytes += _quantized_weight_bytes(model)
+        if total_bytes > 0:
+            return float(total_bytes) / (1024 * 1024)
+    except Exception:
+        pass
+    # ダウンロードサイズはfp16相当のため、fp32でロードした場合はおよそ2倍になる
+    return float(MODEL_SIZES.get(model_name, 0) * 2)
+
+
+class ModelRegistry:
+    """ロード済みモデルをキー単位で共有するスレッドセーフなレジストリ.
+
+    メモリ上限を超える場合は、最も長く使われていないモデルから解放する。
+    Whisperのモデルは同時に複数のデコードを実行できないため、並行して
+    推論する場合はleaseでインスタンスを排他的に借りる。同じキーで複数の
+    インスタンスを借りる場合は、max_instancesまで追加でロードする。
+    """
+
+    def __init__(self, memory_budget_mb: Optional[float] = None) -> None:
+        """ModelRegistryを初期化する.
+
+        Args:
+        ----
+            memory_budget_mb: 保持するモデルの合計メモリ上限（MB）
+        """
+        self.memory_budget_mb = (
+            DEFAULT_MEMORY_BUDGET_MB if memory_budget_mb is None else memory_budget_mb
+        )
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._entries: OrderedDict[_InstanceKey, _Entry] = OrderedDict()
+        self._loading: dict[ModelKey, int] = {}
+        self._next_instance = 0
+        self._stats = RegistryStats()
+
+    def _instances(self, key: ModelKey) -> list[_InstanceKey]:
+        """キーに対応するインスタンスの一覧（古い順, ロック取得済み前提）."""
+        return [instance for instance in self._entries if instance[0] == key]
+
+    def _load(self, key: ModelKey, loader: Callable[[], Any], leased: bool) -> _Entry:
+        """モデルをロードして登録する（ロック未取得で呼び出す）.
+
+        呼び出し前に_loading[key]を増やしておくこと。
+        """
+        try:
+            start_time = time.perf_counter()
+            model = loader()
+            load_time = time.perf_counter() - start_time
+            size_mb = estimate_model_size_mb(model, key[0])
+        except BaseException:
+            with self._changed:
+                self._loading[key] -= 1
+                self._changed.notify_all()
+            raise
+
+        with self._changed:
+            self._loading[key] -= 1
+            self._evict_for(size_mb)
+            entry = _Entry(model=model, size_mb=size_mb, leased=leased)
+            self._entries[(key, self._next_instance)] = entry
+            self._next_instance += 1
+            self._stats.loads += 1
+            self._stats.total_load_time += load_time
+            self._changed.notify_all()
+        return entry
+
+    def get(self, key: ModelKey, loader: Callable[[], Any]) -> Any:
+        """モデルを取得する。未ロードの場合はloaderでロードして登録する.
+
+        同じキーを複数スレッドが同時に要求した場合でもロードは1回だけ行う。
+        返したインスタンスは排他的ではないため、並行して推論する場合は
+        leaseを使用すること。
+
+        Args:
+        ----
+            key: (モデル名, デバイス, dtype, 推論バックエンド)
+            loader: モデルをロードして返す関数
+
+        Returns:
+        -------
+            ロード済みモデル
+        """
+        with self._changed:
+            while True:
+                instances = self._instances(key)
+                if instances:
+                    self._entries.move_to_end(instances[0])
+                    self._stats.hits += 1
+                    return self._entries[instances[0]].model
+                if not self._loading.get(key):
+                    break
+                # 別スレッドがロード中なので完了を待つ
+                self._changed.wait()
+            self._loading[key] = 1
+            self._stats.misses += 1
+
+        return self._load(key, loader, leased=False).model
+
+    @contextmanager
+    def lease(
+        self, key: ModelKey, loader: Callable[[], Any], max_instances: int = 1
+    ) -> Iterator[Any]:
+        """モデルのインスタンスを排他的に借りる.
+
+        空いているインスタンスがなければmax_instancesまで追加でロードし、
+        上限に達している場合はいずれかが返却されるまで待つ。
+
+        Args:
+        ----
+            key: (モデル名, デバイス, dtype, 推論バックエンド)
+            loader: モデルをロードして返す関数
+            max_instances: このキーで同時に保持するインスタンスの上限
+
+        Yields:
+        ------
+            借りたモデル（withブロックを抜けると返却される）
+        """
+        entry: Optional[_Entry] = None
+        with self._changed:
+            while True:
+                instances = self._instances(key)
+                idle = [i for i in instances if not self._entries[i].leased]
+                if idle:
+                    entry = self._entries[idle[0]]
+                    entry.leased = True
+                    self._entries.move_to_end(idle[0])
+                    self._stats.hits += 1
+                    break
+                if len(instances) + self._loading.get(key, 0) < max(1, max_instances):
+                    self._loading[key] = self._loading.get(key, 0) + 1
+                    self._stats.misses += 1
+                    break
+                self._changed.wait()
+
+        if entry is None:
+            entry = self._load(key, loader, leased=True)
+
+        try:
+            yield entry.model
+        finally:
+            with self._changed:
+                entry.leased = False
+                self._changed.notify_all()
+
+    def get_if_loaded(self, key: ModelKey) -> Optional[Any]:
+        """ロード済みの場合のみモデルを返す（未ロードならNone）.
+
+        Args:
+        ----
+            key: (モデル名, デバイス, dtype, 推論バックエンド)
+
+        Returns:
+        -------
+            ロード済みモデル、またはNone
+        """
+        with self._lock:
+            instances = self._instances(key)
+            if not instances:
+                return None
+            self._entries.move_to_end(instances[0])
+            self._stats.hits += 1
+            return self._entries[instances[0]].model
+
+    def _evict_for(self, size_mb: float) -> None:
+        """size_mbを追加できるようにLRU順でモデルを解放する（ロック取得済み前提）.
+
+        貸し出し中のインスタンスは解放しない。
+        """
+        budget = self.memory_budget_mb
+        for instance in list(self._entries):
+            if self.memory_usage_mb() + size_mb <= budget:
+                break
+            if not self._entries[instance].leased:
+                del self._entries[instance]
+                self._stats.evictions += 1
+
+    def set_memory_budget(self, memory_budget_mb: float) -> None:
+        """メモリ上限を変更し、超過分のモデルを解放する.
+
+        Args:
+        ----
+            memory_budget_mb: 保持するモデルの合計メモリ上限（MB）
+        """
+        with self._lock:
+            self.memory_budget_mb = memory_budget_mb
+            self._evict_for(0.0)
+
+    def contains(self, key: ModelKey) -> bool:
+        """指定キーのモデルがロード済みかどうか."""
+        with self._lock:
+            return bool(self._instances(key))
+
+    def instance_count(self, key: ModelKey) -> int:
+        """指定キーでロード済みのインスタンス数."""
+        with self._lock:
+            return len(self._instances(key))
+
+    def is_loaded(
+        self,
+        model_name: str,
+        dtype: Optional[str] = None,
+        backend: Optional[str] = None,
+    ) -> bool:
+        """デバイスを問わず、モデル名がロード済みかどうか.
+
+        Args:
+        ----
+            model_name: モデル名
+            dtype: 指定した場合はそのdtypeでロード済みの場合のみTrue
+            backend: 指定した場合はその推論バックエンドでロード済みの場合のみTrue
+        """
+        with self._lock:
+            return any(
+                key[0] == model_name
+                and dtype in (None, key[2])
+                and backend in (None, key[3])
+                for key, _ in self._entries
+            )
+
+    def loaded_keys(self) -> list[ModelKey]:
+        """ロード済みモデルのキー一覧（古い順, 重複なし）."""
+        with self._lock:
+            return list(dict.fromkeys(key for key, _ in self._entries))
+
+    def memory_usage_mb(self) -> float:
+        """ロード済みモデルの推定合計メモリ（MB）."""
+        return sum(entry.size_mb for entry in self._entries.values())
+
+    def stats(self) -> RegistryStats:
+        """統計情報のスナップショットを返す."""
+        with self._lock:
+            return RegistryStats(**vars(self._stats))
+
+    def evict(self, key: ModelKey) -> bool:
+        """指定キーのモデルを解放する（貸し出し中のインスタンスを除く）.
+
+        Returns
+        -------
+            解放した場合True
+        """
+        with self._lock:
+            idle = [i for i in self._instances(key) if not self._entries[i].leased]
+            for instance in idle:
+                del self._entries[instance]
+            self._stats.evictions += len(idle)
+            return bool(idle)
+
+    def clear(self) -> None:
+        """貸し出し中のインスタンスを除くすべてのモデルを解放する."""
+        with self._lock:
+            for instance, entry in list(self._entries.items()):
+                if not entry.leased:
+                    del self._entries[instance]
+                    self._stats.evictions += 1
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """プロセス共有のモデルレジストリを取得する."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+def configure_model_registry(memory_budget_mb: float) -> ModelRegistry:
+    """プロセス共有レジストリのメモリ上限を設定する.
+
+    Args:
+    ----
+        memory_budget_mb: 保持するモデルの合計メモリ上限（MB）
+
+    Returns:
+    -------
+        設定後のレジストリ
+    """
+    registry = get_model_registry()
+    registry.set_memory_budget(memory_budget_mb)
+    return registry
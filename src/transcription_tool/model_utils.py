@@ -1,8 +1,13 @@
 """Whisperモデル管理のユーティリティ."""
 
-import urllib.request
+import functools
+import hashlib
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Any, Callable, Optional
 
 # Whisperモデルの情報
 MODEL_URLS = {
@@ -25,6 +30,29 @@ MODEL_SIZES = {
     "large-v3": 1550,
 }
 
+# 推論バックエンドの名前
+WHISPER_BACKEND = "whisper"
+FASTER_WHISPER_BACKEND = "faster-whisper"
+
+# faster-whisper用にCTranslate2形式へ変換済みのモデル（Hugging Face Hubのリポジトリ）
+CTRANSLATE2_MODEL_REPOS = {
+    "tiny": "Systran/faster-whisper-tiny",
+    "base": "Systran/faster-whisper-base",
+    "small": "Systran/faster-whisper-small",
+    "medium": "Systran/faster-whisper-medium",
+    "large": "Systran/faster-whisper-large-v2",
+    "large-v2": "Systran/faster-whisper-large-v2",
+    "large-v3": "Systran/faster-whisper-large-v3",
+}
+
+# int8量子化モデルを表す選択肢の接尾辞（例: large-v3:int8）
+QUANTIZED_SUFFIX = ":int8"
+
+# ダウンロードの設定
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_MAX_RETRIES = 5
+DOWNLOAD_TIMEOUT = 30.0
+
 
 def get_model_path(model_name: str) -> Path:
     """Whisperモデルの保存パスを取得.
@@ -50,30 +78,425 @@ def get_model_path(model_name: str) -> Path:
     return cache_dir / filename
 
 
-def is_model_downloaded(model_name: str) -> bool:
+def get_ctranslate2_model_dir(model_name: str) -> Path:
+    """faster-whisper用（CTranslate2形式）のモデルの保存ディレクトリを取得.
+
+    Args:
+    ----
+        model_name: モデル名
+
+    Returns:
+    -------
+        モデルディレクトリのパス（model.binなどを含む）
+    """
+    if model_name not in CTRANSLATE2_MODEL_REPOS:
+        raise ValueError(f"faster-whisperで使用できないモデルです: {model_name}")
+    repo_name = CTRANSLATE2_MODEL_REPOS[model_name].split("/")[-1]
+    return Path.home() / ".cache" / "transcription_tool" / "ctranslate2" / repo_name
+
+
+def get_quantized_model_path(model_name: str) -> Path:
+    """int8量子化したモデルの保存パスを取得.
+
+    元のモデルファイルと同じディレクトリに保存する。
+
+    Args:
+    ----
+        model_name: モデル名
+
+    Returns:
+    -------
+        量子化済みモデルファイルのパス
+    """
+    model_path = get_model_path(model_name)
+    return model_path.with_name(f"{model_path.stem}.int8.pt")
+
+
+def split_model_choice(choice: str) -> tuple[str, str]:
+    """モデルの選択肢を(モデル名, dtype)に分ける.
+
+    Args:
+    ----
+        choice: モデル名、またはQUANTIZED_SUFFIXを付けたモデル名
+
+    Returns:
+    -------
+        (モデル名, dtype)
+    """
+    if choice.endswith(QUANTIZED_SUFFIX):
+        return choice[: -len(QUANTIZED_SUFFIX)], "int8"
+    return choice, "float32"
+
+
+def is_model_downloaded(model_name: str, backend: str = WHISPER_BACKEND) -> bool:
     """モデルがダウンロード済みかチェック.
 
     Args:
     ----
         model_name: モデル名
+        backend: モデルを使用する推論バックエンド（形式と保存先が異なる）
 
     Returns:
     -------
         ダウンロード済みの場合True
     """
+    if backend == FASTER_WHISPER_BACKEND:
+        return (get_ctranslate2_model_dir(model_name) / "model.bin").exists()
     model_path = get_model_path(model_name)
     return model_path.exists()
 
 
+def expected_sha256(model_name: str) -> str:
+    """モデルのURLに含まれるSHA-256チェックサムを取得.
+
+    Args:
+    ----
+        model_name: モデル名
+
+    Returns:
+    -------
+        16進数のチェックサム
+    """
+    return MODEL_URLS[model_name].split("/")[-2]
+
+
+def _partial_path(dest: Path, index: Optional[int] = None) -> Path:
+    """ダウンロード途中のデータを保存するパス."""
+    suffix = ".part" if index is None else f".part{index}"
+    return dest.with_name(dest.name + suffix)
+
+
+def _parse_total_size(response: Any) -> Optional[int]:
+    """レスポンスヘッダからファイル全体のサイズを取得する."""
+    content_range = response.headers.get("Content-Range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get("Content-Length")
+    if response.status == 200 and length and length.isdigit():
+        return int(length)
+    return None
+
+
+def _open_range(url: str, start: int, end: Optional[int], timeout: float) -> Any:
+    """Rangeヘッダ付きでURLを開く.
+
+    範囲外（416）の場合はNoneを返す。
+    """
+    # 通信関連のモジュール（ssl等）はダウンロード時だけ読み込む
+    import urllib.error
+    import urllib.request
+
+    byte_range = f"bytes={start}-" if end is None else f"bytes={start}-{end}"
+    request = urllib.request.Request(url, headers={"Range": byte_range})
+    try:
+        return urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 416:
+            return None
+        raise
+
+
+class _RangeNotSupportedError(RuntimeError):
+    """サーバーがRangeリクエストを無視して全体を返した."""
+
+
+def _probe_download(url: str, timeout: float) -> tuple[Optional[int], bool]:
+    """ファイルサイズとRangeリクエストへの対応を確認する.
+
+    Returns
+    -------
+        (ファイルサイズ, 部分取得（206）に対応しているか)
+    """
+    response = _open_range(url, 0, 0, timeout)
+    if response is None:
+        return 0, True
+    with response:
+        # Range非対応のサーバーは全体を返すため、本文は読まずに閉じる
+        return _parse_total_size(response), response.status == 206
+
+
+def probe_download_size(url: str, timeout: float = DOWNLOAD_TIMEOUT) -> Optional[int]:
+    """ダウンロードするファイルのサイズを取得する.
+
+    Args:
+    ----
+        url: ダウンロード元のURL
+        timeout: 接続のタイムアウト（秒）
+
+    Returns:
+    -------
+        ファイルサイズ（バイト）。サーバーが返さない場合はNone
+    """
+    return _probe_download(url, timeout)[0]
+
+
+class _Progress:
+    """複数の接続からのダウンロード量を集計して通知する."""
+
+    def __init__(
+        self,
+        total: Optional[int],
+        callback: Optional[Callable[[float, str], None]],
+        interval: float = 0.2,
+    ) -> None:
+        self.total = total
+        self.downloaded = 0
+        self._callback = callback
+        self._interval = interval
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, size: int, force: bool = False) -> None:
+        with self._lock:
+            self.downloaded += size
+            now = time.monotonic()
+            if not self._callback or not self.total:
+                return
+            if not force and now - self._last_report < self._interval:
+                return
+            self._last_report = now
+            ratio = min(self.downloaded / self.total, 1.0)
+            downloaded_mb = self.downloaded / (1024 * 1024)
+            total_mb = self.total / (1024 * 1024)
+            self._callback(
+                ratio,
+                f"ダウンロード中: {downloaded_mb:.1f}MB / {total_mb:.1f}MB "
+                f"({ratio * 100:.1f}%)",
+            )
+
+
+def _read_blocks(f: Any) -> Iterator[bytes]:
+    """ファイルやレスポンスをDOWNLOAD_CHUNK_SIZEずつ読み込む."""
+    return iter(functools.partial(f.read, DOWNLOAD_CHUNK_SIZE), b"")
+
+
+def _file_size(path: Path) -> int:
+    """ファイルサイズ（存在しない場合は0）."""
+    return path.stat().st_size if path.exists() else 0
+
+
+def _fetch_once(
+    url: str,
+    part_path: Path,
+    start: int,
+    end: Optional[int],
+    progress: _Progress,
+    digest: Optional[Any],
+    timeout: float,
+) -> tuple[bool, Optional[Any]]:
+    """1回の接続で取得できるところまでpart_pathに追記する.
+
+    Returns
+    -------
+        (範囲の最後まで取得できたか, 更新したハッシュ)
+    """
+    offset = _file_size(part_path)
+    if end is not None and start + offset > end:
+        return True, digest
+    response = _open_range(url, start + offset, end, timeout)
+    if response is None:
+        # 取得済みのデータでファイルの末尾に達している
+        return True, digest
+
+    with response, open(part_path, "ab") as f:
+        if response.status == 200:
+            # Range非対応のサーバーは全体を先頭から返す。範囲の途中や一部だけを
+            # 取得する場合はそのまま書き込むと重複するため、呼び出し元に任せる
+            size = _parse_total_size(response)
+            if start > 0 or (end is not None and size not in (None, end + 1)):
+                raise _RangeNotSupportedError(
+                    "サーバーがRangeリクエストに対応していません"
+                )
+            # ファイル全体を取得する場合は最初からやり直す
+            f.truncate(0)
+            progress.add(-offset)
+            digest = None if digest is None else hashlib.sha256()
+        for block in _read_blocks(response):
+            f.write(block)
+            if digest is not None:
+                digest.update(block)
+            progress.add(len(block))
+
+    finished = end is None or start + _file_size(part_path) > end
+    return finished, digest
+
+
+def _fetch_range(
+    url: str,
+    part_path: Path,
+    start: int,
+    end: Optional[int],
+    progress: _Progress,
+    digest: Optional[Any] = None,
+    max_retries: int = DOWNLOAD_MAX_RETRIES,
+    timeout: float = DOWNLOAD_TIMEOUT,
+) -> Optional[Any]:
+    """指定範囲をpart_pathに追記する。接続が切れた場合は続きから再開する.
+
+    endがNoneの場合はファイルの最後まで取得する。digestを渡した場合は
+    既存の途中データと受信したデータで逐次ハッシュを更新する。
+
+    Returns
+    -------
+        更新したハッシュ（サーバーが先頭から返し直した場合は新しいハッシュ）
+    """
+    import http.client
+    import urllib.error
+
+    if digest is not None and part_path.exists():
+        with open(part_path, "rb") as f:
+            for block in _read_blocks(f):
+                digest.update(block)
+    progress.add(_file_size(part_path), force=True)
+
+    retries = 0
+    while True:
+        try:
+            finished, digest = _fetch_once(
+                url, part_path, start, end, progress, digest, timeout
+            )
+            if finished:
+                return digest
+            raise ConnectionError("レスポンスが途中で終了しました")
+        except (OSError, http.client.HTTPException) as e:
+            if isinstance(e, urllib.error.HTTPError) and e.code < 500:
+                raise
+            retries += 1
+            if retries > max_retries:
+                raise
+            time.sleep(min(0.1 * 2**retries, 5.0))
+
+
+def _download_ranges(
+    url: str,
+    dest: Path,
+    total: int,
+    connections: int,
+    progress: _Progress,
+    max_retries: int,
+    timeout: float,
+) -> Any:
+    """範囲を分割して並列に取得し、結合したファイルのハッシュを返す."""
+    part_size = -(-total // connections)
+    ranges = [
+        (i, start, min(start + part_size, total) - 1)
+        for i, start in enumerate(range(0, total, part_size))
+    ]
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [
+            executor.submit(
+                _fetch_range,
+                url,
+                _partial_path(dest, i),
+                start,
+                end,
+                progress,
+                None,
+                max_retries,
+                timeout,
+            )
+            for i, start, end in ranges
+        ]
+        for future in futures:
+            future.result()
+
+    # 範囲ごとのファイルを結合しながらチェックサムを計算する
+    digest = hashlib.sha256()
+    with open(_partial_path(dest), "wb") as out:
+        for i, _, _ in ranges:
+            with open(_partial_path(dest, i), "rb") as f:
+                for block in _read_blocks(f):
+                    out.write(block)
+                    digest.update(block)
+    for i, _, _ in ranges:
+        _partial_path(dest, i).unlink()
+    return digest
+
+
+def download_file(
+    url: str,
+    dest: Path,
+    expected_sha256: Optional[str] = None,
+    progress_callback: Optional[Callable[[float, str], None]] = None,
+    connections: int = 1,
+    max_retries: int = DOWNLOAD_MAX_RETRIES,
+    timeout: float = DOWNLOAD_TIMEOUT,
+) -> Path:
+    """HTTP Rangeリクエストで再開可能なダウンロードを行う.
+
+    途中までのデータは dest に ".part" を付けたファイルに残り、次回は
+    続きから取得する。connectionsが2以上でサーバーがサイズを返し、
+    Rangeリクエストに対応している場合は範囲を分割して並列に取得する。チェックサムは受信しながら計算し
+    （並列時は結合しながら計算し）、一致しない場合は途中データを削除する。
+
+    Args:
+    ----
+        url: ダウンロード元のURL
+        dest: 保存先のパス
+        expected_sha256: 期待するSHA-256チェックサム（Noneの場合は検証しない）
+        progress_callback: 進捗コールバック (progress_ratio, message)
+        connections: 並列に取得する範囲の数
+        max_retries: 接続が切れた場合に再開する回数
+        timeout: 接続のタイムアウト（秒）
+
+    Returns:
+    -------
+        保存したファイルのパス
+
+    Raises:
+    ------
+        ValueError: チェックサムが一致しない場合
+    """
+    total, ranged = _probe_download(url, timeout)
+    progress = _Progress(total, progress_callback)
+    part_path = _partial_path(dest)
+    digest: Any = None
+
+    if connections > 1 and total and ranged:
+        try:
+            digest = _download_ranges(
+                url, dest, total, connections, progress, max_retries, timeout
+            )
+        except _RangeNotSupportedError:
+            # 確認時は206を返しても実際の取得でRangeを無視するサーバーがある
+            for path in dest.parent.glob(f"{dest.name}.part*"):
+                path.unlink()
+            progress.add(-progress.downloaded)
+    if digest is None:
+        # サイズが分かる場合は末尾まで届いたかを確認するため範囲を明示する
+        end = total - 1 if total else None
+        digest = _fetch_range(
+            url, part_path, 0, end, progress, hashlib.sha256(), max_retries, timeout
+        )
+
+    progress.add(0, force=True)
+    if expected_sha256 is not None and digest.hexdigest() != expected_sha256:
+        part_path.unlink()
+        raise ValueError(
+            f"チェックサムが一致しません: {dest.name} "
+            f"(期待値: {expected_sha256}, 実際: {digest.hexdigest()})"
+        )
+    part_path.replace(dest)
+    return dest
+
+
 def download_model_with_progress(
-    model_name: str, progress_callback: Optional[Callable[[float, str], None]] = None
+    model_name: str,
+    progress_callback: Optional[Callable[[float, str], None]] = None,
+    connections: int = 1,
 ) -> None:
     """進捗表示付きでモデルをダウンロード.
 
+    中断した場合は次回続きから再開し、完了時にURLに含まれる
+    SHA-256チェックサムで検証する。
+
     Args:
     ----
         model_name: モデル名
         progress_callback: 進捗コールバック (progress_ratio, message)
+        connections: 並列に取得する範囲の数
     """
     if model_name not in MODEL_URLS:
         raise ValueError(f"不明なモデル名: {model_name}")
@@ -86,7 +509,6 @@ def download_model_with_progress(
             progress_callback(1.0, f"{model_name}モデルは既にダウンロード済みです")
         return
 
-    url = MODEL_URLS[model_name]
     model_size_mb = MODEL_SIZES[model_name]
 
     # ダウンロード開始
@@ -95,38 +517,46 @@ def download_model_with_progress(
             0.0, f"{model_name}モデル ({model_size_mb}MB) のダウンロードを開始..."
         )
 
-    def download_hook(block_num: int, block_size: int, total_size: int) -> None:
-        """ダウンロード進捗フック."""
-        downloaded = block_num * block_size
-        progress_ratio = min(downloaded / total_size, 1.0)
-        downloaded_mb = downloaded / (1024 * 1024)
-        total_mb = total_size / (1024 * 1024)
+    download_file(
+        MODEL_URLS[model_name],
+        model_path,
+        expected_sha256=expected_sha256(model_name),
+        progress_callback=progress_callback,
+        connections=connections,
+    )
 
-        if progress_callback:
-            progress_callback(
-                progress_ratio,
-                f"ダウンロード中: {downloaded_mb:.1f}MB / {total_mb:.1f}MB "
-                f"({progress_ratio*100:.1f}%)",
-            )
+    if progress_callback:
+        progress_callback(1.0, f"{model_name}モデルのダウンロードが完了しました")
 
-    # 一時ファイルにダウンロード
-    temp_path = model_path.with_suffix(".tmp")
+
+def _download_ctranslate2_model(
+    model_name: str,
+    progress_callback: Optional[Callable[[float, str], None]] = None,
+) -> None:
+    """faster-whisper用のモデルをHugging Face Hubからダウンロード."""
     try:
-        urllib.request.urlretrieve(url, str(temp_path), reporthook=download_hook)
-        # ダウンロード完了後にリネーム
-        temp_path.rename(model_path)
+        from faster_whisper import download_model
+    except ImportError as e:
+        raise ImportError(
+            "faster-whisperがインストールされていません（pip install faster-whisper）"
+        ) from e
 
-        if progress_callback:
-            progress_callback(1.0, f"{model_name}モデルのダウンロードが完了しました")
-    except Exception as e:
-        # エラー時は一時ファイルを削除
-        if temp_path.exists():
-            temp_path.unlink()
-        raise e
+    if progress_callback:
+        progress_callback(
+            0.0, f"{model_name}モデル（CTranslate2形式）をダウンロード中..."
+        )
+    model_dir = get_ctranslate2_model_dir(model_name)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    download_model(CTRANSLATE2_MODEL_REPOS[model_name], output_dir=str(model_dir))
+    if progress_callback:
+        progress_callback(1.0, f"{model_name}モデルのダウンロードが完了しました")
 
 
 def ensure_model_downloaded(
-    model_name: str, progress_callback: Optional[Callable[[float, str], None]] = None
+    model_name: str,
+    progress_callback: Optional[Callable[[float, str], None]] = None,
+    connections: int = 1,
+    backend: str = WHISPER_BACKEND,
 ) -> bool:
     """モデルがダウンロード済みであることを確認し、必要ならダウンロード.
 
@@ -134,15 +564,20 @@ def ensure_model_downloaded(
     ----
         model_name: モデル名
         progress_callback: 進捗コールバック
+        connections: 並列に取得する範囲の数
+        backend: モデルを使用する推論バックエンド（形式と保存先が異なる）
 
     Returns:
     -------
         新規ダウンロードした場合True、既存の場合False
     """
-    if is_model_downloaded(model_name):
+    if is_model_downloaded(model_name, backend):
         if progress_callback:
             progress_callback(1.0, f"{model_name}モデルは既にダウンロード済みです")
         return False
 
-    download_model_with_progress(model_name, progress_callback)
+    if backend == FASTER_WHISPER_BACKEND:
+        _download_ctranslate2_model(model_name, progress_callback)
+    else:
+        download_model_with_progress(model_name, progress_callback, connections)
     return True
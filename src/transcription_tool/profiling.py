@@ -0,0 +1,223 @@
+"""1件の文字起こしジョブのプロファイルとウィンドウごとのデコードログ.
+
+極端に遅いファイル（非常に長い音声や、ハルシネーションでデコードが
+繰り返される音声）を後から調べられるよう、cProfileの結果と、
+model.decodeの呼び出しごとの温度・圧縮率・トークン数を文字起こし結果の
+隣に保存する。必要な場合はtorch.profilerのトレースも保存する。
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from .decoding import fallback_reasons, patch_decode
+
+# 保存するファイルの拡張子（元のファイル名の後ろに付ける）
+PROFILE_SUFFIX = ".profile.prof"
+SUMMARY_SUFFIX = ".profile.txt"
+DECODE_LOG_SUFFIX = ".decode_log.jsonl"
+TORCH_TRACE_SUFFIX = ".trace.json"
+
+# サマリーに表示する関数の数
+SUMMARY_TOP_FUNCTIONS = 30
+
+
+@dataclass
+class DecodeAttempt:
+    """model.decodeの1回の呼び出し（1ウィンドウの1つの温度での試行）."""
+
+    window: int
+    attempt: int
+    temperature: float
+    tokens: int
+    compression_ratio: float
+    avg_logprob: float
+    no_speech_prob: float
+    seconds: float
+    # 次の温度で再デコードされた理由（compression_ratio, avg_logprob）
+    fallback_reasons: list[str] = field(default_factory=list)
+
+
+class JobProfiler:
+    """1件の文字起こしのプロファイルを取り、文字起こし結果の隣に保存する.
+
+    profileのブロックでcProfile（とtorch.profiler）を有効にし、watchで
+    借りたモデルのdecodeを包んでウィンドウごとの試行を記録する。
+    """
+
+    def __init__(self, directory: Path, stem: str, torch_trace: bool = False) -> None:
+        """JobProfilerを初期化する.
+
+        Args:
+        ----
+            directory: 保存先（文字起こし結果と同じディレクトリ）
+            stem: 保存するファイル名（拡張子なし）
+            torch_trace: torch.profilerのトレースも保存するかどうか
+        """
+        self.directory = directory
+        self.stem = stem
+        self.torch_trace = torch_trace
+        self.attempts: list[DecodeAttempt] = []
+        self.wall_seconds = 0.0
+        self._window = -1
+        self._last_temperature: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def path(self, suffix: str) -> Path:
+        """保存するファイルのパス."""
+        return self.directory / f"{self.stem}{suffix}"
+
+    @contextmanager
+    def profile(self) -> Iterator[None]:
+        """ブロック内の処理のプロファイルを取り、抜けるときに保存する.
+
+        ブロック内で例外が発生した場合も、そこまでの結果を保存する。
+        """
+        profiler = cProfile.Profile()
+        torch_profiler = self._start_torch_profiler() if self.torch_trace else None
+        start_time = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self.wall_seconds = time.perf_counter() - start_time
+            if torch_profiler is not None:
+                torch_profiler.__exit__(None, None, None)
+            self.save(profiler, torch_profiler)
+
+    def _start_torch_profiler(self) -> Any:
+        import torch
+        from torch.profiler import ProfilerActivity
+
+        activities = [ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(ProfilerActivity.CUDA)
+        torch_profiler = torch.profiler.profile(activities=activities)
+        torch_profiler.__enter__()
+        return torch_profiler
+
+    @contextmanager
+    def watch(self, model: Any) -> Iterator[None]:
+        """ブロック内でのモデルのdecodeの呼び出しを記録する.
+
+        openai-whisperのtranscribeはウィンドウごとにmodel.decodeを呼び、
+        失敗とみなした結果は温度を上げて呼び直す。温度が下がった（最初の
+        温度に戻った）呼び出しを新しいウィンドウとして数える。decodeを
+        持たないモデル（faster-whisperなど）では何もしない。
+
+        Args:
+        ----
+            model: 借りているモデル（ブロック内は他のスレッドと共有しない）
+
+        Yields:
+        ------
+            なし（ブロックを抜けると元のdecodeに戻す）
+        """
+        original = getattr(model, "decode", None)
+        if original is None:
+            yield
+            return
+
+        def decode(segment: Any, options: Any = None, **kwargs: Any) -> Any:
+            start_time = time.perf_counter()
+            result = original(segment, options, **kwargs)
+            self._record(options, result, time.perf_counter() - start_time)
+            return result
+
+        with patch_decode(model, decode):
+            yield
+
+    def _record(self, options: Any, result: Any, seconds: float) -> None:
+        """decodeの結果（バッチの場合はリスト）を試行として記録する."""
+        temperature = float(getattr(options, "temperature", 0.0))
+        with self._lock:
+            if self._last_temperature is None or temperature <= self._last_temperature:
+                self._window += 1
+                attempt = 0
+            else:
+                attempt = self.attempts[-1].attempt + 1 if self.attempts else 0
+            self._last_temperature = temperature
+            for item in result if isinstance(result, list) else [result]:
+                compression_ratio = float(getattr(item, "compression_ratio", 0.0))
+                avg_logprob = float(getattr(item, "avg_logprob", 0.0))
+                no_speech_prob = float(getattr(item, "no_speech_prob", 0.0))
+                self.attempts.append(
+                    DecodeAttempt(
+                        window=self._window,
+                        attempt=attempt,
+                        temperature=temperature,
+                        tokens=len(getattr(item, "tokens", []) or []),
+                        compression_ratio=compression_ratio,
+                        avg_logprob=avg_logprob,
+                        no_speech_prob=no_speech_prob,
+                        seconds=seconds,
+                        fallback_reasons=fallback_reasons(
+                            compression_ratio, avg_logprob, no_speech_prob
+                        ),
+                    )
+                )
+
+    def save(
+        self, profiler: Optional[cProfile.Profile] = None, torch_profiler: Any = None
+    ) -> dict[str, Path]:
+        """プロファイルとデコードログを保存する.
+
+        Returns
+        -------
+            種類（profile, summary, decode_log, torch_trace）ごとの保存先
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        paths = {"decode_log": self.path(DECODE_LOG_SUFFIX)}
+        with paths["decode_log"].open("w", encoding="utf-8") as f:
+            for attempt in self.attempts:
+                f.write(json.dumps(asdict(attempt), ensure_ascii=False) + "\n")
+
+        summary = self._format_summary()
+        if profiler is not None:
+            paths["profile"] = self.path(PROFILE_SUFFIX)
+            profiler.dump_stats(str(paths["profile"]))
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            stats.sort_stats("cumulative").print_stats(SUMMARY_TOP_FUNCTIONS)
+            summary += "\n" + stream.getvalue()
+        paths["summary"] = self.path(SUMMARY_SUFFIX)
+        paths["summary"].write_text(summary, encoding="utf-8")
+
+        if torch_profiler is not None:
+            paths["torch_trace"] = self.path(TORCH_TRACE_SUFFIX)
+            torch_profiler.export_chrome_trace(str(paths["torch_trace"]))
+        return paths
+
+    def _format_summary(self) -> str:
+        """ウィンドウ数・再デコード回数・遅いウィンドウの一覧."""
+        windows: dict[int, list[DecodeAttempt]] = {}
+        for attempt in self.attempts:
+            windows.setdefault(attempt.window, []).append(attempt)
+        retries = sum(len(attempts) - 1 for attempts in windows.values())
+        lines = [
+            f"処理時間: {self.wall_seconds:.2f}秒",
+            f"ウィンドウ数: {len(windows)} / decodeの呼び出し: {len(self.attempts)}"
+            f" / 温度を上げた再デコード: {retries}",
+        ]
+        slowest = sorted(
+            windows.items(),
+            key=lambda item: sum(attempt.seconds for attempt in item[1]),
+            reverse=True,
+        )[:5]
+        for window, attempts in slowest:
+            seconds = sum(attempt.seconds for attempt in attempts)
+            temperatures = ", ".join(f"{a.temperature:.1f}" for a in attempts)
+            lines.append(
+                f"  ウィンドウ{window}: {seconds:.2f}秒 温度[{temperatures}]"
+                f" トークン{attempts[-1].tokens}"
+            )
+        return "\n".join(lines) + "\n"
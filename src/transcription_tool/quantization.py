@@ -0,0 +1,81 @@
+"""CPU推論向けにWhisperモデルの線形層をint8で動的量子化する機能."""
+
+import uuid
+import warnings
+from typing import Any, Callable, Optional
+
+from .model_utils import get_quantized_model_path
+
+
+def quantize_model(model: Any) -> Any:
+    """モデルの線形層をint8の動的量子化に置き換える.
+
+    重みはint8で保持し、活性は推論時に量子化するため、fp32と比べて
+    線形層のメモリが約1/4になり、CPUでの推論も速くなる。
+
+    Args:
+    ----
+        model: fp32でロードしたCPU上のWhisperモデル
+
+    Returns:
+    -------
+        量子化したモデル（元のモデルは変更される）
+    """
+    import torch
+    from whisper.model import Linear
+
+    # Whisperの線形層はnn.Linearのサブクラス（forwardで重みのdtypeを合わせるだけ）で、
+    # 量子化の対応表に含まれないため、通常のnn.Linearとして扱わせる
+    for module in model.modules():
+        if isinstance(module, Linear):
+            module.__class__ = torch.nn.Linear
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+
+def load_quantized_model(
+    model_name: str, progress_callback: Optional[Callable[[str], None]] = None
+) -> Any:
+    """int8量子化したモデルをロードする.
+
+    量子化済みのモデルが保存されていればそれを読み込み、なければ
+    fp32のモデルを量子化して保存する（量子化は初回のみ）。
+
+    Args:
+    ----
+        model_name: モデル名（ダウンロード済みであること）
+        progress_callback: 進捗を通知するコールバック関数
+
+    Returns:
+    -------
+        量子化したCPU上のモデル
+    """
+    import torch
+    import whisper
+
+    path = get_quantized_model_path(model_name)
+    if path.exists():
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                # 自身で保存したファイルのみを読み込む（モジュールごと保存している）
+                return torch.load(path, map_location="cpu", weights_only=False)
+        except Exception:
+            # PyTorchの更新などで読み込めない場合は量子化し直す
+            path.unlink(missing_ok=True)
+
+    if progress_callback:
+        progress_callback(f"{model_name}モデルをint8に量子化中（初回のみ）...")
+    model = quantize_model(whisper.load_model(model_name, device="cpu"))
+
+    temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        torch.save(model, temp_path)
+        temp_path.replace(path)
+    except OSError:
+        # 保存できなくても量子化したモデルはそのまま使う
+        temp_path.unlink(missing_ok=True)
+    return model
@@ -0,0 +1,182 @@
+"""音声内容のハッシュをキーにした文字起こし結果のキャッシュ."""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+# キャッシュの保存先と容量上限
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "transcription_tool" / "results"
+DEFAULT_MAX_SIZE_MB = 512.0
+
+
+@dataclass
+class CacheStats:
+    """結果キャッシュの利用統計."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """キャッシュヒット率（0.0〜1.0）."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def make_cache_key(
+    audio_hash: str,
+    model_name: str,
+    language: Optional[str],
+    options: Optional[dict[str, Any]] = None,
+) -> str:
+    """キャッシュキーを生成する.
+
+    Args:
+    ----
+        audio_hash: 音声ファイル内容のハッシュ
+        model_name: モデル名
+        language: 指定した言語（自動検出の場合はNone）
+        options: 結果に影響するデコードオプション
+
+    Returns:
+    -------
+        キャッシュキー（16進数文字列）
+    """
+    payload = json.dumps(
+        {
+            "audio": audio_hash,
+            "model": model_name,
+            "language": language,
+            "options": options or {},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """文字起こし結果をJSONファイルとして保存する永続キャッシュ.
+
+    合計サイズが上限を超えた場合は、最終アクセス（mtime）が古いものから削除する。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_size_mb: float = DEFAULT_MAX_SIZE_MB,
+    ) -> None:
+        """ResultCacheを初期化する.
+
+        Args:
+        ----
+            cache_dir: キャッシュの保存先（Noneの場合は~/.cache/transcription_tool）
+            max_size_mb: キャッシュの合計サイズ上限（MB）
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_mb = max_size_mb
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """キャッシュから結果を取得する.
+
+        Args:
+        ----
+            key: make_cache_keyで生成したキー
+
+        Returns:
+        -------
+            キャッシュされた結果、またはNone
+        """
+        path = self._path(key)
+        with self._lock:
+            try:
+                result: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+                # 最終アクセス時刻を更新してLRUの順序に反映する
+                os.utime(path)
+            except (OSError, json.JSONDecodeError):
+                self._stats.misses += 1
+                return None
+            self._stats.hits += 1
+            return result
+
+    def put(self, key: str, result: dict[str, Any]) -> None:
+        """結果をキャッシュに保存する.
+
+        Args:
+        ----
+            key: make_cache_keyで生成したキー
+            result: 文字起こし結果
+        """
+        path = self._path(key)
+        temp_path = path.with_suffix(".tmp")
+        with self._lock:
+            content = json.dumps(result, ensure_ascii=False, default=_to_json)
+            temp_path.write_text(content, encoding="utf-8")
+            temp_path.replace(path)
+            self._evict()
+
+    def _evict(self) -> None:
+        """容量上限を超えた分を古い順に削除する（ロック取得済み前提）."""
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        max_bytes = self.max_size_mb * 1024 * 1024
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total_size <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+            self._stats.evictions += 1
+
+    def size_mb(self) -> float:
+        """キャッシュの合計サイズ（MB）."""
+        total = sum(path.stat().st_size for path in self.cache_dir.glob("*.json"))
+        return total / (1024 * 1024)
+
+    def stats(self) -> CacheStats:
+        """統計情報のスナップショットを返す."""
+        with self._lock:
+            return CacheStats(**vars(self._stats))
+
+    def clear(self) -> None:
+        """すべてのキャッシュを削除する."""
+        with self._lock:
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+
+def _to_json(value: Any) -> Any:
+    """numpyのスカラーなどJSONに変換できない値を変換する."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"JSONに変換できない値です: {type(value).__name__}")
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """プロセス共有の結果キャッシュを取得する."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
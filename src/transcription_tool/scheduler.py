@@ -0,0 +1,444 @@
+"""モデルごとのレーンで文字起こしジョブを実行するスケジューラ."""
+
+import itertools
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .metrics import record_queue_wait
+from .model_registry import ModelRegistry, get_model_registry
+from .model_utils import MODEL_SIZES, WHISPER_BACKEND, split_model_choice
+
+# ジョブの状態
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# 実績がないモデルの実時間比（処理時間 / 音声の長さ）の初期値（CPU想定）
+DEFAULT_REAL_TIME_FACTORS = {
+    "tiny": 0.1,
+    "base": 0.2,
+    "small": 0.5,
+    "medium": 1.2,
+    "large": 2.5,
+    "large-v2": 2.5,
+    "large-v3": 2.5,
+}
+
+# 状態を確認できるよう保持しておく終了済みのジョブの数
+DEFAULT_MAX_FINISHED_JOBS = 100
+
+# 空きメモリを確認する際に他の処理のために残しておく量（MB）
+DEFAULT_MEMORY_RESERVE_MB = 1024.0
+
+# int8の動的量子化では線形層の重みが1/4になり、埋め込みや畳み込みは
+# fp32のまま残るため、fp32でロードした場合の約0.4倍と見積もる
+INT8_MEMORY_RATIO = 0.4
+
+
+# 短い音声をまとめてデコードするレーンの接尾辞
+BATCH_LANE_SUFFIX = "+batch"
+
+
+@dataclass(frozen=True)
+class LaneModel:
+    """レーンで使うモデル（必要なメモリと処理時間の推定に使う）."""
+
+    model_name: str
+    dtype: str = "float32"
+    backend: str = WHISPER_BACKEND
+    micro_batch: bool = False
+
+
+def lane_name(
+    model_choice: str, backend: str = WHISPER_BACKEND, micro_batch: bool = False
+) -> str:
+    """スケジューラのレーン名（既定のバックエンドはモデルの選択肢のまま）.
+
+    短い音声をまとめてデコードするジョブは別のレーンで、同時実行数を
+    バッチサイズまで広げて実行する。同時に届いた音声がBatchDecoderで
+    1回のforwardにまとめられる。
+    """
+    name = model_choice if backend == WHISPER_BACKEND else f"{backend}/{model_choice}"
+    return f"{name}{BATCH_LANE_SUFFIX}" if micro_batch else name
+
+
+def estimate_memory_mb(model_name: str, dtype: str = "float32") -> float:
+    """モデルを1インスタンスロードするのに必要なメモリ（MB）の推定."""
+    # ダウンロードサイズはfp16相当のため、fp32でロードした場合はおよそ2倍になる
+    size_mb = float(MODEL_SIZES.get(model_name, 0) * 2)
+    return size_mb * INT8_MEMORY_RATIO if dtype == "int8" else size_mb
+
+
+def parse_lane_name(lane: str) -> LaneModel:
+    """lane_nameで作ったレーン名から、レーンで使うモデルを取り出す."""
+    micro_batch = lane.endswith(BATCH_LANE_SUFFIX)
+    if micro_batch:
+        lane = lane[: -len(BATCH_LANE_SUFFIX)]
+    backend, _, model_choice = lane.rpartition("/")
+    model_name, dtype = split_model_choice(model_choice)
+    return LaneModel(model_name, dtype, backend or WHISPER_BACKEND, micro_batch)
+
+
+def available_memory_mb() -> Optional[float]:
+    """システムの利用可能メモリ（MB）. 取得できない環境ではNone."""
+    meminfo = Path("/proc/meminfo")
+    if not meminfo.exists():
+        return None
+    for line in meminfo.read_text().splitlines():
+        if line.startswith("MemAvailable:"):
+            return int(line.split()[1]) / 1024
+    return None
+
+
+@dataclass
+class Job:
+    """スケジューラに投入された1件の文字起こしジョブ."""
+
+    job_id: str
+    model_name: str
+    func: Callable[[], Any] = field(repr=False)
+    audio_seconds: Optional[float] = None
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[BaseException] = None
+    # レーン名から取り出したモデル（model_nameはレーン名）
+    model: LaneModel = field(init=False, repr=False)
+    _finished: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def __post_init__(self) -> None:
+        """レーン名からモデルを取り出す."""
+        self.model = parse_lane_name(self.model_name)
+
+    @property
+    def is_finished(self) -> bool:
+        """完了・失敗・キャンセルのいずれかになったかどうか."""
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def queue_wait(self) -> Optional[float]:
+        """投入から実行開始までの待ち時間（秒）."""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """ジョブの終了を待つ.
+
+        Returns
+        -------
+            タイムアウトまでに終了した場合True
+        """
+        return self._finished.wait(timeout)
+
+
+@dataclass
+class _Lane:
+    model: LaneModel
+    concurrency: int
+    queue: deque[Job] = field(default_factory=deque)
+    running: list[Job] = field(default_factory=list)
+
+
+class JobScheduler:
+    """モデルごとのレーンと同時実行数でジョブを実行するスケジューラ.
+
+    レーンごとに同時実行数を設定でき、新しくジョブを開始する前に
+    システムの空きメモリでモデルを追加ロードできるか確認する（アドミッション
+    制御）。空きが足りない場合は実行中のジョブが終わるまで待たせる。
+    終了したジョブは結果や処理を保持し続けないよう、古い順に破棄する。
+    """
+
+    def __init__(
+        self,
+        default_concurrency: int = 1,
+        lane_concurrency: Optional[dict[str, int]] = None,
+        memory_reserve_mb: float = DEFAULT_MEMORY_RESERVE_MB,
+        memory_probe: Callable[[], Optional[float]] = available_memory_mb,
+        registry: Optional[ModelRegistry] = None,
+        max_finished_jobs: int = DEFAULT_MAX_FINISHED_JOBS,
+    ) -> None:
+        """JobSchedulerを初期化する.
+
+        Args:
+        ----
+            default_concurrency: レーンの同時実行数の既定値
+            lane_concurrency: モデル名ごとの同時実行数
+            memory_reserve_mb: アドミッション制御で残しておく空きメモリ（MB）
+            memory_probe: 利用可能メモリ（MB）を返す関数
+            registry: ロード済みモデルの確認に使うレジストリ
+            max_finished_jobs: get_jobで取得できるよう保持する終了済みのジョブの数
+        """
+        self.default_concurrency = max(1, default_concurrency)
+        self._lane_concurrency = dict(lane_concurrency or {})
+        self.memory_reserve_mb = memory_reserve_mb
+        self._memory_probe = memory_probe
+        self._registry = registry
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._lanes: dict[str, _Lane] = {}
+        self._jobs: dict[str, Job] = {}
+        self.max_finished_jobs = max_finished_jobs
+        self._finished_ids: deque[str] = deque()
+        # レーンごとの実時間比の実績（指数移動平均）
+        self._real_time_factors: dict[str, float] = {}
+        self._sequence = itertools.count(1)
+        self._stopped = False
+        self._dispatcher = threading.Thread(
+            target=self._dispatch_loop, name="job-scheduler", daemon=True
+        )
+        self._dispatcher.start()
+
+    def lane_concurrency(self, model_name: str) -> int:
+        """モデルのレーンの同時実行数."""
+        return max(1, self._lane_concurrency.get(model_name, self.default_concurrency))
+
+    def submit(
+        self,
+        model_name: str,
+        func: Callable[[], Any],
+        audio_seconds: Optional[float] = None,
+        concurrency: Optional[int] = None,
+    ) -> Job:
+        """ジョブを投入する.
+
+        Args:
+        ----
+            model_name: 使用するモデル名（レーンの選択に使用）
+            func: レーンの空きを待って実行する処理
+            audio_seconds: 音声の長さ（秒, 待ち時間の推定に使用）
+            concurrency: レーンを新しく作る場合の同時実行数
+                （Noneの場合はlane_concurrencyの値）
+
+        Returns:
+        -------
+            投入したジョブ
+        """
+        job_id = f"{next(self._sequence):04d}-{uuid.uuid4().hex[:6]}"
+        job = Job(
+            job_id=job_id, model_name=model_name, func=func, audio_seconds=audio_seconds
+        )
+        with self._changed:
+            if self._stopped:
+                raise RuntimeError("スケジューラは停止しています")
+            self._jobs[job_id] = job
+            self._lane(model_name, concurrency).queue.append(job)
+            self._changed.notify_all()
+        return job
+
+    def _lane(self, model_name: str, concurrency: Optional[int] = None) -> _Lane:
+        """モデルのレーンを取得する（ロック取得済み前提）."""
+        lane = self._lanes.get(model_name)
+        if lane is None:
+            lane = _Lane(
+                model=parse_lane_name(model_name),
+                concurrency=concurrency or self.lane_concurrency(model_name),
+            )
+            self._lanes[model_name] = lane
+        return lane
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """ジョブIDからジョブを取得する."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """待機中のジョブをキャンセルする（実行中のジョブは対象外）.
+
+        Returns
+        -------
+            キャンセルできた場合True
+        """
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return False
+            self._lanes[job.model_name].queue.remove(job)
+            self._finish(job, CANCELLED)
+            self._changed.notify_all()
+            return True
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """レーン内の待ち順（1始まり）. 実行中なら0、終了済みならNone."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.is_finished:
+                return None
+            if job.status == RUNNING:
+                return 0
+            return self._lanes[job.model_name].queue.index(job) + 1
+
+    def _expected_duration(self, job: Job) -> float:
+        """ジョブの推定処理時間（秒, ロック取得済み前提）."""
+        rtf = self._real_time_factors.get(job.model_name)
+        if rtf is None:
+            rtf = DEFAULT_REAL_TIME_FACTORS.get(job.model.model_name, 1.0)
+        return rtf * (job.audio_seconds or 0.0)
+
+    def estimate_wait(self, job_id: str) -> Optional[float]:
+        """ジョブの実行開始までの推定待ち時間（秒）. 終了済みならNone."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.is_finished:
+                return None
+            if job.status == RUNNING:
+                return 0.0
+            lane = self._lanes[job.model_name]
+            now = time.time()
+            remaining = [
+                max(0.0, self._expected_duration(j) - (now - (j.started_at or now)))
+                for j in lane.running
+            ]
+            ahead = itertools.takewhile(lambda j: j is not job, lane.queue)
+            total = sum(remaining) + sum(self._expected_duration(j) for j in ahead)
+            return total / lane.concurrency
+
+    def estimate_finish(self, job_id: str) -> Optional[float]:
+        """ジョブの完了までの推定時間（秒）. 終了済みならNone."""
+        wait = self.estimate_wait(job_id)
+        if wait is None:
+            return None
+        with self._lock:
+            job = self._jobs[job_id]
+            elapsed = time.time() - job.started_at if job.started_at else 0.0
+            return wait + max(0.0, self._expected_duration(job) - elapsed)
+
+    def _memory_needed_mb(self, lane: _Lane) -> float:
+        """ジョブを開始するのに追加で必要なメモリ（MB）の推定."""
+        model = lane.model
+        registry = self._registry or get_model_registry()
+        if (
+            registry.is_loaded(model.model_name, model.dtype, model.backend)
+            and not lane.running
+        ):
+            return 0.0
+        if model.micro_batch and lane.running:
+            # まとめてデコードするレーンでは実行中のジョブと同じモデルを共有する
+            return 0.0
+        # 未ロード、または並行実行のためにインスタンスを追加する場合
+        return estimate_memory_mb(model.model_name, model.dtype)
+
+    def _admit(self, lane: _Lane) -> bool:
+        """空きメモリからジョブを開始できるか判定する（ロック取得済み前提）."""
+        if not any(lane.running for lane in self._lanes.values()):
+            # 何も実行していない場合は待っても空かないため開始する
+            return True
+        available = self._memory_probe()
+        if available is None:
+            return True
+        needed = self._memory_needed_mb(lane)
+        return available - self.memory_reserve_mb >= needed
+
+    def _dispatch_loop(self) -> None:
+        """待機中のジョブを開始できるか繰り返し確認する."""
+        with self._changed:
+            while not self._stopped:
+                self._start_ready_jobs()
+                # メモリの空きは外部要因でも変わるため定期的に再確認する
+                self._changed.wait(timeout=1.0)
+
+    def _start_ready_jobs(self) -> None:
+        """レーンに空きがあり、メモリが足りるジョブを開始する（ロック取得済み前提）."""
+        for model_name, lane in self._lanes.items():
+            while (
+                lane.queue
+                and len(lane.running) < lane.concurrency
+                and self._admit(lane)
+            ):
+                job = lane.queue.popleft()
+                job.status = RUNNING
+                job.started_at = time.time()
+                record_queue_wait(model_name, job.started_at - job.submitted_at)
+                lane.running.append(job)
+                threading.Thread(
+                    target=self._run, args=(job,), name=f"job-{job.job_id}", daemon=True
+                ).start()
+
+    def _run(self, job: Job) -> None:
+        """ジョブを実行して結果を記録する."""
+        try:
+            job.result = job.func()
+            status = DONE
+        except BaseException as e:
+            job.error = e
+            status = FAILED
+
+        with self._changed:
+            self._lanes[job.model_name].running.remove(job)
+            self._finish(job, status)
+            if status == DONE and job.audio_seconds and job.started_at:
+                assert job.finished_at is not None
+                # 実時間比を実績で更新する（指数移動平均）
+                rtf = (job.finished_at - job.started_at) / job.audio_seconds
+                previous = self._real_time_factors.get(job.model_name, rtf)
+                self._real_time_factors[job.model_name] = 0.7 * previous + 0.3 * rtf
+            self._changed.notify_all()
+
+    def _finish(self, job: Job, status: str) -> None:
+        """ジョブを終了させ、古い終了済みのジョブを破棄する（ロック取得済み前提）."""
+        job.status = status
+        job.finished_at = time.time()
+        job._finished.set()
+        self._finished_ids.append(job.job_id)
+        while len(self._finished_ids) > self.max_finished_jobs:
+            self._jobs.pop(self._finished_ids.popleft(), None)
+
+    def shutdown(self) -> None:
+        """待機中のジョブをキャンセルしてディスパッチを停止する."""
+        with self._changed:
+            self._stopped = True
+            for lane in self._lanes.values():
+                while lane.queue:
+                    self._finish(lane.queue.popleft(), CANCELLED)
+            self._changed.notify_all()
+
+
+_scheduler: Optional[JobScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> JobScheduler:
+    """プロセス共有のスケジューラを取得する."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler()
+        return _scheduler
+
+
+def configure_scheduler(
+    default_concurrency: int = 1,
+    lane_concurrency: Optional[dict[str, int]] = None,
+    memory_reserve_mb: float = DEFAULT_MEMORY_RESERVE_MB,
+) -> JobScheduler:
+    """プロセス共有のスケジューラを指定の設定で作り直す.
+
+    Args:
+    ----
+        default_concurrency: レーンの同時実行数の既定値
+        lane_concurrency: モデル名ごとの同時実行数
+        memory_reserve_mb: アドミッション制御で残しておく空きメモリ（MB）
+
+    Returns:
+    -------
+        新しいスケジューラ
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.shutdown()
+        _scheduler = JobScheduler(
+            default_concurrency=default_concurrency,
+            lane_concurrency=lane_concurrency,
+            memory_reserve_mb=memory_reserve_mb,
+        )
+        return _scheduler
@@ -0,0 +1,214 @@
+"""文字起こし結果の全文検索（文字bigramによる転置索引）.
+
+日本語は単語の区切りがないため、本文を連続する文字の2-gramに分割して
+SQLiteのFTS5に登録する。検索語も同じ方法で分割し、bigramの並びを
+フレーズとして照合するため、形態素解析器なしで任意の部分文字列を検索できる。
+"""
+
+import re
+import sqlite3
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL,
+    start REAL,
+    end REAL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_filename ON segments (filename);
+CREATE VIRTUAL TABLE IF NOT EXISTS segment_terms USING fts5(terms);
+"""
+
+# 本文の見出し（これより後を検索対象にする）
+_BODY_HEADING = "## 文字起こし内容"
+
+# タイムスタンプ付きの行（[MM:SS - MM:SS] または [HH:MM:SS - HH:MM:SS]）
+_TIMESTAMP_LINE = re.compile(
+    r"^\[(?P<start>[\d:.,]+) - (?P<end>[\d:.,]+)\]\s*(?P<text>.*)$"
+)
+
+
+@dataclass
+class SearchHit:
+    """検索にヒットした1セグメント."""
+
+    filename: str
+    start: Optional[float]
+    end: Optional[float]
+    text: str
+    score: float
+
+
+def _runs(text: str) -> list[str]:
+    """正規化した文字列を、文字・数字の連続部分に分割する."""
+    normalized = unicodedata.normalize("NFKC", text).lower()
+    runs, current = [], []
+    for char in normalized:
+        if char.isalnum():
+            current.append(char)
+        elif current:
+            runs.append("".join(current))
+            current = []
+    if current:
+        runs.append("".join(current))
+    return runs
+
+
+def to_terms(text: str) -> str:
+    """本文を索引用の語（空白区切りの文字bigram）に変換する.
+
+    各連続部分の最後の1文字も単独の語として加え、1文字の検索語が
+    前方一致でどの位置にもヒットするようにする。
+
+    Args:
+    ----
+        text: 本文
+
+    Returns:
+    -------
+        空白区切りの語の並び
+    """
+    terms: list[str] = []
+    for run in _runs(text):
+        terms.extend(run[i : i + 2] for i in range(len(run) - 1))
+        terms.append(run[-1])
+    return " ".join(terms)
+
+
+def to_match_query(query: str) -> Optional[str]:
+    """検索語をFTS5のMATCH式に変換する.
+
+    空白などで区切られた各部分はAND条件になる。
+
+    Args:
+    ----
+        query: 検索語
+
+    Returns:
+    -------
+        MATCH式（検索できる文字がない場合はNone）
+    """
+    phrases = []
+    for run in _runs(query):
+        if len(run) == 1:
+            phrases.append(f'"{run}"*')
+        else:
+            bigrams = " ".join(run[i : i + 2] for i in range(len(run) - 1))
+            phrases.append(f'"{bigrams}"')
+    return " AND ".join(phrases) or None
+
+
+def _parse_seconds(value: str) -> Optional[float]:
+    """MM:SS / HH:MM:SS（小数部付きも可）を秒数に変換する."""
+    try:
+        seconds = 0.0
+        for part in value.replace(",", ".").split(":"):
+            seconds = seconds * 60 + float(part)
+    except ValueError:
+        return None
+    return seconds
+
+
+def parse_transcript(
+    content: str,
+) -> list[tuple[Optional[float], Optional[float], str]]:
+    """保存したMarkdownから本文のセグメントを取り出す.
+
+    Args:
+    ----
+        content: Markdownファイルの内容
+
+    Returns:
+    -------
+        (開始秒, 終了秒, テキスト)のリスト（タイムスタンプがない行は秒数がNone）
+    """
+    _, found, body = content.partition(_BODY_HEADING)
+    if not found:
+        body = content
+    segments = []
+    for line in body.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = _TIMESTAMP_LINE.match(line)
+        if match:
+            segments.append(
+                (
+                    _parse_seconds(match["start"]),
+                    _parse_seconds(match["end"]),
+                    match["text"],
+                )
+            )
+        else:
+            segments.append((None, None, line))
+    return segments
+
+
+def remove_documents(conn: sqlite3.Connection, filenames: list[str]) -> None:
+    """ファイルのセグメントを索引から削除する."""
+    for filename in filenames:
+        conn.execute(
+            "DELETE FROM segment_terms WHERE rowid IN "
+            "(SELECT id FROM segments WHERE filename = ?)",
+            (filename,),
+        )
+        conn.execute("DELETE FROM segments WHERE filename = ?", (filename,))
+
+
+def index_document(conn: sqlite3.Connection, path: Path) -> None:
+    """ファイルの本文を索引に登録する（登録済みの場合は置き換える）.
+
+    Args:
+    ----
+        conn: 索引のデータベース接続
+        path: Markdownファイルのパス
+    """
+    remove_documents(conn, [path.name])
+    try:
+        content = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return
+    for start, end, text in parse_transcript(content):
+        cursor = conn.execute(
+            "INSERT INTO segments (filename, start, end, text) VALUES (?, ?, ?, ?)",
+            (path.name, start, end, text),
+        )
+        conn.execute(
+            "INSERT INTO segment_terms (rowid, terms) VALUES (?, ?)",
+            (cursor.lastrowid, to_terms(text)),
+        )
+
+
+def search(conn: sqlite3.Connection, query: str, limit: int = 20) -> list[SearchHit]:
+    """検索語を含むセグメントを関連度の高い順に取得する.
+
+    Args:
+    ----
+        conn: 索引のデータベース接続
+        query: 検索語（空白区切りでAND検索）
+        limit: 最大件数
+
+    Returns:
+    -------
+        ヒットしたセグメントのリスト
+    """
+    match = to_match_query(query)
+    if match is None:
+        return []
+    rows = conn.execute(
+        "SELECT s.filename, s.start, s.end, s.text, bm25(segment_terms) AS score "
+        "FROM segment_terms JOIN segments AS s ON s.id = segment_terms.rowid "
+        "WHERE segment_terms MATCH ? "
+        "ORDER BY score, s.filename DESC, s.start LIMIT ?",
+        (match, limit),
+    ).fetchall()
+    # bm25は小さいほど関連度が高いため、符号を反転してスコアにする
+    return [
+        SearchHit(filename, start, end, text, -score)
+        for filename, start, end, text, score in rows
+    ]
@@ -1,83 +1,1334 @@
 """文字起こし処理を行うモジュール."""
 
+import functools
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import weakref
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager, nullcontext
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Callable, Optional, Union
 
-import whisper
+import numpy as np
 
-from .model_utils import ensure_model_downloaded
+from .audio_cache import AudioCache
+from .audio_input import (
+    AudioInput,
+    compute_audio_hash,
+    load_audio_file,
+    load_audio_input,
+)
+from .backends import get_backend
+from .chunking import (
+    SAMPLE_RATE,
+    AudioChunk,
+    find_silence_points,
+    merge_chunk_results,
+    plan_chunks,
+)
+from .decoding import DEFAULT_DECODING_PROFILE, DecodeBudget, get_decoding_profile
+from .language_id import (
+    LANGUAGE_ID_WINDOW_LENGTH,
+    DetectFn,
+    detect_language,
+    get_language_cache,
+)
+from .metrics import (
+    inference_timer,
+    instrument_encoder,
+    record_decode_retries,
+    record_transcription,
+    stage_timer,
+)
+from .micro_batch import BATCH_WINDOW_LENGTH, get_batch_decoder
+from .model_registry import ModelKey, ModelRegistry, get_model_registry
+from .model_utils import MODEL_SIZES, WHISPER_BACKEND, ensure_model_downloaded
+from .profiling import JobProfiler
+from .result_cache import ResultCache, make_cache_key
+from .utils import compute_file_hash
+from .vad import SpeechMap
+
+# 対応している音声フォーマット
+SUPPORTED_FORMATS = {".wav", ".mp3", ".mp4", ".m4a", ".flac", ".ogg", ".opus"}
+
+SUPPORTED_DTYPES = {"float32", "float16", "int8"}
+
+# ストリーミング時に1回でデコードする音声の最大長（秒, Whisperの入力長）
+STREAM_WINDOW_LENGTH = 30.0
+# 次のウィンドウに引き継ぐ直前テキストの文字数
+STREAM_PROMPT_CHARS = 200
+
+# 先に下書きを表示するために使えるモデル
+DRAFT_MODELS = ("tiny", "base")
+# 下書きを再デコードするかを決める平均対数確率の既定値
+DEFAULT_REFINE_THRESHOLD = -0.5
+
+# ウォームアップで推論する合成音声の長さ（秒）
+WARMUP_AUDIO_LENGTH = 2.0
+
+# 検証済みの音声ファイルのパス、またはデコード済みの16kHzのPCM配列
+_AudioSource = Union[Path, np.ndarray]
+
+
+@dataclass
+class SpeculativeUpdate:
+    """transcribe_speculativeが返す、1ウィンドウの下書きまたは確定した結果.
+
+    同じwindowの結果が後から届いた場合は、前の結果を置き換えて表示する。
+    """
+
+    window: int
+    windows: int
+    segments: list[dict[str, Any]]
+    # このモデルで再デコードした結果かどうか
+    refined: bool
+    # これ以上置き換えられないかどうか（再デコードしない下書きも含む）
+    final: bool
+    # 下書きが済んだ音声位置
+    position: float
+    duration: float
+    language: Optional[str]
+    # VAD使用時の音声全体に対する発話区間の割合
+    speech_ratio: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        """音声全体に対する下書き済みの割合（0.0〜1.0）."""
+        return min(self.position / self.duration, 1.0) if self.duration else 1.0
+
+
+@dataclass
+class StreamUpdate:
+    """transcribe_streamが1ウィンドウごとに返す結果."""
+
+    segments: list[dict[str, Any]]
+    position: float
+    duration: float
+    language: Optional[str]
+    # VAD使用時の音声全体に対する発話区間の割合
+    speech_ratio: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        """音声全体に対する処理済みの割合（0.0〜1.0）."""
+        return min(self.position / self.duration, 1.0) if self.duration else 1.0
 
 
 class Transcriber:
     """音声ファイルから文字起こしを行うクラス."""
 
-    def __init__(self, model_name: str = "large-v3") -> None:
+    def __init__(
+        self,
+        model_name: str = "large-v3",
+        device: Optional[str] = None,
+        dtype: str = "float32",
+        registry: Optional[ModelRegistry] = None,
+        result_cache: Optional[ResultCache] = None,
+        max_instances: int = 1,
+        audio_cache: Optional[AudioCache] = None,
+        backend: str = WHISPER_BACKEND,
+        vad: bool = False,
+        micro_batch: bool = False,
+        language: Optional[str] = None,
+        decoding: str = DEFAULT_DECODING_PROFILE,
+    ) -> None:
         """Transcriberを初期化する.
 
         Args:
         ----
             model_name: 使用するWhisperモデルの名前（デフォルト: large-v3）
+            device: 推論デバイス（Noneの場合はCUDAが使えればcuda、なければcpu）
+            dtype: モデルの重みの精度（float32, float16, またはCPU向けに
+                線形層を動的量子化するint8）
+            registry: ロード済みモデルを共有するレジストリ
+                （Noneの場合はプロセス共有のレジストリ）
+            result_cache: 文字起こし結果のキャッシュ（Noneの場合は使用しない）
+            max_instances: 同じモデルを並行して推論する場合に保持する
+                インスタンス数の上限
+            audio_cache: デコード済み音声のキャッシュ（Noneの場合は毎回デコード）
+            backend: 推論バックエンドの名前（whisperまたはfaster-whisper）
+            vad: Trueの場合、デコード前に無音区間を取り除き、
+                タイムスタンプを元の音声の時刻に戻す
+            micro_batch: Trueの場合、30秒以下の音声は同じモデルを使う他の
+                ジョブの音声とまとめて1回のforwardでデコードする
+                （openai-whisperバックエンドのみ）
+            language: 音声の言語（Noneの場合は音声ごとに判定し、
+                判定結果を音声内容のハッシュごとに再利用する）
+            decoding: デコードのプロファイル（fast, balanced, accurate,
+                または再デコードの回数と時間に上限を設けるadaptive）
+
+        Raises:
+        ------
+            ValueError: 対応していないdtypeやプロファイルの場合
         """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"対応していないdtype: {dtype}")
+        self.decoding = get_decoding_profile(decoding)
+        self.backend = get_backend(backend)
         self.model_name = model_name
+        self.device = device
+        self.dtype = dtype
+        self._registry = registry
+        self.result_cache = result_cache
+        self.max_instances = max_instances
+        self.audio_cache = audio_cache
+        self.vad = vad
+        self.micro_batch = micro_batch
+        self.language = language
         self._model: Optional[Any] = None  # 遅延ロード用
+        # 同じファイルのハッシュを何度も計算しないよう (パス, mtime, サイズ) で保持
+        self._hash_memo: dict[tuple[Path, int, int], str] = {}
+        # メモリ上の音声は直前に計算した配列のハッシュだけを保持する
+        self._array_hash: Optional[tuple[weakref.ref, str]] = None
+        # プロファイル中のジョブ（借りたモデルのdecodeを記録する）
+        self._profiler: Optional[JobProfiler] = None
+        # 実行中のジョブの再デコードの予算（借りたモデルのdecodeに適用する）
+        self._budget: Optional[DecodeBudget] = None
+
+    def _resolve_device(self) -> str:
+        """推論デバイスを決定する."""
+        if self.device is None:
+            import torch
+
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        return self.device
+
+    def _model_key(self) -> ModelKey:
+        """レジストリのキー（モデル名, デバイス, dtype, バックエンド）を返す."""
+        device = self._resolve_device()
+        self.backend.check(device, self.dtype)
+        return (self.model_name, device, self.dtype, self.backend.name)
+
+    def _model_loader(
+        self, progress_callback: Optional[Callable[[str], None]]
+    ) -> Callable[[], Any]:
+        """モデルのダウンロードとロードを行う関数を返す."""
+
+        def loader() -> Any:
+            # まずモデルのダウンロードを確認
+            def download_progress(ratio: float, message: str) -> None:
+                if progress_callback:
+                    progress_callback(message)
+
+            with stage_timer("download"):
+                ensure_model_downloaded(
+                    self.model_name, download_progress, backend=self.backend.name
+                )
+
+            # モデルをロード
+            if progress_callback:
+                progress_callback(f"{self.model_name}モデルをメモリにロード中...")
+            with stage_timer("model_load"):
+                model = self.backend.load_model(
+                    self.model_name,
+                    self._resolve_device(),
+                    self.dtype,
+                    progress_callback,
+                )
+            instrument_encoder(model)
+            if progress_callback:
+                progress_callback("モデルのロード完了！")
+            return model
+
+        return loader
+
+    def _load_model(
+        self, progress_callback: Optional[Callable[[str], None]] = None
+    ) -> Any:
+        """レジストリ経由でモデルを取得する（未ロードの場合のみロードする）.
+
+        返したモデルは他のスレッドと共有されるため、推論には_lease_modelを使う。
+        """
+        registry = self._registry or get_model_registry()
+        key = self._model_key()
+
+        model = registry.get_if_loaded(key)
+        if model is not None:
+            if progress_callback:
+                progress_callback("モデルのロード完了！（ロード済みモデルを再利用）")
+            return model
+
+        return registry.get(key, self._model_loader(progress_callback))
+
+    @contextmanager
+    def _lease_model(
+        self,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        watch: bool = True,
+    ) -> Iterator[Any]:
+        """推論中に他のスレッドと共有しないモデルのインスタンスを借りる.
+
+        watchがTrueの場合、実行中のジョブのプロファイルと再デコードの予算を
+        借りたモデルのdecodeに適用する。
+        """
+        registry = self._registry or get_model_registry()
+        key = self._model_key()
+        loaded = False
+        load = self._model_loader(progress_callback)
+
+        def loader() -> Any:
+            nonlocal loaded
+            loaded = True
+            return load()
+
+        with registry.lease(key, loader, self.max_instances) as model:
+            if not loaded and progress_callback:
+                progress_callback("モデルのロード完了！（ロード済みモデルを再利用）")
+            self._model = model
+            with ExitStack() as stack:
+                if watch and self._profiler is not None:
+                    stack.enter_context(self._profiler.watch(model))
+                if watch and self._budget is not None:
+                    # 打ち切った再デコードがプロファイルに残らないよう外側で包む
+                    stack.enter_context(self._budget.watch(model))
+                yield model
+
+    def warm_up(
+        self,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        duration: float = WARMUP_AUDIO_LENGTH,
+    ) -> float:
+        """モデルをロードし、短い合成音声で一度推論しておく.
+
+        初回の推論で発生するメモリ確保やカーネルの初期化を、利用者の
+        リクエストより前に済ませるために使う。
+
+        Args:
+        ----
+            progress_callback: モデル準備中の進捗を通知するコールバック関数
+            duration: 推論する合成音声の長さ（秒）
+
+        Returns:
+        -------
+            ウォームアップの推論にかかった時間（秒）
+        """
+        t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+        audio = (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+        with self._lease_model(progress_callback) as model:
+            start_time = time.perf_counter()
+            model.transcribe(audio, **self._decode_options(self.language))
+            return time.perf_counter() - start_time
+
+    def _decode_options(self, language: Optional[str] = None) -> dict[str, Any]:
+        """model.transcribeに渡すデコードオプションを生成する.
+
+        languageがNoneの場合はデコード時にWhisperが最初の30秒で判定する。
+        """
+        return {
+            "verbose": False,  # Falseにしてコンソール出力を抑制
+            "fp16": self._resolve_device() != "cpu",  # CPUではfp32で推論
+            "language": language,
+            **self.decoding.options(),
+        }
+
+    def _known_language(self, audio_path: _AudioSource) -> Optional[str]:
+        """指定された言語、または同じ音声で判定済みの言語（なければNone）."""
+        if self.language is not None:
+            return self.language
+        return get_language_cache().get(self._audio_hash(audio_path), self.result_cache)
+
+    def _resolve_language(
+        self, audio_path: _AudioSource, audio: np.ndarray, detect: DetectFn
+    ) -> Optional[str]:
+        """デコードに渡す言語を決める.
+
+        未判定の音声は発話の多い数か所の区間で判定して保存する。30秒以下の
+        音声はデコード時の判定と同じ区間になるため、ここでは判定しない。
+        """
+        language = self._known_language(audio_path)
+        if (
+            language is not None
+            or len(audio) <= LANGUAGE_ID_WINDOW_LENGTH * SAMPLE_RATE
+        ):
+            return language
+        with stage_timer("language_id"):
+            language = detect_language(audio, detect)
+        if language is not None:
+            get_language_cache().put(
+                self._audio_hash(audio_path), language, self.result_cache
+            )
+        return language
+
+    def _remember_language(
+        self, audio_path: _AudioSource, result: dict[str, Any]
+    ) -> None:
+        """デコード時に判定された言語を、次回の実行のために保存する."""
+        if self.language is not None or not result.get("language"):
+            return
+        if self._known_language(audio_path) is None:
+            get_language_cache().put(
+                self._audio_hash(audio_path), result["language"], self.result_cache
+            )
+
+    def _audio_hash(self, audio_path: _AudioSource) -> str:
+        """音声内容のハッシュ（ファイルが変更されていなければ前回の値を再利用）."""
+        if isinstance(audio_path, np.ndarray):
+            if self._array_hash is None or self._array_hash[0]() is not audio_path:
+                self._array_hash = (
+                    weakref.ref(audio_path),
+                    compute_audio_hash(audio_path),
+                )
+            return self._array_hash[1]
+        stat = audio_path.stat()
+        memo_key = (audio_path.resolve(), stat.st_mtime_ns, stat.st_size)
+        if memo_key not in self._hash_memo:
+            self._hash_memo[memo_key] = compute_file_hash(audio_path)
+        return self._hash_memo[memo_key]
+
+    def _load_audio(self, audio_path: _AudioSource) -> np.ndarray:
+        """音声を16kHzモノラルで読み込む（キャッシュがあればデコードを省略）."""
+        if isinstance(audio_path, np.ndarray):
+            # メモリ上の音声はそのまま使う
+            return audio_path
+        with stage_timer("audio_decode"):
+            if self.audio_cache is None:
+                return load_audio_file(audio_path)
+            return self.audio_cache.load(audio_path, self._audio_hash(audio_path))
+
+    def _filter_speech(
+        self, audio: np.ndarray
+    ) -> tuple[np.ndarray, Optional[SpeechMap]]:
+        """VADが有効な場合、発話区間だけをつなげた音声と時刻の対応を返す."""
+        if not self.vad:
+            return audio, None
+        with stage_timer("vad"):
+            speech_map = SpeechMap.from_audio(audio)
+            return speech_map.compact(audio), speech_map
+
+    def _restore_timeline(
+        self, result: dict[str, Any], speech_map: Optional[SpeechMap]
+    ) -> dict[str, Any]:
+        """VADで取り除いた無音を戻し、元の音声の時刻と長さに合わせる."""
+        if speech_map is None:
+            return result
+        result["segments"] = speech_map.remap_segments(result.get("segments", []))
+        result["duration"] = speech_map.duration
+        result["speech_ratio"] = speech_map.speech_ratio
+        return result
+
+    def _decode_speech(
+        self, audio: np.ndarray, decode: Callable[[np.ndarray], dict[str, Any]]
+    ) -> dict[str, Any]:
+        """音声（VAD有効時は発話区間のみ）をデコードし、音声の長さを付け加える."""
+        audio, speech_map = self._filter_speech(audio)
+        if speech_map is not None and not speech_map.regions:
+            result = self._empty_result()
+        else:
+            with inference_timer():
+                result = decode(audio)
+        result["duration"] = len(audio) / SAMPLE_RATE
+        return self._restore_timeline(result, speech_map)
+
+    def _plan_chunks(
+        self, audio: np.ndarray, speech_map: Optional[SpeechMap], **options: Any
+    ) -> list[AudioChunk]:
+        """音声を無音区間で分割する（VADで発話区間がなかった場合は空）."""
+        if speech_map is not None and not speech_map.regions:
+            return []
+        return plan_chunks(
+            len(audio) / SAMPLE_RATE, find_silence_points(audio), **options
+        )
+
+    def _empty_result(self) -> dict[str, Any]:
+        """発話区間がなかった場合の結果（デコードしない）."""
+        return {"text": "", "segments": [], "language": self.language}
+
+    def _cache_key(self, audio_path: _AudioSource, mode: str) -> Optional[str]:
+        """結果キャッシュのキーを生成する（キャッシュ未使用ならNone）."""
+        if self.result_cache is None:
+            return None
+        options = self._decode_options(self.language)
+        return make_cache_key(
+            self._audio_hash(audio_path),
+            self.model_name,
+            options["language"],
+            {
+                "mode": mode,
+                "fp16": options["fp16"],
+                "dtype": self.dtype,
+                "backend": self.backend.name,
+                "vad": self.vad,
+                "decoding": self.decoding.name,
+            },
+        )
+
+    def _get_cached(
+        self,
+        cache_key: Optional[str],
+        progress_callback: Optional[Callable[[str], None]],
+    ) -> Optional[dict[str, Any]]:
+        """キャッシュ済みの結果があれば返す."""
+        if cache_key is None or self.result_cache is None:
+            return None
+        cached = self.result_cache.get(cache_key)
+        if cached is not None and progress_callback:
+            progress_callback("キャッシュ済みの文字起こし結果を使用します")
+        return cached
+
+    def _put_cached(self, cache_key: Optional[str], result: dict[str, Any]) -> None:
+        """結果をキャッシュに保存する（キャッシュ未使用なら何もしない）."""
+        if cache_key is not None and self.result_cache is not None:
+            self.result_cache.put(cache_key, result)
 
     def transcribe(
         self,
-        audio_path: Union[str, Path],
+        audio: AudioInput,
         progress_callback: Optional[Callable[[str], None]] = None,
+        long_form: bool = False,
+        max_workers: Optional[int] = None,
+        profiler: Optional[JobProfiler] = None,
     ) -> dict[str, Any]:
-        """音声ファイルを文字起こしする.
+        """音声を文字起こしする.
 
         Args:
         ----
-            audio_path: 音声ファイルのパス
+            audio: 音声ファイルのパス、またはメモリ上の音声（16kHzのPCM配列、
+                (サンプリングレート, 配列)、音声ファイルの内容のバイト列）
             progress_callback: 進捗状況を通知するコールバック関数
+            long_form: Trueの場合、音声を無音区間で分割して並列に文字起こしする
+            max_workers: long_form時のワーカープロセス数（Noneの場合は自動）
+            profiler: 指定した場合、キャッシュを使わずに文字起こしし、
+                プロファイルとウィンドウごとのデコードログを保存する
+                （long_formのワーカープロセス内のデコードは記録されない）
 
         Returns:
         -------
-            文字起こし結果を含む辞書
+            文字起こし結果を含む辞書（decodingにプロファイル名と
+            ウィンドウ数・再デコードの回数・打ち切った再デコードの回数を含む。
+            long_formのワーカープロセス内の再デコードは数えない）
 
         Raises:
         ------
             FileNotFoundError: 指定されたファイルが存在しない場合
             ValueError: 対応していない音声フォーマットの場合
         """
-        audio_path = Path(audio_path)
-        if not audio_path.exists():
-            raise FileNotFoundError(f"音声ファイルが見つかりません: {audio_path}")
+        audio_path = _resolve_audio_input(audio)
 
-        # 対応している音声フォーマットをチェック
-        supported_formats = {".wav", ".mp3", ".mp4", ".m4a", ".flac", ".ogg", ".opus"}
-        if audio_path.suffix.lower() not in supported_formats:
-            raise ValueError(f"対応していない音声フォーマット: {audio_path.suffix}")
+        cache_key = self._cache_key(
+            audio_path, "long_form" if long_form else "standard"
+        )
+        # プロファイルを取る場合は実際に文字起こしするためキャッシュを使わない
+        cached = None if profiler else self._get_cached(cache_key, progress_callback)
+        if cached is not None:
+            return cached
 
-        # モデルの遅延ロード
-        if self._model is None:
-            # まずモデルのダウンロードを確認
-            def download_progress(ratio: float, message: str) -> None:
-                if progress_callback:
-                    progress_callback(message)
+        start_time = time.perf_counter()
+        budget = DecodeBudget(self.decoding)
+        self._profiler = profiler
+        self._budget = budget
+        try:
+            with profiler.profile() if profiler else nullcontext():
+                if long_form:
+                    result = self._transcribe_long_form(
+                        audio_path, progress_callback, max_workers
+                    )
+                else:
+                    result = self._transcribe_standard(audio_path, progress_callback)
+        finally:
+            self._profiler = None
+            self._budget = None
+
+        result["decoding"] = budget.summary()
+        record_decode_retries(
+            self.model_name,
+            self.decoding.name,
+            budget.retries,
+            budget.skipped_retries,
+        )
+        self._remember_language(audio_path, result)
+        record_transcription(
+            self.model_name,
+            float(result.get("duration", 0.0)),
+            time.perf_counter() - start_time,
+            "long_form" if long_form else "standard",
+        )
+        result.update(self._source_metadata(audio_path))
+        self._put_cached(cache_key, result)
+        return result
 
-            ensure_model_downloaded(self.model_name, download_progress)
+    def source_metadata(self, audio: AudioInput) -> dict[str, Any]:
+        """単語のタイムスタンプを後から計算するために結果に残す情報.
 
-            # モデルをロード
+        音声ファイルの場合は音声のハッシュ（音声キャッシュのキー）とモデル名を
+        返す。メモリ上の音声の場合は後から取り出せないため空の辞書を返す。
+
+        Args:
+        ----
+            audio: 文字起こしした音声（transcribeと同じ）
+
+        Returns:
+        -------
+            audio_hashとmodelを含む辞書
+        """
+        if not isinstance(audio, (str, Path)):
+            return {}
+        return self._source_metadata(Path(audio))
+
+    def _source_metadata(self, audio_path: _AudioSource) -> dict[str, Any]:
+        """音声ファイルのハッシュとモデル名（メモリ上の音声の場合は空）."""
+        if isinstance(audio_path, np.ndarray):
+            return {}
+        return {"audio_hash": self._audio_hash(audio_path), "model": self.model_name}
+
+    def add_word_timestamps(
+        self,
+        audio: AudioInput,
+        result: dict[str, Any],
+        progress_callback: Optional[Callable[[str], None]] = None,
+    ) -> dict[str, Any]:
+        """文字起こし済みの結果に単語ごとのタイムスタンプを付ける.
+
+        保存されているトークンを元の音声と一緒にモデルに通すだけで、
+        デコードはやり直さない。結果キャッシュを使う場合は計算結果も保存する。
+
+        Args:
+        ----
+            audio: 文字起こしした元の音声（transcribeと同じ）
+            result: segments（start, end, text, tokens）を含む文字起こし結果
+            progress_callback: モデル準備中の進捗を通知するコールバック関数
+
+        Returns:
+        -------
+            各セグメントにwordsを追加した結果
+
+        Raises:
+        ------
+            ValueError: openai-whisper以外のバックエンドの場合
+        """
+        from .alignment import align_words, has_word_timestamps
+
+        if has_word_timestamps(result):
+            return result
+        if self.backend.name != WHISPER_BACKEND:
+            raise ValueError(
+                "単語のタイムスタンプはwhisperバックエンドのモデルでのみ計算できます"
+            )
+
+        audio_path = _resolve_audio_input(audio)
+        cache_key = self._words_cache_key(audio_path, result)
+        cached = self._get_cached(cache_key, progress_callback)
+        if cached is not None:
+            return cached
+
+        with self._lease_model(progress_callback) as model:
             if progress_callback:
-                progress_callback(f"{self.model_name}モデルをメモリにロード中...")
-            self._model = whisper.load_model(self.model_name)
+                progress_callback("単語のタイムスタンプを計算中...")
+            segments = align_words(
+                model,
+                self._load_audio(audio_path),
+                result.get("segments") or [],
+                result.get("language"),
+            )
+        aligned = {**result, "segments": segments}
+        self._put_cached(cache_key, aligned)
+        return aligned
+
+    def _words_cache_key(
+        self, audio_path: _AudioSource, result: dict[str, Any]
+    ) -> Optional[str]:
+        """単語のタイムスタンプを付けた結果のキャッシュキー（セグメントごとに異なる）."""
+        if self.result_cache is None:
+            return None
+        segments = [
+            (segment["start"], segment["end"], segment["text"])
+            for segment in result.get("segments") or []
+        ]
+        return make_cache_key(
+            self._audio_hash(audio_path),
+            self.model_name,
+            result.get("language"),
+            {
+                "mode": "words",
+                "segments": segments,
+                "dtype": self.dtype,
+            },
+        )
+
+    def _transcribe_standard(
+        self,
+        audio_path: _AudioSource,
+        progress_callback: Optional[Callable[[str], None]],
+    ) -> dict[str, Any]:
+        """音声ファイル全体をmodel.transcribeで一度に文字起こしする."""
+        audio: Optional[np.ndarray] = None
+        # プロファイル中は他のジョブと混ざらないよう、まとめてデコードしない。
+        # ビームサーチや再デコードの予算はバッチのデコードでは適用できない
+        batchable = (
+            self.micro_batch
+            and self._profiler is None
+            and self.decoding.beam_size is None
+            and not self.decoding.budgeted
+        )
+        if batchable and self.backend.name == WHISPER_BACKEND:
+            audio = self._load_audio(audio_path)
+            if len(audio) <= BATCH_WINDOW_LENGTH * SAMPLE_RATE:
+                return self._transcribe_batched(audio_path, audio, progress_callback)
+
+        # モデルの遅延ロード（ロード済みであればレジストリから再利用）
+        with self._lease_model(progress_callback) as model:
+            # 音声ファイルを文字起こし
             if progress_callback:
-                progress_callback("モデルのロード完了！")
+                progress_callback("音声ファイルを解析中...")
+
+            if audio is None:
+                audio = self._load_audio(audio_path)
+            language = self._resolve_language(
+                audio_path,
+                audio,
+                functools.partial(self.backend.detect_language, model),
+            )
+            return self._decode_speech(
+                audio,
+                functools.partial(model.transcribe, **self._decode_options(language)),
+            )
 
-        # 音声ファイルを文字起こし
-        assert self._model is not None
+    def _transcribe_batched(
+        self,
+        audio_path: _AudioSource,
+        audio: np.ndarray,
+        progress_callback: Optional[Callable[[str], None]],
+    ) -> dict[str, Any]:
+        """短い音声を他のジョブの音声とまとめてデコードする."""
         if progress_callback:
             progress_callback("音声ファイルを解析中...")
+        decoder = get_batch_decoder(self._model_key())
+        # 未判定の場合はバッチのデコード時に音声ごとに判定される
+        language = self._known_language(audio_path)
+        return self._decode_speech(
+            audio,
+            functools.partial(
+                decoder.transcribe,
+                # 他のジョブの再デコードをこのジョブの予算で数えない
+                lease=functools.partial(
+                    self._lease_model, progress_callback, watch=False
+                ),
+                options=self._decode_options(language),
+            ),
+        )
+
+    def transcribe_stream(
+        self,
+        audio: AudioInput,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        window_length: float = STREAM_WINDOW_LENGTH,
+    ) -> Iterator[StreamUpdate]:
+        """音声をウィンドウ単位で文字起こしし、結果を逐次返す.
+
+        ウィンドウは無音区間を優先してwindow_length秒以内に区切る。
+        最初のウィンドウで検出した言語と直前のテキストを以降のウィンドウに
+        引き継ぐ。
+
+        Args:
+        ----
+            audio: 音声ファイルのパス、またはメモリ上の音声（transcribeと同じ）
+            progress_callback: モデル準備中の進捗を通知するコールバック関数
+            window_length: 1回にデコードする音声の最大長（秒）
+
+        Yields:
+        ------
+            ウィンドウごとのセグメントと処理済みの音声位置
+
+        Raises:
+        ------
+            FileNotFoundError: 指定されたファイルが存在しない場合
+            ValueError: 対応していない音声フォーマットの場合
+        """
+        audio_path = _resolve_audio_input(audio)
 
-        # verbose=Trueにすることで進捗をコンソールに表示（将来的にキャプチャ可能）
-        result: dict[str, Any] = self._model.transcribe(
-            str(audio_path),
-            verbose=False,  # Falseにしてコンソール出力を抑制
-            language="ja"
-            if "large" in self.model_name
-            else None,  # largeモデルの場合は日本語を指定
+        cache_key = self._cache_key(audio_path, f"stream:{window_length}")
+        cached = self._get_cached(cache_key, progress_callback)
+        if cached is not None:
+            segments = cached.get("segments", [])
+            duration = cached.get("duration", segments[-1]["end"] if segments else 0)
+            yield StreamUpdate(
+                segments=segments,
+                position=duration,
+                duration=duration,
+                language=cached.get("language"),
+                speech_ratio=cached.get("speech_ratio"),
+            )
+            return
+
+        # yieldで止まっている時間を除いた処理時間
+        busy_time = 0.0
+        busy_since = time.perf_counter()
+
+        # 最初にモデルを準備し、言語を決めておく
+        with self._lease_model(progress_callback) as model:
+            if progress_callback:
+                progress_callback("音声ファイルを読み込み中...")
+            audio, speech_map = self._filter_speech(self._load_audio(audio_path))
+            language = self._resolve_language(
+                audio_path,
+                audio,
+                functools.partial(self.backend.detect_language, model),
+            )
+        windows = self._plan_chunks(
+            audio, speech_map, chunk_length=window_length, overlap=0.0
         )
-        return result
+        duration = len(audio) / SAMPLE_RATE
+        speech_ratio = None
+        if speech_map is not None:
+            duration = speech_map.duration
+            speech_ratio = speech_map.speech_ratio
+
+        options = self._decode_options(language)
+        budget = DecodeBudget(self.decoding)
+        previous_text = ""
+        all_segments: list[dict[str, Any]] = []
+        for window in windows:
+            # ウィンドウごとに借りて、yield中は他のジョブがモデルを使えるようにする
+            with self._lease_model() as model, budget.watch(model):
+                result, segments = self._decode_window(
+                    model, audio, window, speech_map, options, previous_text
+                )
+            if options["language"] is None and result.get("language"):
+                # 判定していない短い音声は最初のウィンドウの判定を引き継ぐ
+                options["language"] = result["language"]
+
+            for i, segment in enumerate(segments):
+                segment["id"] = len(all_segments) + i
+            position = _window_position(window, speech_map)
+            all_segments.extend(segments)
+            previous_text += result.get("text", "")
+
+            busy_time += time.perf_counter() - busy_since
+            yield StreamUpdate(
+                segments=segments,
+                position=position,
+                duration=duration,
+                language=options["language"],
+                speech_ratio=speech_ratio,
+            )
+            busy_since = time.perf_counter()
+
+        if not windows:
+            # 発話区間がなくデコードしなかった場合も完了を通知する
+            yield StreamUpdate(
+                segments=[],
+                position=duration,
+                duration=duration,
+                language=options["language"],
+                speech_ratio=speech_ratio,
+            )
+
+        result = {
+            "text": "".join(segment["text"] for segment in all_segments),
+            "segments": all_segments,
+            "language": options["language"],
+            "duration": duration,
+            "decoding": budget.summary(),
+        }
+        if speech_ratio is not None:
+            result["speech_ratio"] = speech_ratio
+        busy_time += time.perf_counter() - busy_since
+        record_transcription(self.model_name, duration, busy_time, "stream")
+        record_decode_retries(
+            self.model_name,
+            self.decoding.name,
+            budget.retries,
+            budget.skipped_retries,
+        )
+        self._remember_language(audio_path, result)
+        result.update(self._source_metadata(audio_path))
+        self._put_cached(cache_key, result)
+
+    def _decode_window(
+        self,
+        model: Any,
+        audio: np.ndarray,
+        window: AudioChunk,
+        speech_map: Optional[SpeechMap],
+        options: dict[str, Any],
+        previous_text: str,
+    ) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+        """1ウィンドウをデコードし、元の音声の時刻に合わせたセグメントを返す.
+
+        Returns
+        -------
+            (model.transcribeの結果, 元の音声の時刻のセグメント)
+        """
+        with inference_timer():
+            result = model.transcribe(
+                window.slice(audio),
+                initial_prompt=previous_text[-STREAM_PROMPT_CHARS:] or None,
+                **options,
+            )
+        segments = []
+        for segment in result.get("segments", []):
+            shifted = dict(segment)
+            shifted["start"] = segment["start"] + window.start
+            shifted["end"] = segment["end"] + window.start
+            segments.append(shifted)
+        if speech_map is not None:
+            segments = speech_map.remap_segments(segments)
+        return result, segments
+
+    def transcribe_speculative(
+        self,
+        audio: AudioInput,
+        draft_model: str = "tiny",
+        refine_threshold: Optional[float] = None,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        window_length: float = STREAM_WINDOW_LENGTH,
+    ) -> Iterator[SpeculativeUpdate]:
+        """小さいモデルの下書きを先に返し、このモデルで確定した結果に置き換える.
+
+        ウィンドウごとに下書きモデルでデコードして返しながら、別のスレッドで
+        このモデルによる再デコードを進め、終わったウィンドウから確定した
+        セグメントを返す。refine_thresholdを指定した場合は、下書きの平均
+        対数確率がそれを下回るウィンドウだけを再デコードし、それ以外は
+        下書きのまま確定する。
+
+        Args:
+        ----
+            audio: 音声ファイルのパス、またはメモリ上の音声（transcribeと同じ）
+            draft_model: 下書きに使うモデル（DRAFT_MODELSのいずれか）
+            refine_threshold: 再デコードする下書きの平均対数確率の上限
+                （Noneの場合はすべてのウィンドウを再デコードする）
+            progress_callback: モデル準備中の進捗を通知するコールバック関数
+            window_length: 1回にデコードする音声の最大長（秒）
+
+        Yields:
+        ------
+            ウィンドウごとの下書き、または確定したセグメント
+
+        Raises:
+        ------
+            FileNotFoundError: 指定されたファイルが存在しない場合
+            ValueError: 対応していない音声フォーマットや下書きモデルの場合
+        """
+        if draft_model not in DRAFT_MODELS:
+            raise ValueError(f"下書きに使えないモデル: {draft_model}")
+        audio_path = _resolve_audio_input(audio)
+
+        cache_key = self._cache_key(
+            audio_path,
+            f"speculative:{draft_model}:{refine_threshold}:{window_length}",
+        )
+        cached = self._get_cached(cache_key, progress_callback)
+        if cached is not None:
+            segments = cached.get("segments", [])
+            duration = cached.get("duration", segments[-1]["end"] if segments else 0)
+            yield SpeculativeUpdate(
+                window=0,
+                windows=1,
+                segments=segments,
+                refined=True,
+                final=True,
+                position=duration,
+                duration=duration,
+                language=cached.get("language"),
+            )
+            return
+
+        start_time = time.perf_counter()
+        draft = Transcriber(
+            model_name=draft_model,
+            device=self.device,
+            dtype=self.dtype,
+            registry=self._registry,
+            backend=self.backend.name,
+            language=self.language,
+        )
+        # 言語は下書きモデルで判定し、両方のモデルで同じ言語を使う
+        with draft._lease_model(progress_callback) as model:
+            if progress_callback:
+                progress_callback("音声ファイルを読み込み中...")
+            audio, speech_map = self._filter_speech(self._load_audio(audio_path))
+            language = self._resolve_language(
+                audio_path,
+                audio,
+                functools.partial(draft.backend.detect_language, model),
+            )
+        windows = self._plan_chunks(
+            audio, speech_map, chunk_length=window_length, overlap=0.0
+        )
+        duration = speech_map.duration if speech_map else len(audio) / SAMPLE_RATE
+        draft_options = draft._decode_options(language)
+        refiner = _Refiner(
+            self, audio, windows, speech_map, self._decode_options(language)
+        )
+
+        position = 0.0
+        try:
+            for index, window in enumerate(windows):
+                segments = self._decode_draft(draft, refiner, index, draft_options)
+                position = _window_position(window, speech_map)
+
+                needs_refine = _needs_refine(segments, refine_threshold)
+                if needs_refine:
+                    refiner.request(index)
+                yield refiner.update(index, position, duration, final=not needs_refine)
+                for refined_index in refiner.completed():
+                    yield refiner.update(refined_index, position, duration)
+
+            for refined_index in refiner.completed(wait=True):
+                yield refiner.update(refined_index, position, duration)
+        finally:
+            refiner.close()
+
+        if not windows:
+            # 発話区間がなくデコードしなかった場合も完了を通知する
+            position = duration
+            yield SpeculativeUpdate(
+                window=0,
+                windows=0,
+                segments=[],
+                refined=False,
+                final=True,
+                position=duration,
+                duration=duration,
+                language=draft_options["language"],
+                speech_ratio=speech_map.speech_ratio if speech_map else None,
+            )
+
+        result = refiner.result(duration)
+        if speech_map is not None:
+            result["speech_ratio"] = speech_map.speech_ratio
+        record_transcription(
+            self.model_name, duration, time.perf_counter() - start_time, "speculative"
+        )
+        self._remember_language(audio_path, result)
+        result.update(self._source_metadata(audio_path))
+        self._put_cached(cache_key, result)
+
+    def _decode_draft(
+        self,
+        draft: "Transcriber",
+        refiner: "_Refiner",
+        index: int,
+        options: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        """1つのウィンドウを下書きモデルでデコードし、refinerに渡す.
+
+        Args:
+        ----
+            draft: 下書きモデルのTranscriber
+            refiner: 再デコードを進めるrefiner
+            index: デコードするウィンドウの番号
+            options: 下書きモデルのデコードオプション
+
+        Returns:
+        -------
+            ウィンドウの下書きのセグメント
+        """
+        with draft._lease_model() as model:
+            result, segments = self._decode_window(
+                model,
+                refiner.audio,
+                refiner.windows[index],
+                refiner.speech_map,
+                options,
+                refiner.previous_text(index),
+            )
+        if options["language"] is None:
+            # 判定していない短い音声は最初のウィンドウの判定を引き継ぐ
+            options["language"] = result.get("language")
+            refiner.options["language"] = result.get("language")
+        refiner.set_draft(index, segments, result.get("text", ""))
+        return segments
+
+    def _default_worker_count(self) -> int:
+        """CPUコア数とレジストリのメモリ上限からワーカー数を決める."""
+        by_cores = max(1, (os.cpu_count() or 1) // 2)
+        registry = self._registry or get_model_registry()
+        model_mb = MODEL_SIZES.get(self.model_name, 0) * 2
+        if model_mb <= 0:
+            return by_cores
+        by_memory = max(1, int(registry.memory_budget_mb // model_mb))
+        return min(by_cores, by_memory)
+
+    def _transcribe_long_form(
+        self,
+        audio_path: _AudioSource,
+        progress_callback: Optional[Callable[[str], None]],
+        max_workers: Optional[int],
+    ) -> dict[str, Any]:
+        """音声をチャンクに分割し、ワーカープールで並列に文字起こしする."""
+        if progress_callback:
+            progress_callback("音声ファイルを読み込み中...")
+        audio, speech_map = self._filter_speech(self._load_audio(audio_path))
+        duration = len(audio) / SAMPLE_RATE
+        chunks = self._plan_chunks(audio, speech_map)
+
+        workers = min(max_workers or self._default_worker_count(), len(chunks))
+        results: list[dict[str, Any]] = [{} for _ in chunks]
+
+        if workers <= 1:
+            with self._lease_model(progress_callback) as model:
+                language = self._resolve_language(
+                    audio_path,
+                    audio,
+                    functools.partial(self.backend.detect_language, model),
+                )
+                options = self._decode_options(language)
+                for i, chunk in enumerate(chunks):
+                    if progress_callback:
+                        progress_callback(
+                            f"チャンクを文字起こし中... ({i + 1}/{len(chunks)})"
+                        )
+                    with inference_timer():
+                        results[i] = model.transcribe(chunk.slice(audio), **options)
+            return self._restore_timeline(
+                self._merge_long_form(chunks, results, duration), speech_map
+            )
+
+        # ワーカーが同時にダウンロードしないよう、先に親プロセスで取得しておく
+        def download_progress(ratio: float, message: str) -> None:
+            if progress_callback:
+                progress_callback(message)
+
+        ensure_model_downloaded(
+            self.model_name, download_progress, backend=self.backend.name
+        )
+
+        if progress_callback:
+            progress_callback(
+                f"{len(chunks)}チャンクを{workers}プロセスで文字起こし中..."
+            )
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                self.model_name,
+                self._resolve_device(),
+                self.dtype,
+                self.backend.name,
+                threads_per_worker,
+            ),
+        ) as executor:
+            # 言語はチャンクごとに判定させず、最初に音声全体で1回だけ決める
+            language = self._resolve_language(
+                audio_path,
+                audio,
+                lambda windows: executor.submit(
+                    _detect_chunk_language, windows, self.backend.name
+                ).result(),
+            )
+            options = self._decode_options(language)
+            # ワーカー内のエンコード時間は測れないため、全体をデコードとして記録する
+            with inference_timer():
+                futures = {
+                    executor.submit(_transcribe_chunk, chunk.slice(audio), options): i
+                    for i, chunk in enumerate(chunks)
+                }
+                for done, future in enumerate(as_completed(futures), start=1):
+                    results[futures[future]] = future.result()
+                    if progress_callback:
+                        progress_callback(
+                            f"チャンクを文字起こし中... ({done}/{len(chunks)})"
+                        )
+
+        return self._restore_timeline(
+            self._merge_long_form(chunks, results, duration), speech_map
+        )
+
+    def _merge_long_form(
+        self,
+        chunks: list[AudioChunk],
+        results: list[dict[str, Any]],
+        duration: float,
+    ) -> dict[str, Any]:
+        """チャンクの結果を結合し、音声の長さを付け加える."""
+        merged = merge_chunk_results(chunks, results)
+        merged["duration"] = duration
+        return merged
+
+
+class _Refiner:
+    """transcribe_speculativeで、下書きしたウィンドウを別のスレッドで再デコードする."""
+
+    def __init__(
+        self,
+        transcriber: Transcriber,
+        audio: np.ndarray,
+        windows: list[AudioChunk],
+        speech_map: Optional[SpeechMap],
+        options: dict[str, Any],
+    ) -> None:
+        self.transcriber = transcriber
+        self.audio = audio
+        self.windows = windows
+        self.speech_map = speech_map
+        self.options = options
+        # ウィンドウごとの現時点のセグメントとテキスト（再デコードで置き換える）
+        self.segments: list[list[dict[str, Any]]] = [[] for _ in windows]
+        self.texts = ["" for _ in windows]
+        self._requests: queue.Queue[Optional[int]] = queue.Queue()
+        self._done: queue.Queue[Union[int, BaseException]] = queue.Queue()
+        self._pending = 0
+        self._refined: set[int] = set()
+        self._stop = threading.Event()
+        threading.Thread(
+            target=self._run, name="speculative-refine", daemon=True
+        ).start()
+
+    def previous_text(self, index: int) -> str:
+        """ウィンドウより前のテキスト（確定済みなら確定したもの）."""
+        return "".join(self.texts[:index])
+
+    def set_draft(self, index: int, segments: list[dict[str, Any]], text: str) -> None:
+        """ウィンドウの下書きを記録する."""
+        self.segments[index] = segments
+        self.texts[index] = text
+
+    def request(self, index: int) -> None:
+        """ウィンドウの再デコードを依頼する（下書きの順に処理される）."""
+        self._pending += 1
+        self._requests.put(index)
+
+    def completed(self, wait: bool = False) -> Iterator[int]:
+        """再デコードが終わったウィンドウの番号を返す.
+
+        Args:
+        ----
+            wait: Trueの場合、依頼したすべてのウィンドウが終わるまで待つ
+
+        Raises:
+        ------
+            BaseException: 再デコード中に発生した例外
+        """
+        while self._pending and (wait or not self._done.empty()):
+            item = self._done.get()
+            self._pending -= 1
+            if isinstance(item, BaseException):
+                raise item
+            self._refined.add(item)
+            yield item
+
+    def update(
+        self, index: int, position: float, duration: float, final: bool = True
+    ) -> SpeculativeUpdate:
+        """ウィンドウの現時点の結果（再デコード済みなら確定した結果）."""
+        return SpeculativeUpdate(
+            window=index,
+            windows=len(self.windows),
+            segments=self.segments[index],
+            refined=index in self._refined,
+            final=final,
+            position=position,
+            duration=duration,
+            language=self.options["language"],
+            speech_ratio=self.speech_map.speech_ratio if self.speech_map else None,
+        )
+
+    def close(self) -> None:
+        """残りの再デコードを取りやめ、スレッドを終了させる."""
+        self._stop.set()
+        self._requests.put(None)
+
+    def result(self, duration: float) -> dict[str, Any]:
+        """ウィンドウの結果をつなげた文字起こし結果."""
+        segments = itertools.chain.from_iterable(self.segments)
+        return {
+            "text": "".join(self.texts),
+            "segments": [{**segment, "id": i} for i, segment in enumerate(segments)],
+            "language": self.options["language"],
+            "duration": duration,
+        }
+
+    def _run(self) -> None:
+        try:
+            index = self._requests.get()
+            while index is not None and not self._stop.is_set():
+                with self.transcriber._lease_model() as model:
+                    result, segments = self.transcriber._decode_window(
+                        model,
+                        self.audio,
+                        self.windows[index],
+                        self.speech_map,
+                        self.options,
+                        self.previous_text(index),
+                    )
+                self.set_draft(index, segments, result.get("text", ""))
+                self._done.put(index)
+                index = self._requests.get()
+        except BaseException as e:
+            self._done.put(e)
+
+
+def _window_position(window: AudioChunk, speech_map: Optional[SpeechMap]) -> float:
+    """ウィンドウの終わりの元の音声での時刻."""
+    if speech_map is None:
+        return window.end
+    return speech_map.to_original(window.end, is_end=True)
+
+
+def _needs_refine(
+    segments: list[dict[str, Any]], refine_threshold: Optional[float]
+) -> bool:
+    """下書きを再デコードするかどうか.
+
+    セグメントのトークン数で重み付けした平均対数確率がrefine_thresholdを
+    下回る場合に再デコードする。下書きで発話がなかったウィンドウはしない。
+    """
+    if refine_threshold is None:
+        return True
+    if not segments:
+        return False
+    weights = [max(1, len(segment.get("tokens") or [])) for segment in segments]
+    total = sum(
+        float(segment.get("avg_logprob", 0.0)) * weight
+        for segment, weight in zip(segments, weights)
+    )
+    return total / sum(weights) < refine_threshold
+
+
+def _resolve_audio_input(audio: AudioInput) -> _AudioSource:
+    """パスは存在とフォーマットを確認し、それ以外は16kHzのPCM配列にする."""
+    if isinstance(audio, (str, Path)):
+        return _validate_audio_path(audio)
+    return load_audio_input(audio)
+
+
+def _validate_audio_path(audio_path: Union[str, Path]) -> Path:
+    """音声ファイルの存在とフォーマットをチェックする."""
+    audio_path = Path(audio_path)
+    if not audio_path.exists():
+        raise FileNotFoundError(f"音声ファイルが見つかりません: {audio_path}")
+
+    # 対応している音声フォーマットをチェック
+    if audio_path.suffix.lower() not in SUPPORTED_FORMATS:
+        raise ValueError(f"対応していない音声フォーマット: {audio_path.suffix}")
+    return audio_path
+
+
+# ワーカープロセスごとに1つだけ保持するモデル
+_worker_model: Optional[Any] = None
+
+
+def _init_worker(
+    model_name: str, device: str, dtype: str, backend: str, num_threads: int
+) -> None:
+    """ワーカープロセスの初期化（モデルを1回だけロードする）."""
+    global _worker_model
+    import torch
+
+    torch.set_num_threads(num_threads)
+    _worker_model = Transcriber(
+        model_name, device=device, dtype=dtype, backend=backend
+    )._load_model()
+
+
+def _transcribe_chunk(audio: np.ndarray, options: dict[str, Any]) -> dict[str, Any]:
+    """ワーカープロセスで1チャンクを文字起こしする."""
+    assert _worker_model is not None
+    result: dict[str, Any] = _worker_model.transcribe(audio, **options)
+    return result
+
+
+def _detect_chunk_language(
+    windows: list[np.ndarray], backend: str
+) -> list[dict[str, float]]:
+    """ワーカープロセスで音声の区間ごとの言語の確率を求める."""
+    assert _worker_model is not None
+    return get_backend(backend).detect_language(_worker_model, windows)
@@ -1,15 +1,66 @@
 """ユーティリティ関数を提供するモジュール."""
 
+import hashlib
+import shutil
+import sqlite3
+import subprocess
+import wave
+from collections.abc import Sequence
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
 
+from .history_index import AlignmentSource, get_history_index
+from .metrics import stage_timer
+from .writers import DEFAULT_OUTPUT_FORMATS, write_outputs
+
+
+def save_transcription(
+    transcription_result: dict[str, Any],
+    audio_filename: str,
+    output_dir: Optional[Path] = None,
+    include_timestamps: bool = False,
+    formats: Sequence[str] = DEFAULT_OUTPUT_FORMATS,
+    output_stem: Optional[str] = None,
+) -> dict[str, Path]:
+    """文字起こし結果を指定した形式でまとめて保存する.
+
+    Markdownを含む場合は履歴の索引にも登録する。
+
+    Args:
+    ----
+        transcription_result: Whisperの文字起こし結果
+        audio_filename: 元の音声ファイル名
+        output_dir: 出力ディレクトリ（Noneの場合はtranscriptionsディレクトリ）
+        include_timestamps: Markdownにタイムスタンプを含めるかどうか
+        formats: 出力形式（md, srt, vtt, json, tsv）
+        output_stem: 拡張子を除いた出力ファイル名
+            （Noneの場合は日時と音声ファイル名から生成）
+
+    Returns:
+    -------
+        形式ごとの保存したファイルのパス
+    """
+    # 出力ディレクトリの設定
+    if output_dir is None:
+        output_dir = Path("transcriptions")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # ファイル名の生成
+    if output_stem is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_stem = f"{timestamp}_{Path(audio_filename).stem}"
+    paths = {fmt: output_dir / f"{output_stem}.{fmt}" for fmt in formats}
+    _write_and_index(transcription_result, audio_filename, paths, include_timestamps)
+    return paths
+
 
 def save_transcription_as_markdown(
     transcription_result: dict[str, Any],
     audio_filename: str,
     output_dir: Optional[Path] = None,
     include_timestamps: bool = False,
+    output_filename: Optional[str] = None,
 ) -> Path:
     """文字起こし結果をMarkdown形式で保存する.
 
@@ -19,53 +70,120 @@ def save_transcription_as_markdown(
         audio_filename: 元の音声ファイル名
         output_dir: 出力ディレクトリ（Noneの場合はtranscriptionsディレクトリ）
         include_timestamps: タイムスタンプを含めるかどうか
+        output_filename: 出力ファイル名（Noneの場合は日時と音声ファイル名から生成）
 
     Returns:
     -------
         保存したファイルのパス
     """
-    # 出力ディレクトリの設定
+    if output_filename is None:
+        return save_transcription(
+            transcription_result, audio_filename, output_dir, include_timestamps
+        )["md"]
+
     if output_dir is None:
         output_dir = Path("transcriptions")
     output_dir.mkdir(parents=True, exist_ok=True)
-
-    # ファイル名の生成
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    base_name = Path(audio_filename).stem
-    output_filename = f"{timestamp}_{base_name}.md"
     output_path = output_dir / output_filename
+    _write_and_index(
+        transcription_result, audio_filename, {"md": output_path}, include_timestamps
+    )
+    return output_path
 
-    # Markdownコンテンツの生成
-    content_lines = [
-        "# 文字起こし結果",
-        "",
-        f"**ファイル名**: {audio_filename}",
-        f"**作成日時**: {datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}",
-        "",
-        "## 文字起こし内容",
-        "",
-    ]
-
-    if include_timestamps and "segments" in transcription_result:
-        # タイムスタンプ付きで出力
-        for segment in transcription_result["segments"]:
-            start_time = _format_timestamp(segment["start"])
-            end_time = _format_timestamp(segment["end"])
-            text = segment["text"].strip()
-            content_lines.append(f"[{start_time} - {end_time}] {text}")
-            content_lines.append("")
-    else:
-        # 通常のテキスト出力
-        content_lines.append(transcription_result["text"])
-
-    # ファイルに保存
-    output_path.write_text("\n".join(content_lines), encoding="utf-8")
 
-    return output_path
+def _write_and_index(
+    transcription_result: dict[str, Any],
+    audio_filename: str,
+    paths: dict[str, Path],
+    include_timestamps: bool,
+) -> None:
+    """結果を書き出し、Markdownがあれば履歴の索引に登録する."""
+    with stage_timer("save"):
+        markdown_path = paths.get("md")
+        dir_mtime = markdown_path.parent.stat().st_mtime if markdown_path else 0.0
+        write_outputs(transcription_result, audio_filename, paths, include_timestamps)
+        if markdown_path is None:
+            return
+
+        # 履歴の索引に登録（失敗しても次回の一覧表示時に差分として取り込まれる）
+        try:
+            get_history_index(markdown_path.parent).record(
+                markdown_path,
+                audio_filename=audio_filename,
+                language=transcription_result.get("language"),
+                duration=transcription_result.get("duration"),
+                previous_dir_mtime=dir_mtime,
+                alignment_source=AlignmentSource.from_result(transcription_result),
+            )
+        except sqlite3.Error:
+            pass
+
+
+def compute_file_hash(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """ファイル内容のSHA-256ハッシュを計算する.
+
+    Args:
+    ----
+        file_path: 対象ファイルのパス
+        chunk_size: 一度に読み込むバイト数
+
+    Returns:
+    -------
+        16進数のハッシュ文字列
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# 長さを読み取れない圧縮音声のおおよそのビットレート（128kbps, バイト/秒）
+_FALLBACK_BYTES_PER_SECOND = 16000
+
+
+def estimate_audio_duration(file_path: Path) -> float:
+    """音声ファイルの長さ（秒）を、デコードせずに推定する.
+
+    WAVはヘッダから、それ以外はffprobeが使える場合はffprobeで取得し、
+    どちらも使えない場合はファイルサイズから推定する。
+
+    Args:
+    ----
+        file_path: 音声ファイルのパス
+
+    Returns:
+    -------
+        音声の長さ（秒）
+    """
+    file_path = Path(file_path)
+    if file_path.suffix.lower() == ".wav":
+        try:
+            with wave.open(str(file_path), "rb") as wav:
+                return wav.getnframes() / float(wav.getframerate())
+        except (wave.Error, EOFError):
+            pass
 
+    if shutil.which("ffprobe"):
+        try:
+            output = subprocess.run(
+                [
+                    "ffprobe",
+                    "-v",
+                    "error",
+                    "-show_entries",
+                    "format=duration",
+                    "-of",
+                    "default=noprint_wrappers=1:nokey=1",
+                    str(file_path),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=10,
+            ).stdout
+            return float(output.strip())
+        except (subprocess.SubprocessError, ValueError):
+            pass
 
-def _format_timestamp(seconds: float) -> str:
-    """秒数を MM:SS 形式のタイムスタンプに変換する."""
-    minutes = int(seconds // 60)
-    seconds = int(seconds % 60)
-    return f"{minutes:02d}:{seconds:02d}"
+    return file_path.stat().st_size / _FALLBACK_BYTES_PER_SECOND
@@ -0,0 +1,208 @@
+"""デコード前に無音区間を取り除く軽量な音声区間検出（VAD）."""
+
+import bisect
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from .chunking import SAMPLE_RATE
+
+# 発話区間の検出設定（秒）
+DEFAULT_THRESHOLD_DB = -40.0
+DEFAULT_MIN_SPEECH = 0.25
+DEFAULT_MIN_SILENCE = 1.0
+DEFAULT_PADDING = 0.2
+# 発話区間をつなげる際に間に挟む無音の長さ（秒）
+DEFAULT_GAP = 0.3
+
+
+def detect_speech(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_duration: float = 0.03,
+    threshold_db: float = DEFAULT_THRESHOLD_DB,
+    min_speech: float = DEFAULT_MIN_SPEECH,
+    min_silence: float = DEFAULT_MIN_SILENCE,
+    padding: float = DEFAULT_PADDING,
+) -> list[tuple[float, float]]:
+    """フレームのエネルギーから発話区間を検出する.
+
+    Args:
+    ----
+        audio: モノラル音声（-1.0〜1.0のfloat配列）
+        sample_rate: サンプリングレート
+        frame_duration: エネルギーを計算するフレーム長（秒）
+        threshold_db: これ以上のRMS（dBFS）のフレームを発話とみなす
+        min_speech: これより短い発話区間は雑音として捨てる（秒）
+        min_silence: これより短い無音は発話区間に含める（秒）
+        padding: 発話区間の前後に加える余白（秒, 語頭・語尾の欠けを防ぐ）
+
+    Returns:
+    -------
+        発話区間の(開始, 終了)のリスト（秒, 昇順で重ならない）
+    """
+    duration = len(audio) / sample_rate
+    frame_size = max(1, int(frame_duration * sample_rate))
+    n_frames = -(-len(audio) // frame_size)
+    if n_frames == 0:
+        return []
+
+    padded_audio = np.zeros(n_frames * frame_size, dtype=np.float64)
+    padded_audio[: len(audio)] = audio
+    frames = padded_audio.reshape(n_frames, frame_size)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    voiced = 20 * np.log10(rms + 1e-10) >= threshold_db
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced, [0])).astype(np.int8)))
+    frame_seconds = frame_size / sample_rate
+    regions: list[tuple[float, float]] = []
+    for start, end in zip(edges[0::2] * frame_seconds, edges[1::2] * frame_seconds):
+        if regions and start - regions[-1][1] < min_silence:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+
+    speech: list[tuple[float, float]] = []
+    for start, end in regions:
+        if end - start < min_speech:
+            continue
+        start, end = max(0.0, start - padding), min(duration, end + padding)
+        if speech and start <= speech[-1][1]:
+            speech[-1] = (speech[-1][0], end)
+        else:
+            speech.append((start, end))
+    return speech
+
+
+@dataclass
+class SpeechMap:
+    """発話区間だけをつなげた音声と、元の音声の時刻との対応.
+
+    つなげた音声では、各発話区間の間にgap秒の無音を挟む。
+    """
+
+    regions: list[tuple[float, float]]
+    duration: float
+    gap: float = DEFAULT_GAP
+
+    def __post_init__(self) -> None:
+        """各発話区間がつなげた音声のどこから始まるかを計算する."""
+        self._offsets: list[float] = []
+        cursor = 0.0
+        for start, end in self.regions:
+            self._offsets.append(cursor)
+            cursor += end - start + self.gap
+
+    @classmethod
+    def from_audio(cls, audio: np.ndarray, **options: Any) -> "SpeechMap":
+        """音声から発話区間を検出してSpeechMapを作成する.
+
+        Args:
+        ----
+            audio: 16kHzモノラルの音声
+            **options: detect_speechの検出設定
+
+        Returns:
+        -------
+            作成したSpeechMap
+        """
+        return cls(detect_speech(audio, **options), len(audio) / SAMPLE_RATE)
+
+    @property
+    def speech_duration(self) -> float:
+        """発話区間の合計（秒）."""
+        return sum(end - start for start, end in self.regions)
+
+    @property
+    def speech_ratio(self) -> float:
+        """音声全体に対する発話区間の割合（0.0〜1.0）."""
+        return self.speech_duration / self.duration if self.duration else 0.0
+
+    def compact(self, audio: np.ndarray) -> np.ndarray:
+        """発話区間だけをつなげた音声を作成する.
+
+        Args:
+        ----
+            audio: 元の音声
+
+        Returns:
+        -------
+            発話区間の間にgap秒の無音を挟んでつなげた音声
+        """
+        gap = np.zeros(int(self.gap * SAMPLE_RATE), dtype=np.float32)
+        pieces = []
+        for start, end in self.regions:
+            pieces.append(audio[int(start * SAMPLE_RATE) : int(end * SAMPLE_RATE)])
+            pieces.append(gap)
+        if not pieces:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(pieces).astype(np.float32, copy=False)
+
+    def to_original(self, seconds: float, is_end: bool = False) -> float:
+        """つなげた音声の時刻を元の音声の時刻に変換する.
+
+        区間の間の無音にあたる時刻は、開始時刻なら次の発話区間の先頭、
+        終了時刻なら直前の発話区間の末尾に寄せる。
+
+        Args:
+        ----
+            seconds: つなげた音声での時刻（秒）
+            is_end: セグメントの終了時刻かどうか
+
+        Returns:
+        -------
+            元の音声での時刻（秒）
+        """
+        if not self.regions:
+            return seconds
+        index = max(0, bisect.bisect_right(self._offsets, seconds) - 1)
+        start, end = self.regions[index]
+        position = seconds - self._offsets[index]
+        if position <= end - start:
+            return start + max(0.0, position)
+        # 区間の後ろの無音
+        if is_end or index + 1 == len(self.regions):
+            return end
+        return self.regions[index + 1][0]
+
+    def to_compacted(self, seconds: float) -> float:
+        """元の音声の時刻をつなげた音声の時刻に変換する（to_originalの逆）.
+
+        発話区間の外の時刻は、直前の発話区間の末尾（先頭より前なら0）に寄せる。
+
+        Args:
+        ----
+            seconds: 元の音声での時刻（秒）
+
+        Returns:
+        -------
+            つなげた音声での時刻（秒）
+        """
+        if not self.regions:
+            return seconds
+        starts = [start for start, _ in self.regions]
+        index = bisect.bisect_right(starts, seconds) - 1
+        if index < 0:
+            return 0.0
+        start, end = self.regions[index]
+        return self._offsets[index] + min(seconds, end) - start
+
+    def remap_segments(self, segments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """セグメント（と単語）のタイムスタンプを元の音声の時刻に変換する."""
+        remapped = []
+        for segment in segments:
+            shifted = dict(segment)
+            shifted["start"] = self.to_original(segment["start"])
+            shifted["end"] = self.to_original(segment["end"], is_end=True)
+            if "words" in segment:
+                shifted["words"] = [
+                    {
+                        **word,
+                        "start": self.to_original(word["start"]),
+                        "end": self.to_original(word["end"], is_end=True),
+                    }
+                    for word in segment["words"]
+                ]
+            remapped.append(shifted)
+        return remapped
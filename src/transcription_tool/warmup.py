@@ -0,0 +1,163 @@
+"""サーバー起動時にモデルを事前にロードしてウォームアップする機能."""
+
+import functools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from .model_registry import ModelRegistry
+from .model_utils import split_model_choice
+from .transcriber import Transcriber
+
+# ウォームアップの状態
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+@dataclass
+class WarmupState:
+    """1つのモデルのウォームアップ状況."""
+
+    model_name: str
+    status: str = PENDING
+    message: str = ""
+    elapsed: Optional[float] = None
+
+
+class ModelWarmer:
+    """指定したモデルをバックグラウンドで順にロードし、ウォームアップする.
+
+    モデルはレジストリに登録されるため、最初の利用者のリクエストは
+    ロード済みのモデルを再利用できる。
+    """
+
+    def __init__(
+        self,
+        registry: Optional[ModelRegistry] = None,
+        device: Optional[str] = None,
+    ) -> None:
+        """ModelWarmerを初期化する.
+
+        Args:
+        ----
+            registry: モデルを登録するレジストリ（Noneの場合はプロセス共有）
+            device: 推論デバイス（Noneの場合は自動）
+        """
+        self._registry = registry
+        self.device = device
+        self._lock = threading.Lock()
+        self._states: dict[str, WarmupState] = {}
+        self._done = threading.Event()
+        self._done.set()
+        self._version = 0
+
+    def start(self, model_names: list[str]) -> None:
+        """モデルのウォームアップをバックグラウンドで開始する.
+
+        Args:
+        ----
+            model_names: ウォームアップするモデル名（指定順に処理する）。
+                int8量子化モデルはQUANTIZED_SUFFIXを付けて指定する
+        """
+        if not model_names:
+            return
+        with self._lock:
+            for name in model_names:
+                self._states[name] = WarmupState(model_name=name)
+            self._version += 1
+            self._done.clear()
+        threading.Thread(
+            target=self._run, args=(list(model_names),), name="warmup", daemon=True
+        ).start()
+
+    def _update(self, model_name: str, **changes: object) -> None:
+        with self._lock:
+            state = self._states[model_name]
+            for name, value in changes.items():
+                setattr(state, name, value)
+            self._version += 1
+
+    def _report(self, model_name: str, message: str) -> None:
+        self._update(model_name, message=message)
+
+    def _run(self, model_names: list[str]) -> None:
+        """モデルを順にロードし、合成音声で推論する."""
+        for name in model_names:
+            self._update(name, status=LOADING, message="準備中...")
+            start_time = time.perf_counter()
+            try:
+                model_name, dtype = split_model_choice(name)
+                transcriber = Transcriber(
+                    model_name=model_name,
+                    device="cpu" if dtype == "int8" else self.device,
+                    dtype=dtype,
+                    registry=self._registry,
+                )
+                transcriber.warm_up(functools.partial(self._report, name))
+            except Exception as e:
+                self._update(name, status=FAILED, message=str(e))
+                continue
+            self._update(
+                name,
+                status=READY,
+                message="準備完了",
+                elapsed=time.perf_counter() - start_time,
+            )
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """すべてのウォームアップが終わるまで待つ.
+
+        Returns
+        -------
+            タイムアウトまでに終わった場合True
+        """
+        return self._done.wait(timeout)
+
+    def is_ready(self) -> bool:
+        """ウォームアップ中のモデルがないかどうか."""
+        return self._done.is_set()
+
+    @property
+    def version(self) -> int:
+        """状態が変わるたびに増える番号（UIの更新判定に使用）."""
+        with self._lock:
+            return self._version
+
+    def states(self) -> list[WarmupState]:
+        """各モデルのウォームアップ状況のスナップショット."""
+        with self._lock:
+            return [WarmupState(**vars(state)) for state in self._states.values()]
+
+    def format_status(self) -> str:
+        """UIに表示する準備状況のメッセージ."""
+        states = self.states()
+        if not states:
+            return "🟢 準備完了"
+        icons = {PENDING: "⏳", LOADING: "🔄", READY: "✅", FAILED: "❌"}
+        details = []
+        for state in states:
+            detail = f"{icons[state.status]} {state.model_name}"
+            if state.status == READY and state.elapsed is not None:
+                detail += f"（{state.elapsed:.1f}秒）"
+            elif state.message:
+                detail += f": {state.message}"
+            details.append(detail)
+        header = "🟢 準備完了" if self.is_ready() else "🟡 モデルを準備中..."
+        return f"{header}　" + " / ".join(details)
+
+
+_warmer: Optional[ModelWarmer] = None
+_warmer_lock = threading.Lock()
+
+
+def get_model_warmer() -> ModelWarmer:
+    """プロセス共有のModelWarmerを取得する."""
+    global _warmer
+    with _warmer_lock:
+        if _warmer is None:
+            _warmer = ModelWarmer()
+        return _warmer
@@ -0,0 +1,274 @@
+"""文字起こし結果をMarkdown・SRT・WebVTT・JSON・TSVで書き出すライター.
+
+すべての形式のファイルを同時に開き、セグメントを1回走査しながら各ライターに
+順に書き込むため、形式の数によらず結果全体の文字列をメモリ上に組み立てない。
+"""
+
+import io
+import json
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Any, TextIO
+
+# 対応している出力形式（拡張子）
+OUTPUT_FORMATS = ("md", "srt", "vtt", "json", "tsv")
+DEFAULT_OUTPUT_FORMATS = ("md",)
+
+
+def format_timestamp(
+    seconds: float,
+    always_include_hours: bool = False,
+    decimal_marker: str = ".",
+    precision: int = 3,
+) -> str:
+    """秒数を [HH:]MM:SS[.mmm] 形式のタイムスタンプに変換する.
+
+    Args:
+    ----
+        seconds: 秒数
+        always_include_hours: 1時間未満でも時間を含めるかどうか
+        decimal_marker: 小数点の文字（SRTは","）
+        precision: 秒の小数部の桁数（0の場合は小数部を含めない）
+
+    Returns:
+    -------
+        タイムスタンプ文字列
+    """
+    scale = 10**precision
+    total = round(max(0.0, seconds) * scale)
+    hours, rest = divmod(total, 3600 * scale)
+    minutes, rest = divmod(rest, 60 * scale)
+    whole, fraction = divmod(rest, scale)
+    text = f"{minutes:02d}:{whole:02d}"
+    if hours or always_include_hours:
+        text = f"{hours:02d}:{text}"
+    if precision:
+        text += f"{decimal_marker}{fraction:0{precision}d}"
+    return text
+
+
+def _subtitle_text(segment: dict[str, Any]) -> str:
+    """字幕のキューに書くテキスト（区切りの"-->"を含まないようにする）."""
+    return str(segment["text"]).strip().replace("-->", "->")
+
+
+def _json_default(value: Any) -> Any:
+    """numpyの数値や配列をJSONで扱える値にする."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"JSONに変換できない値: {type(value).__name__}")
+
+
+class ResultWriter:
+    """1つの出力形式のライターの基底クラス.
+
+    write_header、セグメントごとのwrite_segment、write_footerの順に呼ばれる。
+    """
+
+    extension = ""
+
+    def __init__(self, include_timestamps: bool = False) -> None:
+        """ResultWriterを初期化する.
+
+        Args:
+        ----
+            include_timestamps: タイムスタンプを含めるかどうか
+                （字幕など時刻が必須の形式では無視する）
+        """
+        self.include_timestamps = include_timestamps
+
+    def write_header(
+        self, f: TextIO, result: dict[str, Any], audio_filename: str
+    ) -> None:
+        """セグメントより前の部分を書き込む."""
+
+    def write_segment(self, f: TextIO, index: int, segment: dict[str, Any]) -> None:
+        """1つのセグメントを書き込む."""
+
+    def write_footer(self, f: TextIO, result: dict[str, Any]) -> None:
+        """セグメントより後の部分を書き込む."""
+
+
+class MarkdownWriter(ResultWriter):
+    """履歴や全文検索の対象になるMarkdown."""
+
+    extension = "md"
+
+    def write_header(
+        self, f: TextIO, result: dict[str, Any], audio_filename: str
+    ) -> None:
+        """見出しとファイル情報を書き込む."""
+        f.write("# 文字起こし結果\n\n")
+        f.write(f"**ファイル名**: {audio_filename}\n")
+        f.write(f"**作成日時**: {datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}\n\n")
+        f.write("## 文字起こし内容\n\n")
+        # セグメントがない結果はタイムスタンプなしで本文を書く
+        self._timestamps = self.include_timestamps and "segments" in result
+
+    def write_segment(self, f: TextIO, index: int, segment: dict[str, Any]) -> None:
+        """タイムスタンプ付きの場合は1セグメントを1行で書き込む."""
+        if self._timestamps:
+            start = format_timestamp(segment["start"], precision=0)
+            end = format_timestamp(segment["end"], precision=0)
+            f.write(f"[{start} - {end}] {segment['text'].strip()}\n\n")
+
+    def write_footer(self, f: TextIO, result: dict[str, Any]) -> None:
+        """タイムスタンプなしの場合は本文をまとめて書き込む."""
+        if not self._timestamps:
+            f.write(f"{result['text']}\n")
+
+
+class SrtWriter(ResultWriter):
+    """SubRip字幕（HH:MM:SS,mmm）."""
+
+    extension = "srt"
+
+    def write_segment(self, f: TextIO, index: int, segment: dict[str, Any]) -> None:
+        """番号・時刻・テキストのキューを書き込む."""
+        start = format_timestamp(segment["start"], True, ",")
+        end = format_timestamp(segment["end"], True, ",")
+        f.write(f"{index + 1}\n{start} --> {end}\n{_subtitle_text(segment)}\n\n")
+
+
+class VttWriter(ResultWriter):
+    """WebVTT字幕（HH:MM:SS.mmm）."""
+
+    extension = "vtt"
+
+    def write_header(
+        self, f: TextIO, result: dict[str, Any], audio_filename: str
+    ) -> None:
+        """WEBVTTのシグネチャを書き込む."""
+        f.write("WEBVTT\n\n")
+
+    def write_segment(self, f: TextIO, index: int, segment: dict[str, Any]) -> None:
+        """時刻・テキストのキューを書き込む."""
+        start = format_timestamp(segment["start"], True)
+        end = format_timestamp(segment["end"], True)
+        f.write(f"{start} --> {end}\n{_subtitle_text(segment)}\n\n")
+
+
+class JsonWriter(ResultWriter):
+    """単語ごとの時刻を含むセグメントをそのまま保存するJSON."""
+
+    extension = "json"
+
+    def write_header(
+        self, f: TextIO, result: dict[str, Any], audio_filename: str
+    ) -> None:
+        """セグメント以外の項目を書き込み、segmentsの配列を開く."""
+        f.write("{")
+        f.write(f'"audio_filename": {json.dumps(audio_filename, ensure_ascii=False)}')
+        for key, value in result.items():
+            if key != "segments":
+                f.write(f", {json.dumps(key)}: ")
+                json.dump(value, f, ensure_ascii=False, default=_json_default)
+        f.write(', "segments": [')
+
+    def write_segment(self, f: TextIO, index: int, segment: dict[str, Any]) -> None:
+        """1セグメントを配列の要素として書き込む."""
+        f.write("\n  " if index == 0 else ",\n  ")
+        json.dump(segment, f, ensure_ascii=False, default=_json_default)
+
+    def write_footer(self, f: TextIO, result: dict[str, Any]) -> None:
+        """segmentsの配列とオブジェクトを閉じる."""
+        f.write("\n]}\n" if result.get("segments") else "]}\n")
+
+
+class TsvWriter(ResultWriter):
+    """開始・終了（ミリ秒）とテキストのタブ区切り."""
+
+    extension = "tsv"
+
+    def write_header(
+        self, f: TextIO, result: dict[str, Any], audio_filename: str
+    ) -> None:
+        """列名を書き込む."""
+        f.write("start\tend\ttext\n")
+
+    def write_segment(self, f: TextIO, index: int, segment: dict[str, Any]) -> None:
+        """1セグメントを1行で書き込む."""
+        start = round(segment["start"] * 1000)
+        end = round(segment["end"] * 1000)
+        text = " ".join(str(segment["text"]).split())
+        f.write(f"{start}\t{end}\t{text}\n")
+
+
+WRITERS: dict[str, type[ResultWriter]] = {
+    writer.extension: writer
+    for writer in (MarkdownWriter, SrtWriter, VttWriter, JsonWriter, TsvWriter)
+}
+
+
+def write_outputs(
+    result: dict[str, Any],
+    audio_filename: str,
+    paths: dict[str, Path],
+    include_timestamps: bool = False,
+) -> None:
+    """文字起こし結果を複数の形式で同時に書き出す.
+
+    Args:
+    ----
+        result: 文字起こし結果（text, segments, languageなど）
+        audio_filename: 元の音声ファイル名
+        paths: 形式（拡張子）ごとの出力先
+        include_timestamps: Markdownにタイムスタンプを含めるかどうか
+
+    Raises:
+    ------
+        ValueError: 対応していない形式が含まれる場合
+    """
+    unknown = sorted(set(paths) - set(WRITERS))
+    if unknown:
+        raise ValueError(f"対応していない出力形式: {', '.join(unknown)}")
+
+    with ExitStack() as stack:
+        outputs = []
+        for fmt, path in paths.items():
+            f = stack.enter_context(path.open("w", encoding="utf-8", newline="\n"))
+            writer = WRITERS[fmt](include_timestamps=include_timestamps)
+            writer.write_header(f, result, audio_filename)
+            outputs.append((writer, f))
+
+        for index, segment in enumerate(result.get("segments") or []):
+            for writer, f in outputs:
+                writer.write_segment(f, index, segment)
+
+        for writer, f in outputs:
+            writer.write_footer(f, result)
+
+
+def render_output(
+    result: dict[str, Any],
+    fmt: str,
+    audio_filename: str,
+    include_timestamps: bool = False,
+) -> str:
+    """文字起こし結果を1つの形式の文字列にする（HTTPのレスポンス用）.
+
+    Args:
+    ----
+        result: 文字起こし結果（text, segments, languageなど）
+        fmt: 出力形式（拡張子）
+        audio_filename: 元の音声ファイル名
+        include_timestamps: Markdownにタイムスタンプを含めるかどうか
+
+    Returns:
+    -------
+        書き出した内容
+
+    Raises:
+    ------
+        ValueError: 対応していない形式の場合
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"対応していない出力形式: {fmt}")
+    f = io.StringIO(newline="\n")
+    writer = WRITERS[fmt](include_timestamps=include_timestamps)
+    writer.write_header(f, result, audio_filename)
+    for index, segment in enumerate(result.get("segments") or []):
+        writer.write_segment(f, index, segment)
+    writer.write_footer(f, result)
+    return f.getvalue()
@@ -0,0 +1,222 @@
+"""alignmentモジュールのテスト."""
+
+import json
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from transcription_tool.alignment import (
+    align_transcript,
+    align_words,
+    has_word_timestamps,
+)
+from transcription_tool.audio_cache import AudioCache
+from transcription_tool.history_index import get_history_index
+from transcription_tool.model_registry import ModelRegistry
+from transcription_tool.result_cache import ResultCache
+from transcription_tool.transcriber import Transcriber
+from transcription_tool.utils import save_transcription
+
+
+def _tiny_model() -> Any:
+    """ランダムな重みの小さなWhisperモデル."""
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    torch.manual_seed(0)
+    dims = ModelDimensions(
+        n_mels=80,
+        n_audio_ctx=1500,
+        n_audio_state=32,
+        n_audio_head=2,
+        n_audio_layer=1,
+        n_vocab=51865,
+        n_text_ctx=64,
+        n_text_state=32,
+        n_text_head=2,
+        n_text_layer=2,
+    )
+    model = Whisper(dims).eval()
+    # デコーダの位置埋め込みはtorch.emptyで確保されるため乱数で初期化する
+    torch.nn.init.normal_(model.decoder.positional_embedding, std=0.01)
+    return model
+
+
+def test_align_words_はウィンドウごとに元の時刻で単語を返す() -> None:
+    """30秒を超えて離れたセグメントも元の音声の時刻で単語が付くことを確認"""
+    from whisper.tokenizer import get_tokenizer
+
+    model = _tiny_model()
+    tokenizer = get_tokenizer(True, language="ja", task="transcribe")
+    tokens = [tokenizer.timestamp_begin, *tokenizer.encode("こんにちは")]
+    segments = [
+        {"start": 0.0, "end": 2.0, "text": "こんにちは", "tokens": tokens},
+        # トークンのないセグメントはテキストから作り直す
+        {"start": 40.0, "end": 42.0, "text": "さようなら"},
+    ]
+    audio = np.random.default_rng(0).normal(0, 0.1, 16000 * 45).astype(np.float32)
+
+    aligned = align_words(model, audio, segments, language="ja")
+
+    assert [segment["text"] for segment in aligned] == ["こんにちは", "さようなら"]
+    assert aligned[0]["tokens"] == tokens
+    assert "seek" not in aligned[0] and "words" not in segments[0]
+    assert aligned[0]["words"] and aligned[1]["words"]
+    # ランダムな重みのため、各ウィンドウの範囲に収まることだけを確認する
+    assert all(word["end"] <= 30.0 for word in aligned[0]["words"])
+    assert all(word["start"] >= 30.0 for word in aligned[1]["words"])
+    assert has_word_timestamps({"segments": aligned})
+    assert not has_word_timestamps({"segments": segments})
+
+
+def test_align_words_は30秒を超えるVADのセグメントを発話区間でアライメントする() -> (
+    None
+):
+    """無音を除くと30秒に収まるセグメントの単語が30秒で打ち切られないことを確認"""
+    model = _tiny_model()
+    rng = np.random.default_rng(0)
+    audio = np.zeros(16000 * 70, dtype=np.float32)
+    audio[16000 * 2 : 16000 * 10] = rng.normal(0, 0.3, 16000 * 8)
+    audio[16000 * 50 : 16000 * 58] = rng.normal(0, 0.3, 16000 * 8)
+    # VADで無音を除いてデコードすると、元の音声では56秒にわたるセグメントになる
+    segments = [{"start": 2.0, "end": 58.0, "text": "こんにちは、さようなら。"}]
+
+    aligned = align_words(model, audio, segments, language="ja")
+
+    assert (aligned[0]["start"], aligned[0]["end"]) == (2.0, 58.0)
+    words = aligned[0]["words"]
+    # 最後の単語は後半の発話区間に付く（以前は開始から30秒で打ち切られていた）
+    assert words[-1]["end"] >= 50.0
+    assert all(word["end"] <= 58.0 for word in words)
+
+
+def test_align_words_は発話区間でも30秒を超えるセグメントをトークンの時刻で分ける() -> (
+    None
+):
+    """無音を除いても30秒を超えるセグメントの単語が30秒で打ち切られないことを確認"""
+    from whisper.tokenizer import get_tokenizer
+
+    model = _tiny_model()
+    tokenizer = get_tokenizer(True, language="ja", task="transcribe")
+    begin = tokenizer.timestamp_begin
+    tokens = [
+        begin,
+        *tokenizer.encode("こんにちは"),
+        begin + 750,
+        begin + 750,
+        *tokenizer.encode("元気ですか"),
+        begin + 1400,
+        *tokenizer.encode("さようなら"),
+    ]
+    audio = np.random.default_rng(0).normal(0, 0.3, 16000 * 40).astype(np.float32)
+    segments = [{"start": 0.0, "end": 40.0, "text": "", "tokens": tokens}]
+
+    aligned = align_words(model, audio, segments, language="ja")
+
+    assert aligned[0]["tokens"] == tokens
+    assert (aligned[0]["start"], aligned[0]["end"]) == (0.0, 40.0)
+    words = aligned[0]["words"]
+    assert "".join(word["word"] for word in words).strip() == (
+        "こんにちは元気ですかさようなら"
+    )
+    # 最後のまとまり（28秒以降）の単語は30秒を超えた位置にも付けられる
+    assert words[-1]["end"] > 30.0
+    assert all(word["end"] <= 40.0 for word in words)
+
+
+def test_align_words_はトークンで分けられない長いセグメントをデコードし直す() -> None:
+    """タイムスタンプトークンのない長いセグメントはword_timestampsで求め直すことを確認"""
+    model = _tiny_model()
+    words = [{"word": "こんにちは", "start": 35.0, "end": 36.0, "probability": 0.9}]
+    model.transcribe = Mock(return_value={"segments": [{"words": words}]})
+    audio = np.random.default_rng(0).normal(0, 0.3, 16000 * 40).astype(np.float32)
+    segments = [{"start": 0.0, "end": 40.0, "text": "こんにちは"}]
+
+    aligned = align_words(model, audio, segments, language="ja")
+
+    assert model.transcribe.call_args.kwargs["word_timestamps"] is True
+    assert [word["word"] for word in aligned[0]["words"]] == ["こんにちは"]
+    assert aligned[0]["words"][0]["end"] == pytest.approx(36.0, abs=0.1)
+
+
+@patch("transcription_tool.alignment.align_words")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_add_word_timestamps_は計算結果をキャッシュする(
+    mock_load_model: Mock, mock_ensure: Mock, mock_align: Mock, tmp_path: Path
+) -> None:
+    """同じ結果への2回目の要求ではアライメントしないことを確認"""
+    mock_load_model.return_value = Mock()
+    segments = [{"start": 0.0, "end": 1.0, "text": "テスト", "tokens": [1]}]
+    words = [{"word": "テスト", "start": 0.1, "end": 0.9, "probability": 0.5}]
+    mock_align.return_value = [{**segments[0], "words": words}]
+    transcriber = Transcriber(
+        model_name="tiny",
+        device="cpu",
+        registry=ModelRegistry(),
+        result_cache=ResultCache(cache_dir=tmp_path / "cache"),
+    )
+    audio = np.zeros(16000, dtype=np.float32)
+    result = {"text": "テスト", "segments": segments, "language": "ja"}
+
+    first = transcriber.add_word_timestamps(audio, result)
+    second = transcriber.add_word_timestamps(audio, result)
+
+    assert first["segments"][0]["words"] == words
+    assert second == first
+    mock_align.assert_called_once()
+    assert "words" not in result["segments"][0]
+
+
+@patch("transcription_tool.alignment.Transcriber")
+@patch("transcription_tool.alignment.get_result_cache")
+@patch("transcription_tool.alignment.get_audio_cache")
+def test_保存時に登録した情報から単語のタイムスタンプを計算する(
+    mock_get_audio_cache: Mock,
+    mock_get_result_cache: Mock,
+    mock_transcriber_class: Mock,
+    tmp_path: Path,
+) -> None:
+    """履歴のファイル名だけで、音声キャッシュの音声を使って計算できることを確認"""
+    audio_cache = AudioCache(cache_dir=tmp_path / "audio")
+    audio_cache._store(audio_cache._path("hash"), np.zeros(16000, dtype=np.float32))
+    output_dir = tmp_path / "out"
+    result = {
+        "text": "テスト",
+        "segments": [{"start": 0.0, "end": 1.0, "text": "テスト", "tokens": [5]}],
+        "language": "ja",
+        "audio_hash": "hash",
+        "model": "small",
+    }
+    paths = save_transcription(result, "audio.wav", output_dir=output_dir)
+
+    aligned = {
+        **result,
+        "segments": [{**result["segments"][0], "words": [{"word": "テスト"}]}],
+    }
+    mock_get_audio_cache.return_value = audio_cache
+    mock_transcriber_class.return_value.add_word_timestamps.return_value = aligned
+
+    words_path = align_transcript(paths["md"].name, output_dir)
+
+    assert mock_transcriber_class.call_args.kwargs["model_name"] == "small"
+    audio, source, _ = (
+        mock_transcriber_class.return_value.add_word_timestamps.call_args.args
+    )
+    assert len(audio) == 16000
+    assert source["segments"] == result["segments"]
+    assert words_path == output_dir / f"{paths['md'].stem}.words.json"
+    saved = json.loads(words_path.read_text(encoding="utf-8"))
+    assert saved["segments"][0]["words"] == [{"word": "テスト"}]
+
+
+def test_計算に必要な情報がない結果ではエラーになる(tmp_path: Path) -> None:
+    """音声のハッシュなしで保存した結果ではValueErrorになることを確認"""
+    paths = save_transcription({"text": "テスト"}, "audio.wav", output_dir=tmp_path)
+    assert get_history_index(tmp_path).get_alignment_source(paths["md"].name) is None
+
+    with pytest.raises(ValueError, match="情報がありません"):
+        align_transcript(paths["md"].name, tmp_path)
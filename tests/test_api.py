@@ -0,0 +1,86 @@
+"""apiモジュールのテスト."""
+
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from transcription_tool.api import create_api
+
+
+def _wait_until_finished(client: TestClient, job_id: str) -> dict:
+    """ジョブが終了するまで状態の変化を待ちながらポーリングする."""
+    for _ in range(50):
+        status = client.get(f"/jobs/{job_id}", params={"wait": 1}).json()
+        if status["status"] in ("done", "failed", "cancelled"):
+            return status
+    raise AssertionError("ジョブが終了しませんでした")
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_投入したジョブの途中経過と結果を取得できる(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock, tmp_path: Path
+) -> None:
+    """POST /jobsで投入し、状態のポーリング後に各形式の結果が取得できることを確認"""
+    mock_load_audio.return_value = np.zeros(16000 * 5, dtype=np.float32)
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {
+        "text": "テスト",
+        "segments": [{"id": 0, "start": 0.0, "end": 1.5, "text": "テスト"}],
+        "language": "ja",
+    }
+    mock_load_model.return_value = mock_model
+    client = TestClient(create_api(upload_dir=tmp_path / "uploads"))
+
+    response = client.post(
+        "/jobs",
+        params={"filename": "会議.wav", "model": "tiny", "language": "ja"},
+        content=b"audio",
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.headers["Location"] == f"/jobs/{job_id}"
+
+    status = _wait_until_finished(client, job_id)
+    assert status["status"] == "done"
+    assert [segment["text"] for segment in status["segments"]] == ["テスト"]
+    assert client.get(f"/jobs/{job_id}", params={"since": 1}).json()["segments"] == []
+    assert not list((tmp_path / "uploads").iterdir())  # 終了後に音声を削除する
+
+    srt = client.get(f"/jobs/{job_id}/result", params={"format": "srt"})
+    assert srt.headers["content-type"].startswith("application/x-subrip")
+    assert "00:00:00,000 --> 00:00:01,500" in srt.text
+    result = client.get(f"/jobs/{job_id}/result").json()
+    assert result["language"] == "ja"
+    assert result["segments"][0]["text"] == "テスト"
+
+
+def test_不正なリクエストはエラーを返す(tmp_path: Path) -> None:
+    """未対応の形式・空の音声・存在しないジョブがエラーになることを確認"""
+    client = TestClient(create_api(upload_dir=tmp_path))
+
+    response = client.post("/jobs", params={"filename": "a.txt"}, content=b"x")
+    assert response.status_code == 400
+    response = client.post(
+        "/jobs", params={"filename": "a.wav", "model": "tiny"}, content=b""
+    )
+    assert response.status_code == 400
+    assert not list(tmp_path.iterdir())
+    assert client.get("/jobs/unknown").status_code == 404
+    assert client.get("/jobs/unknown/result").status_code == 404
+
+
+def test_上限を超える音声は413を返す(tmp_path: Path) -> None:
+    """最大サイズを超えたアップロードを拒否し、途中まで書いた音声を削除することを確認"""
+    client = TestClient(create_api(upload_dir=tmp_path, max_upload_mb=1))
+
+    response = client.post(
+        "/jobs",
+        params={"filename": "a.wav", "model": "tiny"},
+        content=b"x" * (2**20 + 1),
+    )
+    assert response.status_code == 413
+    assert not list(tmp_path.iterdir())
@@ -1,8 +1,19 @@
 """Gradioアプリケーションのテスト"""
 
+from collections.abc import Iterator
+from pathlib import Path
 from unittest.mock import Mock, patch
 
-from transcription_tool.app import create_app, transcribe_audio
+from transcription_tool.app import (
+    cancel_job,
+    create_app,
+    get_model_choices,
+    run_scheduled,
+    transcribe_audio,
+    transcribe_audio_stream,
+)
+from transcription_tool.scheduler import get_scheduler
+from transcription_tool.transcriber import StreamUpdate
 
 
 def test_create_app_関数が存在する() -> None:
@@ -26,7 +37,7 @@ def test_create_app_が正しいインターフェースを返す() -> None:
 
 
 @patch("transcription_tool.app.Transcriber")
-@patch("transcription_tool.app.save_transcription_as_markdown")
+@patch("transcription_tool.app.save_transcription")
 def test_transcribe_audio_正常な処理(
     mock_save: Mock, mock_transcriber_class: Mock
 ) -> None:
@@ -38,7 +49,7 @@ def test_transcribe_audio_正常な処理(
         "language": "ja",
     }
     mock_transcriber_class.return_value = mock_transcriber
-    mock_save.return_value = "/path/to/output.md"
+    mock_save.return_value = {"md": Path("/path/to/output.md")}
 
     # テスト実行
     audio_path = "/test/audio.wav"
@@ -58,3 +69,85 @@ def test_transcribe_audio_エラー処理() -> None:
     # 存在しないファイルでテスト
     result = transcribe_audio(None, "tiny", False)
     assert "エラー" in result or "選択" in result
+
+
+@patch("transcription_tool.app.ensure_model_downloaded")
+@patch("transcription_tool.app.Transcriber")
+@patch("transcription_tool.app.save_transcription")
+def test_transcribe_audio_stream_は途中経過を逐次返す(
+    mock_save: Mock, mock_transcriber_class: Mock, mock_ensure: Mock
+) -> None:
+    """transcribe_audio_streamがウィンドウごとにテキストを追記して返すことを確認"""
+    mock_transcriber = Mock()
+    mock_transcriber.transcribe_stream.return_value = iter(
+        [
+            StreamUpdate(
+                segments=[{"start": 0.0, "end": 2.0, "text": "一つ目。"}],
+                position=30.0,
+                duration=60.0,
+                language="ja",
+            ),
+            StreamUpdate(
+                segments=[{"start": 31.0, "end": 33.0, "text": "二つ目。"}],
+                position=60.0,
+                duration=60.0,
+                language="ja",
+            ),
+        ]
+    )
+    mock_transcriber.source_metadata.return_value = {"audio_hash": "abc"}
+    mock_transcriber_class.return_value = mock_transcriber
+    mock_save.return_value = {"md": Path("/path/to/output.md")}
+
+    messages = list(transcribe_audio_stream("/test/audio.wav", "tiny", False))
+
+    assert len(messages) == 3
+    assert "一つ目。" in messages[0] and "二つ目。" not in messages[0]
+    assert "一つ目。二つ目。" in messages[1]
+    assert "完了" in messages[2]
+    saved_result = mock_save.call_args.args[0]
+    assert saved_result["text"] == "一つ目。二つ目。"
+    assert len(saved_result["segments"]) == 2
+    assert saved_result["audio_hash"] == "abc"
+
+
+def test_transcribe_audio_stream_ファイル未選択() -> None:
+    """ファイル未選択の場合にエラーメッセージが返されることを確認"""
+    messages = list(transcribe_audio_stream(None, "tiny", False))
+    assert len(messages) == 1
+    assert "選択" in messages[0]
+
+
+def test_run_scheduled_はジョブの途中経過とジョブIDを返す() -> None:
+    """スケジューラで実行した処理のメッセージがジョブIDと共に返ることを確認"""
+
+    def produce() -> Iterator[str]:
+        yield "途中"
+        yield "完了"
+
+    outputs = list(run_scheduled(None, "tiny", produce, poll_interval=0.01))
+
+    assert [message for message, _ in outputs][-2:] == ["途中", "完了"]
+    job_id = outputs[-1][1]
+    assert get_scheduler().get_job(job_id) is not None
+    assert "キャンセルできません" in cancel_job(job_id)
+
+
+@patch("transcription_tool.app.is_model_downloaded")
+@patch("transcription_tool.app.get_model_registry")
+def test_get_model_choices_はロード済みとダウンロード済みを区別する(
+    mock_get_registry: Mock, mock_is_downloaded: Mock
+) -> None:
+    """ロード済み・ダウンロード済み・未ダウンロードで表示が異なることを確認"""
+    mock_get_registry.return_value.is_loaded.side_effect = (
+        lambda name, dtype=None: name == "tiny" and dtype == "float32"
+    )
+    mock_is_downloaded.side_effect = lambda name: name in ("tiny", "base")
+
+    labels = dict((value, label) for label, value in get_model_choices())
+
+    assert labels["tiny"].endswith("●")
+    assert labels["base"].endswith("✓")
+    assert labels["small"].endswith("↓")
+    # int8の選択肢は量子化モデルのロード状況で判定する
+    assert labels["medium:int8"].endswith("↓")
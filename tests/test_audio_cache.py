@@ -0,0 +1,86 @@
+"""audio_cacheモジュールのテスト."""
+
+import os
+from pathlib import Path
+from unittest.mock import Mock
+
+import numpy as np
+
+from transcription_tool.audio_cache import AudioCache
+
+
+def _decoder(samples: int = 16000) -> Mock:
+    """指定サンプル数の音声を返すモックのデコーダを作成する."""
+    return Mock(return_value=np.linspace(-1, 1, samples, dtype=np.float32))
+
+
+def test_2回目はデコードせずメモリマップで読み込む(tmp_path: Path) -> None:
+    """同じ内容の音声はデコードが1回だけで、2回目はメモリマップになることを確認."""
+    decoder = _decoder()
+    cache = AudioCache(cache_dir=tmp_path / "cache", decoder=decoder)
+    first = tmp_path / "first.wav"
+    second = tmp_path / "second.wav"
+    first.write_bytes(b"same audio")
+    second.write_bytes(b"same audio")
+
+    decoded = cache.load(first)
+    cached = cache.load(second)
+
+    decoder.assert_called_once_with(str(first))
+    assert isinstance(cached, np.memmap)
+    np.testing.assert_array_equal(decoded, cached)
+    stats = cache.stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
+
+
+def test_メモリマップした配列は書き込み可能(tmp_path: Path) -> None:
+    """copy-on-writeでマップし、書き込んでもキャッシュが変わらないことを確認."""
+    cache = AudioCache(cache_dir=tmp_path / "cache", decoder=_decoder())
+    audio_file = tmp_path / "audio.wav"
+    audio_file.write_bytes(b"audio")
+    cache.load(audio_file)
+
+    cached = cache.load(audio_file)
+    assert cached.flags.writeable
+    cached[:] = 0
+
+    assert cache.load(audio_file).any()
+
+
+def test_内容が異なる音声は別々にキャッシュされる(tmp_path: Path) -> None:
+    """ハッシュが異なれば別のエントリとして保存されることを確認."""
+    decoder = _decoder()
+    cache = AudioCache(cache_dir=tmp_path / "cache", decoder=decoder)
+    first = tmp_path / "first.wav"
+    second = tmp_path / "second.wav"
+    first.write_bytes(b"first")
+    second.write_bytes(b"second")
+
+    cache.load(first)
+    cache.load(second)
+
+    assert decoder.call_count == 2
+    assert len(list((tmp_path / "cache").glob("*.npy"))) == 2
+
+
+def test_容量上限を超えると古いものから削除される(tmp_path: Path) -> None:
+    """合計サイズが上限を超えた場合に最終アクセスが古い音声が削除されることを確認."""
+    # 16000サンプル × 4バイト ≒ 0.06MB
+    cache = AudioCache(
+        cache_dir=tmp_path / "cache", max_size_mb=0.1, decoder=_decoder()
+    )
+    files = []
+    for i in range(2):
+        audio_file = tmp_path / f"{i}.wav"
+        audio_file.write_bytes(f"audio{i}".encode())
+        files.append(audio_file)
+
+    cache.load(files[0])
+    entry = next((tmp_path / "cache").glob("*.npy"))
+    os.utime(entry, (1, 1))
+    cache.load(files[1])
+
+    assert not entry.exists()
+    assert cache.stats().evictions == 1
+    assert cache.size_mb() <= 0.1
@@ -0,0 +1,108 @@
+"""audio_inputモジュールのテスト."""
+
+import io
+import shutil
+import wave
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from transcription_tool.audio_input import (
+    decode_audio_bytes,
+    from_pcm,
+    load_audio_file,
+    load_audio_input,
+)
+from transcription_tool.model_registry import ModelRegistry
+from transcription_tool.result_cache import ResultCache
+from transcription_tool.transcriber import Transcriber
+
+
+def _wav_bytes(pcm: np.ndarray, sample_rate: int = 16000, channels: int = 1) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def test_16kHzモノラルのfloat32配列はコピーしない() -> None:
+    """変換が不要な配列はそのまま返されることを確認."""
+    audio = np.zeros(16000, dtype=np.float32)
+    assert from_pcm(audio) is audio
+
+
+def test_整数型のステレオ配列をモノラルのfloat32にする() -> None:
+    """gr.Audio(type="numpy")と同じint16の2次元配列を変換できることを確認."""
+    pcm = np.array([[16384, -16384], [32767, 32767]], dtype=np.int16)
+    audio = load_audio_input((16000, pcm))
+    assert audio.dtype == np.float32
+    np.testing.assert_allclose(audio, [0.0, 32767 / 32768], atol=1e-6)
+
+
+def test_符号なし8bitは中央を無音とする() -> None:
+    """8bitのPCMは128が0.0になることを確認."""
+    audio = from_pcm(np.array([0, 128, 255], dtype=np.uint8))
+    np.testing.assert_allclose(audio, [-1.0, 0.0, 127 / 128])
+
+
+def test_16kHzのWAVのバイト列はffmpegを使わずに読み込む() -> None:
+    """WAVのヘッダを解析してPCMを取り出すことを確認."""
+    pcm = np.array([0, 8192, -8192, 32767], dtype=np.int16)
+    with patch("subprocess.run") as mock_run:
+        audio = decode_audio_bytes(_wav_bytes(pcm))
+    mock_run.assert_not_called()
+    np.testing.assert_allclose(audio, pcm / 32768.0)
+
+
+def test_16kHzのWAVファイルはffmpegを使わずに読み込む(tmp_path: Path) -> None:
+    """load_audio_fileがWAVをwhisper.load_audioを使わずに読み込むことを確認."""
+    pcm = np.array([[100, 300], [-100, -300]], dtype=np.int16)
+    wav_file = tmp_path / "stereo.wav"
+    wav_file.write_bytes(_wav_bytes(pcm.reshape(-1), channels=2))
+    with patch("whisper.load_audio") as mock_load_audio:
+        audio = load_audio_file(wav_file)
+    mock_load_audio.assert_not_called()
+    np.testing.assert_allclose(audio, [200 / 32768, -200 / 32768], atol=1e-7)
+
+
+def test_対応していない入力はTypeError() -> None:
+    """配列・バイト列・パス以外の入力はTypeErrorになることを確認."""
+    with pytest.raises(TypeError, match="対応していない音声の入力"):
+        load_audio_input([0.0, 0.1])  # type: ignore[arg-type]
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpegが必要")
+def test_16kHz以外の配列はリサンプリングする() -> None:
+    """48kHzの配列が長さ1/3の16kHzの配列になることを確認."""
+    audio = from_pcm(np.zeros(48000, dtype=np.float32), 48000)
+    assert len(audio) == pytest.approx(16000, abs=32)
+
+
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_配列をそのままモデルに渡して文字起こしする(
+    mock_load_model: Mock, mock_ensure: Mock, tmp_path: Path
+) -> None:
+    """メモリ上の配列がコピーされずにモデルに渡され、結果がキャッシュされることを確認."""
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {"text": "配列", "segments": []}
+    mock_load_model.return_value = mock_model
+    audio = np.zeros(3 * 16000, dtype=np.float32)
+
+    transcriber = Transcriber(
+        model_name="tiny",
+        device="cpu",
+        registry=ModelRegistry(),
+        result_cache=ResultCache(cache_dir=tmp_path / "cache"),
+    )
+    result = transcriber.transcribe(audio)
+    transcriber.transcribe(audio.copy())
+
+    assert mock_model.transcribe.call_args.args[0] is audio
+    mock_model.transcribe.assert_called_once()
+    assert result["duration"] == 3.0
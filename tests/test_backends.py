@@ -0,0 +1,128 @@
+"""backendsモジュールのテスト"""
+
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from transcription_tool.backends import (
+    BATCHED_MIN_DURATION,
+    FasterWhisperBackend,
+    FasterWhisperModel,
+    InferenceBackend,
+    WhisperBackend,
+    get_backend,
+)
+from transcription_tool.chunking import SAMPLE_RATE
+from transcription_tool.model_registry import ModelRegistry
+from transcription_tool.transcriber import Transcriber
+
+
+def _segment(start: float, end: float, text: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        start=start,
+        end=end,
+        text=text,
+        tokens=[1, 2],
+        temperature=0.0,
+        avg_logprob=-0.1,
+        compression_ratio=1.2,
+        no_speech_prob=0.01,
+    )
+
+
+def _fake_model(*segments: SimpleNamespace) -> Mock:
+    model = Mock()
+    model.transcribe.return_value = (
+        iter(segments),
+        SimpleNamespace(language="ja"),
+    )
+    return model
+
+
+def test_get_backend_存在しない名前はエラーになる() -> None:
+    """未対応のバックエンド名を指定した場合、ValueErrorが発生することを確認"""
+    assert get_backend("whisper").name == "whisper"
+    with pytest.raises(ValueError, match="推論バックエンド"):
+        get_backend("unknown")
+    with pytest.raises(TypeError):
+        InferenceBackend()  # type: ignore[abstract]
+
+
+def test_check_デバイスとdtypeの組み合わせを検証する() -> None:
+    """バックエンドごとに使用できないdtypeがエラーになることを確認"""
+    with pytest.raises(ValueError, match="int8"):
+        WhisperBackend().check("cuda", "int8")
+    FasterWhisperBackend().check("cuda", "int8")
+    with pytest.raises(ValueError, match="float16"):
+        FasterWhisperBackend().check("cpu", "float16")
+
+
+def test_FasterWhisperModel_whisperと同じ形式の結果を返す() -> None:
+    """セグメントとテキスト・言語がopenai-whisperと同じ辞書で返ることを確認"""
+    model = _fake_model(_segment(0.0, 1.5, "こんにちは。"), _segment(1.5, 3.0, "元気"))
+    adapter = FasterWhisperModel(model)
+
+    result = adapter.transcribe(
+        np.zeros(SAMPLE_RATE, dtype=np.float32),
+        verbose=False,
+        fp16=False,
+        language=None,
+        initial_prompt="前の文",
+    )
+
+    assert result["text"] == "こんにちは。元気"
+    assert result["language"] == "ja"
+    assert [s["id"] for s in result["segments"]] == [0, 1]
+    assert result["segments"][1]["start"] == 1.5
+    # faster-whisperが受け付けないオプションとNoneは渡さない（貪欲法は明示する）
+    assert model.transcribe.call_args.kwargs == {
+        "initial_prompt": "前の文",
+        "beam_size": 1,
+    }
+    adapter.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), beam_size=5)
+    assert model.transcribe.call_args.kwargs == {"beam_size": 5}
+
+
+def test_FasterWhisperModel_長い音声はバッチ推論を使う() -> None:
+    """BATCHED_MIN_DURATION以上の音声でバッチ推論のパイプラインを使うことを確認"""
+    model = _fake_model()
+    pipeline = _fake_model(_segment(0.0, 30.0, "長い音声"))
+    adapter = FasterWhisperModel(model, batch_size=4)
+    audio = np.zeros(int(BATCHED_MIN_DURATION * SAMPLE_RATE), dtype=np.float32)
+
+    with patch.object(adapter, "_batched_pipeline", return_value=pipeline):
+        result = adapter.transcribe(audio, condition_on_previous_text=True)
+
+    assert result["text"] == "長い音声"
+    model.transcribe.assert_not_called()
+    assert pipeline.transcribe.call_args.kwargs == {"batch_size": 4, "beam_size": 1}
+
+
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+def test_Transcriber_バックエンドごとに別のモデルとして登録する(
+    mock_ensure: Mock,
+) -> None:
+    """faster-whisperを指定した場合、専用の形式でダウンロード・ロードすることを確認"""
+    registry = ModelRegistry()
+    loaded: list[Any] = []
+
+    def fake_load(*args: Any) -> Mock:
+        loaded.append(args[:3])
+        return Mock()
+
+    with patch.object(FasterWhisperBackend, "load_model", side_effect=fake_load):
+        transcriber = Transcriber(
+            "tiny",
+            device="cpu",
+            dtype="int8",
+            registry=registry,
+            backend="faster-whisper",
+        )
+        transcriber._load_model()
+
+    assert loaded == [("tiny", "cpu", "int8")]
+    assert mock_ensure.call_args.kwargs["backend"] == "faster-whisper"
+    assert registry.loaded_keys() == [("tiny", "cpu", "int8", "faster-whisper")]
@@ -0,0 +1,193 @@
+"""batchモジュールのテスト."""
+
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from transcription_tool.batch import (
+    JOURNAL_FILENAME,
+    BatchJournal,
+    collect_audio_files,
+    collect_audio_inputs,
+    run_batch,
+)
+
+
+def _touch(path: Path, content: bytes = b"audio") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_対応フォーマットの音声だけが集められる(tmp_path: Path) -> None:
+    """ディレクトリ・globから対応フォーマットのファイルだけが集まることを確認."""
+    wav = _touch(tmp_path / "a.wav")
+    mp3 = _touch(tmp_path / "b.MP3")
+    _touch(tmp_path / "notes.txt")
+    nested = _touch(tmp_path / "sub" / "c.m4a")
+
+    assert collect_audio_files([str(tmp_path)]) == sorted(
+        [wav.resolve(), mp3.resolve()]
+    )
+    assert nested.resolve() in collect_audio_files([str(tmp_path)], recursive=True)
+    assert collect_audio_files([str(tmp_path / "*.wav")]) == [wav.resolve()]
+    # 重複指定しても1回だけ
+    assert collect_audio_files([str(wav), str(tmp_path / "*.wav")]) == [wav.resolve()]
+
+
+def test_ジャーナルは内容が変わったファイルを未処理として扱う(tmp_path: Path) -> None:
+    """記録後にファイルが更新された場合は再処理対象になることを確認."""
+    audio = _touch(tmp_path / "a.wav")
+    journal_path = tmp_path / JOURNAL_FILENAME
+
+    BatchJournal(journal_path).record(audio, "done", duration=1.0)
+    assert BatchJournal(journal_path).is_done(audio)
+
+    audio.write_bytes(b"changed audio")
+    assert not BatchJournal(journal_path).is_done(audio)
+
+
+def test_ジャーナルは失敗したファイルを処理済みにしない(tmp_path: Path) -> None:
+    """failedとして記録されたファイルは再実行時に処理されることを確認."""
+    audio = _touch(tmp_path / "a.wav")
+    journal_path = tmp_path / JOURNAL_FILENAME
+
+    BatchJournal(journal_path).record(audio, "failed", error="boom")
+    assert not BatchJournal(journal_path).is_done(audio)
+
+
+@patch("transcription_tool.batch.Transcriber")
+def test_run_batch_は処理済みのファイルをスキップして再開できる(
+    mock_transcriber_class: Mock, tmp_path: Path
+) -> None:
+    """出力済み・ジャーナル記録済みのファイルがスキップされることを確認."""
+    mock_transcriber = Mock()
+    mock_transcriber.transcribe.return_value = {
+        "text": "テスト",
+        "language": "ja",
+        "duration": 1800.0,
+    }
+    mock_transcriber_class.return_value = mock_transcriber
+
+    inputs = tmp_path / "inputs"
+    output_dir = tmp_path / "out"
+    files = [_touch(inputs / f"{name}.wav", name.encode()) for name in "abc"]
+    # aは出力済み
+    _touch(output_dir / "a.md", b"done")
+
+    summary = run_batch(files, output_dir, model_name="tiny")
+
+    assert summary.skipped == [files[0]]
+    assert summary.processed == files[1:]
+    assert summary.audio_seconds == 3600.0
+    assert (output_dir / "b.md").exists()
+    assert (output_dir / "c.md").exists()
+
+    # 再実行ではジャーナルによりすべてスキップされる
+    (output_dir / "b.md").unlink()
+    mock_transcriber.transcribe.reset_mock()
+    summary = run_batch(files, output_dir, model_name="tiny")
+    assert summary.processed == []
+    assert len(summary.skipped) == 3
+    mock_transcriber.transcribe.assert_not_called()
+
+
+@patch("transcription_tool.batch.Transcriber")
+def test_run_batch_は失敗したファイルを記録して続行する(
+    mock_transcriber_class: Mock, tmp_path: Path
+) -> None:
+    """1ファイルの失敗で処理全体が止まらないことを確認."""
+    mock_transcriber = Mock()
+    mock_transcriber.transcribe.side_effect = [
+        RuntimeError("decode error"),
+        {"text": "テスト", "duration": 60.0},
+    ]
+    mock_transcriber_class.return_value = mock_transcriber
+
+    files = [_touch(tmp_path / f"{name}.wav", name.encode()) for name in "ab"]
+    summary = run_batch(files, tmp_path / "out", model_name="tiny")
+
+    assert summary.failed == {files[0]: "decode error"}
+    assert summary.processed == [files[1]]
+    assert summary.throughput > 0
+
+
+@patch("transcription_tool.batch.Transcriber")
+def test_run_batch_は指定した形式で保存する(
+    mock_transcriber_class: Mock, tmp_path: Path
+) -> None:
+    """formatsに指定した形式のファイルが音声ファイル名で保存されることを確認."""
+    mock_transcriber = Mock()
+    mock_transcriber.transcribe.return_value = {
+        "text": "テスト",
+        "segments": [{"start": 0.0, "end": 1.0, "text": "テスト"}],
+        "duration": 1.0,
+    }
+    mock_transcriber_class.return_value = mock_transcriber
+
+    files = [_touch(tmp_path / "a.wav", b"a")]
+    output_dir = tmp_path / "out"
+    summary = run_batch(files, output_dir, model_name="tiny", formats=["srt", "tsv"])
+
+    assert summary.processed == files
+    assert (output_dir / "a.srt").exists()
+    assert (output_dir / "a.tsv").exists()
+    assert not (output_dir / "a.md").exists()
+
+
+@patch("transcription_tool.batch.Transcriber")
+def test_run_batch_は同名の音声を別のファイルに保存する(
+    mock_transcriber_class: Mock, tmp_path: Path
+) -> None:
+    """拡張子違い・サブディレクトリ違いの同名の音声の出力が衝突しないことを確認."""
+    mock_transcriber = Mock()
+    mock_transcriber.transcribe.return_value = {"text": "テスト", "duration": 1.0}
+    mock_transcriber_class.return_value = mock_transcriber
+
+    inputs = tmp_path / "inputs"
+    files = [
+        _touch(inputs / "a.wav"),
+        _touch(inputs / "a.mp3"),
+        _touch(inputs / "x" / "b.wav"),
+        _touch(inputs / "y" / "b.wav"),
+    ]
+    output_dir = tmp_path / "out"
+    summary = run_batch(files, output_dir, model_name="tiny")
+
+    assert summary.processed == files
+    assert summary.skipped == []
+    for name in ["a_wav.md", "a_mp3.md", "x/b.md", "y/b.md"]:
+        assert (output_dir / name).exists()
+
+
+@patch("transcription_tool.batch.Transcriber")
+def test_run_batch_は入力を追加しても既存の出力名を変えない(
+    mock_transcriber_class: Mock, tmp_path: Path
+) -> None:
+    """入力を追加して再実行しても、前回の出力ファイル名が維持されることを確認."""
+    mock_transcriber = Mock()
+    mock_transcriber.transcribe.return_value = {"text": "テスト", "duration": 1.0}
+    mock_transcriber_class.return_value = mock_transcriber
+
+    first = tmp_path / "day1"
+    second = tmp_path / "day2"
+    _touch(first / "a.wav")
+    _touch(second / "b.wav")
+    _touch(second / "a.wav")
+    output_dir = tmp_path / "out"
+
+    roots = collect_audio_inputs([str(first)])
+    run_batch(list(roots), output_dir, model_name="tiny", input_roots=roots)
+    assert (output_dir / "a.md").exists()
+
+    roots = collect_audio_inputs([str(first), str(second / "b.wav")])
+    summary = run_batch(list(roots), output_dir, model_name="tiny", input_roots=roots)
+    assert summary.skipped == [(first / "a.wav").resolve()]
+    assert (output_dir / "b.md").exists()
+    assert not (output_dir / "day1").exists()
+
+    # 別の入力にある同名の音声は衝突する場合だけ区別し、上書きしない
+    roots = collect_audio_inputs([str(first), str(second)])
+    summary = run_batch(list(roots), output_dir, model_name="tiny", input_roots=roots)
+    assert summary.processed == [(second / "a.wav").resolve()]
+    assert (output_dir / "a.md").exists()
+    assert (output_dir / "day2" / "a.md").exists()
@@ -0,0 +1,49 @@
+"""ベンチマークスイートのテスト."""
+
+import wave
+from pathlib import Path
+
+from benchmarks.compare import compare_results, find_regressions
+from benchmarks.suite import character_error_rate
+from benchmarks.synthetic import (
+    SAMPLE_RATE,
+    generate_speech_like_audio,
+    write_wav,
+)
+
+
+def _results(**values: float) -> dict:
+    return {"metrics": {k: {"value": v, "unit": "s"} for k, v in values.items()}}
+
+
+def test_合成音声は指定した長さで再現性がある(tmp_path: Path) -> None:
+    """同じシードからは同じ長さ・内容の音声が生成されることを確認."""
+    audio = generate_speech_like_audio(3.0, seed=1)
+    assert len(audio) == 3 * SAMPLE_RATE
+    assert (audio == generate_speech_like_audio(3.0, seed=1)).all()
+    assert abs(audio).max() <= 1.0
+
+    path = write_wav(tmp_path / "a.wav", audio)
+    with wave.open(str(path)) as f:
+        assert f.getframerate() == SAMPLE_RATE
+        assert f.getnframes() == len(audio)
+
+
+def test_閾値を超えて悪化した指標だけが検出される() -> None:
+    """変化率が閾値を超える指標だけが劣化として扱われることを確認."""
+    baseline = _results(load=1.0, rtf=0.5, removed=1.0)
+    current = _results(load=1.05, rtf=0.6, added=1.0)
+
+    comparisons = compare_results(baseline, current)
+
+    assert [c.name for c in comparisons] == ["load", "rtf"]
+    regressions = find_regressions(comparisons, threshold=0.1)
+    assert [c.name for c in regressions] == ["rtf"]
+
+
+def test_文字誤り率は編集距離を参照の文字数で割った値() -> None:
+    """置換・挿入・削除を数え、空白を無視して文字誤り率を計算することを確認."""
+    assert character_error_rate("今日は晴れ", "今日は晴れ") == 0.0
+    assert character_error_rate("今日は晴れ", "今日は 雨") == 0.4
+    assert character_error_rate("abc", "abcd") == 1 / 3
+    assert character_error_rate("", "") == 0.0
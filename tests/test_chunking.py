@@ -0,0 +1,98 @@
+"""chunkingモジュールのテスト."""
+
+import numpy as np
+import pytest
+from transcription_tool.chunking import (
+    SAMPLE_RATE,
+    AudioChunk,
+    find_silence_points,
+    merge_chunk_results,
+    plan_chunks,
+)
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_無音区間の中央が検出される() -> None:
+    """音声の間にある無音区間の中央の時刻が返されることを確認."""
+    audio = np.concatenate([_tone(2.0), _silence(1.0), _tone(2.0)])
+    points = find_silence_points(audio)
+    assert len(points) == 1
+    assert points[0] == pytest.approx(2.5, abs=0.05)
+
+
+def test_短い無音は分割点にしない() -> None:
+    """min_silenceより短い無音は無視されることを確認."""
+    audio = np.concatenate([_tone(2.0), _silence(0.1), _tone(2.0)])
+    assert find_silence_points(audio, min_silence=0.3) == []
+
+
+def test_チャンクは無音点で区切られる() -> None:
+    """目標長の後半にある無音点で分割されることを確認."""
+    chunks = plan_chunks(250.0, [70.0, 100.0, 190.0], chunk_length=120.0, overlap=2)
+    assert [c.keep_start for c in chunks] == [0.0, 100.0, 190.0]
+    assert [c.keep_end for c in chunks] == [100.0, 190.0, 250.0]
+    # 先頭と末尾以外は前後にオーバーラップする
+    assert chunks[0].start == 0.0
+    assert chunks[0].end == 102.0
+    assert chunks[1].start == 98.0
+    assert chunks[2].end == 250.0
+
+
+def test_無音点がない場合は目標長で区切る() -> None:
+    """無音点がない場合はchunk_lengthごとに分割されることを確認."""
+    chunks = plan_chunks(250.0, [], chunk_length=100.0, overlap=0)
+    assert [(c.start, c.end) for c in chunks] == [
+        (0.0, 100.0),
+        (100.0, 200.0),
+        (200.0, 250.0),
+    ]
+
+
+def test_短い音声は1チャンクになる() -> None:
+    """chunk_length以下の音声は分割されないことを確認."""
+    chunks = plan_chunks(30.0, [10.0], chunk_length=120.0)
+    assert chunks == [AudioChunk(start=0.0, end=30.0, keep_start=0.0, keep_end=30.0)]
+
+
+def test_結合時にタイムスタンプが補正され重複が除かれる() -> None:
+    """チャンク結果の結合でタイムスタンプ補正と重複除去が行われることを確認."""
+    chunks = [
+        AudioChunk(start=0.0, end=12.0, keep_start=0.0, keep_end=10.0),
+        AudioChunk(start=8.0, end=20.0, keep_start=10.0, keep_end=20.0),
+    ]
+    results = [
+        {
+            "language": "ja",
+            "segments": [
+                {"id": 0, "start": 0.0, "end": 5.0, "text": "一つ目。"},
+                {"id": 1, "start": 5.0, "end": 9.0, "text": "二つ目。"},
+                # 中央が10秒を超えるので後ろのチャンクに任せる
+                {"id": 2, "start": 9.5, "end": 12.0, "text": "三つ目。"},
+            ],
+        },
+        {
+            "language": "ja",
+            "segments": [
+                # 中央が10秒より前なので前のチャンクの結果を採用する
+                {"id": 0, "start": 0.0, "end": 1.0, "text": "二つ目。"},
+                {"id": 1, "start": 1.5, "end": 4.0, "text": "三つ目。"},
+                {"id": 2, "start": 4.0, "end": 12.0, "text": "四つ目。"},
+            ],
+        },
+    ]
+
+    merged = merge_chunk_results(chunks, results)
+
+    assert merged["text"] == "一つ目。二つ目。三つ目。四つ目。"
+    assert merged["language"] == "ja"
+    assert [s["id"] for s in merged["segments"]] == [0, 1, 2, 3]
+    assert merged["segments"][2]["start"] == 9.5
+    assert merged["segments"][3]["end"] == 20.0
@@ -0,0 +1,187 @@
+"""cliモジュールのテスト."""
+
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from transcription_tool.batch import BatchSummary
+from transcription_tool.cli import main
+
+# CLIの起動時に読み込むモジュールのimport時間の上限（マイクロ秒）
+IMPORT_TIME_BUDGET_US = 1_000_000
+
+
+def test_起動時に重い依存関係を読み込まない() -> None:
+    """torch・whisper・gradioを読み込まず、import時間が上限内であることを確認."""
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import transcription_tool.cli, transcription_tool.batch, "
+            "transcription_tool.file_manager, transcription_tool.transcriber",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # 各行は "import time: 自身 | 累計 | モジュール名"
+    rows = [
+        line.split("|")
+        for line in completed.stderr.splitlines()
+        if line.startswith("import time:") and "self [us]" not in line
+    ]
+    modules = {row[2].strip() for row in rows}
+    heavy = {
+        name for name in modules if name.split(".")[0] in {"torch", "whisper", "gradio"}
+    }
+    assert not heavy
+    total_us = sum(int(row[0].split(":")[1]) for row in rows)
+    assert total_us < IMPORT_TIME_BUDGET_US
+
+
+def test_batch_対象ファイルがない場合はエラー終了する(tmp_path: Path) -> None:
+    """音声ファイルが見つからない場合に終了コード1を返すことを確認."""
+    assert main(["batch", str(tmp_path)]) == 1
+
+
+@patch("transcription_tool.batch.run_batch")
+def test_batch_スループットを表示する(
+    mock_run_batch: Mock, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """batchサブコマンドが集計結果とスループットを表示することを確認."""
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"audio")
+    mock_run_batch.return_value = BatchSummary(
+        processed=[audio], audio_seconds=7200.0, wall_seconds=3600.0
+    )
+
+    exit_code = main(["batch", str(tmp_path), "-m", "tiny", "-j", "2"])
+
+    assert exit_code == 0
+    assert mock_run_batch.call_args.kwargs["workers"] == 2
+    assert mock_run_batch.call_args.kwargs["model_name"] == "tiny"
+    assert "2.00" in capsys.readouterr().out
+
+
+@patch("transcription_tool.batch.run_batch")
+def test_batch_プロファイルの指定を渡す(mock_run_batch: Mock, tmp_path: Path) -> None:
+    """--profileと--torch-traceがrun_batchに渡されることを確認."""
+    (tmp_path / "a.wav").write_bytes(b"audio")
+    mock_run_batch.return_value = BatchSummary()
+
+    assert main(["batch", str(tmp_path), "--profile", "--torch-trace"]) == 0
+    assert mock_run_batch.call_args.kwargs["profile"] is True
+    assert mock_run_batch.call_args.kwargs["torch_trace"] is True
+
+
+@patch("transcription_tool.batch.run_batch")
+def test_batch_デコードのプロファイルを渡す(
+    mock_run_batch: Mock, tmp_path: Path
+) -> None:
+    """--decodingがrun_batchに渡され、既定はbalancedであることを確認."""
+    (tmp_path / "a.wav").write_bytes(b"audio")
+    mock_run_batch.return_value = BatchSummary()
+
+    assert main(["batch", str(tmp_path)]) == 0
+    assert mock_run_batch.call_args.kwargs["decoding"] == "balanced"
+    assert main(["batch", str(tmp_path), "-d", "adaptive"]) == 0
+    assert mock_run_batch.call_args.kwargs["decoding"] == "adaptive"
+
+
+@patch("transcription_tool.app.main")
+def test_ui_同時実行数とメモリ予約を渡す(mock_run_app: Mock) -> None:
+    """uiサブコマンドのオプションがアプリの起動設定に渡されることを確認."""
+    assert main(["ui", "-c", "2", "--memory-reserve-mb", "512"]) == 0
+    mock_run_app.assert_called_once_with(
+        concurrency=2,
+        memory_reserve_mb=512.0,
+        preload=[],
+        wait_for_preload=False,
+        metrics_port=7863,
+        json_logs=False,
+        api_port=None,
+        api_host="127.0.0.1",
+        model_memory_mb=None,
+    )
+
+
+@patch("transcription_tool.app.main")
+def test_ui_モデルのメモリ上限を渡す(mock_run_app: Mock) -> None:
+    """--model-memory-mbがアプリの起動設定に渡されることを確認."""
+    assert main(["ui", "--model-memory-mb", "4096"]) == 0
+    assert mock_run_app.call_args.kwargs["model_memory_mb"] == 4096.0
+
+
+@patch("transcription_tool.app.main")
+def test_ui_メトリクスのポートと構造化ログを指定する(mock_run_app: Mock) -> None:
+    """--metrics-portと--json-logsがアプリの起動設定に渡されることを確認."""
+    assert main(["ui", "--metrics-port", "0", "--json-logs"]) == 0
+    assert mock_run_app.call_args.kwargs["metrics_port"] == 0
+    assert mock_run_app.call_args.kwargs["json_logs"] is True
+
+
+@patch("transcription_tool.app.main")
+def test_ui_HTTP_APIのポートを指定する(mock_run_app: Mock) -> None:
+    """--api-portと--api-hostがアプリの起動設定に渡されることを確認."""
+    assert main(["ui", "--api-port", "7864", "--api-host", "0.0.0.0"]) == 0
+    assert mock_run_app.call_args.kwargs["api_port"] == 7864
+    assert mock_run_app.call_args.kwargs["api_host"] == "0.0.0.0"
+
+
+@patch("transcription_tool.app.main")
+def test_ui_起動時にウォームアップするモデルを渡す(mock_run_app: Mock) -> None:
+    """--preloadで指定したモデルがアプリの起動設定に渡されることを確認."""
+    assert main(["ui", "--preload", "tiny", "large-v3", "--wait-for-preload"]) == 0
+    assert mock_run_app.call_args.kwargs["preload"] == ["tiny", "large-v3"]
+    assert mock_run_app.call_args.kwargs["wait_for_preload"] is True
+
+
+@patch("transcription_tool.model_utils.ensure_model_downloaded")
+def test_download_接続数を指定してモデルを取得する(mock_ensure: Mock) -> None:
+    """downloadサブコマンドが指定した接続数でダウンロードすることを確認."""
+    assert main(["download", "tiny", "base", "-n", "8"]) == 0
+    assert [call.args[0] for call in mock_ensure.call_args_list] == ["tiny", "base"]
+    assert all(call.args[2] == 8 for call in mock_ensure.call_args_list)
+
+
+@patch("transcription_tool.model_utils.ensure_model_downloaded")
+def test_download_失敗した場合はエラー終了する(mock_ensure: Mock) -> None:
+    """ダウンロードに失敗した場合に終了コード1を返すことを確認."""
+    mock_ensure.side_effect = ValueError("チェックサムが一致しません")
+    assert main(["download", "tiny"]) == 1
+
+
+def test_search_ヒットした箇所を位置付きで表示する(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """searchサブコマンドが該当セグメントを開始位置付きで表示することを確認."""
+    (tmp_path / "meeting.md").write_text(
+        "## 文字起こし内容\n\n[01:05 - 01:10] 予算の会議を始めます\n",
+        encoding="utf-8",
+    )
+
+    assert main(["search", "会議", "-d", str(tmp_path)]) == 0
+    assert "meeting.md [0:01:05] 予算の会議を始めます" in capsys.readouterr().out
+    assert main(["search", "存在しない語", "-d", str(tmp_path)]) == 1
+
+
+@patch("transcription_tool.alignment.align_transcript")
+def test_words_単語のタイムスタンプの保存先を表示する(
+    mock_align: Mock, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """wordsサブコマンドが音声と結果のディレクトリを渡すことを確認."""
+    mock_align.return_value = tmp_path / "meeting.words.json"
+    audio = tmp_path / "meeting.wav"
+
+    assert main(["words", "meeting.md", "-d", str(tmp_path), "-a", str(audio)]) == 0
+    assert mock_align.call_args.args == ("meeting.md", tmp_path)
+    assert mock_align.call_args.kwargs["audio"] == audio
+    assert "meeting.words.json" in capsys.readouterr().out
+
+    mock_align.side_effect = ValueError("情報がありません")
+    assert main(["words", "meeting.md", "-d", str(tmp_path)]) == 1
@@ -0,0 +1,90 @@
+"""decodingモジュールのテスト."""
+
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from transcription_tool.decoding import (
+    DecodeBudget,
+    DecodingProfile,
+    get_decoding_profile,
+)
+from transcription_tool.model_registry import ModelRegistry
+from transcription_tool.transcriber import Transcriber
+
+
+def test_プロファイルはビーム幅と温度の段階をオプションにする() -> None:
+    """ウィンドウごとの上限で温度の段階が切り詰められることを確認"""
+    accurate = get_decoding_profile("accurate").options()
+    assert accurate["beam_size"] == 5
+    assert accurate["best_of"] == 5
+
+    profile = DecodingProfile(
+        "test", temperatures=(0.0, 0.2, 0.4), max_window_retries=1
+    )
+    assert profile.options()["temperature"] == (0.0, 0.2)
+    assert not profile.budgeted
+
+    with pytest.raises(ValueError):
+        get_decoding_profile("unknown")
+
+
+def test_DecodeBudget_は上限を超えた再デコードを打ち切る() -> None:
+    """上限に達した後は前回の結果を返し、回数が記録されることを確認"""
+    outputs = iter(SimpleNamespace(id=i) for i in range(10))
+    model = Mock()
+    model.decode.side_effect = lambda segment, options: next(outputs)
+    original = model.decode
+    budget = DecodeBudget(DecodingProfile("test", max_job_retries=1))
+
+    with budget.watch(model):
+        results = [
+            model.decode("mel", SimpleNamespace(temperature=temperature))
+            for temperature in (0.0, 0.2, 0.4, 0.0, 0.2)
+        ]
+
+    assert model.decode is original
+    # 2回目の再デコード以降は実行せず、そのウィンドウの前回の結果を返す
+    assert [result.id for result in results] == [0, 1, 1, 2, 2]
+    assert budget.summary() == {
+        "profile": "test",
+        "windows": 2,
+        "retries": 1,
+        "skipped_retries": 2,
+    }
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_transcribe_はプロファイルのオプションで推論し回数を返す(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock, tmp_path: Path
+) -> None:
+    """温度の段階とビーム幅がmodel.transcribeに渡され、結果に回数が含まれることを確認"""
+    mock_load_audio.return_value = np.zeros(16000 * 5, dtype=np.float32)
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {"text": "テスト", "segments": []}
+    mock_load_model.return_value = mock_model
+    audio_file = tmp_path / "test.wav"
+    audio_file.write_bytes(b"audio")
+
+    transcriber = Transcriber(
+        model_name="tiny",
+        device="cpu",
+        registry=ModelRegistry(),
+        language="ja",
+        decoding="adaptive",
+    )
+    result = transcriber.transcribe(audio_file)
+
+    kwargs = mock_model.transcribe.call_args.kwargs
+    assert kwargs["temperature"] == (0.0, 0.4, 0.8)
+    assert kwargs["beam_size"] is None
+    assert result["decoding"]["profile"] == "adaptive"
+    assert result["decoding"]["retries"] == 0
+
+    with pytest.raises(ValueError):
+        Transcriber(model_name="tiny", decoding="unknown")
@@ -0,0 +1,150 @@
+"""history_indexモジュールのテスト"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from transcription_tool import file_manager
+from transcription_tool.history_index import (
+    AlignmentSource,
+    HistoryIndex,
+    get_history_index,
+)
+from transcription_tool.utils import save_transcription_as_markdown
+
+
+def _write(directory: Path, name: str, content: str, mtime: float) -> Path:
+    path = directory / name
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_reconcile_ディレクトリのファイルを取り込む(tmp_path: Path) -> None:
+    """reconcileで既存の.mdファイルだけが索引に登録されることを確認"""
+    _write(tmp_path, "a.md", "a", 100)
+    _write(tmp_path, "b.md", "bb", 200)
+    _write(tmp_path, "memo.txt", "x", 300)
+    index = HistoryIndex(tmp_path)
+
+    assert index.reconcile() == 2
+    assert index.count() == 2
+    assert [e.filename for e in index.query()] == ["b.md", "a.md"]
+
+
+def test_reconcile_ディレクトリが変わっていなければ登録済みのファイルだけ確認する(
+    tmp_path: Path,
+) -> None:
+    """ディレクトリのmtimeが同じ場合も上書きされたファイルは取り込むことを確認"""
+    _write(tmp_path, "a.md", "a", 100)
+    index = HistoryIndex(tmp_path)
+    index.reconcile()
+    assert index.reconcile() == 0
+
+    # ファイルの内容だけを変更してもディレクトリのmtimeは変わらない
+    dir_mtime = tmp_path.stat().st_mtime
+    _write(tmp_path, "a.md", "changed", 150)
+    _write(tmp_path, "b.md", "b", 200)
+    os.utime(tmp_path, (dir_mtime, dir_mtime))
+
+    assert index.reconcile() == 1
+    assert [e.size for e in index.query()] == [7]
+    assert index.search("changed")[0].filename == "a.md"
+
+    # fullを指定した場合はディレクトリを走査する
+    assert index.reconcile(full=True) == 1
+    assert sorted(e.filename for e in index.query()) == ["a.md", "b.md"]
+
+
+def test_reconcile_追加と削除を反映する(tmp_path: Path) -> None:
+    """ファイルの追加・削除後のreconcileで索引が更新されることを確認"""
+    _write(tmp_path, "a.md", "a", 100)
+    _write(tmp_path, "b.md", "b", 200)
+    index = HistoryIndex(tmp_path)
+    index.reconcile()
+
+    (tmp_path / "a.md").unlink()
+    _write(tmp_path, "c.md", "c", 300)
+    os.utime(tmp_path, (1000, 1000))
+
+    assert index.reconcile() == 2
+    assert sorted(e.filename for e in index.query()) == ["b.md", "c.md"]
+
+
+def test_query_ページと並べ替え(tmp_path: Path) -> None:
+    """ページ単位で並べ替えて取得できることを確認"""
+    for i in range(5):
+        _write(tmp_path, f"{i}.md", "x" * (5 - i), 100 + i)
+    index = HistoryIndex(tmp_path)
+    index.reconcile()
+
+    assert [e.filename for e in index.query(page=1, page_size=2)] == ["4.md", "3.md"]
+    assert [e.filename for e in index.query(page=3, page_size=2)] == ["0.md"]
+    by_size = index.query(page_size=5, sort_by="size", descending=False)
+    assert [e.size for e in by_size] == [1, 2, 3, 4, 5]
+    by_name = index.query(page_size=2, sort_by="filename", descending=False)
+    assert [e.filename for e in by_name] == ["0.md", "1.md"]
+
+    with pytest.raises(ValueError):
+        index.query(sort_by="mtime; DROP TABLE transcriptions")
+
+
+def test_保存時に索引へ登録され再走査が不要(tmp_path: Path) -> None:
+    """save_transcription_as_markdownで保存した結果が走査なしで一覧に出ることを確認"""
+    index = get_history_index(tmp_path)
+    index.reconcile()
+
+    output_path = save_transcription_as_markdown(
+        {"text": "テスト", "language": "ja", "duration": 12.5},
+        "audio.wav",
+        output_dir=tmp_path,
+    )
+
+    assert index.reconcile() == 0
+    (entry,) = index.query()
+    assert entry.filename == output_path.name
+    assert entry.audio_filename == "audio.wav"
+    assert entry.language == "ja"
+    assert entry.duration == 12.5
+
+
+def test_単語のタイムスタンプ用の情報を保存し削除時に消す(tmp_path: Path) -> None:
+    """トークンと音声のハッシュが登録され、ファイル削除後は取得できないことを確認"""
+    index = HistoryIndex(tmp_path)
+    path = _write(tmp_path, "a.md", "a", 100)
+    source = AlignmentSource.from_result(
+        {
+            "text": "テスト",
+            "segments": [{"start": 0.0, "end": 1.0, "text": "テスト", "tokens": [7]}],
+            "language": "ja",
+            "audio_hash": "abc",
+            "model": "tiny",
+        }
+    )
+    assert source is not None
+    assert AlignmentSource.from_result({"text": "テスト"}) is None
+
+    index.record(path, alignment_source=source)
+    assert index.get_alignment_source("a.md") == source
+
+    path.unlink()
+    os.utime(tmp_path, (1000, 1000))
+    index.reconcile()
+    assert index.get_alignment_source("a.md") is None
+
+
+def test_list_transcription_page_一覧と件数を返す(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """file_managerのページ取得が表示用の行と総件数を返すことを確認"""
+    monkeypatch.chdir(tmp_path)
+    directory = file_manager.get_transcriptions_dir()
+    for i in range(3):
+        _write(directory, f"{i}.md", "x", 100 + i)
+
+    rows, total = file_manager.list_transcription_page(page=1, page_size=2)
+
+    assert total == 3
+    assert [row[0] for row in rows] == ["2.md", "1.md"]
+    assert len(file_manager.list_transcription_files()) == 3
@@ -0,0 +1,101 @@
+"""language_idモジュールのテスト."""
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from transcription_tool.backends import get_backend
+from transcription_tool.language_id import (
+    LanguageCache,
+    detect_language,
+    pick_language,
+    sample_windows,
+)
+from transcription_tool.result_cache import ResultCache
+
+
+def test_sample_windows_は発話の多い区間を時刻順に選ぶ() -> None:
+    """音量の大きい区間が選ばれ、元の時刻順に並ぶことを確認"""
+    audio = np.zeros(300 * 16000, dtype=np.float32)
+    audio[200 * 16000 : 270 * 16000] = 0.5
+    audio[: 50 * 16000] = 0.3
+
+    windows = sample_windows(audio, n_windows=2, window_length=30.0)
+
+    assert [len(window) for window in windows] == [30 * 16000, 30 * 16000]
+    assert np.all(windows[0] == 0.3)
+    assert np.all(windows[1] == 0.5)
+
+
+def test_sample_windows_は短い音声をそのまま返す() -> None:
+    """区間より短い音声は音声全体が1つの区間になることを確認"""
+    audio = np.ones(10 * 16000, dtype=np.float32)
+    windows = sample_windows(audio)
+    assert len(windows) == 1 and len(windows[0]) == len(audio)
+
+
+def test_pick_language_は区間の確率を平均して決める() -> None:
+    """1区間だけ強く判定された言語より、全体で確率の高い言語が選ばれることを確認"""
+    probabilities = [
+        {"en": 0.9, "ja": 0.1},
+        {"en": 0.2, "ja": 0.8},
+        {"en": 0.3, "ja": 0.7},
+    ]
+    assert pick_language(probabilities) == "ja"
+    assert pick_language([]) is None
+
+    calls: list[int] = []
+
+    def detect(windows: list[np.ndarray]) -> list[dict[str, Any]]:
+        calls.append(len(windows))
+        return probabilities[: len(windows)]
+
+    assert detect_language(np.ones(300 * 16000, dtype=np.float32), detect) == "ja"
+    assert calls == [3]  # 区間はまとめて1回で判定する
+
+
+def test_LanguageCache_は結果キャッシュに保存して再利用する(tmp_path: Path) -> None:
+    """別のプロセスを想定した新しいLanguageCacheでも判定結果が取得できることを確認"""
+    result_cache = ResultCache(cache_dir=tmp_path / "cache")
+    LanguageCache().put("hash", "en", result_cache)
+
+    cache = LanguageCache()
+    assert cache.get("hash") is None
+    assert cache.get("hash", result_cache) == "en"
+    assert cache.get("hash") == "en"  # 取得後はプロセス内で保持する
+    assert cache.get("other", result_cache) is None
+
+
+def test_WhisperBackendは区間ごとの言語の確率を返す() -> None:
+    """ランダムな重みの小さなモデルで区間ごとの確率が返されることを確認"""
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    torch.manual_seed(0)
+    dims = ModelDimensions(
+        n_mels=80,
+        n_audio_ctx=1500,
+        n_audio_state=32,
+        n_audio_head=2,
+        n_audio_layer=1,
+        n_vocab=51865,
+        n_text_ctx=64,
+        n_text_state=32,
+        n_text_head=2,
+        n_text_layer=2,
+    )
+    model = Whisper(dims).eval()
+    # デコーダの位置埋め込みはtorch.emptyで確保されるため乱数で初期化する
+    torch.nn.init.normal_(model.decoder.positional_embedding, std=0.01)
+    rng = np.random.default_rng(0)
+    windows = [
+        rng.normal(0, 0.1, 16000 * 30).astype(np.float32),
+        rng.normal(0, 0.1, 16000).astype(np.float32),
+    ]
+
+    probabilities = get_backend("whisper").detect_language(model, windows)
+
+    assert len(probabilities) == 2
+    assert "ja" in probabilities[0]
+    assert abs(sum(probabilities[1].values()) - 1.0) < 1e-3
@@ -0,0 +1,145 @@
+"""metricsモジュールのテスト."""
+
+import io
+import json
+import logging
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from transcription_tool.metrics import (
+    LOGGER_NAME,
+    MetricsRegistry,
+    configure_json_logging,
+    get_metrics,
+    inference_timer,
+    instrument_encoder,
+    record_transcription,
+    start_metrics_server,
+)
+from transcription_tool.model_registry import ModelRegistry
+from transcription_tool.transcriber import Transcriber
+
+
+def test_render_はPrometheusのテキスト形式で出力する() -> None:
+    """ヒストグラムの累積バケット・カウンター・取得時の値が出力されることを確認"""
+    registry = MetricsRegistry()
+    registry.observe("transcription_stage_seconds", 0.3, (0.1, 1.0), stage="vad")
+    registry.observe("transcription_stage_seconds", 2.0, (0.1, 1.0), stage="vad")
+    registry.inc("transcription_audio_seconds_total", 90.5, model="tiny")
+    registry.add_collector(
+        lambda: [("transcription_cache_hit_ratio", {"cache": 'a"b'}, 0.5)]
+    )
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE transcription_stage_seconds histogram" in lines
+    assert 'transcription_stage_seconds_bucket{stage="vad",le="0.1"} 0' in lines
+    assert 'transcription_stage_seconds_bucket{stage="vad",le="1"} 1' in lines
+    assert 'transcription_stage_seconds_bucket{stage="vad",le="+Inf"} 2' in lines
+    assert 'transcription_stage_seconds_sum{stage="vad"} 2.3' in lines
+    assert 'transcription_stage_seconds_count{stage="vad"} 2' in lines
+    assert 'transcription_audio_seconds_total{model="tiny"} 90.5' in lines
+    assert 'transcription_cache_hit_ratio{cache="a\\"b"} 0.5' in lines
+    assert registry.histogram("transcription_stage_seconds", stage="vad") == (2, 2.3)
+
+
+def test_inference_timer_はエンコーダの時間を分けて記録する() -> None:
+    """フックを付けたエンコーダの時間がencode、残りがdecodeとして記録されることを確認"""
+    import torch
+
+    model = torch.nn.Module()
+    model.encoder = torch.nn.Linear(4, 4)
+    instrument_encoder(model)
+    metrics = get_metrics()
+    encode_count, _ = metrics.histogram("transcription_stage_seconds", stage="encode")
+    decode_count, _ = metrics.histogram("transcription_stage_seconds", stage="decode")
+
+    with inference_timer():
+        model.encoder(torch.zeros(1, 4))
+
+    assert metrics.histogram("transcription_stage_seconds", stage="encode")[0] == (
+        encode_count + 1
+    )
+    assert metrics.histogram("transcription_stage_seconds", stage="decode")[0] == (
+        decode_count + 1
+    )
+
+
+def test_構造化ログは1行1件のJSONで出力する() -> None:
+    """実時間比を含むイベントがJSONで出力されることを確認"""
+    stream = io.StringIO()
+    handler = configure_json_logging(stream)
+    try:
+        record_transcription("tiny", 60.0, 15.0, "standard")
+    finally:
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.removeHandler(handler)
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+
+    event = json.loads(stream.getvalue().splitlines()[-1])
+    assert event["event"] == "transcription"
+    assert event["model"] == "tiny"
+    assert event["real_time_factor"] == 0.25
+
+
+def test_metricsサーバーは_metricsだけに応答する() -> None:
+    """/metricsがPrometheus形式で返り、それ以外は404になることを確認"""
+    server = start_metrics_server(port=0)
+    port = server.server_address[1]
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            body = response.read().decode("utf-8")
+            content_type = response.headers["Content-Type"]
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/other")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert content_type.startswith("text/plain")
+    assert "transcription_model_memory_mb" in body
+    assert "transcription_cache_hit_ratio" in body
+    assert error.value.code == 404
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_文字起こしで段階ごとの時間と実時間比を記録する(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock, tmp_path: Path
+) -> None:
+    """ダウンロード・ロード・デコードの時間と実時間比が記録されることを確認"""
+    mock_load_audio.return_value = np.zeros(16000 * 10, dtype=np.float32)
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {"text": "テスト", "segments": []}
+    mock_load_model.return_value = mock_model
+    audio_file = tmp_path / "test.wav"
+    audio_file.write_bytes(b"audio")
+
+    metrics = get_metrics()
+    stages = ("download", "model_load", "audio_decode", "decode")
+    before = {
+        stage: metrics.histogram("transcription_stage_seconds", stage=stage)[0]
+        for stage in stages
+    }
+    rtf_before = metrics.histogram(
+        "transcription_real_time_factor", model="tiny", mode="standard"
+    )[0]
+
+    Transcriber(model_name="tiny", device="cpu", registry=ModelRegistry()).transcribe(
+        audio_file
+    )
+
+    for stage in stages:
+        count, _ = metrics.histogram("transcription_stage_seconds", stage=stage)
+        assert count == before[stage] + 1, stage
+    rtf_count, _ = metrics.histogram(
+        "transcription_real_time_factor", model="tiny", mode="standard"
+    )
+    assert rtf_count == rtf_before + 1
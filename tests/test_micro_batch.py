@@ -0,0 +1,178 @@
+"""micro_batchモジュールのテスト."""
+
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Optional
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from transcription_tool.micro_batch import BatchDecoder, _split_segments, decode_batch
+from transcription_tool.model_registry import ModelRegistry
+from transcription_tool.transcriber import Transcriber
+
+OPTIONS = {"verbose": False, "fp16": False, "language": "ja"}
+
+
+def _fake_decode(
+    model: Any, audios: list[np.ndarray], language: Optional[str], fp16: bool
+) -> list[Optional[dict[str, Any]]]:
+    model.batch_sizes.append(len(audios))
+    return [
+        {
+            "text": f"{len(audio)}",
+            "segments": [{"id": 0, "start": 0.0, "end": 1.0, "text": f"{len(audio)}"}],
+            "language": language,
+        }
+        for audio in audios
+    ]
+
+
+def _leaser(model: Any) -> Any:
+    @contextmanager
+    def lease() -> Iterator[Any]:
+        yield model
+
+    return lease
+
+
+def test_同時に届いた音声はまとめてデコードされる() -> None:
+    """複数スレッドから投入した音声が1回でデコードされ、結果が分かれることを確認."""
+    model = SimpleNamespace(batch_sizes=[])
+    decoder = BatchDecoder(max_batch_size=4, max_wait=1.0, decode=_fake_decode)
+    results: dict[int, str] = {}
+
+    def submit(length: int) -> None:
+        audio = np.zeros(length, dtype=np.float32)
+        results[length] = decoder.transcribe(audio, _leaser(model), OPTIONS)["text"]
+
+    threads = [threading.Thread(target=submit, args=(n,)) for n in (100, 200, 300, 400)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert model.batch_sizes == [4]
+    assert results == {n: str(n) for n in (100, 200, 300, 400)}
+    assert decoder.stats().average_batch_size == 4.0
+
+
+def test_言語が異なる音声は別のバッチになる() -> None:
+    """デコードオプションが異なる音声は同じバッチにまとめないことを確認."""
+    model = SimpleNamespace(batch_sizes=[])
+    decoder = BatchDecoder(max_batch_size=4, max_wait=0.2, decode=_fake_decode)
+
+    def submit(language: str) -> None:
+        options = {**OPTIONS, "language": language}
+        decoder.transcribe(np.zeros(10, dtype=np.float32), _leaser(model), options)
+
+    threads = [threading.Thread(target=submit, args=(lang,)) for lang in ("ja", "en")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(model.batch_sizes) == [1, 1]
+
+
+def test_デコードに失敗した音声は個別に文字起こしする() -> None:
+    """バッチの結果がNoneの音声はmodel.transcribeで処理し直すことを確認."""
+    model = Mock()
+    model.transcribe.return_value = {"text": "再試行", "segments": [], "language": "ja"}
+    decoder = BatchDecoder(max_wait=0.0, decode=lambda *args: [None])
+
+    result = decoder.transcribe(np.zeros(10, dtype=np.float32), _leaser(model), OPTIONS)
+
+    assert result["text"] == "再試行"
+    model.transcribe.assert_called_once()
+    assert decoder.stats().fallbacks == 1
+
+
+def test_デコード中のエラーは呼び出し元に伝わる() -> None:
+    """バッチのデコードで発生した例外がtranscribeから送出されることを確認."""
+
+    def fail(*args: Any) -> list[Optional[dict[str, Any]]]:
+        raise RuntimeError("デコード失敗")
+
+    decoder = BatchDecoder(max_wait=0.0, decode=fail)
+    try:
+        decoder.transcribe(np.zeros(10, dtype=np.float32), _leaser(Mock()), OPTIONS)
+    except RuntimeError as e:
+        assert str(e) == "デコード失敗"
+    else:
+        raise AssertionError("例外が送出されていません")
+
+
+def test_タイムスタンプトークンでセグメントに分ける() -> None:
+    """タイムスタンプの組で区切ったトークン列が2つのセグメントになることを確認."""
+    tokenizer = SimpleNamespace(timestamp_begin=1000)
+    tokens = [1000, 1, 2, 1050, 1050, 3, 1100]
+    assert _split_segments(tokens, tokenizer, duration=5.0) == [
+        (0.0, 1.0, [1, 2]),
+        (1.0, 2.0, [3]),
+    ]
+    # 終了のタイムスタンプがない場合は音声の末尾まで
+    assert _split_segments([1000, 1, 2], tokenizer, duration=5.0) == [
+        (0.0, 5.0, [1, 2])
+    ]
+
+
+def test_ランダムな重みのモデルで複数の音声を一度にデコードできる() -> None:
+    """openai-whisperのモデルでバッチデコードが音声ごとの結果を返すことを確認."""
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    torch.manual_seed(0)
+    dims = ModelDimensions(
+        n_mels=80,
+        n_audio_ctx=1500,
+        n_audio_state=32,
+        n_audio_head=2,
+        n_audio_layer=1,
+        n_vocab=51865,
+        n_text_ctx=16,
+        n_text_state=32,
+        n_text_head=2,
+        n_text_layer=1,
+    )
+    model = Whisper(dims).eval()
+    # デコーダの位置埋め込みはtorch.emptyで確保されるため乱数で初期化する
+    torch.nn.init.normal_(model.decoder.positional_embedding, std=0.01)
+    audios = [np.zeros(16000, dtype=np.float32), np.zeros(32000, dtype=np.float32)]
+
+    results = decode_batch(model, audios, language="ja", fp16=False)
+
+    assert len(results) == 2
+    for result in results:
+        assert result is None or result["language"] == "ja"
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_micro_batchでは短い音声をBatchDecoderでデコードする(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock, tmp_path: Path
+) -> None:
+    """30秒以下の音声がBatchDecoder経由でデコードされることを確認."""
+    mock_load_audio.return_value = np.zeros(5 * 16000, dtype=np.float32)
+    mock_model = Mock(batch_sizes=[])
+    mock_load_model.return_value = mock_model
+    decoder = BatchDecoder(max_wait=0.0, decode=_fake_decode)
+    audio_file = tmp_path / "short.wav"
+    audio_file.write_bytes(b"")
+
+    transcriber = Transcriber(
+        model_name="tiny", device="cpu", registry=ModelRegistry(), micro_batch=True
+    )
+    with patch(
+        "transcription_tool.transcriber.get_batch_decoder", return_value=decoder
+    ):
+        result = transcriber.transcribe(audio_file)
+
+    assert mock_model.batch_sizes == [1]
+    mock_model.transcribe.assert_not_called()
+    assert result["text"] == str(5 * 16000)
+    assert result["duration"] == 5.0
@@ -0,0 +1,169 @@
+"""model_registryモジュールのテスト."""
+
+import threading
+import time
+from unittest.mock import Mock
+
+from transcription_tool.model_registry import ModelRegistry, estimate_model_size_mb
+
+
+def _make_model(size_mb: float) -> Mock:
+    """指定サイズのパラメータを持つモックモデルを作成する."""
+    param = Mock()
+    param.numel.return_value = int(size_mb * 1024 * 1024)
+    param.element_size.return_value = 1
+    model = Mock()
+    model.parameters.return_value = [param]
+    model.buffers.return_value = []
+    return model
+
+
+def test_同じキーは一度だけロードされる() -> None:
+    """同じキーで2回取得してもloaderは1回しか呼ばれないことを確認."""
+    registry = ModelRegistry()
+    loader = Mock(return_value=_make_model(10))
+
+    first = registry.get(("tiny", "cpu", "float32", "whisper"), loader)
+    second = registry.get(("tiny", "cpu", "float32", "whisper"), loader)
+
+    assert first is second
+    loader.assert_called_once()
+    stats = registry.stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.loads == 1
+    assert stats.hit_rate == 0.5
+
+
+def test_デバイスやdtypeが異なれば別のモデルとして扱う() -> None:
+    """キーの一部が異なる場合は別々にロードされることを確認."""
+    registry = ModelRegistry()
+    loader = Mock(side_effect=lambda: _make_model(10))
+
+    registry.get(("tiny", "cpu", "float32", "whisper"), loader)
+    registry.get(("tiny", "cuda", "float32", "whisper"), loader)
+    registry.get(("tiny", "cuda", "float16", "whisper"), loader)
+
+    assert loader.call_count == 3
+    assert len(registry.loaded_keys()) == 3
+
+
+def test_メモリ上限を超えるとLRUで解放される() -> None:
+    """メモリ上限を超えた場合、最も古く使われたモデルから解放されることを確認."""
+    registry = ModelRegistry(memory_budget_mb=25)
+    tiny = ("tiny", "cpu", "float32", "whisper")
+    base = ("base", "cpu", "float32", "whisper")
+    small = ("small", "cpu", "float32", "whisper")
+
+    registry.get(tiny, lambda: _make_model(10))
+    registry.get(base, lambda: _make_model(10))
+    # tinyを使用してbaseを最も古い状態にする
+    registry.get(tiny, lambda: _make_model(10))
+    registry.get(small, lambda: _make_model(10))
+
+    assert registry.contains(tiny)
+    assert not registry.contains(base)
+    assert registry.contains(small)
+    assert registry.stats().evictions == 1
+    assert registry.memory_usage_mb() == 20
+
+
+def test_メモリ上限の変更で超過分が解放される() -> None:
+    """set_memory_budgetで上限を下げると超過分が解放されることを確認."""
+    registry = ModelRegistry(memory_budget_mb=100)
+    registry.get(("tiny", "cpu", "float32", "whisper"), lambda: _make_model(30))
+    registry.get(("base", "cpu", "float32", "whisper"), lambda: _make_model(30))
+
+    registry.set_memory_budget(40)
+
+    assert registry.loaded_keys() == [("base", "cpu", "float32", "whisper")]
+
+
+def test_同時に要求されてもロードは一度だけ() -> None:
+    """複数スレッドから同時に同じモデルを要求してもロードが1回であることを確認."""
+    registry = ModelRegistry()
+    call_count = 0
+
+    def slow_loader() -> Mock:
+        nonlocal call_count
+        call_count += 1
+        time.sleep(0.05)
+        return _make_model(10)
+
+    results = []
+
+    def worker() -> None:
+        results.append(registry.get(("tiny", "cpu", "float32", "whisper"), slow_loader))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert call_count == 1
+    assert all(result is results[0] for result in results)
+    assert registry.stats().hits == 4
+
+
+def test_get_if_loaded_は未ロードならNoneを返す() -> None:
+    """get_if_loadedが未ロードのモデルをロードしないことを確認."""
+    registry = ModelRegistry()
+    assert registry.get_if_loaded(("tiny", "cpu", "float32", "whisper")) is None
+    assert registry.stats().misses == 0
+
+
+def test_パラメータを数えられない場合はモデルサイズから推定する() -> None:
+    """parametersを持たないモデルではMODEL_SIZESから推定されることを確認."""
+    assert estimate_model_size_mb(object(), "tiny") == 78.0
+
+
+def test_leaseは貸し出し中のインスタンスを他に渡さない() -> None:
+    """max_instancesまでは貸し出し中なら別インスタンスをロードすることを確認."""
+    registry = ModelRegistry()
+    key = ("tiny", "cpu", "float32", "whisper")
+    loader = Mock(side_effect=lambda: _make_model(10))
+
+    with registry.lease(key, loader, max_instances=2) as first:
+        with registry.lease(key, loader, max_instances=2) as second:
+            assert first is not second
+    assert registry.instance_count(key) == 2
+
+    # 返却後は既存のインスタンスを再利用する
+    with registry.lease(key, loader, max_instances=2):
+        pass
+    assert loader.call_count == 2
+
+
+def test_leaseは上限に達すると返却を待つ() -> None:
+    """インスタンス数が上限の場合、返却されるまで待つことを確認."""
+    registry = ModelRegistry()
+    key = ("tiny", "cpu", "float32", "whisper")
+    loader = Mock(side_effect=lambda: _make_model(10))
+    acquired = threading.Event()
+    models = []
+
+    def worker() -> None:
+        with registry.lease(key, loader) as model:
+            models.append(model)
+            acquired.set()
+
+    with registry.lease(key, loader) as held:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        assert not acquired.wait(timeout=0.1)
+
+    thread.join(timeout=1)
+    assert acquired.is_set()
+    assert models == [held]
+    loader.assert_called_once()
+
+
+def test_貸し出し中のインスタンスは解放されない() -> None:
+    """メモリ上限を超えても貸し出し中のモデルは解放されないことを確認."""
+    registry = ModelRegistry(memory_budget_mb=15)
+    tiny = ("tiny", "cpu", "float32", "whisper")
+
+    with registry.lease(tiny, lambda: _make_model(10)):
+        registry.get(("base", "cpu", "float32", "whisper"), lambda: _make_model(10))
+        assert registry.contains(tiny)
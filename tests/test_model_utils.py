@@ -1,14 +1,96 @@
 """model_utilsモジュールのテスト."""
 
-from typing import Callable, Optional
+import hashlib
+import re
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Optional
 from unittest.mock import Mock, patch
 
+import pytest
+
 from transcription_tool.model_utils import (
+    download_file,
     ensure_model_downloaded,
+    expected_sha256,
+    get_ctranslate2_model_dir,
     get_model_path,
+    get_quantized_model_path,
     is_model_downloaded,
+    split_model_choice,
 )
 
+PAYLOAD = bytes(range(256)) * 4096  # 1MB
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """Rangeリクエストに対応したテスト用のハンドラ.
+
+    server.drop_after が設定されている場合、最初のレスポンスを
+    そのバイト数で打ち切って接続を切る。server.support_range が "probe" の
+    場合はサイズ確認（bytes=0-0）にだけ206を返し、それ以外は全体を返す。
+    """
+
+    def do_GET(self) -> None:  # noqa: N802
+        server: Any = self.server
+        byte_range = self.headers.get("Range") or ""
+        server.requests.append(self.headers.get("Range"))
+        start, end = 0, len(PAYLOAD) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", byte_range)
+        supported = server.support_range is True or (
+            server.support_range == "probe" and byte_range == "bytes=0-0"
+        )
+        if match and supported:
+            start = int(match.group(1))
+            if match.group(2):
+                end = min(int(match.group(2)), end)
+            if start >= len(PAYLOAD):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(PAYLOAD)}")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+        body = PAYLOAD[start : end + 1]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        with server.lock:
+            drop_after = server.drop_after
+            if drop_after is not None and drop_after < len(body):
+                server.drop_after = None
+            else:
+                drop_after = None
+        if drop_after is not None:
+            self.wfile.write(body[:drop_after])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def http_server() -> Iterator[Any]:
+    """PAYLOADを配信するローカルHTTPサーバー."""
+    server: Any = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    server.requests = []
+    server.support_range = True
+    server.drop_after = None
+    server.lock = threading.Lock()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/model.pt"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
 
 def test_get_model_path() -> None:
     """モデルパスが正しく生成されることを確認."""
@@ -34,10 +116,10 @@ def test_is_model_downloaded(mock_exists: Mock) -> None:
     assert is_model_downloaded("tiny") is False
 
 
-@patch("transcription_tool.model_utils.urllib.request.urlretrieve")
+@patch("transcription_tool.model_utils.download_file")
 @patch("transcription_tool.model_utils.is_model_downloaded")
 def test_ensure_model_downloaded_already_exists(
-    mock_is_downloaded: Mock, mock_urlretrieve: Mock
+    mock_is_downloaded: Mock, mock_download_file: Mock
 ) -> None:
     """既存のモデルはダウンロードされないことを確認."""
     mock_is_downloaded.return_value = True
@@ -52,34 +134,43 @@ def test_ensure_model_downloaded_already_exists(
     assert result is False  # 新規ダウンロードではない
     assert len(progress_calls) == 1
     assert "既にダウンロード済み" in progress_calls[0][1]
-    mock_urlretrieve.assert_not_called()
+    mock_download_file.assert_not_called()
 
 
-@patch("transcription_tool.model_utils.urllib.request.urlretrieve")
+@patch("transcription_tool.model_utils.download_file")
 @patch("transcription_tool.model_utils.is_model_downloaded")
-@patch("transcription_tool.model_utils.Path.rename")
+@patch("transcription_tool.model_utils.get_model_path")
 def test_ensure_model_downloaded_new_download(
-    mock_rename: Mock, mock_is_downloaded: Mock, mock_urlretrieve: Mock
+    mock_get_model_path: Mock,
+    mock_is_downloaded: Mock,
+    mock_download_file: Mock,
+    tmp_path: Path,
 ) -> None:
     """新しいモデルがダウンロードされることを確認."""
     mock_is_downloaded.return_value = False
+    mock_get_model_path.return_value = tmp_path / "tiny.pt"
 
     progress_calls = []
 
     def progress_callback(ratio: float, message: str) -> None:
         progress_calls.append((ratio, message))
 
-    # urlretrieveのコールバックをシミュレート
+    # download_fileのコールバックをシミュレート
     def simulate_download(
-        url: str, path: str, reporthook: Optional[Callable] = None
-    ) -> None:
-        if reporthook:
+        url: str,
+        dest: Path,
+        expected_sha256: Optional[str] = None,
+        progress_callback: Optional[Callable] = None,
+        connections: int = 1,
+    ) -> Path:
+        if progress_callback:
             # ダウンロード進捗をシミュレート
-            reporthook(0, 1024, 10240)  # 10%
-            reporthook(5, 1024, 10240)  # 50%
-            reporthook(10, 1024, 10240)  # 100%
+            progress_callback(0.1, "ダウンロード中: 0.1MB / 1.0MB (10.0%)")
+            progress_callback(0.5, "ダウンロード中: 0.5MB / 1.0MB (50.0%)")
+            progress_callback(1.0, "ダウンロード中: 1.0MB / 1.0MB (100.0%)")
+        return dest
 
-    mock_urlretrieve.side_effect = simulate_download
+    mock_download_file.side_effect = simulate_download
 
     result = ensure_model_downloaded("tiny", progress_callback)
 
@@ -87,4 +178,159 @@ def test_ensure_model_downloaded_new_download(
     assert len(progress_calls) >= 3  # 開始、進捗、完了
     assert any("ダウンロード中" in call[1] for call in progress_calls)
     assert any("完了" in call[1] for call in progress_calls)
-    mock_urlretrieve.assert_called_once()
+    mock_download_file.assert_called_once()
+    # URLに含まれるチェックサムで検証する
+    assert mock_download_file.call_args.kwargs["expected_sha256"] == expected_sha256(
+        "tiny"
+    )
+
+
+def test_expected_sha256_はURLからチェックサムを取り出す() -> None:
+    """MODEL_URLSのパスに含まれるSHA-256が取得できることを確認."""
+    assert expected_sha256("tiny") == (
+        "65147644a518d12f04e32d6f3b26facc3f8dd46e5390956a9424a650c0ce22b9"
+    )
+
+
+def test_download_file_チェックサムを検証して保存する(
+    http_server: Any, tmp_path: Path
+) -> None:
+    """ダウンロードした内容がチェックサムと一致すれば保存されることを確認."""
+    dest = tmp_path / "model.pt"
+    progress_calls: list[float] = []
+
+    download_file(
+        http_server.url,
+        dest,
+        expected_sha256=hashlib.sha256(PAYLOAD).hexdigest(),
+        progress_callback=lambda ratio, _: progress_calls.append(ratio),
+    )
+
+    assert dest.read_bytes() == PAYLOAD
+    assert not (tmp_path / "model.pt.part").exists()
+    assert progress_calls[-1] == 1.0
+
+
+def test_download_file_途中のファイルから再開する(
+    http_server: Any, tmp_path: Path
+) -> None:
+    """既存の途中データがあればその続きからRangeで取得することを確認."""
+    dest = tmp_path / "model.pt"
+    (tmp_path / "model.pt.part").write_bytes(PAYLOAD[:300_000])
+
+    download_file(
+        http_server.url, dest, expected_sha256=hashlib.sha256(PAYLOAD).hexdigest()
+    )
+
+    assert dest.read_bytes() == PAYLOAD
+    assert f"bytes=300000-{len(PAYLOAD) - 1}" in http_server.requests
+
+
+def test_download_file_接続が切れても続きから再開する(
+    http_server: Any, tmp_path: Path
+) -> None:
+    """レスポンスが途中で切れた場合に続きから取得し直すことを確認."""
+    http_server.drop_after = 200_000
+    dest = tmp_path / "model.pt"
+
+    download_file(
+        http_server.url, dest, expected_sha256=hashlib.sha256(PAYLOAD).hexdigest()
+    )
+
+    assert dest.read_bytes() == PAYLOAD
+    assert f"bytes=200000-{len(PAYLOAD) - 1}" in http_server.requests
+
+
+def test_download_file_複数の範囲を並列に取得する(
+    http_server: Any, tmp_path: Path
+) -> None:
+    """connectionsを指定すると範囲を分割して取得し、結合することを確認."""
+    dest = tmp_path / "model.pt"
+
+    download_file(
+        http_server.url,
+        dest,
+        expected_sha256=hashlib.sha256(PAYLOAD).hexdigest(),
+        connections=4,
+    )
+
+    assert dest.read_bytes() == PAYLOAD
+    assert "bytes=0-262143" in http_server.requests
+    assert "bytes=786432-1048575" in http_server.requests
+    assert not list(tmp_path.glob("*.part*"))
+
+
+def test_download_file_Range非対応なら最初から取得し直す(
+    http_server: Any, tmp_path: Path
+) -> None:
+    """サーバーがRangeを無視した場合、途中データを捨てて取得することを確認."""
+    http_server.support_range = False
+    dest = tmp_path / "model.pt"
+    (tmp_path / "model.pt.part").write_bytes(b"x" * 1000)
+
+    download_file(
+        http_server.url, dest, expected_sha256=hashlib.sha256(PAYLOAD).hexdigest()
+    )
+
+    assert dest.read_bytes() == PAYLOAD
+
+
+@pytest.mark.parametrize("support_range", [False, "probe"])
+def test_download_file_Range非対応なら並列でも1接続で取得する(
+    http_server: Any, tmp_path: Path, support_range: Any
+) -> None:
+    """Rangeを無視するサーバーでは範囲ごとに全体が重複せず、1接続で取得することを確認."""
+    http_server.support_range = support_range
+    dest = tmp_path / "model.pt"
+
+    download_file(
+        http_server.url,
+        dest,
+        expected_sha256=hashlib.sha256(PAYLOAD).hexdigest(),
+        connections=4,
+    )
+
+    assert dest.read_bytes() == PAYLOAD
+    assert f"bytes=0-{len(PAYLOAD) - 1}" in http_server.requests
+    assert not list(tmp_path.glob("*.part*"))
+
+
+def test_download_file_チェックサムが一致しない場合はエラー(
+    http_server: Any, tmp_path: Path
+) -> None:
+    """チェックサムが一致しない場合はValueErrorで途中データも削除されることを確認."""
+    dest = tmp_path / "model.pt"
+
+    with pytest.raises(ValueError, match="チェックサム"):
+        download_file(http_server.url, dest, expected_sha256="0" * 64)
+
+    assert not dest.exists()
+    assert not (tmp_path / "model.pt.part").exists()
+
+
+def test_split_model_choice_int8の選択肢を分解する() -> None:
+    """int8の接尾辞付きの選択肢がモデル名とdtypeに分かれることを確認"""
+    assert split_model_choice("large-v3:int8") == ("large-v3", "int8")
+    assert split_model_choice("large-v3") == ("large-v3", "float32")
+
+
+def test_get_quantized_model_path_元のモデルと同じ場所に保存する() -> None:
+    """量子化済みモデルのパスが元のモデルファイルの隣になることを確認"""
+    path = get_quantized_model_path("large")
+    assert path.parent == get_model_path("large").parent
+    assert path.name == "large-v2.int8.pt"
+
+
+def test_faster_whisperのモデルはCTranslate2形式で判定する(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """faster-whisper用のモデルはmodel.binの有無でダウンロード済みか判定することを確認"""
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    model_dir = get_ctranslate2_model_dir("large")
+    assert model_dir.name == "faster-whisper-large-v2"
+    assert not is_model_downloaded("large", backend="faster-whisper")
+
+    model_dir.mkdir(parents=True)
+    (model_dir / "model.bin").write_bytes(b"")
+    assert is_model_downloaded("large", backend="faster-whisper")
+    assert ensure_model_downloaded("large", backend="faster-whisper") is False
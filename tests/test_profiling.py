@@ -0,0 +1,127 @@
+"""profilingモジュールのテスト."""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from transcription_tool.model_registry import ModelRegistry
+from transcription_tool.profiling import JobProfiler, fallback_reasons
+from transcription_tool.transcriber import Transcriber
+
+
+def _tiny_model() -> Any:
+    """ランダムな重みの小さなWhisperモデル."""
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    torch.manual_seed(0)
+    dims = ModelDimensions(
+        n_mels=80,
+        n_audio_ctx=1500,
+        n_audio_state=32,
+        n_audio_head=2,
+        n_audio_layer=1,
+        n_vocab=51865,
+        n_text_ctx=64,
+        n_text_state=32,
+        n_text_head=2,
+        n_text_layer=2,
+    )
+    model = Whisper(dims).eval()
+    # デコーダの位置埋め込みはtorch.emptyで確保されるため乱数で初期化する
+    torch.nn.init.normal_(model.decoder.positional_embedding, std=0.01)
+    return model
+
+
+def test_fallback_reasons_はtranscribeと同じ基準で判定する() -> None:
+    """繰り返し・低い対数確率・無音の扱いがmodel.transcribeと一致することを確認"""
+    assert fallback_reasons(3.0, -0.5, 0.1) == ["compression_ratio"]
+    assert fallback_reasons(1.5, -1.5, 0.1) == ["avg_logprob"]
+    assert fallback_reasons(3.0, -1.5, 0.1) == ["compression_ratio", "avg_logprob"]
+    assert fallback_reasons(1.5, -1.5, 0.9) == []  # 無音として扱われる
+    assert fallback_reasons(1.5, -0.5, 0.1) == []
+
+
+def test_watch_は温度が戻った呼び出しを新しいウィンドウとして記録する(
+    tmp_path: Path,
+) -> None:
+    """温度を上げた再デコードが同じウィンドウの試行として記録されることを確認"""
+    outputs = iter(
+        [
+            SimpleNamespace(
+                tokens=[1] * 40,
+                compression_ratio=3.1,
+                avg_logprob=-0.2,
+                no_speech_prob=0,
+            ),
+            SimpleNamespace(
+                tokens=[1] * 8,
+                compression_ratio=1.2,
+                avg_logprob=-0.3,
+                no_speech_prob=0,
+            ),
+            SimpleNamespace(
+                tokens=[1] * 5,
+                compression_ratio=1.1,
+                avg_logprob=-0.1,
+                no_speech_prob=0,
+            ),
+        ]
+    )
+    model = Mock()
+    model.decode.side_effect = lambda segment, options: next(outputs)
+    original = model.decode
+    profiler = JobProfiler(tmp_path, "audio")
+
+    with profiler.watch(model):
+        for temperature in (0.0, 0.2, 0.0):
+            model.decode("mel", SimpleNamespace(temperature=temperature))
+
+    assert model.decode is original
+    assert [(a.window, a.attempt) for a in profiler.attempts] == [
+        (0, 0),
+        (0, 1),
+        (1, 0),
+    ]
+    assert profiler.attempts[0].fallback_reasons == ["compression_ratio"]
+    assert profiler.attempts[0].tokens == 40
+    assert profiler.attempts[1].fallback_reasons == []
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_transcribe_はプロファイルとデコードログを保存する(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock, tmp_path: Path
+) -> None:
+    """実際のmodel.decodeの試行が記録され、各ファイルが保存されることを確認"""
+    model = _tiny_model()
+    mock_load_model.return_value = model
+    mock_load_audio.return_value = (
+        np.random.default_rng(0).normal(0, 0.1, 16000 * 5).astype(np.float32)
+    )
+    audio_file = tmp_path / "meeting.wav"
+    audio_file.write_bytes(b"audio")
+    profiler = JobProfiler(tmp_path / "out", "meeting")
+
+    transcriber = Transcriber(
+        model_name="tiny", device="cpu", registry=ModelRegistry(), language="en"
+    )
+    transcriber.transcribe(audio_file, profiler=profiler)
+
+    assert profiler.attempts
+    assert profiler.attempts[0].window == 0
+    assert profiler.attempts[0].temperature == 0.0
+    assert "decode" not in vars(model)  # 元のdecodeに戻っている
+
+    lines = (tmp_path / "out" / "meeting.decode_log.jsonl").read_text().splitlines()
+    assert len(lines) == len(profiler.attempts)
+    assert set(json.loads(lines[0])) >= {"window", "temperature", "tokens"}
+    assert (tmp_path / "out" / "meeting.profile.prof").stat().st_size > 0
+    summary = (tmp_path / "out" / "meeting.profile.txt").read_text(encoding="utf-8")
+    assert "ウィンドウ数: " in summary
+    assert "cumulative" in summary
@@ -0,0 +1,92 @@
+"""quantizationモジュールのテスト"""
+
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+import torch
+from whisper.model import ModelDimensions, Whisper
+
+from transcription_tool.model_registry import estimate_model_size_mb
+from transcription_tool.quantization import load_quantized_model, quantize_model
+
+# テスト用の小さなモデル（重みは乱数）
+DIMS = ModelDimensions(
+    n_mels=80,
+    n_audio_ctx=1500,
+    n_audio_state=64,
+    n_audio_head=2,
+    n_audio_layer=1,
+    n_vocab=51865,
+    n_text_ctx=448,
+    n_text_state=64,
+    n_text_head=2,
+    n_text_layer=1,
+)
+
+
+def _small_model() -> Whisper:
+    torch.manual_seed(0)
+    return Whisper(DIMS).eval()
+
+
+def test_quantize_model_線形層がint8になりメモリが減る() -> None:
+    """すべての線形層が動的量子化され、推論結果の形も変わらないことを確認"""
+    model = _small_model()
+    mel = torch.randn(1, 80, 3000)
+    with torch.no_grad():
+        expected = model.encoder(mel)
+    fp32_size = estimate_model_size_mb(model, "tiny")
+
+    quantized = quantize_model(model)
+
+    modules = list(quantized.modules())
+    assert not any(isinstance(m, torch.nn.Linear) for m in modules)
+    assert any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in modules)
+    with torch.no_grad():
+        actual = quantized.encoder(mel)
+    assert actual.shape == expected.shape
+    assert np.corrcoef(actual.flatten(), expected.flatten())[0, 1] > 0.9
+    assert estimate_model_size_mb(quantized, "tiny") < fp32_size
+
+
+@patch("whisper.load_model")
+def test_load_quantized_model_量子化は初回のみ(
+    mock_load_model: Mock, tmp_path: Path
+) -> None:
+    """量子化したモデルが保存され、2回目以降は保存済みのものを読み込むことを確認"""
+    mock_load_model.side_effect = lambda *args, **kwargs: _small_model()
+    cache_path = tmp_path / "tiny.int8.pt"
+    messages: list[str] = []
+
+    with patch(
+        "transcription_tool.quantization.get_quantized_model_path",
+        return_value=cache_path,
+    ):
+        first = load_quantized_model("tiny", messages.append)
+        second = load_quantized_model("tiny", messages.append)
+
+    mock_load_model.assert_called_once_with("tiny", device="cpu")
+    assert cache_path.exists()
+    assert len(messages) == 1
+    assert type(second) is type(first)
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+@patch("whisper.load_model")
+def test_load_quantized_model_壊れた保存ファイルは作り直す(
+    mock_load_model: Mock, tmp_path: Path
+) -> None:
+    """読み込めない量子化済みファイルがある場合は量子化し直すことを確認"""
+    mock_load_model.side_effect = lambda *args, **kwargs: _small_model()
+    cache_path = tmp_path / "tiny.int8.pt"
+    cache_path.write_bytes(b"broken")
+
+    with patch(
+        "transcription_tool.quantization.get_quantized_model_path",
+        return_value=cache_path,
+    ):
+        load_quantized_model("tiny")
+
+    mock_load_model.assert_called_once()
+    assert cache_path.stat().st_size > len(b"broken")
@@ -0,0 +1,61 @@
+"""result_cacheモジュールのテスト."""
+
+import os
+from pathlib import Path
+
+from transcription_tool.result_cache import ResultCache, make_cache_key
+
+
+def test_保存した結果を取得できる(tmp_path: Path) -> None:
+    """putした結果がgetで取得できることを確認."""
+    cache = ResultCache(cache_dir=tmp_path)
+    result = {
+        "text": "テスト",
+        "segments": [{"start": 0.0, "end": 1.0, "text": "テスト"}],
+        "language": "ja",
+    }
+
+    cache.put("key", result)
+
+    assert cache.get("key") == result
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.hit_rate == 0.5
+
+
+def test_キャッシュは永続化される(tmp_path: Path) -> None:
+    """別インスタンスからも保存済みの結果を取得できることを確認."""
+    ResultCache(cache_dir=tmp_path).put("key", {"text": "テスト"})
+    assert ResultCache(cache_dir=tmp_path).get("key") == {"text": "テスト"}
+
+
+def test_キーは結果に影響する条件ごとに異なる() -> None:
+    """音声・モデル・言語・オプションが異なればキーも異なることを確認."""
+    base = make_cache_key("abc", "tiny", None, {"mode": "standard"})
+    assert base == make_cache_key("abc", "tiny", None, {"mode": "standard"})
+    assert base != make_cache_key("abd", "tiny", None, {"mode": "standard"})
+    assert base != make_cache_key("abc", "base", None, {"mode": "standard"})
+    assert base != make_cache_key("abc", "tiny", "ja", {"mode": "standard"})
+    assert base != make_cache_key("abc", "tiny", None, {"mode": "long_form"})
+
+
+def test_容量上限を超えると古いものから削除される(tmp_path: Path) -> None:
+    """合計サイズが上限を超えた場合、最終アクセスが古いものから削除されることを確認."""
+    text = "あ" * 1000  # 約3KB
+    cache = ResultCache(cache_dir=tmp_path, max_size_mb=7 / 1024)
+
+    cache.put("first", {"text": text})
+    cache.put("second", {"text": text})
+    # firstを古く、secondを新しくしておく
+    os.utime(tmp_path / "first.json", (1, 1))
+    os.utime(tmp_path / "second.json", (2, 2))
+    cache.get("first")  # アクセスでfirstが最新になる
+
+    cache.put("third", {"text": text})
+
+    assert (tmp_path / "first.json").exists()
+    assert not (tmp_path / "second.json").exists()
+    assert (tmp_path / "third.json").exists()
+    assert cache.stats().evictions == 1
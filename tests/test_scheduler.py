@@ -0,0 +1,252 @@
+"""schedulerモジュールのテスト."""
+
+import threading
+from collections.abc import Iterator
+from typing import Callable, Optional
+
+import pytest
+
+from transcription_tool.model_registry import ModelRegistry
+from transcription_tool.scheduler import (
+    CANCELLED,
+    DONE,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    JobScheduler,
+    LaneModel,
+    lane_name,
+    parse_lane_name,
+)
+
+
+def _blocking_job(
+    release: threading.Event, started: Optional[threading.Event] = None
+) -> Callable[[], str]:
+    """releaseがセットされるまで終わらないジョブを作成する."""
+
+    def run() -> str:
+        if started is not None:
+            started.set()
+        release.wait(timeout=5)
+        return "done"
+
+    return run
+
+
+@pytest.fixture
+def scheduler() -> Iterator[JobScheduler]:
+    """テスト用のスケジューラ（終了時に停止する）."""
+    instance = JobScheduler(registry=ModelRegistry(), memory_probe=lambda: None)
+    yield instance
+    instance.shutdown()
+
+
+def test_ジョブが実行されて結果が記録される(scheduler: JobScheduler) -> None:
+    """投入したジョブが実行され、結果と状態が記録されることを確認."""
+    job = scheduler.submit("tiny", lambda: "結果")
+
+    assert job.wait(timeout=2)
+    assert job.status == DONE
+    assert job.result == "結果"
+    assert job.queue_wait is not None
+
+
+def test_ジョブの例外は失敗として記録される(scheduler: JobScheduler) -> None:
+    """ジョブ内の例外が失敗として記録されることを確認."""
+
+    def fail() -> None:
+        raise RuntimeError("失敗")
+
+    job = scheduler.submit("tiny", fail)
+
+    assert job.wait(timeout=2)
+    assert job.status == FAILED
+    assert isinstance(job.error, RuntimeError)
+
+
+def test_同じレーンは同時実行数までしか実行しない(scheduler: JobScheduler) -> None:
+    """同時実行数1のレーンでは2件目が待機し、待ち順が返ることを確認."""
+    release = threading.Event()
+    started = threading.Event()
+    first = scheduler.submit("tiny", _blocking_job(release, started))
+    assert started.wait(timeout=2)
+    second = scheduler.submit("tiny", lambda: None, audio_seconds=60)
+
+    assert scheduler.queue_position(first.job_id) == 0
+    assert scheduler.queue_position(second.job_id) == 1
+    assert second.status == QUEUED
+    assert first.status == RUNNING
+
+    release.set()
+    assert second.wait(timeout=2)
+    assert second.status == DONE
+    assert scheduler.queue_position(second.job_id) is None
+
+
+def test_別のモデルのレーンは並行して実行される(scheduler: JobScheduler) -> None:
+    """異なるモデルのジョブは互いに待たずに実行されることを確認."""
+    release = threading.Event()
+    scheduler.submit("large-v3", _blocking_job(release))
+
+    job = scheduler.submit("tiny", lambda: "tiny")
+    assert job.wait(timeout=2)
+    release.set()
+
+
+def test_レーンの同時実行数を設定できる() -> None:
+    """lane_concurrencyで指定したレーンは複数のジョブを並行して実行することを確認."""
+    scheduler = JobScheduler(
+        lane_concurrency={"tiny": 2},
+        registry=ModelRegistry(),
+        memory_probe=lambda: None,
+    )
+    release = threading.Event()
+    started = [threading.Event(), threading.Event()]
+    for event in started:
+        scheduler.submit("tiny", _blocking_job(release, event))
+
+    assert all(event.wait(timeout=2) for event in started)
+    assert scheduler.lane_concurrency("tiny") == 2
+    assert scheduler.lane_concurrency("base") == 1
+    release.set()
+    scheduler.shutdown()
+
+
+def test_投入時にレーンの同時実行数を指定できる(scheduler: JobScheduler) -> None:
+    """新しいレーンを作るジョブで指定した同時実行数が使われることを確認."""
+    release = threading.Event()
+    started = [threading.Event() for _ in range(3)]
+    for event in started:
+        scheduler.submit("tiny+batch", _blocking_job(release, event), concurrency=3)
+
+    assert all(event.wait(timeout=2) for event in started)
+    release.set()
+
+
+def test_待機中のジョブはキャンセルできる(scheduler: JobScheduler) -> None:
+    """待機中のジョブはキャンセルでき、実行中のジョブはできないことを確認."""
+    release = threading.Event()
+    started = threading.Event()
+    running = scheduler.submit("tiny", _blocking_job(release, started))
+    assert started.wait(timeout=2)
+    queued = scheduler.submit("tiny", lambda: "実行されない")
+
+    assert scheduler.cancel(queued.job_id)
+    assert not scheduler.cancel(running.job_id)
+    assert not scheduler.cancel("unknown")
+
+    release.set()
+    assert running.wait(timeout=2)
+    assert queued.status == CANCELLED
+    assert queued.result is None
+
+
+def test_推定待ち時間は前のジョブの音声の長さから計算される(
+    scheduler: JobScheduler,
+) -> None:
+    """待ち時間の推定が、前に並ぶジョブの音声の長さに比例することを確認."""
+    release = threading.Event()
+    started = threading.Event()
+    scheduler.submit("tiny", _blocking_job(release, started), audio_seconds=100)
+    assert started.wait(timeout=2)
+    second = scheduler.submit("tiny", lambda: None, audio_seconds=100)
+    third = scheduler.submit("tiny", lambda: None, audio_seconds=100)
+
+    second_wait = scheduler.estimate_wait(second.job_id)
+    third_wait = scheduler.estimate_wait(third.job_id)
+    assert second_wait is not None and third_wait is not None
+    assert 0 < second_wait < third_wait
+    release.set()
+
+
+def test_空きメモリが足りない場合は実行中のジョブの終了を待つ() -> None:
+    """モデルを追加でロードする空きがない場合は開始を遅らせることを確認."""
+    scheduler = JobScheduler(
+        registry=ModelRegistry(),
+        memory_reserve_mb=0,
+        memory_probe=lambda: 100.0,
+    )
+    release = threading.Event()
+    started = threading.Event()
+    # 何も実行していない場合はメモリに関係なく開始する
+    scheduler.submit("large-v3", _blocking_job(release, started))
+    assert started.wait(timeout=2)
+
+    # large-v3のロード中に別のlargeモデルをロードする空きはない
+    waiting = scheduler.submit("large-v2", lambda: None)
+    assert not waiting.wait(timeout=0.3)
+    assert waiting.status == QUEUED
+
+    release.set()
+    assert waiting.wait(timeout=3)
+    assert waiting.status == DONE
+    scheduler.shutdown()
+
+
+@pytest.mark.parametrize(
+    "lane", ["large-v3:int8", "faster-whisper/large-v3", "large-v3+batch"]
+)
+def test_モデルの選択肢のレーンも空きメモリを確認する(lane: str) -> None:
+    """量子化などの選択肢でもモデル本来のサイズで必要なメモリを見積もることを確認."""
+    scheduler = JobScheduler(
+        registry=ModelRegistry(),
+        memory_reserve_mb=0,
+        memory_probe=lambda: 100.0,
+    )
+    release = threading.Event()
+    started = threading.Event()
+    scheduler.submit("large-v3", _blocking_job(release, started))
+    assert started.wait(timeout=2)
+
+    waiting = scheduler.submit(lane, lambda: None)
+    assert not waiting.wait(timeout=0.3)
+    assert waiting.status == QUEUED
+
+    release.set()
+    assert waiting.wait(timeout=3)
+    scheduler.shutdown()
+
+
+def test_まとめてデコードするレーンは2件目以降にモデル分のメモリを求めない() -> None:
+    """+batchのレーンでは実行中のジョブとモデルを共有するため開始できることを確認."""
+    scheduler = JobScheduler(
+        registry=ModelRegistry(),
+        memory_reserve_mb=0,
+        memory_probe=lambda: 100.0,
+        default_concurrency=2,
+    )
+    release = threading.Event()
+    started = threading.Event()
+    scheduler.submit("large-v3+batch", _blocking_job(release, started))
+    assert started.wait(timeout=2)
+
+    second = scheduler.submit("large-v3+batch", lambda: None)
+    assert second.wait(timeout=2)
+
+    release.set()
+    scheduler.shutdown()
+
+
+def test_parse_lane_name_はlane_nameの逆変換になる() -> None:
+    """レーン名からモデル名・dtype・推論バックエンドを取り出せることを確認."""
+    lane = lane_name("large-v3:int8", "faster-whisper", micro_batch=True)
+    assert parse_lane_name(lane) == LaneModel(
+        "large-v3", "int8", "faster-whisper", micro_batch=True
+    )
+    assert parse_lane_name("tiny") == LaneModel("tiny")
+
+
+def test_終了済みのジョブは上限を超えると古い順に破棄される() -> None:
+    """終了したジョブの結果を保持し続けないことを確認."""
+    scheduler = JobScheduler(
+        registry=ModelRegistry(), memory_probe=lambda: None, max_finished_jobs=2
+    )
+    jobs = [scheduler.submit("tiny", lambda: "done") for _ in range(3)]
+    for job in jobs:
+        assert job.wait(timeout=3)
+
+    assert scheduler.get_job(jobs[0].job_id) is None
+    assert scheduler.get_job(jobs[1].job_id) is jobs[1]
+    assert scheduler.get_job(jobs[2].job_id) is jobs[2]
+    scheduler.shutdown()
@@ -0,0 +1,103 @@
+"""search_indexモジュールのテスト"""
+
+import os
+import sqlite3
+from pathlib import Path
+
+from transcription_tool.history_index import HistoryIndex
+from transcription_tool.search_index import (
+    SCHEMA,
+    index_document,
+    parse_transcript,
+    search,
+    to_match_query,
+    to_terms,
+)
+
+TRANSCRIPT = """# 文字起こし結果
+
+**ファイル名**: meeting.wav
+
+## 文字起こし内容
+
+[00:00 - 00:05] 本日の会議を始めます。
+
+[01:02 - 01:09] 会議室の予約は山田さんにお願いします。
+
+[1:00:00 - 1:00:04] 以上で終了です。
+"""
+
+
+def _write(directory: Path, name: str, content: str) -> Path:
+    path = directory / name
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def test_to_terms_文字bigramに分割する() -> None:
+    """区切り文字で分けた連続部分ごとにbigramと末尾の1文字を返すことを確認"""
+    assert to_terms("会議室。ＡＢ") == "会議 議室 室 ab b"
+
+
+def test_to_match_query_フレーズと前方一致に変換する() -> None:
+    """2文字以上はbigramのフレーズ、1文字は前方一致になることを確認"""
+    assert to_match_query("会議室 山") == '"会議 議室" AND "山"*'
+    assert to_match_query("。、 ") is None
+
+
+def test_parse_transcript_タイムスタンプ付きの行を秒数に変換する() -> None:
+    """本文の見出し以降のセグメントと開始・終了秒を取り出すことを確認"""
+    segments = parse_transcript(TRANSCRIPT)
+
+    assert segments[0] == (0.0, 5.0, "本日の会議を始めます。")
+    assert segments[1][:2] == (62.0, 69.0)
+    assert segments[2][:2] == (3600.0, 3604.0)
+    assert parse_transcript("## 文字起こし内容\n\n本文だけ\n") == [
+        (None, None, "本文だけ")
+    ]
+
+
+def test_search_部分文字列をセグメント単位で検索する(tmp_path: Path) -> None:
+    """日本語の部分文字列・1文字・AND検索でセグメントがヒットすることを確認"""
+    conn = _connect()
+    index_document(conn, _write(tmp_path, "meeting.md", TRANSCRIPT))
+
+    hits = search(conn, "会議")
+    assert [hit.start for hit in sorted(hits, key=lambda h: h.start or 0)] == [0, 62]
+    assert [hit.start for hit in search(conn, "会議室")] == [62.0]
+    assert [hit.start for hit in search(conn, "予約 山田")] == [62.0]
+    assert [hit.start for hit in search(conn, "了")] == [3600.0]
+    assert search(conn, "議事録") == []
+    # 句読点をまたいだ文字列はヒットしない
+    assert search(conn, "ます本日") == []
+
+
+def test_search_再登録すると古い本文は検索されない(tmp_path: Path) -> None:
+    """同じファイルを登録し直した場合に古いセグメントが残らないことを確認"""
+    conn = _connect()
+    path = _write(tmp_path, "memo.md", "## 文字起こし内容\n\n古い内容\n")
+    index_document(conn, path)
+    _write(tmp_path, "memo.md", "## 文字起こし内容\n\n新しい内容\n")
+    index_document(conn, path)
+
+    assert search(conn, "古い") == []
+    assert [hit.text for hit in search(conn, "内容")] == ["新しい内容"]
+
+
+def test_HistoryIndex_保存と削除に追従する(tmp_path: Path) -> None:
+    """recordとreconcileで全文検索の索引も更新されることを確認"""
+    index = HistoryIndex(tmp_path)
+    index.reconcile()
+    index.record(_write(tmp_path, "meeting.md", TRANSCRIPT))
+    assert [hit.filename for hit in index.search("会議室")] == ["meeting.md"]
+
+    (tmp_path / "meeting.md").unlink()
+    os.utime(tmp_path, (1000, 1000))
+    index.reconcile()
+    assert index.search("会議室") == []
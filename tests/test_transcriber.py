@@ -3,7 +3,11 @@
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+import numpy as np
 import pytest
+from transcription_tool.audio_cache import AudioCache
+from transcription_tool.model_registry import ModelRegistry
+from transcription_tool.result_cache import ResultCache
 from transcription_tool.transcriber import Transcriber
 
 
@@ -71,12 +75,425 @@ def test_transcribe_初回呼び出し時にモデルがロードされる(mock_
     # テスト用の音声ファイルパス
     test_audio = Path("tests/test_data/test_audio.wav")
 
-    transcriber = Transcriber(model_name="tiny")
+    transcriber = Transcriber(model_name="tiny", device="cpu", registry=ModelRegistry())
 
     # ファイルが存在する場合のみテストを実行
     if test_audio.exists():
         result = transcriber.transcribe(test_audio, progress_callback=None)
 
         # モデルがロードされたことを確認
-        mock_load_model.assert_called_once_with("tiny")
+        mock_load_model.assert_called_once_with("tiny", device="cpu")
         assert result["text"] == "テストテキスト"
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_同じモデルはレジストリから再利用される(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock
+) -> None:
+    """別のTranscriberインスタンスでもロード済みモデルが再利用されることを確認"""
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {"text": "テストテキスト"}
+    mock_load_model.return_value = mock_model
+    registry = ModelRegistry()
+
+    test_file = Path("tests/test_data/registry_test.wav")
+    test_file.parent.mkdir(parents=True, exist_ok=True)
+    test_file.write_bytes(b"")
+
+    try:
+        for _ in range(2):
+            transcriber = Transcriber(
+                model_name="tiny", device="cpu", registry=registry
+            )
+            transcriber.transcribe(test_file)
+    finally:
+        test_file.unlink()
+
+    mock_load_model.assert_called_once_with("tiny", device="cpu")
+    assert registry.stats().hits == 1
+    assert registry.stats().misses == 1
+
+
+def test_CPUでfloat16を指定するとエラーになる() -> None:
+    """CPUでfloat16を指定した場合、ValueErrorが発生することを確認"""
+    transcriber = Transcriber(model_name="tiny", device="cpu", dtype="float16")
+    with pytest.raises(ValueError, match="float16"):
+        transcriber._load_model()
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_long_formではチャンクごとに文字起こしして結合する(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock
+) -> None:
+    """long_form指定時にチャンク単位で処理され、結果が結合されることを確認"""
+    import numpy as np
+
+    # 300秒の無音（無音点がないため120秒ごとに分割される）
+    mock_load_audio.return_value = np.full(300 * 16000, 0.5, dtype=np.float32)
+    mock_model = Mock()
+    mock_model.is_multilingual = False  # 事前の言語判定を行わない
+    mock_model.transcribe.side_effect = lambda audio, **kwargs: {
+        "text": f"チャンク{mock_model.transcribe.call_count}",
+        "language": "ja",
+        "segments": [
+            {
+                "id": 0,
+                "start": 0.0,
+                "end": len(audio) / 16000,
+                "text": f"チャンク{mock_model.transcribe.call_count}",
+            }
+        ],
+    }
+    mock_load_model.return_value = mock_model
+
+    test_file = Path("tests/test_data/long_form_test.wav")
+    test_file.parent.mkdir(parents=True, exist_ok=True)
+    test_file.write_bytes(b"")
+
+    try:
+        transcriber = Transcriber(
+            model_name="tiny", device="cpu", registry=ModelRegistry()
+        )
+        result = transcriber.transcribe(test_file, long_form=True, max_workers=1)
+    finally:
+        test_file.unlink()
+
+    assert mock_model.transcribe.call_count == 3
+    assert result["language"] == "ja"
+    assert result["text"] == "チャンク1チャンク2チャンク3"
+    assert result["segments"][-1]["end"] == 300.0
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_transcribe_stream_はウィンドウごとにセグメントを返す(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock
+) -> None:
+    """transcribe_streamがウィンドウ単位で補正済みのセグメントを返すことを確認"""
+    import numpy as np
+
+    mock_load_audio.return_value = np.full(70 * 16000, 0.5, dtype=np.float32)
+    mock_model = Mock()
+    mock_model.is_multilingual = False  # 事前の言語判定を行わない
+    mock_model.transcribe.side_effect = lambda audio, **kwargs: {
+        "text": "こんにちは。",
+        "language": "ja",
+        "segments": [{"id": 0, "start": 1.0, "end": 2.0, "text": "こんにちは。"}],
+    }
+    mock_load_model.return_value = mock_model
+
+    test_file = Path("tests/test_data/stream_test.wav")
+    test_file.parent.mkdir(parents=True, exist_ok=True)
+    test_file.write_bytes(b"")
+
+    try:
+        transcriber = Transcriber(
+            model_name="tiny", device="cpu", registry=ModelRegistry()
+        )
+        updates = list(transcriber.transcribe_stream(test_file))
+    finally:
+        test_file.unlink()
+
+    assert [u.position for u in updates] == [30.0, 60.0, 70.0]
+    assert updates[-1].progress == 1.0
+    assert [u.segments[0]["start"] for u in updates] == [1.0, 31.0, 61.0]
+    assert [u.segments[0]["id"] for u in updates] == [0, 1, 2]
+    # 2回目以降は最初に検出した言語と直前のテキストが引き継がれる
+    second_call = mock_model.transcribe.call_args_list[1]
+    assert second_call.kwargs["language"] == "ja"
+    assert second_call.kwargs["initial_prompt"] == "こんにちは。"
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_VADでは無音を除いてデコードし元の時刻に戻す(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock, tmp_path: Path
+) -> None:
+    """無音を除いた音声をデコードし、タイムスタンプと発話の割合を返すことを確認"""
+    t = np.arange(2 * 16000) / 16000
+    tone = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    silence = np.zeros(18 * 16000, dtype=np.float32)
+    mock_load_audio.return_value = np.concatenate([silence, tone, silence])
+    mock_model = Mock()
+    mock_model.is_multilingual = False  # 事前の言語判定を行わない
+    mock_model.transcribe.return_value = {
+        "text": "こんにちは。",
+        "language": "ja",
+        "segments": [{"id": 0, "start": 0.2, "end": 2.2, "text": "こんにちは。"}],
+    }
+    mock_load_model.return_value = mock_model
+    audio_file = tmp_path / "vad.wav"
+    audio_file.write_bytes(b"")
+
+    transcriber = Transcriber(
+        model_name="tiny", device="cpu", registry=ModelRegistry(), vad=True
+    )
+    result = transcriber.transcribe(audio_file)
+
+    decoded = mock_model.transcribe.call_args.args[0]
+    assert len(decoded) < 3 * 16000
+    assert result["segments"][0]["start"] == pytest.approx(18.0, abs=0.05)
+    assert result["segments"][0]["end"] == pytest.approx(20.0, abs=0.05)
+    assert result["duration"] == 38.0
+    assert result["speech_ratio"] == pytest.approx(2.4 / 38.0, abs=0.01)
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_VADで発話がなければデコードしない(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock, tmp_path: Path
+) -> None:
+    """無音だけの音声ではモデルを呼ばずに空の結果を返すことを確認"""
+    mock_load_audio.return_value = np.zeros(10 * 16000, dtype=np.float32)
+    mock_model = Mock()
+    mock_load_model.return_value = mock_model
+    audio_file = tmp_path / "silence.wav"
+    audio_file.write_bytes(b"")
+
+    transcriber = Transcriber(
+        model_name="tiny", device="cpu", registry=ModelRegistry(), vad=True
+    )
+    result = transcriber.transcribe(audio_file)
+    updates = list(transcriber.transcribe_stream(audio_file))
+
+    mock_model.transcribe.assert_not_called()
+    assert result["text"] == ""
+    assert result["speech_ratio"] == 0.0
+    assert updates[-1].progress == 1.0
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_同じ音声の再実行ではキャッシュ済みの結果を返す(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock, tmp_path: Path
+) -> None:
+    """同じ内容の音声はモデルを使わずにキャッシュから結果が返されることを確認"""
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {"text": "テストテキスト", "segments": []}
+    mock_load_model.return_value = mock_model
+    cache = ResultCache(cache_dir=tmp_path / "cache")
+
+    first = tmp_path / "first.wav"
+    second = tmp_path / "second.wav"
+    first.write_bytes(b"same audio")
+    second.write_bytes(b"same audio")
+
+    transcriber = Transcriber(
+        model_name="tiny", device="cpu", registry=ModelRegistry(), result_cache=cache
+    )
+    assert transcriber.transcribe(first)["text"] == "テストテキスト"
+    assert transcriber.transcribe(second)["text"] == "テストテキスト"
+
+    mock_model.transcribe.assert_called_once()
+    assert cache.stats().hits == 1
+
+
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_別のモデルで再実行してもデコード済み音声を再利用する(
+    mock_load_model: Mock, mock_ensure: Mock, tmp_path: Path
+) -> None:
+    """音声キャッシュがあればモデルを変えてもデコードが1回で済むことを確認"""
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {"text": "テスト", "segments": []}
+    mock_load_model.return_value = mock_model
+    decoder = Mock(return_value=np.zeros(16000, dtype=np.float32))
+    audio_cache = AudioCache(cache_dir=tmp_path / "audio", decoder=decoder)
+
+    audio_file = tmp_path / "test.wav"
+    audio_file.write_bytes(b"audio")
+
+    for model_name in ("tiny", "base"):
+        transcriber = Transcriber(
+            model_name=model_name,
+            device="cpu",
+            registry=ModelRegistry(),
+            audio_cache=audio_cache,
+        )
+        assert transcriber.transcribe(audio_file)["duration"] == 1.0
+
+    decoder.assert_called_once_with(str(audio_file))
+    assert audio_cache.stats().hits == 1
+    assert mock_model.transcribe.call_count == 2
+
+
+@patch("transcription_tool.transcriber.detect_language")
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_言語は音声ごとに1回だけ判定して再利用する(
+    mock_load_model: Mock,
+    mock_ensure: Mock,
+    mock_load_audio: Mock,
+    mock_detect: Mock,
+    tmp_path: Path,
+) -> None:
+    """同じ音声の再実行では判定を省略し、判定した言語でデコードすることを確認"""
+    mock_load_audio.return_value = np.full(60 * 16000, 0.5, dtype=np.float32)
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {"text": "hello", "segments": []}
+    mock_load_model.return_value = mock_model
+    mock_detect.return_value = "en"
+
+    audio_file = tmp_path / "test.wav"
+    audio_file.write_bytes(str(tmp_path).encode())  # テストごとに異なる内容
+
+    for _ in range(2):
+        transcriber = Transcriber(
+            model_name="tiny", device="cpu", registry=ModelRegistry()
+        )
+        transcriber.transcribe(audio_file)
+
+    mock_detect.assert_called_once()
+    assert mock_model.transcribe.call_count == 2
+    assert mock_model.transcribe.call_args.kwargs["language"] == "en"
+
+
+@patch("transcription_tool.transcriber.detect_language")
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_言語を指定した場合は判定しない(
+    mock_load_model: Mock,
+    mock_ensure: Mock,
+    mock_load_audio: Mock,
+    mock_detect: Mock,
+    tmp_path: Path,
+) -> None:
+    """languageを指定するとモデル名によらずその言語でデコードすることを確認"""
+    mock_load_audio.return_value = np.full(60 * 16000, 0.5, dtype=np.float32)
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {"text": "hello", "segments": []}
+    mock_load_model.return_value = mock_model
+
+    audio_file = tmp_path / "test.wav"
+    audio_file.write_bytes(b"audio")
+
+    transcriber = Transcriber(
+        model_name="tiny", device="cpu", registry=ModelRegistry(), language="en"
+    )
+    result = transcriber.transcribe(audio_file)
+
+    mock_detect.assert_not_called()
+    assert mock_model.transcribe.call_args.kwargs["language"] == "en"
+    assert result["text"] == "hello"
+
+
+def test_GPUでint8を指定するとエラーになる() -> None:
+    """int8（動的量子化）をCPU以外で指定した場合、ValueErrorが発生することを確認"""
+    transcriber = Transcriber(model_name="tiny", device="cuda", dtype="int8")
+    with pytest.raises(ValueError, match="int8"):
+        transcriber._load_model()
+
+
+@patch("transcription_tool.backends.load_quantized_model")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_int8では量子化モデルをロードする(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_quantized: Mock
+) -> None:
+    """int8指定時は量子化モデルを使い、fp32とは別のキーで登録されることを確認"""
+    registry = ModelRegistry()
+    transcriber = Transcriber(
+        model_name="tiny", device="cpu", dtype="int8", registry=registry
+    )
+
+    assert transcriber._load_model() is mock_load_quantized.return_value
+    mock_load_model.assert_not_called()
+    assert registry.is_loaded("tiny", "int8")
+    assert not registry.is_loaded("tiny", "float32")
+
+
+def _speculative_models(draft_logprobs: list[float]) -> dict[str, Mock]:
+    """下書き（tiny）と再デコード（small）のモックモデルを作成する."""
+    logprobs = iter(draft_logprobs)
+    draft = Mock()
+    draft.is_multilingual = False  # 事前の言語判定を行わない
+    draft.transcribe.side_effect = lambda audio, **kwargs: {
+        "text": "下書き",
+        "language": "ja",
+        "segments": [
+            {"start": 1.0, "end": 2.0, "text": "下書き", "avg_logprob": next(logprobs)}
+        ],
+    }
+    refined = Mock()
+    refined.transcribe.side_effect = lambda audio, **kwargs: {
+        "text": "確定",
+        "language": "ja",
+        "segments": [{"start": 1.0, "end": 2.0, "text": "確定"}],
+    }
+    return {"tiny": draft, "small": refined}
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_transcribe_speculative_は下書きを確定した結果で置き換える(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock, tmp_path: Path
+) -> None:
+    """ウィンドウごとに下書きが先に届き、同じウィンドウの確定結果が後から届くことを確認"""
+    mock_load_audio.return_value = np.full(70 * 16000, 0.5, dtype=np.float32)
+    models = _speculative_models([-0.2, -0.2, -0.2])
+    mock_load_model.side_effect = lambda name, *args, **kwargs: models[name]
+    audio_file = tmp_path / "speculative.wav"
+    audio_file.write_bytes(b"")
+
+    transcriber = Transcriber(
+        model_name="small", device="cpu", registry=ModelRegistry(), language="ja"
+    )
+    updates = list(transcriber.transcribe_speculative(audio_file))
+
+    assert [update.window for update in updates if not update.refined] == [0, 1, 2]
+    for window in range(3):
+        window_updates = [update for update in updates if update.window == window]
+        assert [update.refined for update in window_updates] == [False, True]
+        assert window_updates[0].segments[0]["text"] == "下書き"
+        assert window_updates[1].segments[0]["text"] == "確定"
+        assert window_updates[1].segments[0]["start"] == 1.0 + window * 30
+    assert models["small"].transcribe.call_count == 3
+    # 再デコードは下書きと同じ言語で行う
+    assert models["small"].transcribe.call_args.kwargs["language"] == "ja"
+
+    with pytest.raises(ValueError):
+        next(transcriber.transcribe_speculative(audio_file, draft_model="large-v3"))
+
+
+@patch("whisper.load_audio")
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_transcribe_speculative_は確信度の低いウィンドウだけ再デコードする(
+    mock_load_model: Mock, mock_ensure: Mock, mock_load_audio: Mock, tmp_path: Path
+) -> None:
+    """refine_thresholdを上回る下書きはそのまま確定することを確認"""
+    mock_load_audio.return_value = np.full(70 * 16000, 0.5, dtype=np.float32)
+    models = _speculative_models([-0.1, -1.2, -0.1])
+    mock_load_model.side_effect = lambda name, *args, **kwargs: models[name]
+    audio_file = tmp_path / "speculative.wav"
+    audio_file.write_bytes(b"")
+
+    transcriber = Transcriber(
+        model_name="small", device="cpu", registry=ModelRegistry(), language="ja"
+    )
+    updates = list(
+        transcriber.transcribe_speculative(audio_file, refine_threshold=-0.5)
+    )
+
+    assert [
+        (update.window, update.final) for update in updates if not update.refined
+    ] == [
+        (0, True),
+        (1, False),
+        (2, True),
+    ]
+    refined = [update for update in updates if update.refined]
+    assert [update.window for update in refined] == [1]
+    assert refined[0].segments[0]["text"] == "確定"
+    assert models["small"].transcribe.call_count == 1
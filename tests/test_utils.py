@@ -2,7 +2,11 @@
 
 from pathlib import Path
 
-from transcription_tool.utils import save_transcription_as_markdown
+from transcription_tool.utils import (
+    compute_file_hash,
+    estimate_audio_duration,
+    save_transcription_as_markdown,
+)
 
 
 def test_save_transcription_as_markdown_関数が存在する() -> None:
@@ -56,3 +60,31 @@ def test_save_transcription_タイムスタンプ付き保存ができる(tmp_pa
     # ファイル内容の確認
     content = output_path.read_text(encoding="utf-8")
     assert "[00:00 - 00:02]" in content or "[0:00 - 0:02]" in content
+
+
+def test_compute_file_hash_は内容に応じたハッシュを返す(tmp_path: Path) -> None:
+    """同じ内容のファイルは同じハッシュになることを確認"""
+    first = tmp_path / "first.wav"
+    second = tmp_path / "second.wav"
+    third = tmp_path / "third.wav"
+    first.write_bytes(b"audio")
+    second.write_bytes(b"audio")
+    third.write_bytes(b"other")
+
+    assert compute_file_hash(first) == compute_file_hash(second)
+    assert compute_file_hash(first) != compute_file_hash(third)
+    assert len(compute_file_hash(first)) == 64
+
+
+def test_estimate_audio_duration_はWAVのヘッダから長さを返す(tmp_path: Path) -> None:
+    """WAVファイルの長さをヘッダから取得できることを確認"""
+    import wave
+
+    audio_path = tmp_path / "audio.wav"
+    with wave.open(str(audio_path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\x00\x00" * 16000 * 3)
+
+    assert estimate_audio_duration(audio_path) == 3.0
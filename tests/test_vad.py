@@ -0,0 +1,67 @@
+"""vadモジュールのテスト."""
+
+import numpy as np
+import pytest
+from transcription_tool.chunking import SAMPLE_RATE
+from transcription_tool.vad import SpeechMap, detect_speech
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_発話区間が余白付きで検出される() -> None:
+    """無音に挟まれた音が前後の余白を含めて1区間として検出されることを確認."""
+    audio = np.concatenate([_silence(5.0), _tone(2.0), _silence(5.0)])
+    regions = detect_speech(audio, padding=0.2)
+    assert len(regions) == 1
+    assert regions[0][0] == pytest.approx(4.8, abs=0.05)
+    assert regions[0][1] == pytest.approx(7.2, abs=0.05)
+
+
+def test_短い無音は発話区間に含める() -> None:
+    """min_silenceより短い息継ぎで区間が分かれないことを確認."""
+    audio = np.concatenate([_tone(1.0), _silence(0.5), _tone(1.0), _silence(3.0)])
+    assert len(detect_speech(audio, min_silence=1.0)) == 1
+    assert len(detect_speech(audio, min_silence=0.2, padding=0.0)) == 2
+
+
+def test_短い雑音は発話とみなさない() -> None:
+    """min_speechより短い音は捨てられることを確認."""
+    audio = np.concatenate([_silence(2.0), _tone(0.05), _silence(2.0)])
+    assert detect_speech(audio, min_speech=0.25) == []
+
+
+def test_発話区間だけをつなげた音声を作成する() -> None:
+    """compactが発話区間と区間の間の無音だけを含むことを確認."""
+    speech_map = SpeechMap([(1.0, 2.0), (10.0, 12.0)], duration=20.0, gap=0.5)
+    compact = speech_map.compact(np.ones(20 * SAMPLE_RATE, dtype=np.float32))
+    assert len(compact) == pytest.approx(4.0 * SAMPLE_RATE)
+    assert speech_map.speech_ratio == pytest.approx(0.15)
+
+
+def test_つなげた音声の時刻を元の時刻に戻す() -> None:
+    """区間内はずれを戻し、区間の間の無音は隣の区間の端に寄せることを確認."""
+    speech_map = SpeechMap([(1.0, 2.0), (10.0, 12.0)], duration=20.0, gap=0.5)
+    assert speech_map.to_original(0.5) == pytest.approx(1.5)
+    assert speech_map.to_original(2.0) == pytest.approx(10.5)
+    # 区間の間の無音
+    assert speech_map.to_original(1.2) == pytest.approx(10.0)
+    assert speech_map.to_original(1.2, is_end=True) == pytest.approx(2.0)
+
+    # 元の時刻からつなげた音声の時刻へ（区間の外は直前の区間の末尾に寄せる）
+    assert speech_map.to_compacted(1.5) == pytest.approx(0.5)
+    assert speech_map.to_compacted(10.5) == pytest.approx(2.0)
+    assert speech_map.to_compacted(5.0) == pytest.approx(1.0)
+    assert speech_map.to_compacted(0.5) == 0.0
+
+    segments = speech_map.remap_segments(
+        [{"start": 1.5, "end": 3.0, "text": "テスト", "words": []}]
+    )
+    assert segments[0]["start"] == pytest.approx(10.0)
+    assert segments[0]["end"] == pytest.approx(11.5)
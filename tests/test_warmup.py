@@ -0,0 +1,57 @@
+"""warmupモジュールのテスト."""
+
+from unittest.mock import Mock, patch
+
+from transcription_tool.model_registry import ModelRegistry
+from transcription_tool.warmup import FAILED, READY, ModelWarmer
+
+
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_指定したモデルをロードして推論しておく(
+    mock_load_model: Mock, mock_ensure: Mock
+) -> None:
+    """ウォームアップでモデルがレジストリに登録され、推論も1回行われることを確認."""
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {"text": "", "segments": []}
+    mock_load_model.return_value = mock_model
+    registry = ModelRegistry()
+    warmer = ModelWarmer(registry=registry, device="cpu")
+
+    warmer.start(["tiny"])
+
+    assert warmer.wait(timeout=5)
+    assert warmer.is_ready()
+    assert registry.is_loaded("tiny")
+    mock_model.transcribe.assert_called_once()
+    [state] = warmer.states()
+    assert state.status == READY
+    assert state.elapsed is not None
+    assert "準備完了" in warmer.format_status()
+
+
+@patch("transcription_tool.transcriber.ensure_model_downloaded")
+@patch("whisper.load_model")
+def test_失敗したモデルがあっても残りのモデルを準備する(
+    mock_load_model: Mock, mock_ensure: Mock
+) -> None:
+    """1つのモデルのロードに失敗しても他のモデルのウォームアップは続くことを確認."""
+    mock_model = Mock()
+    mock_model.transcribe.return_value = {"text": "", "segments": []}
+    mock_load_model.side_effect = [RuntimeError("ロード失敗"), mock_model]
+    warmer = ModelWarmer(registry=ModelRegistry(), device="cpu")
+
+    warmer.start(["tiny", "base"])
+
+    assert warmer.wait(timeout=5)
+    statuses = {state.model_name: state.status for state in warmer.states()}
+    assert statuses == {"tiny": FAILED, "base": READY}
+    assert "ロード失敗" in warmer.format_status()
+
+
+def test_ウォームアップするモデルがなければ準備完了() -> None:
+    """モデルを指定しない場合はすぐに準備完了になることを確認."""
+    warmer = ModelWarmer(registry=ModelRegistry())
+    warmer.start([])
+    assert warmer.is_ready()
+    assert warmer.format_status() == "🟢 準備完了"
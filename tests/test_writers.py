@@ -0,0 +1,104 @@
+"""writersモジュールのテスト."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+from transcription_tool.utils import save_transcription
+from transcription_tool.writers import format_timestamp, write_outputs
+
+
+def _result() -> dict[str, Any]:
+    return {
+        "text": "一つ目。二つ目。",
+        "language": "ja",
+        "segments": [
+            {
+                "start": 0.0,
+                "end": 2.5,
+                "text": " 一つ目。",
+                "words": [{"word": "一つ目。", "start": 0.0, "end": 2.5}],
+            },
+            {"start": 3725.25, "end": 3727.0, "text": " 二つ目。"},
+        ],
+    }
+
+
+def test_format_timestamp_は時間とミリ秒を含められる() -> None:
+    """時間・小数点の文字・桁数の指定が反映されることを確認"""
+    assert format_timestamp(2.5) == "00:02.500"
+    assert format_timestamp(3725.25, True, ",") == "01:02:05,250"
+    assert format_timestamp(1.0, always_include_hours=True) == "00:00:01.000"
+    assert format_timestamp(59.6, precision=0) == "01:00"
+
+
+def test_write_outputs_はSRTとVTTの字幕を書き出す(tmp_path: Path) -> None:
+    """セグメントごとのキューが各字幕形式で書き出されることを確認"""
+    paths = {"srt": tmp_path / "a.srt", "vtt": tmp_path / "a.vtt"}
+    write_outputs(_result(), "audio.wav", paths)
+
+    srt = paths["srt"].read_text(encoding="utf-8")
+    assert srt.startswith("1\n00:00:00,000 --> 00:00:02,500\n一つ目。\n\n2\n")
+    assert "01:02:05,250 --> 01:02:07,000" in srt
+
+    vtt = paths["vtt"].read_text(encoding="utf-8")
+    assert vtt.startswith("WEBVTT\n\n00:00:00.000 --> 00:00:02.500\n一つ目。\n")
+
+
+def test_write_outputs_はJSONとTSVを書き出す(tmp_path: Path) -> None:
+    """JSONに単語の時刻が残り、TSVがミリ秒で書き出されることを確認"""
+    result = _result()
+    result["speech_ratio"] = np.float64(0.5)
+    paths = {"json": tmp_path / "a.json", "tsv": tmp_path / "a.tsv"}
+    write_outputs(result, "audio.wav", paths)
+
+    data = json.loads(paths["json"].read_text(encoding="utf-8"))
+    assert data["audio_filename"] == "audio.wav"
+    assert data["speech_ratio"] == 0.5
+    assert data["segments"][0]["words"][0]["end"] == 2.5
+    assert len(data["segments"]) == 2
+
+    lines = paths["tsv"].read_text(encoding="utf-8").splitlines()
+    assert lines == [
+        "start\tend\ttext",
+        "0\t2500\t一つ目。",
+        "3725250\t3727000\t二つ目。",
+    ]
+
+
+def test_write_outputs_はセグメントのない結果も書き出す(tmp_path: Path) -> None:
+    """segmentsがない結果でも壊れていないファイルになることを確認"""
+    paths = {"json": tmp_path / "a.json", "srt": tmp_path / "a.srt"}
+    write_outputs({"text": "", "language": "ja"}, "audio.wav", paths)
+
+    assert json.loads(paths["json"].read_text(encoding="utf-8"))["segments"] == []
+    assert paths["srt"].read_text(encoding="utf-8") == ""
+
+
+def test_write_outputs_は未対応の形式でエラーになる(tmp_path: Path) -> None:
+    """対応していない形式を指定するとValueErrorになることを確認"""
+    with pytest.raises(ValueError, match="docx"):
+        write_outputs(_result(), "audio.wav", {"docx": tmp_path / "a.docx"})
+
+
+def test_save_transcription_は複数の形式を同じ名前で保存する(tmp_path: Path) -> None:
+    """指定した形式のファイルが拡張子違いの同じ名前で保存されることを確認"""
+    paths = save_transcription(
+        _result(),
+        "audio.wav",
+        output_dir=tmp_path,
+        include_timestamps=True,
+        formats=["md", "srt", "json"],
+        output_stem="meeting",
+    )
+
+    assert paths == {
+        "md": tmp_path / "meeting.md",
+        "srt": tmp_path / "meeting.srt",
+        "json": tmp_path / "meeting.json",
+    }
+    assert "[01:02:05 - 01:02:07] 二つ目。" in paths["md"].read_text(encoding="utf-8")
+    assert all(path.exists() for path in paths.values())